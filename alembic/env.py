@@ -10,6 +10,9 @@ from alembic import context
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 # Import your models for autogenerate support
+from src.infrastructure.database.models.audit_event import (  # noqa: E402, F401
+    AuthAuditEvent,
+)
 from src.infrastructure.database.models.refresh_token import (  # noqa: E402; noqa: F401
     RefreshToken,
 )
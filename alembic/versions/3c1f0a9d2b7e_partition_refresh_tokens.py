@@ -0,0 +1,215 @@
+"""partition refresh_tokens by expires_at
+
+Converts ``refresh_tokens`` into a table range-partitioned by day of
+``expires_at`` without holding a long lock:
+
+1. create the partitioned table with partitions up to today + 14 days,
+2. mirror every write on the old table into it with a trigger,
+3. backfill still-retained rows in id batches, each in its own transaction,
+4. swap the tables under a short ACCESS EXCLUSIVE lock.
+
+Rows that expired before the retention cutoff are not copied; partition
+maintenance would drop them straight away. Later partitions are created and
+dropped by ``src.infrastructure.database.partitions`` at runtime.
+
+PostgreSQL only; a no-op on other databases.
+
+Revision ID: 3c1f0a9d2b7e
+Revises: 7bae8c635f3a
+Create Date: 2026-10-19 09:12:41.503118
+
+"""
+
+from datetime import UTC, datetime, timedelta
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3c1f0a9d2b7e"
+down_revision: str | None = "7bae8c635f3a"
+branch_labels: str | None = None
+depends_on: str | None = None
+
+RETENTION_DAYS = 1
+DAYS_AHEAD = 14
+BATCH_SIZE = 10_000
+
+COLUMNS = "id, jti, user_id, token_hash, expires_at, created_at, is_active, revoked_at"
+
+
+def _create_partition(table: str, day) -> None:
+    start = datetime.combine(day, datetime.min.time(), UTC)
+    end = start + timedelta(days=1)
+    op.execute(
+        f"CREATE TABLE IF NOT EXISTS refresh_tokens_p{day:%Y%m%d} "
+        f"PARTITION OF {table} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    today = datetime.now(UTC).date()
+    cutoff = today - timedelta(days=RETENTION_DAYS)
+
+    op.execute(
+        """
+        CREATE TABLE refresh_tokens_partitioned (
+            id integer NOT NULL
+                DEFAULT nextval('refresh_tokens_id_seq'::regclass),
+            jti varchar(255) NOT NULL,
+            user_id integer NOT NULL REFERENCES users (id),
+            token_hash varchar(255) NOT NULL,
+            expires_at timestamptz NOT NULL,
+            created_at timestamptz NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            is_active boolean NOT NULL,
+            revoked_at timestamptz,
+            CONSTRAINT refresh_tokens_partitioned_pkey
+                PRIMARY KEY (id, expires_at),
+            CONSTRAINT uq_refresh_tokens_jti_expires_at
+                UNIQUE (jti, expires_at)
+        ) PARTITION BY RANGE (expires_at)
+        """
+    )
+    # Catches rows outside every daily partition (e.g. long-expired tokens
+    # written through the mirror trigger); normally empty. Partition
+    # maintenance moves rows out of it when their day's partition is created
+    # and deletes the expired ones.
+    op.execute(
+        "CREATE TABLE refresh_tokens_default "
+        "PARTITION OF refresh_tokens_partitioned DEFAULT"
+    )
+    day = cutoff
+    while day <= today + timedelta(days=DAYS_AHEAD):
+        _create_partition("refresh_tokens_partitioned", day)
+        day += timedelta(days=1)
+
+    op.execute(
+        """
+        CREATE FUNCTION refresh_tokens_mirror() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                DELETE FROM refresh_tokens_partitioned
+                WHERE id = OLD.id AND expires_at = OLD.expires_at;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO refresh_tokens_partitioned (
+                    id, jti, user_id, token_hash, expires_at, created_at,
+                    is_active, revoked_at
+                )
+                VALUES (NEW.id, NEW.jti, NEW.user_id, NEW.token_hash,
+                        NEW.expires_at, NEW.created_at, NEW.is_active,
+                        NEW.revoked_at)
+                ON CONFLICT (id, expires_at) DO UPDATE SET
+                    jti = EXCLUDED.jti,
+                    user_id = EXCLUDED.user_id,
+                    token_hash = EXCLUDED.token_hash,
+                    created_at = EXCLUDED.created_at,
+                    is_active = EXCLUDED.is_active,
+                    revoked_at = EXCLUDED.revoked_at;
+            END IF;
+            RETURN NULL;
+        END;
+        $$
+        """
+    )
+    op.execute(
+        "CREATE TRIGGER refresh_tokens_mirror "
+        "AFTER INSERT OR UPDATE OR DELETE ON refresh_tokens "
+        "FOR EACH ROW EXECUTE FUNCTION refresh_tokens_mirror()"
+    )
+
+    # Backfill outside the migration transaction so each batch commits on
+    # its own and no lock is held on refresh_tokens for the whole copy.
+    # Rows written meanwhile reach the new table through the trigger, and
+    # ON CONFLICT keeps the backfill from overwriting those newer versions.
+    with op.get_context().autocommit_block():
+        max_id = bind.execute(
+            sa.text("SELECT coalesce(max(id), 0) FROM refresh_tokens")
+        ).scalar()
+        for start in range(0, max_id, BATCH_SIZE):
+            bind.execute(
+                sa.text(
+                    f"INSERT INTO refresh_tokens_partitioned ({COLUMNS}) "  # noqa: S608
+                    f"SELECT {COLUMNS} FROM refresh_tokens "
+                    "WHERE id > :start AND id <= :end AND expires_at >= :cutoff "
+                    "ON CONFLICT (id, expires_at) DO NOTHING"
+                ),
+                {
+                    "start": start,
+                    "end": start + BATCH_SIZE,
+                    "cutoff": datetime.combine(cutoff, datetime.min.time(), UTC),
+                },
+            )
+
+    op.execute("LOCK TABLE refresh_tokens IN ACCESS EXCLUSIVE MODE")
+    op.execute("DROP TRIGGER refresh_tokens_mirror ON refresh_tokens")
+    op.execute("DROP FUNCTION refresh_tokens_mirror()")
+    op.execute(
+        "ALTER SEQUENCE refresh_tokens_id_seq OWNED BY refresh_tokens_partitioned.id"
+    )
+    op.execute("DROP TABLE refresh_tokens")
+    op.execute("ALTER TABLE refresh_tokens_partitioned RENAME TO refresh_tokens")
+    op.execute(
+        "ALTER TABLE refresh_tokens RENAME CONSTRAINT "
+        "refresh_tokens_partitioned_pkey TO refresh_tokens_pkey"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    # Offline conversion back to a single heap table
+    op.execute("ALTER TABLE refresh_tokens RENAME TO refresh_tokens_partitioned")
+    op.execute(
+        "ALTER TABLE refresh_tokens_partitioned RENAME CONSTRAINT "
+        "refresh_tokens_pkey TO refresh_tokens_partitioned_pkey"
+    )
+    op.create_table(
+        "refresh_tokens",
+        sa.Column(
+            "id",
+            sa.Integer(),
+            server_default=sa.text("nextval('refresh_tokens_id_seq'::regclass)"),
+            nullable=False,
+        ),
+        sa.Column("jti", sa.String(length=255), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("token_hash", sa.String(length=255), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        sa.Column("revoked_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["user_id"],
+            ["users.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.execute(
+        f"INSERT INTO refresh_tokens ({COLUMNS}) "  # noqa: S608
+        f"SELECT {COLUMNS} FROM refresh_tokens_partitioned"
+    )
+    op.execute("ALTER SEQUENCE refresh_tokens_id_seq OWNED BY refresh_tokens.id")
+    op.execute("DROP TABLE refresh_tokens_partitioned")
+    op.create_index(
+        op.f("ix_refresh_tokens_id"), "refresh_tokens", ["id"], unique=False
+    )
+    op.create_index(
+        op.f("ix_refresh_tokens_jti"), "refresh_tokens", ["jti"], unique=True
+    )
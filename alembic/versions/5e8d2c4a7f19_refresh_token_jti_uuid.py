@@ -0,0 +1,38 @@
+"""store refresh_tokens.jti as native uuid
+
+Existing jti values are uuid4 strings and cast directly; new ones are
+time-ordered UUIDv7. The column shrinks from up to 255 bytes of text to
+16 bytes and the (jti, expires_at) unique index is rebuilt as part of the
+type change. The rewrite holds an ACCESS EXCLUSIVE lock, but after the
+partitioning migration the table only holds unexpired tokens.
+
+Revision ID: 5e8d2c4a7f19
+Revises: 3c1f0a9d2b7e
+Create Date: 2026-10-19 11:02:17.846310
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5e8d2c4a7f19"
+down_revision: str | None = "3c1f0a9d2b7e"
+branch_labels: str | None = None
+depends_on: str | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("ALTER TABLE refresh_tokens ALTER COLUMN jti TYPE uuid USING jti::uuid")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute(
+        "ALTER TABLE refresh_tokens ALTER COLUMN jti TYPE varchar(255) "
+        "USING jti::text"
+    )
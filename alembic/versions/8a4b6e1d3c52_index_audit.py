@@ -0,0 +1,101 @@
+"""index audit: drop redundant indexes, add missing ones
+
+- ``ix_users_id`` / ``ix_refresh_tokens_id`` duplicate the primary keys and
+  only add write cost (the latter is already gone with the partitioning
+  migration; dropped here if it still exists).
+- ``ix_users_username_lower`` / ``ix_users_email_lower`` serve the
+  case-insensitive repository lookups.
+- ``ix_refresh_tokens_user_id`` serves per-user session queries and the
+  foreign key check when a user is deleted.
+- ``ix_refresh_tokens_active`` is a partial index on (user_id, expires_at)
+  of active tokens only, for active-session counts and expiry scans.
+
+Every index is built CONCURRENTLY, outside a transaction. Postgres cannot
+build an index concurrently on a partitioned table, so the refresh_tokens
+indexes are created ON ONLY the parent, built concurrently on each
+partition and then attached; partitions created later inherit them.
+
+Revision ID: 8a4b6e1d3c52
+Revises: 5e8d2c4a7f19
+Create Date: 2026-10-19 13:40:05.219774
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8a4b6e1d3c52"
+down_revision: str | None = "5e8d2c4a7f19"
+branch_labels: str | None = None
+depends_on: str | None = None
+
+# name -> (columns, WHERE clause)
+REFRESH_TOKEN_INDEXES = {
+    "ix_refresh_tokens_user_id": ("user_id", None),
+    "ix_refresh_tokens_active": ("user_id, expires_at", "is_active"),
+}
+
+
+def _partitions(bind) -> list[str]:
+    result = bind.execute(
+        sa.text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON pg_inherits.inhparent = parent.oid "
+            "JOIN pg_class child ON pg_inherits.inhrelid = child.oid "
+            "WHERE parent.relname = 'refresh_tokens'"
+        )
+    )
+    return [row[0] for row in result]
+
+
+def _create_partitioned_index(bind, name: str, columns: str, where: str | None):
+    where_sql = f" WHERE {where}" if where else ""
+    op.execute(
+        f"CREATE INDEX IF NOT EXISTS {name} "
+        f"ON ONLY refresh_tokens ({columns}){where_sql}"
+    )
+    for partition in _partitions(bind):
+        partition_index = f"{partition}_{name.removeprefix('ix_refresh_tokens_')}"
+        op.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition_index} "
+            f"ON {partition} ({columns}){where_sql}"
+        )
+        op.execute(f"ALTER INDEX {name} ATTACH PARTITION {partition_index}")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_users_id")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_refresh_tokens_id")
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_username_lower "
+            "ON users (lower(username))"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_email_lower "
+            "ON users (lower(email))"
+        )
+        for name, (columns, where) in REFRESH_TOKEN_INDEXES.items():
+            _create_partitioned_index(bind, name, columns, where)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    with op.get_context().autocommit_block():
+        # Dropping the parent index drops the attached partition indexes
+        for name in REFRESH_TOKEN_INDEXES:
+            op.execute(f"DROP INDEX IF EXISTS {name}")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_users_email_lower")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_users_username_lower")
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_id ON users (id)")
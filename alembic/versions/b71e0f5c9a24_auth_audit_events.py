@@ -0,0 +1,90 @@
+"""add auth_audit_events
+
+Login, refresh and logout audit trail. On PostgreSQL the table is
+range-partitioned by day of ``occurred_at`` so retention is a partition
+drop; later partitions are managed by
+``src.infrastructure.database.partitions``.
+
+Revision ID: b71e0f5c9a24
+Revises: 8a4b6e1d3c52
+Create Date: 2026-10-19 15:21:48.306912
+
+"""
+
+from datetime import UTC, datetime, timedelta
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b71e0f5c9a24"
+down_revision: str | None = "8a4b6e1d3c52"
+branch_labels: str | None = None
+depends_on: str | None = None
+
+DAYS_AHEAD = 7
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        op.create_table(
+            "auth_audit_events",
+            sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column("occurred_at", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("event", sa.String(length=20), nullable=False),
+            sa.Column("outcome", sa.String(length=20), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=True),
+            sa.Column("username", sa.String(length=50), nullable=True),
+            sa.Column("ip_address", sa.String(length=45), nullable=True),
+            sa.Column("user_agent", sa.String(length=255), nullable=True),
+            sa.Column("detail", sa.String(length=255), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+    else:
+        op.execute(
+            """
+            CREATE TABLE auth_audit_events (
+                id bigserial NOT NULL,
+                occurred_at timestamptz NOT NULL,
+                event varchar(20) NOT NULL,
+                outcome varchar(20) NOT NULL,
+                user_id integer,
+                username varchar(50),
+                ip_address varchar(45),
+                user_agent varchar(255),
+                detail varchar(255),
+                CONSTRAINT auth_audit_events_pkey PRIMARY KEY (id, occurred_at)
+            ) PARTITION BY RANGE (occurred_at)
+            """
+        )
+        op.execute(
+            "CREATE TABLE auth_audit_events_default "
+            "PARTITION OF auth_audit_events DEFAULT"
+        )
+        today = datetime.now(UTC).date()
+        for offset in range(DAYS_AHEAD + 1):
+            day = today + timedelta(days=offset)
+            start = datetime.combine(day, datetime.min.time(), UTC)
+            end = start + timedelta(days=1)
+            op.execute(
+                f"CREATE TABLE auth_audit_events_p{day:%Y%m%d} "
+                "PARTITION OF auth_audit_events "
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            )
+
+    op.create_index(
+        "ix_auth_audit_events_occurred_at", "auth_audit_events", ["occurred_at"]
+    )
+    op.create_index(
+        "ix_auth_audit_events_user_id", "auth_audit_events", ["user_id", "occurred_at"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_auth_audit_events_user_id", table_name="auth_audit_events")
+    op.drop_index("ix_auth_audit_events_occurred_at", table_name="auth_audit_events")
+    # Drops every partition with it
+    op.drop_table("auth_audit_events")
@@ -0,0 +1,98 @@
+"""session metadata and covering per-user index on refresh_tokens
+
+Adds ``device``, ``ip_address`` and ``last_used_at`` (nullable, so adding
+them is a catalog-only change) and replaces ``ix_refresh_tokens_user_id``
+and ``ix_refresh_tokens_active`` with one covering index,
+``(user_id, is_active, expires_at) INCLUDE (...)``. The session listing
+becomes an index-only scan, and the same index serves active-session
+counts and the users.id foreign key check.
+
+The new index is built like the index audit migration: ON ONLY the parent,
+CONCURRENTLY on each partition, then attached.
+
+Revision ID: d2a9c7e41b86
+Revises: b71e0f5c9a24
+Create Date: 2026-10-19 17:08:33.912450
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d2a9c7e41b86"
+down_revision: str | None = "b71e0f5c9a24"
+branch_labels: str | None = None
+depends_on: str | None = None
+
+INDEX = "ix_refresh_tokens_user_sessions"
+COLUMNS = "user_id, is_active, expires_at"
+INCLUDE = "id, created_at, last_used_at, device, ip_address"
+
+
+def _partitions(bind) -> list[str]:
+    result = bind.execute(
+        sa.text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON pg_inherits.inhparent = parent.oid "
+            "JOIN pg_class child ON pg_inherits.inhrelid = child.oid "
+            "WHERE parent.relname = 'refresh_tokens'"
+        )
+    )
+    return [row[0] for row in result]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "refresh_tokens", sa.Column("device", sa.String(length=255), nullable=True)
+    )
+    op.add_column(
+        "refresh_tokens", sa.Column("ip_address", sa.String(length=45), nullable=True)
+    )
+    op.add_column(
+        "refresh_tokens",
+        sa.Column("last_used_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        op.create_index(INDEX, "refresh_tokens", ["user_id", "is_active", "expires_at"])
+        return
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            f"CREATE INDEX IF NOT EXISTS {INDEX} ON ONLY refresh_tokens "
+            f"({COLUMNS}) INCLUDE ({INCLUDE})"
+        )
+        for partition in _partitions(bind):
+            partition_index = f"{partition}_user_sessions"
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition_index} "
+                f"ON {partition} ({COLUMNS}) INCLUDE ({INCLUDE})"
+            )
+            op.execute(f"ALTER INDEX {INDEX} ATTACH PARTITION {partition_index}")
+        # Superseded; dropping a partitioned index cannot be CONCURRENTLY
+        op.execute("DROP INDEX IF EXISTS ix_refresh_tokens_active")
+        op.execute("DROP INDEX IF EXISTS ix_refresh_tokens_user_id")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_refresh_tokens_user_id "
+            "ON refresh_tokens (user_id)"
+        )
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_refresh_tokens_active "
+            "ON refresh_tokens (user_id, expires_at) WHERE is_active"
+        )
+        op.execute(f"DROP INDEX IF EXISTS {INDEX}")
+    else:
+        op.drop_index(INDEX, table_name="refresh_tokens")
+    op.drop_column("refresh_tokens", "last_used_at")
+    op.drop_column("refresh_tokens", "ip_address")
+    op.drop_column("refresh_tokens", "device")
@@ -0,0 +1,39 @@
+"""users.version and users.updated_at for profile ETags
+
+``version`` is bumped by every UPDATE of a user row and identifies the
+representation served by ``/api/v1/auth/me``. Adding a NOT NULL column
+with a constant default is a catalog-only change on PostgreSQL 11+, so
+existing rows are not rewritten.
+
+Revision ID: e4f1b8a2c637
+Revises: d2a9c7e41b86
+Create Date: 2026-10-19 18:42:10.513207
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e4f1b8a2c637"
+down_revision: str | None = "d2a9c7e41b86"
+branch_labels: str | None = None
+depends_on: str | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "users",
+        sa.Column("version", sa.Integer(), server_default=sa.text("1"), nullable=False),
+    )
+    op.add_column(
+        "users", sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("users", "updated_at")
+    op.drop_column("users", "version")
@@ -1,5 +1,6 @@
 import asyncio
 from collections.abc import AsyncGenerator
+from contextlib import contextmanager
 
 import pytest
 import pytest_asyncio
@@ -7,8 +8,35 @@ from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.pool import StaticPool
 
+from src.api.lifecycle import get_lifecycle_state
 from src.api.main import app
-from src.infrastructure.database.session import Base, get_db
+from src.infrastructure.audit.audit_writer import get_audit_writer
+from src.infrastructure.cache.principal_cache import get_principal_cache
+from src.infrastructure.cache.revocation_cache import get_revocation_cache
+from src.infrastructure.cache.session_activity import get_session_activity_tracker
+from src.infrastructure.cache.user_lookup_filter import get_user_lookup_filter
+from src.infrastructure.database.circuit_breaker import (
+    get_circuit_breaker,
+    install_circuit_breaker_hooks,
+)
+from src.infrastructure.database.query_stats import install_query_hooks, track_queries
+from src.infrastructure.database.session import Base, get_db, get_snapshot_db
+from src.infrastructure.database.slow_queries import get_slow_query_sampler
+from src.infrastructure.database.timeouts import install_statement_timeout_hooks
+from src.infrastructure.monitoring.exposition import get_metrics_exposition
+from src.infrastructure.monitoring.flight_recorder import (
+    get_flight_recorder,
+    install_flight_recorder_hooks,
+)
+from src.infrastructure.monitoring.health_monitor import get_health_monitor
+from src.infrastructure.monitoring.loop_monitor import get_loop_monitor
+from src.infrastructure.monitoring.memory_profiler import get_memory_profiler
+from src.infrastructure.monitoring.metrics import set_auth_metrics
+from src.infrastructure.monitoring.tracing import set_tracer
+from src.infrastructure.security.rate_limiter import (
+    InMemoryRateLimitBackend,
+    set_rate_limit_backend,
+)
 
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
@@ -19,6 +47,11 @@ test_engine = create_async_engine(
     connect_args={"check_same_thread": False},
 )
 
+install_circuit_breaker_hooks(test_engine)
+install_statement_timeout_hooks(test_engine)
+install_query_hooks(test_engine)
+install_flight_recorder_hooks(test_engine)
+
 TestSessionLocal = async_sessionmaker(
     test_engine,
     class_=AsyncSession,
@@ -46,6 +79,7 @@ async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
         yield db_session
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_snapshot_db] = override_get_db
 
     async with AsyncClient(app=app, base_url="http://test") as ac:
         yield ac
@@ -53,6 +87,122 @@ async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
     app.dependency_overrides.clear()
 
 
+@pytest.fixture(autouse=True)
+def reset_rate_limiter():
+    set_rate_limit_backend(InMemoryRateLimitBackend())
+    yield
+
+
+@pytest.fixture(autouse=True)
+def reset_user_lookup_filter():
+    yield
+    get_user_lookup_filter().reset()
+
+
+@pytest.fixture(autouse=True)
+def reset_audit_writer():
+    yield
+    get_audit_writer().reset()
+
+
+@pytest.fixture(autouse=True)
+def reset_session_activity_tracker():
+    yield
+    get_session_activity_tracker().reset()
+
+
+@pytest.fixture(autouse=True)
+def reset_principal_cache():
+    yield
+    get_principal_cache().reset()
+
+
+@pytest.fixture(autouse=True)
+def reset_revocation_cache():
+    yield
+    get_revocation_cache().reset()
+
+
+@pytest.fixture(autouse=True)
+def reset_circuit_breaker():
+    yield
+    get_circuit_breaker().reset()
+
+
+@pytest.fixture(autouse=True)
+def reset_auth_metrics():
+    yield
+    set_auth_metrics(None)
+
+
+@pytest.fixture(autouse=True)
+def reset_loop_monitor():
+    yield
+    get_loop_monitor().reset()
+
+
+@pytest.fixture(autouse=True)
+def reset_slow_query_sampler():
+    yield
+    get_slow_query_sampler().reset()
+
+
+@pytest.fixture(autouse=True)
+def reset_memory_profiler():
+    yield
+    get_memory_profiler().reset()
+
+
+@pytest.fixture(autouse=True)
+def reset_flight_recorder():
+    yield
+    get_flight_recorder().reset()
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics_exposition():
+    yield
+    get_metrics_exposition().reset()
+
+
+@pytest.fixture(autouse=True)
+def reset_tracer():
+    yield
+    set_tracer(None)
+
+
+@pytest.fixture(autouse=True)
+def reset_health_monitor():
+    yield
+    get_health_monitor().reset()
+    get_lifecycle_state().reset()
+
+
+def metric_sample(metric, name: str, **labels) -> float:
+    """Current value of one sample of a Prometheus metric; 0 if not yet seen."""
+    for collected in metric.collect():
+        for sample in collected.samples:
+            if sample.name == name and sample.labels == labels:
+                return sample.value
+    return 0.0
+
+
+@pytest.fixture
+def assert_query_count():
+    """Assert the exact number of SQL statements run inside the block."""
+
+    @contextmanager
+    def _assert_query_count(expected: int):
+        with track_queries() as stats:
+            yield stats
+        ran = "\n".join(stats.statements)
+        assert (
+            stats.queries == expected
+        ), f"expected {expected} queries, ran {stats.queries}:\n{ran}"
+
+    return _assert_query_count
+
+
 @pytest.fixture
 def test_user_data() -> dict:
     return {
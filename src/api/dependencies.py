@@ -1,57 +1,92 @@
-from fastapi import Depends, HTTPException, status
+from typing import Any
+
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.config import settings
+from src.infrastructure.cache.principal_cache import Principal, get_principal_cache
+from src.infrastructure.cache.session_activity import get_session_activity_tracker
+from src.infrastructure.database.circuit_breaker import DatabaseUnavailableError
 from src.infrastructure.database.models.roles import UserRole
 from src.infrastructure.database.models.user import User
 from src.infrastructure.database.session import get_db
+from src.infrastructure.monitoring.flight_recorder import timed_stage
+from src.infrastructure.monitoring.metrics import (
+    record_degraded_response,
+    record_rate_limited,
+)
+from src.infrastructure.security.rate_limiter import check_rate_limit
 from src.infrastructure.security.token_service import decode_token
 
 # Create the security scheme with auto_error=False to handle authentication manually
 bearer_scheme = HTTPBearer(auto_error=False)
 
 
-async def get_current_user(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+async def get_token_payload(
     token: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-    db: AsyncSession = Depends(get_db),
-) -> User:
+) -> dict[str, Any]:
+    """Claims of a valid access token; 401 otherwise."""
     # Check if token is provided
     if token is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _credentials_exception()
 
     try:
-        payload = decode_token(token.credentials)
-        username: str | None = payload.get("sub")
-        if username is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+        with timed_stage("jwt"):
+            payload = decode_token(token.credentials)
     except JWTError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _credentials_exception() from None
+    if payload.get("sub") is None:
+        raise _credentials_exception()
+
+    sid = payload.get("sid")
+    if isinstance(sid, int):
+        # Coalesced in memory; written by the session activity flusher
+        get_session_activity_tracker().touch(sid)
+    return payload
 
-    user = await db.execute(select(User).where(User.username == username))
+
+async def get_current_user(
+    payload: dict[str, Any] = Depends(get_token_payload),
+    db: AsyncSession = Depends(get_db),
+) -> User:
+    user = await db.execute(select(User).where(User.username == payload["sub"]))
     user = user.scalar_one_or_none()
     if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _credentials_exception()
+    get_principal_cache().put(Principal.from_user(user))
     return user
 
 
+async def get_current_principal(
+    payload: dict[str, Any] = Depends(get_token_payload),
+    db: AsyncSession = Depends(get_db),
+) -> Principal:
+    """Like get_current_user, but served from the principal cache when possible."""
+    cache = get_principal_cache()
+    principal = cache.get(payload["sub"])
+    if principal is None:
+        try:
+            principal = Principal.from_user(await get_current_user(payload, db))
+        except DatabaseUnavailableError:
+            # The token is valid; answer from the last known profile meanwhile
+            principal = cache.get_stale(payload["sub"])
+            if principal is None:
+                raise
+            record_degraded_response("principal")
+    return principal
+
+
 def require_role(required_role: UserRole):
     async def role_checker(current_user: User = Depends(get_current_user)) -> User:
         if current_user.role.value != required_role.value:
@@ -62,3 +97,48 @@ def require_role(required_role: UserRole):
         return current_user
 
     return role_checker
+
+
+def require_principal_role(required_role: UserRole):
+    """Like require_role, but checks the cached principal instead of the row."""
+
+    async def role_checker(
+        principal: Principal = Depends(get_current_principal),
+    ) -> Principal:
+        if principal.role.value != required_role.value:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Access denied. Required role: {required_role.value}",
+            )
+        return principal
+
+    return role_checker
+
+
+def get_client_ip(request: Request) -> str:
+    if settings.RATE_LIMIT_TRUST_FORWARDED_FOR:
+        forwarded_for = request.headers.get("x-forwarded-for")
+        if forwarded_for:
+            return forwarded_for.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+async def enforce_rate_limit(
+    request: Request, action: str, username: str | None = None
+) -> None:
+    """Reject the request with 429 when ``action`` exceeds its rate limits."""
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+
+    identifiers = {"ip": get_client_ip(request)}
+    if username is not None:
+        identifiers["username"] = username.lower()
+
+    result, key_type = await check_rate_limit(action, identifiers)
+    if not result.allowed:
+        record_rate_limited(action, key_type or "unknown")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests, please try again later",
+            headers={"Retry-After": str(result.retry_after)},
+        )
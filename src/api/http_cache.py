@@ -0,0 +1,40 @@
+"""
+Conditional GET helpers (ETag / If-None-Match).
+"""
+
+from fastapi import Request, Response, status
+
+# Cacheable by the client only, and revalidated on every use
+PRIVATE_REVALIDATE = "private, no-cache"
+
+
+def make_etag(*parts: object) -> str:
+    return '"' + ".".join(str(part) for part in parts) + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison, as If-None-Match requires (RFC 9110 13.1.2)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag.removeprefix("W/") in {
+        tag.strip().removeprefix("W/") for tag in if_none_match.split(",")
+    }
+
+
+def cache_headers(etag: str, cache_control: str = PRIVATE_REVALIDATE) -> dict:
+    # Responses differ per bearer token
+    return {"ETag": etag, "Cache-Control": cache_control, "Vary": "Authorization"}
+
+
+def not_modified_response(
+    request: Request, etag: str, cache_control: str = PRIVATE_REVALIDATE
+) -> Response | None:
+    """A 304 response if the client already has ``etag``, else None."""
+    if not etag_matches(request.headers.get("if-none-match"), etag):
+        return None
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers=cache_headers(etag, cache_control),
+    )
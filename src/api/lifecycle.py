@@ -0,0 +1,60 @@
+"""
+Application start-up and shutdown state.
+
+Warm-up runs in the background after the lifespan start-up hook, and
+``/health/startup`` answers 503 until it has finished. Readiness fails once
+``shutting_down`` is set, which the server does on SIGTERM (see
+``src.api.server``).
+"""
+
+import asyncio
+
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from src.config import settings
+from src.infrastructure.cache.user_lookup_filter import build_user_lookup_filter
+from src.infrastructure.database.warmup import warm_pool
+from src.infrastructure.monitoring.health_monitor import get_health_monitor
+from src.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class LifecycleState:
+    def __init__(self):
+        self.startup_complete = False
+        self.shutting_down = False
+
+    def reset(self) -> None:
+        self.startup_complete = False
+        self.shutting_down = False
+
+
+_state = LifecycleState()
+
+
+def get_lifecycle_state() -> LifecycleState:
+    return _state
+
+
+async def warm_up(
+    app: FastAPI,
+    engine: AsyncEngine,
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    """Prepare everything the first requests would otherwise pay for."""
+    try:
+        async with asyncio.timeout(settings.WARMUP_TIMEOUT_SECONDS):
+            app.openapi()
+            warmed = await warm_pool(engine, settings.WARMUP_POOL_CONNECTIONS)
+            logger.info("Warmed %d database connections", warmed)
+            if settings.USER_LOOKUP_FILTER_ENABLED:
+                await build_user_lookup_filter(session_factory)
+            # Readiness is answered from the monitor; give it a first result
+            await get_health_monitor().run_once()
+    except Exception:
+        # A cold start is slower, not broken; readiness reflects the database
+        logger.exception("Warm-up did not complete")
+    finally:
+        _state.startup_complete = True
@@ -1,22 +1,70 @@
+import argparse
+import asyncio
 import os
+import signal
+import time
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, Response
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
-from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from fastapi.responses import JSONResponse
+from prometheus_client import CONTENT_TYPE_LATEST
 
+from src.api.lifecycle import get_lifecycle_state, warm_up
 from src.api.routers import admin, auth, health
 from src.config import settings
-from src.infrastructure.monitoring.metrics import setup_metrics  # Updated import
-from src.logging_config import configure_logging, get_logger
-
-# Configure logging
-configure_logging(
-    level=os.getenv("LOG_LEVEL", "INFO"),
-    json_logs=os.getenv("JSON_LOGS", "true").lower() == "true",
+from src.infrastructure.audit.audit_writer import get_audit_writer
+from src.infrastructure.cache.revocation_cache import (
+    get_revocation_cache,
+    run_revocation_flusher,
+)
+from src.infrastructure.cache.session_activity import (
+    get_session_activity_tracker,
+    run_session_activity_flusher,
+)
+from src.infrastructure.cache.user_lookup_filter import run_user_lookup_filter_refresher
+from src.infrastructure.database.circuit_breaker import DatabaseUnavailableError
+from src.infrastructure.database.partitions import run_partition_maintenance
+from src.infrastructure.database.query_stats import QueryAccountingMiddleware
+from src.infrastructure.database.session import (
+    close_db,
+    get_engine,
+    get_session_factory,
+)
+from src.infrastructure.database.slow_queries import get_slow_query_sampler
+from src.infrastructure.database.timeouts import DeadlineMiddleware
+from src.infrastructure.monitoring.exposition import (
+    accepts_gzip,
+    get_metrics_exposition,
+)
+from src.infrastructure.monitoring.flight_recorder import (
+    FlightRecorderMiddleware,
+    dump_on_signal,
+)
+from src.infrastructure.monitoring.health_monitor import (
+    build_default_checks,
+    get_health_monitor,
+)
+from src.infrastructure.monitoring.loop_monitor import (
+    RouteAttributionMiddleware,
+    get_loop_monitor,
+)
+from src.infrastructure.monitoring.memory_profiler import (
+    RssWatchdog,
+    get_memory_profiler,
+    run_rss_watchdog,
+)
+from src.infrastructure.monitoring.metrics import (  # Updated import
+    record_startup_duration,
+    setup_metrics,
 )
+from src.infrastructure.monitoring.tracing import TracingMiddleware, get_tracer
+from src.infrastructure.security.hashing_pool import shutdown_hashing_executor
+from src.infrastructure.security.password_service import get_pwd_context
+from src.infrastructure.security.token_service import get_jwt
+from src.logging_config import configure_logging, get_logger
 
 logger = get_logger(__name__)
 
@@ -24,11 +72,95 @@ logger = get_logger(__name__)
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """Application lifespan management."""
-    # Startup
+    # Startup: everything that used to run at import time happens here
+    started = time.perf_counter()
+    configure_logging(
+        level=os.getenv("LOG_LEVEL", "INFO"),
+        json_logs=os.getenv("JSON_LOGS", "true").lower() == "true",
+    )
+    engine = get_engine()
+    get_pwd_context()
+    get_jwt()
+
+    # Long-running background jobs, cancelled on shutdown
+    background_jobs: list[asyncio.Task] = []
+    if settings.USER_LOOKUP_FILTER_ENABLED:
+        background_jobs.append(
+            asyncio.create_task(
+                run_user_lookup_filter_refresher(
+                    get_session_factory(), build_first=not settings.WARMUP_ENABLED
+                )
+            )
+        )
+    background_jobs.append(
+        asyncio.create_task(run_session_activity_flusher(get_session_factory()))
+    )
+    background_jobs.append(
+        asyncio.create_task(run_revocation_flusher(get_session_factory()))
+    )
+    if settings.PARTITION_MAINTENANCE_ENABLED and engine.dialect.name == "postgresql":
+        background_jobs.append(asyncio.create_task(run_partition_maintenance(engine)))
+
+    if settings.MEMORY_TRACE_ON_START:
+        get_memory_profiler().start(settings.MEMORY_TRACE_FRAMES)
+    if settings.MEMORY_RSS_DUMP_THRESHOLD_MB > 0:
+        watchdog = RssWatchdog(
+            get_memory_profiler(),
+            threshold_bytes=settings.MEMORY_RSS_DUMP_THRESHOLD_MB * 2**20,
+            dump_dir=settings.MEMORY_DUMP_DIR,
+            cooldown_seconds=settings.MEMORY_DUMP_COOLDOWN_SECONDS,
+            frames=settings.MEMORY_TRACE_FRAMES,
+        )
+        background_jobs.append(
+            asyncio.create_task(
+                run_rss_watchdog(watchdog, settings.MEMORY_RSS_CHECK_INTERVAL_SECONDS)
+            )
+        )
+
+    if settings.AUDIT_ENABLED:
+        get_audit_writer().start(get_session_factory())
+    get_health_monitor().start(build_default_checks(get_session_factory(), engine))
+    if settings.LOOP_MONITOR_ENABLED:
+        get_loop_monitor().start()
+    get_tracer().start()
+
+    loop = asyncio.get_running_loop()
+    dump_signal = settings.FLIGHT_RECORDER_ENABLED and dump_on_signal(
+        loop, settings.FLIGHT_RECORDER_DUMP_DIR
+    )
+
+    state = get_lifecycle_state()
+    if settings.WARMUP_ENABLED:
+        # In the background so the startup probe can answer meanwhile
+        background_jobs.append(
+            asyncio.create_task(warm_up(app, engine, get_session_factory()))
+        )
+    else:
+        state.startup_complete = True
+
+    record_startup_duration(time.perf_counter() - started)
     logger.info("Starting authentication microservice")
     yield
-    # Shutdown
+    # Shutdown: the server has already reported not ready and finished the
+    # in-flight requests (src.api.server)
     logger.info("Shutting down authentication microservice")
+    if dump_signal:
+        loop.remove_signal_handler(signal.SIGUSR1)
+    await get_health_monitor().stop()
+    await get_loop_monitor().stop()
+    await get_slow_query_sampler().stop()
+    for job in background_jobs:
+        job.cancel()
+    await asyncio.gather(*background_jobs, return_exceptions=True)
+    # Write whatever audit events are still queued
+    await get_audit_writer().stop()
+    # Export the spans of the last requests
+    await get_tracer().stop()
+    await get_session_activity_tracker().flush(get_session_factory())
+    await get_revocation_cache().flush(get_session_factory())
+    shutdown_hashing_executor()
+    await close_db()
+    state.reset()
 
 
 app = FastAPI(
@@ -68,6 +200,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.QUERY_ACCOUNTING_ENABLED:
+    app.add_middleware(QueryAccountingMiddleware)
+
+if settings.FLIGHT_RECORDER_ENABLED:
+    app.add_middleware(
+        FlightRecorderMiddleware,
+        loop_lag=(
+            (lambda: get_loop_monitor().last_lag)
+            if settings.LOOP_MONITOR_ENABLED
+            else None
+        ),
+    )
+
+if settings.LOOP_BLOCK_ATTRIBUTE_ROUTES:
+    app.add_middleware(RouteAttributionMiddleware)
+
+# Starts the request's database deadline (none if its route has a 0 budget)
+app.add_middleware(DeadlineMiddleware)
+
+# Opens the server span; passes requests straight through unless tracing is on
+app.add_middleware(TracingMiddleware)
+
 # Include routers
 app.include_router(health.router, tags=["health"])
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["authentication"])
@@ -90,6 +244,18 @@ def custom_openapi():
 app.openapi = custom_openapi
 
 
+@app.exception_handler(DatabaseUnavailableError)
+async def database_unavailable_handler(
+    request: Request, exc: DatabaseUnavailableError
+) -> JSONResponse:
+    # Fail fast with a retryable status instead of a 500
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Service temporarily unavailable"},
+        headers={"Retry-After": str(int(settings.DB_CIRCUIT_RESET_SECONDS))},
+    )
+
+
 @app.get("/")
 async def root() -> dict[str, str]:
     # logger.info("Root endpoint accessed")
@@ -97,12 +263,43 @@ async def root() -> dict[str, str]:
 
 
 @app.get("/metrics")
-async def metrics() -> Response:
+async def metrics(request: Request) -> Response:
     """Prometheus metrics endpoint."""
-    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+    gzipped = settings.METRICS_GZIP and accepts_gzip(
+        request.headers.get("accept-encoding", "")
+    )
+    body = await get_metrics_exposition().render(gzipped=gzipped)
+    headers = {"Content-Encoding": "gzip", "Vary": "Accept-Encoding"} if gzipped else {}
+    return Response(body, media_type=CONTENT_TYPE_LATEST, headers=headers)
 
 
-if __name__ == "__main__":
-    import uvicorn
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Run the authentication service")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--startup-report",
+        action="store_true",
+        help="Print an import/lifespan start-up time breakdown and exit",
+    )
+    parser.add_argument(
+        "--top", type=int, default=20, help="Number of imports in the report"
+    )
+    args = parser.parse_args(argv)
+
+    if args.startup_report:
+        from src.infrastructure.monitoring.startup import (
+            build_startup_report,
+            format_startup_report,
+        )
 
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+        print(format_startup_report(build_startup_report(app), top=args.top))
+        return
+
+    from src.api.server import serve
+
+    serve(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
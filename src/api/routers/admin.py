@@ -1,12 +1,46 @@
-from fastapi import APIRouter, Depends
+import asyncio
+import threading
+from concurrent.futures import Executor
+from datetime import UTC, datetime, timedelta
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, status
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.api.dependencies import require_role
+from src.api.dependencies import require_principal_role, require_role
+from src.config import settings
+from src.domain.use_cases.bulk_import_users import (
+    BulkImportUsersUseCase,
+    iter_lines,
+    parse_user_rows,
+)
+from src.domain.use_cases.export_users import EXPORT_FORMATS, ExportUsersUseCase
+from src.infrastructure.cache.principal_cache import Principal
 from src.infrastructure.database.models.refresh_token import RefreshToken
 from src.infrastructure.database.models.roles import UserRole
 from src.infrastructure.database.models.user import User
-from src.infrastructure.database.session import get_db
+from src.infrastructure.database.repositories.audit_event_repository import (
+    AuditEventRepository,
+)
+from src.infrastructure.database.repositories.user_repository import UserRepository
+from src.infrastructure.database.session import get_db, get_snapshot_db
+from src.infrastructure.database.slow_queries import get_slow_query_sampler
+from src.infrastructure.database.timeouts import AGGREGATE
+from src.infrastructure.monitoring.flight_recorder import get_flight_recorder
+from src.infrastructure.monitoring.memory_profiler import (
+    GroupBy,
+    SnapshotNotFoundError,
+    TracingNotStartedError,
+    get_memory_profiler,
+)
+from src.infrastructure.monitoring.metrics import record_active_users
+from src.infrastructure.monitoring.profiler import ProfilerBusyError, SamplingProfiler
+from src.infrastructure.security.hashing_pool import (
+    get_hashing_executor,
+    get_hashing_workers,
+)
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -33,23 +67,36 @@ async def get_admin_dashboard(
     Returns:
         dict: Dashboard data with user and system statistics
     """
+    # Counts scan whole tables, so they get the aggregate statement timeout
+    aggregate = {"query_class": AGGREGATE}
+
     # Get user statistics
-    total_users_result = await db.execute(select(func.count(User.id)))
+    total_users_result = await db.execute(
+        select(func.count(User.id)), execution_options=aggregate
+    )
     total_users = total_users_result.scalar()
 
     active_users_result = await db.execute(
-        select(func.count(User.id)).where(User.is_active.is_(True))
+        select(func.count(User.id)).where(User.is_active.is_(True)),
+        execution_options=aggregate,
     )
     active_users = active_users_result.scalar()
+    record_active_users(active_users)
 
     admin_users_result = await db.execute(
-        select(func.count(User.id)).where(User.role == UserRole.ADMIN)
+        select(func.count(User.id)).where(User.role == UserRole.ADMIN),
+        execution_options=aggregate,
     )
     admin_users = admin_users_result.scalar()
 
     # Get refresh token statistics
     active_sessions_result = await db.execute(
-        select(func.count(RefreshToken.id)).where(RefreshToken.is_active.is_(True))
+        # count(*) on these predicates is answered from the user sessions index
+        select(func.count())
+        .select_from(RefreshToken)
+        .where(RefreshToken.is_active)
+        .where(RefreshToken.expires_at > datetime.now(UTC)),
+        execution_options=aggregate,
     )
     active_sessions = active_sessions_result.scalar()
 
@@ -67,29 +114,36 @@ async def get_admin_dashboard(
 
 @router.get("/users")
 async def list_users(
+    username: str | None = Query(None, description="Case-insensitive match"),
+    email: str | None = Query(None, description="Case-insensitive match"),
     current_admin: User = Depends(require_role(UserRole.ADMIN)),
     db: AsyncSession = Depends(get_db),
 ):
     """
     Get list of all users (admin only).
 
-    Requires admin role for access.
+    Requires admin role for access. ``username`` and ``email`` narrow the
+    list to matching users, ignoring case.
 
     Returns:
         dict: List of users with basic information
     """
-    result = await db.execute(
-        select(
-            User.id,
-            User.username,
-            User.email,
-            User.full_name,
-            User.role,
-            User.is_active,
-            User.created_at,
+    if username is not None or email is not None:
+        users = await UserRepository(db).find_users(username=username, email=email)
+    else:
+        result = await db.execute(
+            select(
+                User.id,
+                User.username,
+                User.email,
+                User.full_name,
+                User.role,
+                User.is_active,
+                User.created_at,
+            ),
+            execution_options={"query_class": AGGREGATE},
         )
-    )
-    users = result.all()
+        users = result.all()
 
     return {
         "users": [
@@ -106,3 +160,473 @@ async def list_users(
         ],
         "total_count": len(users),
     }
+
+
+@router.post(
+    "/users/import",
+    summary="Bulk import users",
+    description="Import users from a CSV or NDJSON upload. Requires admin role.",
+    responses={
+        200: {"description": "Import report with per-row errors"},
+        401: {"description": "Not authenticated"},
+        403: {"description": "Access denied. Admin role required"},
+    },
+)
+async def import_users(
+    file: UploadFile,
+    input_format: Literal["csv", "ndjson"] = Query("csv", alias="format"),
+    resume_after_line: int = Query(0, ge=0),
+    current_admin: User = Depends(require_role(UserRole.ADMIN)),
+    db: AsyncSession = Depends(get_db),
+    executor: Executor = Depends(get_hashing_executor),
+):
+    """
+    Bulk import users (admin only).
+
+    Rows are validated with the signup schema, passwords are hashed on a
+    process pool and users are inserted in batches; rows that clash with
+    existing users are skipped. ``last_line`` in the report can be passed
+    back as ``resume_after_line`` to continue an interrupted import.
+
+    Returns:
+        dict: Import report
+    """
+
+    async def chunks():
+        while chunk := await file.read(64 * 1024):
+            yield chunk
+
+    use_case = BulkImportUsersUseCase(
+        UserRepository(db),
+        executor=executor,
+        batch_size=settings.BULK_IMPORT_BATCH_SIZE,
+        workers=get_hashing_workers(),
+    )
+    report = await use_case.execute(
+        parse_user_rows(iter_lines(chunks()), input_format),
+        resume_after_line=resume_after_line,
+    )
+    return report.as_dict()
+
+
+@router.get(
+    "/users/export",
+    summary="Export users",
+    description="Stream all users as CSV, NDJSON or columnar NDJSON. Requires admin role.",
+    responses={
+        200: {"description": "Export stream"},
+        401: {"description": "Not authenticated"},
+        403: {"description": "Access denied. Admin role required"},
+    },
+)
+async def export_users(
+    export_format: Literal["csv", "ndjson", "columnar"] = Query("csv", alias="format"),
+    include_sessions: bool = False,
+    gzip: bool = False,
+    chunk_size: int = Query(1000, ge=1, le=10_000),
+    current_admin: User = Depends(require_role(UserRole.ADMIN)),
+    db: AsyncSession = Depends(get_snapshot_db),
+):
+    """
+    Export all users (admin only).
+
+    Rows are read from a server-side cursor in ``chunk_size`` batches and
+    encoded as they arrive, so memory use does not grow with the table.
+
+    Returns:
+        StreamingResponse: Export file, optionally gzip-compressed
+    """
+    media_type, extension = EXPORT_FORMATS[export_format]
+    filename = f"users.{extension}"
+    if gzip:
+        media_type, filename = "application/gzip", f"{filename}.gz"
+
+    stream = ExportUsersUseCase(UserRepository(db), chunk_size=chunk_size).execute(
+        export_format=export_format,
+        include_sessions=include_sessions,
+        compress=gzip,
+    )
+    return StreamingResponse(
+        stream,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get(
+    "/audit",
+    summary="Query the authentication audit trail",
+    description="List login, refresh and logout events, newest first. Requires admin role.",
+    responses={
+        200: {"description": "Matching audit events"},
+        401: {"description": "Not authenticated"},
+        403: {"description": "Access denied. Admin role required"},
+    },
+)
+async def list_audit_events(
+    since: datetime | None = Query(None, description="Defaults to 24 hours ago"),
+    until: datetime | None = Query(None, description="Defaults to now"),
+    user_id: int | None = None,
+    username: str | None = None,
+    event: Literal["login", "refresh", "logout"] | None = None,
+    outcome: Literal["success", "failure"] | None = None,
+    limit: int = Query(100, ge=1, le=1000),
+    current_admin: User = Depends(require_role(UserRole.ADMIN)),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Query audit events (admin only).
+
+    Events are written in batches shortly after they happen, so the last
+    few hundred milliseconds may not be visible yet. The time window is
+    always bounded so only the matching daily partitions are read.
+
+    Returns:
+        dict: Matching events and their count
+    """
+    until = until or datetime.now(UTC)
+    since = since or until - timedelta(days=1)
+    events = await AuditEventRepository(db).list_events(
+        since=since,
+        until=until,
+        user_id=user_id,
+        username=username,
+        event=event,
+        outcome=outcome,
+        limit=limit,
+    )
+    return {
+        "events": [
+            {
+                "id": audit_event.id,
+                "occurred_at": audit_event.occurred_at,
+                "event": audit_event.event,
+                "outcome": audit_event.outcome,
+                "user_id": audit_event.user_id,
+                "username": audit_event.username,
+                "ip_address": audit_event.ip_address,
+                "user_agent": audit_event.user_agent,
+                "detail": audit_event.detail,
+            }
+            for audit_event in events
+        ],
+        "count": len(events),
+    }
+
+
+@router.get(
+    "/slow-queries",
+    summary="List slow queries and their plans",
+    description=(
+        "Statements slower than the slow-query threshold, normalized, with "
+        "their EXPLAIN plan. Requires admin role."
+    ),
+    responses={
+        200: {"description": "Slow statements, most recently seen first"},
+        401: {"description": "Not authenticated"},
+        403: {"description": "Access denied. Admin role required"},
+    },
+)
+async def list_slow_queries(
+    seq_scans_only: bool = Query(
+        False, description="Only statements whose plan scans a table sequentially"
+    ),
+    current_admin: User = Depends(require_role(UserRole.ADMIN)),
+):
+    """
+    List sampled slow queries (admin only).
+
+    Only this replica's statements are listed. A plan may be missing for a
+    while after a statement first shows up, since plans are captured in the
+    background at a capped rate.
+
+    Returns:
+        dict: Slow statements with their plans and the threshold in use
+    """
+    queries = get_slow_query_sampler().queries(seq_scans_only=seq_scans_only)
+    return {
+        "queries": [query.to_dict() for query in queries],
+        "count": len(queries),
+        "threshold_ms": settings.SLOW_QUERY_THRESHOLD_MS,
+    }
+
+
+@router.get(
+    "/slow-requests",
+    summary="List recent slow requests",
+    description=(
+        "The last requests that went over their route's latency budget, with "
+        "stage, query, pool wait and event loop lag timings. Requires admin role."
+    ),
+    responses={
+        200: {"description": "Slow requests, newest first"},
+        401: {"description": "Not authenticated"},
+        403: {"description": "Access denied. Admin role required"},
+    },
+)
+async def list_slow_requests(
+    route: str
+    | None = Query(None, description="Route template, e.g. /api/v1/auth/login"),
+    limit: int = Query(100, ge=1, le=1000),
+    current_admin: User = Depends(require_role(UserRole.ADMIN)),
+):
+    """
+    List the flight recorder's slow requests (admin only).
+
+    Only this process's requests are listed; ``kill -USR1`` writes the same
+    records to a file on the worker.
+
+    Returns:
+        dict: Slow requests and their count
+    """
+    records = get_flight_recorder().records(route=route, limit=limit)
+    return {
+        "requests": [record.to_dict() for record in records],
+        "count": len(records),
+    }
+
+
+@router.get(
+    "/profile",
+    summary="Profile CPU usage",
+    description=(
+        "Sample the stacks of the running process for a few seconds and return "
+        "collapsed stacks or speedscope JSON. Requires admin role."
+    ),
+    responses={
+        200: {"description": "Aggregated stack samples"},
+        401: {"description": "Not authenticated"},
+        403: {"description": "Access denied. Admin role required"},
+        404: {"description": "Profiling is disabled"},
+        409: {"description": "Another profile is already running"},
+    },
+)
+async def profile_cpu(
+    seconds: float = Query(10.0, gt=0, le=settings.PROFILER_MAX_SECONDS),
+    interval_ms: float = Query(10.0, ge=settings.PROFILER_MIN_INTERVAL_MS, le=1000),
+    profile_format: Literal["collapsed", "speedscope"] = Query(
+        "collapsed", alias="format"
+    ),
+    threads: Literal["loop", "all"] = "loop",
+    current_admin: Principal = Depends(require_principal_role(UserRole.ADMIN)),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Run the sampling profiler (admin only).
+
+    ``threads=loop`` samples only the event loop thread, where request
+    handling happens; ``all`` adds the executor and background threads.
+    Idle time shows up as samples in the selector's ``select``/``poll``.
+
+    Returns:
+        Collapsed stacks as text, or a speedscope JSON file
+    """
+    if not settings.PROFILER_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Profiling is disabled"
+        )
+    # A principal cache miss read the user; return its connection to the pool
+    # rather than holding it idle in a transaction for the whole profile
+    await db.commit()
+    profiler = SamplingProfiler(
+        interval_ms=interval_ms,
+        thread_ids=None if threads == "all" else {threading.get_ident()},
+        max_stacks=settings.PROFILER_MAX_STACKS,
+    )
+    try:
+        profiler.start()
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    try:
+        # The loop stays free while sampling; that is what is being measured
+        await asyncio.sleep(seconds)
+    finally:
+        profile = await asyncio.to_thread(profiler.stop)
+
+    headers = {"X-Profile-Samples": str(profile.samples)}
+    if profile_format == "speedscope":
+        headers[
+            "Content-Disposition"
+        ] = 'attachment; filename="profile.speedscope.json"'
+        return JSONResponse(profile.speedscope(), headers=headers)
+    return PlainTextResponse(profile.collapsed(), headers=headers)
+
+
+def _memory_profiling_enabled() -> None:
+    if not settings.MEMORY_PROFILING_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Memory profiling is disabled",
+        )
+
+
+_MEMORY_RESPONSES = {
+    401: {"description": "Not authenticated"},
+    403: {"description": "Access denied. Admin role required"},
+    404: {"description": "Memory profiling is disabled, or no such snapshot"},
+}
+
+
+@router.get(
+    "/memory",
+    summary="Memory tracing status",
+    description="tracemalloc state, RSS and kept snapshots. Requires admin role.",
+    responses={200: {"description": "Tracing status"}, **_MEMORY_RESPONSES},
+)
+async def memory_status(
+    current_admin: User = Depends(require_role(UserRole.ADMIN)),
+):
+    """
+    Show the memory tracing status (admin only).
+
+    Returns:
+        dict: Whether tracemalloc is tracing, traced and resident sizes, snapshots
+    """
+    _memory_profiling_enabled()
+    return get_memory_profiler().status()
+
+
+@router.post(
+    "/memory/tracing",
+    summary="Start memory tracing",
+    description="Start tracemalloc. Requires admin role.",
+    responses={200: {"description": "Tracing status"}, **_MEMORY_RESPONSES},
+)
+async def start_memory_tracing(
+    frames: int = Query(
+        settings.MEMORY_TRACE_FRAMES,
+        ge=1,
+        le=25,
+        description="Frames kept per allocation; more frames cost more memory",
+    ),
+    current_admin: User = Depends(require_role(UserRole.ADMIN)),
+):
+    """
+    Start tracemalloc (admin only).
+
+    Only allocations made from now on are traced, so start tracing, let the
+    service run for a while, then take snapshots. Tracing slows allocations
+    down noticeably; stop it when done.
+
+    Returns:
+        dict: Tracing status
+    """
+    _memory_profiling_enabled()
+    profiler = get_memory_profiler()
+    profiler.start(frames)
+    return profiler.status()
+
+
+@router.delete(
+    "/memory/tracing",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Stop memory tracing",
+    description="Stop tracemalloc and drop its snapshots. Requires admin role.",
+    responses={204: {"description": "Tracing stopped"}, **_MEMORY_RESPONSES},
+)
+async def stop_memory_tracing(
+    current_admin: User = Depends(require_role(UserRole.ADMIN)),
+):
+    """Stop tracemalloc and free its memory (admin only)."""
+    _memory_profiling_enabled()
+    get_memory_profiler().stop()
+
+
+@router.post(
+    "/memory/snapshots",
+    status_code=status.HTTP_201_CREATED,
+    summary="Take a memory snapshot",
+    description="Take a tracemalloc snapshot and keep it. Requires admin role.",
+    responses={
+        201: {"description": "Snapshot summary"},
+        409: {"description": "Tracing is not started"},
+        **_MEMORY_RESPONSES,
+    },
+)
+async def take_memory_snapshot(
+    current_admin: User = Depends(require_role(UserRole.ADMIN)),
+):
+    """
+    Take a tracemalloc snapshot (admin only).
+
+    Only the last few snapshots are kept; older ones are dropped.
+
+    Returns:
+        dict: Snapshot id, time, traced and resident sizes
+    """
+    _memory_profiling_enabled()
+    try:
+        info = await asyncio.to_thread(get_memory_profiler().take_snapshot)
+    except TracingNotStartedError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return info.to_dict()
+
+
+@router.get(
+    "/memory/snapshots/{snapshot_id}",
+    summary="Top allocation sites of a snapshot",
+    description="Largest allocation sites of a kept snapshot. Requires admin role.",
+    responses={200: {"description": "Allocation sites"}, **_MEMORY_RESPONSES},
+)
+async def memory_snapshot_top(
+    snapshot_id: int,
+    group_by: GroupBy = "module",
+    limit: int = Query(25, ge=1, le=500),
+    current_admin: User = Depends(require_role(UserRole.ADMIN)),
+):
+    """
+    List the largest allocation sites of a snapshot (admin only).
+
+    ``module`` groups this service's code by module under ``src`` and other
+    code by top-level package; ``filename`` and ``lineno`` are finer.
+
+    Returns:
+        dict: Allocation sites, largest first
+    """
+    _memory_profiling_enabled()
+    try:
+        sites = await asyncio.to_thread(
+            get_memory_profiler().top, snapshot_id, group_by, limit
+        )
+    except SnapshotNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Snapshot not found"
+        )
+    return {"snapshot_id": snapshot_id, "group_by": group_by, "sites": sites}
+
+
+@router.get(
+    "/memory/diff",
+    summary="Diff two memory snapshots",
+    description="Allocation sites that changed most between snapshots. Requires admin role.",
+    responses={
+        200: {"description": "Allocation site differences"},
+        **_MEMORY_RESPONSES,
+    },
+)
+async def memory_snapshot_diff(
+    from_id: int = Query(..., alias="from"),
+    to_id: int = Query(..., alias="to"),
+    group_by: GroupBy = "module",
+    limit: int = Query(25, ge=1, le=500),
+    current_admin: User = Depends(require_role(UserRole.ADMIN)),
+):
+    """
+    Compare two snapshots (admin only).
+
+    Sites are ordered by the absolute change in size, so the site that grew
+    the most between ``from`` and ``to`` comes first.
+
+    Returns:
+        dict: Allocation sites with their size and count differences
+    """
+    _memory_profiling_enabled()
+    try:
+        sites = await asyncio.to_thread(
+            get_memory_profiler().diff, from_id, to_id, group_by, limit
+        )
+    except SnapshotNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Snapshot not found"
+        )
+    return {"from": from_id, "to": to_id, "group_by": group_by, "sites": sites}
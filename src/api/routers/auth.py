@@ -1,10 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from functools import partial
+
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Request,
+    Response,
+    status,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.api.dependencies import get_current_user
-from src.api.schemas.auth import RefreshTokenRequest, Token, TokenWithRefresh
-from src.api.schemas.user import UserCreate, UserLogin, UserResponse
+from src.api.dependencies import (
+    enforce_rate_limit,
+    get_client_ip,
+    get_current_principal,
+    get_current_user,
+)
+from src.api.http_cache import cache_headers, make_etag, not_modified_response
+from src.api.schemas.auth import (
+    RefreshTokenRequest,
+    SessionResponse,
+    Token,
+    TokenWithRefresh,
+)
+from src.api.schemas.user import (
+    AvailabilityResponse,
+    UserCreate,
+    UserLogin,
+    UserResponse,
+)
 from src.domain.use_cases.auth_service import AuthService
+from src.infrastructure.audit.audit_writer import record_auth_event
+from src.infrastructure.cache.principal_cache import Principal
+from src.infrastructure.cache.session_activity import get_session_activity_tracker
 from src.infrastructure.database.models.user import User
 from src.infrastructure.database.repositories.refresh_token_repository import (
     RefreshTokenRepository,  # New import
@@ -15,18 +44,34 @@ from src.infrastructure.database.session import get_db
 router = APIRouter()
 
 
-async def get_auth_service(db: AsyncSession = Depends(get_db)) -> AuthService:
+async def get_auth_service(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+) -> AuthService:
     user_repo = UserRepository(db)
     refresh_token_repo = RefreshTokenRepository(db)  # New
-    return AuthService(user_repo, refresh_token_repo)  # Updated
+    return AuthService(
+        user_repo,
+        refresh_token_repo,
+        task_scheduler=background_tasks.add_task,
+        audit_recorder=partial(
+            record_auth_event,
+            ip_address=get_client_ip(request),
+            user_agent=request.headers.get("user-agent"),
+        ),
+    )
 
 
 @router.post(
     "/signup", response_model=UserResponse, status_code=status.HTTP_201_CREATED
 )
 async def signup(
-    user_data: UserCreate, auth_service: AuthService = Depends(get_auth_service)
+    request: Request,
+    user_data: UserCreate,
+    auth_service: AuthService = Depends(get_auth_service),
 ):
+    await enforce_rate_limit(request, "signup")
     try:
         new_user = await auth_service.register_user(
             username=user_data.username,
@@ -41,13 +86,45 @@ async def signup(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
+@router.get(
+    "/signup/availability",
+    response_model=AvailabilityResponse,
+    summary="Check username/email availability",
+    description="Check whether a username and/or email can still be registered",
+    responses={
+        200: {"description": "Availability of each requested field"},
+        400: {"description": "Neither username nor email given"},
+        429: {"description": "Too many requests"},
+    },
+)
+async def signup_availability(
+    request: Request,
+    username: str | None = None,
+    email: str | None = None,
+    auth_service: AuthService = Depends(get_auth_service),
+):
+    await enforce_rate_limit(request, "availability")
+    if username is None and email is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide a username or an email",
+        )
+    return await auth_service.check_availability(username=username, email=email)
+
+
 @router.post("/login", response_model=TokenWithRefresh)
 async def login(
-    credentials: UserLogin, auth_service: AuthService = Depends(get_auth_service)
+    request: Request,
+    credentials: UserLogin,
+    auth_service: AuthService = Depends(get_auth_service),
 ):
+    await enforce_rate_limit(request, "login", username=credentials.username)
     try:
         tokens = await auth_service.authenticate_user(
-            username=credentials.username, password=credentials.password
+            username=credentials.username,
+            password=credentials.password,
+            device=request.headers.get("user-agent"),
+            ip_address=get_client_ip(request),
         )
         return tokens
     except ValueError as e:
@@ -58,21 +135,36 @@ async def login(
     "/me",
     response_model=UserResponse,
     summary="Get current user profile",
-    description="Get the profile information of the currently authenticated user",
+    description=(
+        "Get the profile information of the currently authenticated user. "
+        "Send the returned ETag in If-None-Match to get 304 when unchanged."
+    ),
     responses={
         200: {"description": "User profile retrieved successfully"},
+        304: {"description": "Profile unchanged since the given ETag"},
         401: {"description": "Not authenticated"},
     },
 )
-async def get_me(current_user: User = Depends(get_current_user)):
-    return current_user
+async def get_me(
+    request: Request,
+    response: Response,
+    principal: Principal = Depends(get_current_principal),
+):
+    etag = make_etag(principal.id, principal.version)
+    not_modified = not_modified_response(request, etag)
+    if not_modified is not None:
+        return not_modified
+    response.headers.update(cache_headers(etag))
+    return principal
 
 
 @router.post("/refresh", response_model=Token)
 async def refresh(
+    request: Request,
     refresh_request: RefreshTokenRequest,
     auth_service: AuthService = Depends(get_auth_service),
 ):
+    await enforce_rate_limit(request, "refresh")
     try:
         new_access_token = await auth_service.refresh_access_token(
             refresh_request.refresh_token
@@ -85,7 +177,11 @@ async def refresh(
 @router.post(
     "/logout",
     summary="Logout user",
-    description="Logout the current user and invalidate their refresh token",
+    description=(
+        "Logout the current user and invalidate their refresh token. Access "
+        "tokens already issued stay valid until they expire "
+        "(ACCESS_TOKEN_EXPIRE_MINUTES, 60 by default)."
+    ),
     responses={
         200: {"description": "Successfully logged out"},
         400: {"description": "Invalid refresh token"},
@@ -94,7 +190,7 @@ async def refresh(
 )
 async def logout(
     refresh_request: RefreshTokenRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     auth_service: AuthService = Depends(get_auth_service),
 ):
     try:
@@ -102,3 +198,54 @@ async def logout(
         return {"message": "Successfully logged out"}
     except ValueError as e:  # Changed from NotImplementedError
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get(
+    "/sessions",
+    response_model=list[SessionResponse],
+    summary="List my sessions",
+    description="List the active sessions (refresh tokens) of the current user",
+    responses={
+        200: {"description": "Active sessions, most recent first"},
+        401: {"description": "Not authenticated"},
+    },
+)
+async def list_sessions(
+    current_user: User = Depends(get_current_user),
+    auth_service: AuthService = Depends(get_auth_service),
+):
+    sessions = await auth_service.list_sessions(current_user.id)
+    tracker = get_session_activity_tracker()
+    for session in sessions:
+        # Include uses that have not been flushed to the database yet
+        pending = tracker.last_used(session["id"])
+        if pending is not None:
+            session["last_used_at"] = pending
+    return sessions
+
+
+@router.delete(
+    "/sessions/{session_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Revoke a session",
+    description=(
+        "Revoke one of the current user's sessions, e.g. a lost device. Its "
+        "refresh token stops working at once. Access tokens are not checked "
+        "against revoked sessions, so those already issued to it stay valid "
+        "until they expire (ACCESS_TOKEN_EXPIRE_MINUTES, 60 by default)."
+    ),
+    responses={
+        204: {"description": "Session revoked"},
+        401: {"description": "Not authenticated"},
+        404: {"description": "No such active session for this user"},
+    },
+)
+async def revoke_session(
+    session_id: int,
+    current_user: Principal = Depends(get_current_principal),
+    auth_service: AuthService = Depends(get_auth_service),
+):
+    try:
+        await auth_service.revoke_session(current_user.id, session_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
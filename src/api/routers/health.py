@@ -1,38 +1,15 @@
-import time
 from datetime import UTC, datetime
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import text
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, HTTPException
 
-from src.infrastructure.database.session import get_db
+from src.api.lifecycle import get_lifecycle_state
+from src.infrastructure.database.circuit_breaker import get_circuit_breaker
+from src.infrastructure.monitoring.health_monitor import get_health_monitor
 
 router = APIRouter()
 
 
-async def check_database_health(db: AsyncSession) -> dict[str, Any]:
-    """Check database connectivity and basic operations."""
-    try:
-        start_time = time.time()
-        # Simple query to test database connectivity
-        result = await db.execute(text("SELECT 1"))
-        result.fetchone()
-        response_time = time.time() - start_time
-
-        return {
-            "status": "healthy",
-            "response_time_ms": round(response_time * 1000, 2),
-            "timestamp": datetime.now(UTC).isoformat(),
-        }
-    except Exception as e:
-        return {
-            "status": "unhealthy",
-            "error": str(e),
-            "timestamp": datetime.now(UTC).isoformat(),
-        }
-
-
 @router.get("/health")
 async def health_check() -> dict[str, Any]:
     """Basic health check endpoint."""
@@ -45,24 +22,21 @@ async def health_check() -> dict[str, Any]:
 
 
 @router.get("/health/detailed")
-async def detailed_health_check(db: AsyncSession = Depends(get_db)) -> dict[str, Any]:
-    """Detailed health check including database connectivity."""
-
-    # Check database health
-    db_health = await check_database_health(db)
-
-    # Overall health status
-    overall_status = "healthy" if db_health["status"] == "healthy" else "unhealthy"
+async def detailed_health_check() -> dict[str, Any]:
+    """Detailed health check, served from the health monitor's cached results."""
+    monitor = get_health_monitor()
+    overall_status = monitor.status()
 
     health_data = {
         "status": overall_status,
         "timestamp": datetime.now(UTC).isoformat(),
         "service": "authentication-microservice",
         "version": "1.0.0",
-        "checks": {"database": db_health},
+        "checks": monitor.snapshot(),
+        "database_circuit": get_circuit_breaker().snapshot(),
     }
 
-    # Return 503 if any check fails
+    # Return 503 if any critical check fails or is stale; degraded still serves
     if overall_status == "unhealthy":
         raise HTTPException(status_code=503, detail=health_data)
 
@@ -70,14 +44,11 @@ async def detailed_health_check(db: AsyncSession = Depends(get_db)) -> dict[str,
 
 
 @router.get("/health/ready")
-async def readiness_check(db: AsyncSession = Depends(get_db)) -> dict[str, str]:
-    """Kubernetes readiness probe endpoint."""
-    try:
-        # Check if we can connect to database
-        await db.execute(text("SELECT 1"))
-        return {"status": "ready"}
-    except Exception:
-        raise HTTPException(status_code=503, detail={"status": "not ready"}) from None
+async def readiness_check() -> dict[str, str]:
+    """Kubernetes readiness probe endpoint; never touches the database."""
+    if get_lifecycle_state().shutting_down or not get_health_monitor().is_ready():
+        raise HTTPException(status_code=503, detail={"status": "not ready"})
+    return {"status": "ready"}
 
 
 @router.get("/health/live")
@@ -88,6 +59,7 @@ async def liveness_check() -> dict[str, str]:
 
 @router.get("/health/startup")
 async def startup_check() -> dict[str, str]:
-    """Kubernetes startup probe endpoint."""
-    # In a real app, you might check for cold-start conditions
+    """Kubernetes startup probe endpoint; 503 until warm-up has finished."""
+    if not get_lifecycle_state().startup_complete:
+        raise HTTPException(status_code=503, detail={"status": "starting"})
     return {"status": "startup complete"}
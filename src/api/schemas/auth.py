@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from pydantic import BaseModel
 
 
@@ -18,3 +20,12 @@ class RefreshTokenRequest(BaseModel):
 
 class TokenData(BaseModel):
     username: str | None = None
+
+
+class SessionResponse(BaseModel):
+    id: int
+    device: str | None = None
+    ip_address: str | None = None
+    created_at: datetime
+    last_used_at: datetime | None = None
+    expires_at: datetime
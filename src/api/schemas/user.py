@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 
 from src.infrastructure.database.models.roles import UserRole
 
@@ -17,11 +17,24 @@ class UserCreate(UserBase):
     role: UserRole | None = UserRole.USER
 
 
+class UserImport(UserCreate):
+    # Column lengths of users; PostgreSQL would reject the whole batch
+    username: str = Field(max_length=50)
+    email: EmailStr = Field(max_length=100)
+    full_name: str | None = Field(None, max_length=100)
+    cpf: str = Field(max_length=11)
+
+
 class UserLogin(BaseModel):
     username: str
     password: str
 
 
+class AvailabilityResponse(BaseModel):
+    username: bool | None = None
+    email: bool | None = None
+
+
 class UserResponse(UserBase):
     id: int
     role: UserRole
@@ -0,0 +1,54 @@
+"""
+uvicorn server with a readiness grace period on shutdown.
+
+uvicorn runs the lifespan shutdown only after it has stopped accepting
+connections and finished the open ones, which is too late to tell load
+balancers anything. This server reports not ready on the first SIGTERM (or
+SIGINT) and keeps serving for SHUTDOWN_READINESS_DELAY_SECONDS, so that the
+readiness probe fails and the pod is taken out of rotation first. uvicorn's
+own graceful shutdown then waits up to SHUTDOWN_DRAIN_TIMEOUT_SECONDS for
+in-flight requests. A second signal shuts down at once.
+
+Kubernetes' terminationGracePeriodSeconds must cover both.
+"""
+
+import asyncio
+from types import FrameType
+
+import uvicorn
+from fastapi import FastAPI
+
+from src.api.lifecycle import get_lifecycle_state
+from src.config import settings
+from src.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class GracefulServer(uvicorn.Server):
+    def handle_exit(self, sig: int, frame: FrameType | None) -> None:
+        state = get_lifecycle_state()
+        if state.shutting_down or self.should_exit:
+            super().handle_exit(sig, frame)
+            return
+        state.shutting_down = True
+        logger.info(
+            "Shutdown requested; reporting not ready for %.1fs before stopping",
+            settings.SHUTDOWN_READINESS_DELAY_SECONDS,
+        )
+        asyncio.get_running_loop().call_later(
+            settings.SHUTDOWN_READINESS_DELAY_SECONDS,
+            super().handle_exit,
+            sig,
+            frame,
+        )
+
+
+def serve(app: FastAPI, host: str, port: int) -> None:
+    config = uvicorn.Config(
+        app,
+        host=host,
+        port=port,
+        timeout_graceful_shutdown=int(settings.SHUTDOWN_DRAIN_TIMEOUT_SECONDS),
+    )
+    GracefulServer(config).run()
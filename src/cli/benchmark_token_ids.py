@@ -0,0 +1,121 @@
+"""
+Compare refresh token identifier layouts: uuid4 text vs UUIDv7 native uuid.
+
+Each layout gets a scratch table with a unique index on ``jti``; rows are
+inserted in batches and the insert throughput and final index size are
+reported. Requires PostgreSQL (``DATABASE_URL``).
+
+Usage:
+    python -m src.cli.benchmark_token_ids --rows 200000 --batch-size 1000
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from src.config import settings
+from src.infrastructure.security.token_service import uuid7
+
+# name -> (column type, identifier factory)
+LAYOUTS: dict[str, tuple[str, Callable[[], Any]]] = {
+    "uuid4_text": ("varchar(255)", lambda: str(uuid.uuid4())),
+    "uuid7_native": ("uuid", uuid7),
+}
+
+
+@dataclass
+class BenchmarkResult:
+    layout: str
+    rows: int
+    seconds: float
+    index_bytes: int
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+async def benchmark_layout(
+    engine: AsyncEngine, layout: str, rows: int, batch_size: int
+) -> BenchmarkResult:
+    column_type, make_id = LAYOUTS[layout]
+    table = f"bench_jti_{layout}"
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+        await conn.execute(
+            text(
+                f"CREATE TABLE {table} ("
+                f"jti {column_type} NOT NULL, "
+                "created_at timestamptz NOT NULL DEFAULT now())"
+            )
+        )
+        await conn.execute(text(f"CREATE UNIQUE INDEX {table}_jti ON {table} (jti)"))
+
+    insert = text(f"INSERT INTO {table} (jti) VALUES (:jti)")  # noqa: S608
+    try:
+        started = time.perf_counter()
+        for offset in range(0, rows, batch_size):
+            batch = [{"jti": make_id()} for _ in range(min(batch_size, rows - offset))]
+            async with engine.begin() as conn:
+                await conn.execute(insert, batch)
+        seconds = time.perf_counter() - started
+
+        async with engine.connect() as conn:
+            index_bytes = (
+                await conn.execute(
+                    text("SELECT pg_relation_size(:index)"), {"index": f"{table}_jti"}
+                )
+            ).scalar()
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+
+    return BenchmarkResult(layout, rows, seconds, index_bytes)
+
+
+def format_results(results: list[BenchmarkResult]) -> str:
+    lines = [f"{'layout':<15} {'rows/s':>12} {'index size':>14}"]
+    for result in results:
+        lines.append(
+            f"{result.layout:<15} {result.rows_per_second:>12,.0f} "
+            f"{result.index_bytes / 1024 / 1024:>11.2f} MiB"
+        )
+    return "\n".join(lines)
+
+
+async def run_benchmark(rows: int, batch_size: int) -> list[BenchmarkResult]:
+    engine = create_async_engine(settings.DATABASE_URL)
+    try:
+        return [
+            await benchmark_layout(engine, layout, rows, batch_size)
+            for layout in LAYOUTS
+        ]
+    finally:
+        await engine.dispose()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    if not settings.DATABASE_URL.startswith("postgresql"):
+        print("benchmark requires a PostgreSQL DATABASE_URL", file=sys.stderr)
+        return 1
+
+    results = asyncio.run(run_benchmark(args.rows, args.batch_size))
+    print(format_results(results))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
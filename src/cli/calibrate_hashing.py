@@ -0,0 +1,64 @@
+"""
+Calibrate password hashing cost for this host.
+
+Usage:
+    python -m src.cli.calibrate_hashing --scheme bcrypt --target-ms 250
+"""
+
+import argparse
+import sys
+
+from src.config import settings
+from src.infrastructure.security.hash_calibration import (
+    calibrate_argon2,
+    calibrate_bcrypt,
+)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scheme", choices=["bcrypt", "argon2"], default="bcrypt")
+    parser.add_argument(
+        "--target-ms",
+        type=float,
+        default=settings.PASSWORD_HASH_TARGET_MS,
+        help="p99 hashing latency budget in milliseconds",
+    )
+    parser.add_argument("--samples", type=int, default=10)
+    parser.add_argument(
+        "--memory-cost",
+        type=int,
+        default=settings.ARGON2_MEMORY_COST,
+        help="argon2 memory cost in KiB",
+    )
+    parser.add_argument("--parallelism", type=int, default=settings.ARGON2_PARALLELISM)
+    args = parser.parse_args(argv)
+
+    if args.scheme == "bcrypt":
+        result = calibrate_bcrypt(args.target_ms, samples=args.samples)
+    else:
+        from passlib.exc import MissingBackendError
+
+        try:
+            result = calibrate_argon2(
+                args.target_ms,
+                samples=args.samples,
+                memory_cost=args.memory_cost,
+                parallelism=args.parallelism,
+            )
+        except MissingBackendError:
+            print("argon2 requires the argon2-cffi package", file=sys.stderr)
+            return 1
+
+    print(f"p99 per candidate ({args.samples} samples, target {args.target_ms} ms):")
+    for label, p99 in result.measurements.items():
+        print(f"  {label:<45} {p99:8.2f} ms")
+    if not result.meets_target:
+        print("warning: even the cheapest candidate exceeds the target")
+    print()
+    print("\n".join(result.as_env()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
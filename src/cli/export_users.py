@@ -0,0 +1,65 @@
+"""
+Export all users as CSV, NDJSON or columnar NDJSON.
+
+Usage:
+    python -m src.cli.export_users [--format csv] [--gzip] [-o users.csv]
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+from src.domain.use_cases.export_users import EXPORT_FORMATS, ExportUsersUseCase
+from src.infrastructure.database.repositories.user_repository import UserRepository
+from src.infrastructure.database.session import close_db, get_snapshot_db
+
+
+async def run_export(
+    output, export_format: str, include_sessions: bool, gzip: bool, chunk_size: int
+) -> None:
+    try:
+        async for session in get_snapshot_db():
+            use_case = ExportUsersUseCase(UserRepository(session), chunk_size)
+            async for block in use_case.execute(
+                export_format=export_format,
+                include_sessions=include_sessions,
+                compress=gzip,
+            ):
+                output.write(block)
+    finally:
+        await close_db()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--format", dest="export_format", choices=list(EXPORT_FORMATS), default="csv"
+    )
+    parser.add_argument("--include-sessions", action="store_true")
+    parser.add_argument("--gzip", action="store_true")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument(
+        "-o", "--output", type=Path, help="Output file (default: stdout)"
+    )
+    args = parser.parse_args(argv)
+
+    output = args.output.open("wb") if args.output else sys.stdout.buffer
+    try:
+        asyncio.run(
+            run_export(
+                output,
+                args.export_format,
+                args.include_sessions,
+                args.gzip,
+                args.chunk_size,
+            )
+        )
+    finally:
+        if args.output:
+            output.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""
+Bulk import users from a CSV or NDJSON file.
+
+Usage:
+    python -m src.cli.import_users users.csv [--format csv] [--checkpoint FILE]
+
+Progress is checkpointed after every committed batch; re-running the same
+command resumes after the last committed line.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+from src.config import settings
+from src.domain.use_cases.bulk_import_users import (
+    BulkImportUsersUseCase,
+    ImportCheckpoint,
+    iter_file_lines,
+    parse_user_rows,
+)
+from src.infrastructure.database.repositories.user_repository import UserRepository
+from src.infrastructure.database.session import close_db, get_session_factory
+from src.infrastructure.security.hashing_pool import (
+    get_hashing_executor,
+    get_hashing_workers,
+    shutdown_hashing_executor,
+)
+
+
+async def run_import(
+    path: Path, input_format: str, checkpoint: ImportCheckpoint, batch_size: int
+) -> dict:
+    try:
+        async with get_session_factory()() as session:
+            use_case = BulkImportUsersUseCase(
+                UserRepository(session),
+                executor=get_hashing_executor(),
+                batch_size=batch_size,
+                workers=get_hashing_workers(),
+            )
+            with path.open(encoding="utf-8-sig") as lines:
+                report = await use_case.execute(
+                    parse_user_rows(iter_file_lines(lines), input_format),
+                    resume_after_line=checkpoint.load(),
+                    checkpoint=checkpoint,
+                )
+        return report.as_dict()
+    finally:
+        shutdown_hashing_executor()
+        await close_db()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--format", dest="input_format", choices=["csv", "ndjson"])
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        help="Checkpoint file (default: <path>.checkpoint)",
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=settings.BULK_IMPORT_BATCH_SIZE
+    )
+    args = parser.parse_args(argv)
+
+    input_format = args.input_format or (
+        "ndjson" if args.path.suffix in (".ndjson", ".jsonl") else "csv"
+    )
+    checkpoint = ImportCheckpoint(
+        args.checkpoint or args.path.with_name(args.path.name + ".checkpoint")
+    )
+
+    report = asyncio.run(
+        run_import(args.path, input_format, checkpoint, args.batch_size)
+    )
+    json.dump(report, sys.stdout, indent=2, default=str)
+    print()
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,21 @@
 from datetime import datetime
+from uuid import UUID
 
 from pydantic import BaseModel
 
 
 class RefreshToken(BaseModel):
     id: int
-    jti: str
+    jti: UUID
     user_id: int
     token_hash: str
     expires_at: datetime
     created_at: datetime
     is_active: bool
     revoked_at: datetime | None = None
+    device: str | None = None
+    ip_address: str | None = None
+    last_used_at: datetime | None = None
 
     class Config:
         orm_mode = True
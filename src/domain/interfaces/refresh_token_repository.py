@@ -1,4 +1,6 @@
 from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any
 
 from src.domain.entities.refresh_token import RefreshToken
 
@@ -9,7 +11,13 @@ class RefreshTokenRepository(ABC):
         pass
 
     @abstractmethod
-    async def get_refresh_token_by_jti(self, jti: str) -> RefreshToken | None:
+    async def get_refresh_token_by_jti(
+        self, jti: str, expires_at: datetime | None = None
+    ) -> RefreshToken | None:
+        """
+        Look up a token by jti. ``expires_at``, when known (e.g. from the
+        token's ``exp`` claim), narrows the search to the matching partition.
+        """
         pass
 
     @abstractmethod
@@ -19,3 +27,13 @@ class RefreshTokenRepository(ABC):
     @abstractmethod
     async def delete_refresh_token(self, jti: str) -> None:
         pass
+
+    @abstractmethod
+    async def list_active_sessions(self, user_id: int) -> list[dict[str, Any]]:
+        """Unexpired, unrevoked tokens of ``user_id``, most recent first."""
+        pass
+
+    @abstractmethod
+    async def revoke_session(self, user_id: int, session_id: int) -> bool:
+        """Deactivate one of ``user_id``'s tokens; False if there is none."""
+        pass
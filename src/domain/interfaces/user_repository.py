@@ -1,4 +1,6 @@
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
+from typing import Any
 
 from src.domain.entities.user import User
 
@@ -16,22 +18,55 @@ class UserRepository(ABC):
     ) -> User:
         pass
 
+    @abstractmethod
+    async def bulk_insert_users(
+        self, rows: list[dict[str, Any]]
+    ) -> list[tuple[str, str, str]]:
+        """Insert users, skipping conflicts; return inserted (username, email, cpf)."""
+        pass
+
+    @abstractmethod
+    def stream_users(
+        self, batch_size: int = 1000, include_sessions: bool = False
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """Yield all users in chunks of at most ``batch_size`` rows."""
+        pass
+
     @abstractmethod
     async def get_user(self, user_id: int) -> User | None:
         pass
 
     @abstractmethod
-    async def get_user_by_username(self, username: str) -> User | None:
+    async def get_user_by_username(
+        self, username: str, use_lookup_filter: bool = False
+    ) -> User | None:
+        """
+        ``use_lookup_filter`` trusts the lookup filter's definite misses when
+        it is enabled (single-replica deployments only).
+        """
         pass
 
     @abstractmethod
-    async def get_user_by_email(self, email: str) -> User | None:
+    async def get_user_by_email(
+        self, email: str, use_lookup_filter: bool = False
+    ) -> User | None:
+        pass
+
+    @abstractmethod
+    async def find_users(
+        self, username: str | None = None, email: str | None = None
+    ) -> list[User]:
+        """Users whose username and/or email match, ignoring case."""
         pass
 
     @abstractmethod
     async def update_user(self, user: User) -> User:
         pass
 
+    @abstractmethod
+    async def update_password_hash(self, user_id: int, password_hash: str) -> None:
+        pass
+
     @abstractmethod
     async def delete_user(self, user_id: int) -> None:
         pass
@@ -1,14 +1,28 @@
-from datetime import UTC, datetime, timedelta
+import asyncio
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime
+from typing import Any
+from uuid import UUID
 
 from src.api.schemas.auth import Token, TokenWithRefresh
 from src.domain.entities.user import User
 from src.domain.interfaces.refresh_token_repository import RefreshTokenRepository
 from src.domain.interfaces.user_repository import UserRepository
+from src.infrastructure.cache.revocation_cache import (
+    RefreshTokenState,
+    get_revocation_cache,
+)
+from src.infrastructure.database.circuit_breaker import DatabaseUnavailableError
 from src.infrastructure.database.models.refresh_token import (
     RefreshToken,  # Needed for creating RefreshToken object
 )
+from src.infrastructure.monitoring.flight_recorder import timed_stage
+from src.infrastructure.monitoring.metrics import AuthTimer, record_degraded_response
+from src.infrastructure.monitoring.tracing import traced
 from src.infrastructure.security.password_service import (
+    get_dummy_password_hash,
     get_password_hash,
+    password_needs_rehash,
     verify_password,
 )
 from src.infrastructure.security.token_service import (
@@ -16,19 +30,54 @@ from src.infrastructure.security.token_service import (
     create_refresh_token,
     decode_refresh_token,
     generate_token_hash,
+    get_refresh_token_expiry,
     verify_refresh_token,
 )
 
+TaskScheduler = Callable[..., Any]
+# Called as recorder(event, outcome, user_id=..., username=..., detail=...)
+AuditRecorder = Callable[..., None]
+
+
+def _expires_at_hint(payload: dict[str, Any]) -> datetime | None:
+    # The exp claim lets the repository prune refresh_tokens partitions
+    exp = payload.get("exp")
+    if not isinstance(exp, int | float):
+        return None
+    return datetime.fromtimestamp(exp, UTC)
+
 
 class AuthService:
     def __init__(
         self,
         user_repository: UserRepository,
         refresh_token_repository: RefreshTokenRepository,
+        task_scheduler: TaskScheduler | None = None,
+        audit_recorder: AuditRecorder | None = None,
     ):
         self.user_repository = user_repository
         self.refresh_token_repository = refresh_token_repository
+        # Runs deferred work after the response, e.g. BackgroundTasks.add_task.
+        # Without one, deferred work is awaited inline.
+        self.task_scheduler = task_scheduler
+        # Must not block: it only queues the event for the audit writer
+        self.audit_recorder = audit_recorder
+
+    def _audit(self, event: str, outcome: str, **fields: Any) -> None:
+        if self.audit_recorder is not None:
+            self.audit_recorder(event, outcome, **fields)
+
+    async def _defer(self, func: Callable[..., Awaitable[Any]], *args: Any) -> None:
+        if self.task_scheduler is None:
+            await func(*args)
+        else:
+            self.task_scheduler(func, *args)
+
+    async def _rehash_password(self, user_id: int, password: str) -> None:
+        new_hash = await asyncio.to_thread(get_password_hash, password)
+        await self.user_repository.update_password_hash(user_id, new_hash)
 
+    @traced()
     async def register_user(
         self,
         username: str,
@@ -48,7 +97,8 @@ class AuthService:
         if existing_user_by_username:
             raise ValueError("Username already taken")
 
-        hashed_password = get_password_hash(password)
+        with timed_stage("hashing"):
+            hashed_password = get_password_hash(password)
         new_user = await self.user_repository.register_user(
             username=username,
             full_name=full_name,
@@ -59,54 +109,155 @@ class AuthService:
         )
         return new_user
 
-    async def authenticate_user(self, username: str, password: str) -> TokenWithRefresh:
-        user = await self.user_repository.get_user_by_username(username)
-        if not user or not verify_password(password, user.password_hash):
+    @traced()
+    async def check_availability(
+        self, username: str | None = None, email: str | None = None
+    ) -> dict[str, bool]:
+        availability = {}
+        if username is not None:
+            availability["username"] = (
+                await self.user_repository.get_user_by_username(username) is None
+            )
+        if email is not None:
+            availability["email"] = (
+                await self.user_repository.get_user_by_email(email) is None
+            )
+        return availability
+
+    @traced()
+    async def authenticate_user(
+        self,
+        username: str,
+        password: str,
+        device: str | None = None,
+        ip_address: str | None = None,
+    ) -> TokenWithRefresh:
+        timer = AuthTimer("login")
+        # Unknown usernames (e.g. credential stuffing) skip the database when
+        # the lookup filter is enabled, which it only is with one replica
+        user = await self.user_repository.get_user_by_username(
+            username, use_lookup_filter=True
+        )
+        timer.stage("lookup")
+        if not user:
+            # Keep response time independent of whether the username exists
+            verify_password(password, get_dummy_password_hash())
+            timer.stage("hash_verify")
+            self._audit("login", "failure", username=username, detail="unknown user")
+            timer.done("unknown_user")
+            raise ValueError("Invalid username or password")
+        password_ok = verify_password(password, user.password_hash)
+        timer.stage("hash_verify")
+        if not password_ok:
+            self._audit(
+                "login",
+                "failure",
+                user_id=user.id,
+                username=user.username,
+                detail="wrong password",
+            )
+            timer.done("bad_password")
             raise ValueError("Invalid username or password")
 
         if not user.is_active:
+            self._audit(
+                "login",
+                "failure",
+                user_id=user.id,
+                username=user.username,
+                detail="account disabled",
+            )
+            timer.done("disabled")
             raise ValueError("User account is disabled")
 
-        access_token = create_access_token(
-            data={
-                "sub": user.username,
-                "email": user.email,
-                "user_id": user.id,
-                "role": user.role.value,
-            }
-        )
+        if password_needs_rehash(user.password_hash):
+            # Upgrade hashes made with a deprecated scheme or old cost
+            # parameters without delaying the login response.
+            await self._defer(self._rehash_password, user.id, password)
+            timer.skip()
 
-        refresh_token, jti = create_refresh_token(user.id)
+        expires_at = get_refresh_token_expiry()
+        refresh_token, jti = create_refresh_token(user.id, expires_at=expires_at)
         refresh_token_hash = generate_token_hash(refresh_token)
+        timer.stage("token_sign")
 
         db_refresh_token = RefreshToken(
-            jti=jti,
+            jti=UUID(jti),
             user_id=user.id,
             token_hash=refresh_token_hash,
-            expires_at=datetime.now(UTC) + timedelta(days=7),
+            expires_at=expires_at,
+            device=device[:255] if device else None,
+            ip_address=ip_address[:45] if ip_address else None,
         )
         await self.refresh_token_repository.add_refresh_token(db_refresh_token)
+        timer.stage("token_persist")
+        get_revocation_cache().remember(
+            RefreshTokenState(
+                jti=jti,
+                session_id=(
+                    db_refresh_token.id
+                    if isinstance(db_refresh_token.id, int)
+                    else None
+                ),
+                token_hash=refresh_token_hash,
+                expires_at=expires_at,
+                active=True,
+                user_id=user.id,
+                username=user.username,
+                email=user.email,
+                role=user.role.value,
+            )
+        )
+
+        claims = {
+            "sub": user.username,
+            "email": user.email,
+            "user_id": user.id,
+            "role": user.role.value,
+        }
+        if isinstance(db_refresh_token.id, int):
+            # Session the access token belongs to, for last-used tracking only;
+            # a revoked session's access tokens stay valid until they expire
+            claims["sid"] = db_refresh_token.id
+        access_token = create_access_token(data=claims)
+        timer.stage("token_sign")
+        self._audit("login", "success", user_id=user.id, username=user.username)
+        timer.done("success")
 
         return TokenWithRefresh(
             access_token=access_token, refresh_token=refresh_token, token_type="bearer"
         )
 
+    @traced()
     async def refresh_access_token(self, refresh_token_str: str) -> Token:
+        timer = AuthTimer("refresh")
         payload = decode_refresh_token(refresh_token_str)
         user_id = int(payload.get("sub"))
         jti = payload.get("jti")
+        timer.stage("token_verify")
 
-        db_refresh_token = await self.refresh_token_repository.get_refresh_token_by_jti(
-            jti
-        )
-
-        if (
-            not db_refresh_token
-            or not db_refresh_token.is_active
-            or not verify_refresh_token(  # Added db_refresh_token.is_active
-                refresh_token_str, db_refresh_token.token_hash
+        try:
+            db_refresh_token = (
+                await self.refresh_token_repository.get_refresh_token_by_jti(
+                    jti, _expires_at_hint(payload)
+                )
             )
-        ):
+        except DatabaseUnavailableError:
+            state = get_revocation_cache().get_stale(jti)
+            if state is None:
+                raise
+            return self._refresh_from_cache(refresh_token_str, state, timer)
+        timer.stage("lookup")
+
+        token_ok = (
+            db_refresh_token is not None
+            and db_refresh_token.is_active
+            and verify_refresh_token(refresh_token_str, db_refresh_token.token_hash)
+        )
+        timer.stage("hash_verify")
+        if not token_ok:
+            self._audit("refresh", "failure", user_id=user_id, detail="invalid token")
+            timer.done("invalid_token")
             raise ValueError("Invalid refresh token")
 
         if db_refresh_token.expires_at.tzinfo is None:
@@ -117,15 +268,25 @@ class AuthService:
         if db_refresh_token.expires_at < datetime.now(UTC):
             db_refresh_token.is_active = False
             await self.refresh_token_repository.update_refresh_token(db_refresh_token)
+            timer.stage("token_persist")
+            self._audit("refresh", "failure", user_id=user_id, detail="expired token")
+            timer.done("expired")
             raise ValueError("Refresh token has expired")
 
         user = await self.user_repository.get_user(user_id)
+        timer.stage("lookup")
 
         if not user or not user.is_active:
+            self._audit(
+                "refresh", "failure", user_id=user_id, detail="user missing or inactive"
+            )
+            timer.done("disabled")
             raise ValueError("User not found or inactive")
 
         db_refresh_token.is_active = False
+        db_refresh_token.last_used_at = datetime.now(UTC)
         await self.refresh_token_repository.update_refresh_token(db_refresh_token)
+        timer.stage("token_persist")
 
         access_token = create_access_token(
             data={
@@ -135,16 +296,113 @@ class AuthService:
                 "role": user.role.value,
             }
         )
+        timer.stage("token_sign")
+        self._audit("refresh", "success", user_id=user.id, username=user.username)
+        timer.done("success")
+        return Token(access_token=access_token, token_type="bearer")
+
+    def _refresh_from_cache(
+        self, refresh_token_str: str, state: RefreshTokenState, timer: AuthTimer
+    ) -> Token:
+        # The database is unavailable: trust what this replica last knew
+        timer.stage("lookup")
+        token_ok = (
+            state.active
+            and state.expires_at > datetime.now(UTC)
+            and verify_refresh_token(refresh_token_str, state.token_hash)
+        )
+        timer.stage("hash_verify")
+        if not token_ok:
+            self._audit(
+                "refresh", "failure", user_id=state.user_id, detail="invalid token"
+            )
+            timer.done("invalid_token")
+            raise ValueError("Invalid refresh token")
+
+        get_revocation_cache().consume(state.jti)
+        access_token = create_access_token(
+            data={
+                "sub": state.username,
+                "email": state.email,
+                "user_id": state.user_id,
+                "role": state.role,
+            }
+        )
+        timer.stage("token_sign")
+        record_degraded_response("refresh_token")
+        self._audit(
+            "refresh",
+            "success",
+            user_id=state.user_id,
+            username=state.username,
+            detail="database unavailable",
+        )
+        timer.done("success")
         return Token(access_token=access_token, token_type="bearer")
 
+    @traced()
     async def logout_user(self, refresh_token_str: str) -> None:
+        timer = AuthTimer("logout")
         payload = decode_refresh_token(refresh_token_str)
         jti = payload.get("jti")
+        timer.stage("token_verify")
 
-        db_refresh_token = await self.refresh_token_repository.get_refresh_token_by_jti(
-            jti
-        )
+        try:
+            db_refresh_token = (
+                await self.refresh_token_repository.get_refresh_token_by_jti(
+                    jti, _expires_at_hint(payload)
+                )
+            )
+            timer.stage("lookup")
+            if db_refresh_token:
+                db_refresh_token.is_active = False
+                await self.refresh_token_repository.update_refresh_token(
+                    db_refresh_token
+                )
+                timer.stage("token_persist")
+        except DatabaseUnavailableError:
+            # Revoked here at once, so it cannot be refreshed from the cache,
+            # and in the database by the flusher once it is back
+            get_revocation_cache().consume(jti)
+            record_degraded_response("logout")
+            self._audit(
+                "logout",
+                "success",
+                user_id=int(payload.get("sub")),
+                detail="database unavailable",
+            )
+            timer.done("success")
+            return
 
         if db_refresh_token:
-            db_refresh_token.is_active = False
-            await self.refresh_token_repository.update_refresh_token(db_refresh_token)
+            self._audit("logout", "success", user_id=db_refresh_token.user_id)
+            timer.done("success")
+        else:
+            self._audit("logout", "failure", detail="unknown token")
+            timer.done("invalid_token")
+
+    @traced()
+    async def list_sessions(self, user_id: int) -> list[dict[str, Any]]:
+        return await self.refresh_token_repository.list_active_sessions(user_id)
+
+    @traced()
+    async def revoke_session(self, user_id: int, session_id: int) -> None:
+        try:
+            revoked = await self.refresh_token_repository.revoke_session(
+                user_id, session_id
+            )
+        except DatabaseUnavailableError:
+            # Only tokens cached here can be refreshed during the outage
+            if not get_revocation_cache().consume_session(user_id, session_id):
+                raise
+            record_degraded_response("logout")
+            self._audit(
+                "logout",
+                "success",
+                user_id=user_id,
+                detail="session revoked; database unavailable",
+            )
+            return
+        if not revoked:
+            raise ValueError("Session not found")
+        self._audit("logout", "success", user_id=user_id, detail="session revoked")
@@ -0,0 +1,228 @@
+import asyncio
+import csv
+import json
+from collections.abc import AsyncIterable, AsyncIterator, Iterable
+from concurrent.futures import Executor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from pydantic import ValidationError
+
+from src.api.schemas.user import UserImport
+from src.domain.interfaces.user_repository import UserRepository
+from src.infrastructure.database.models.roles import UserRole
+from src.infrastructure.security.password_service import hash_passwords
+
+SUPPORTED_FORMATS = ("csv", "ndjson")
+
+
+@dataclass
+class RowError:
+    line: int
+    error: str
+
+
+@dataclass
+class ImportReport:
+    processed: int = 0
+    inserted: int = 0
+    skipped: int = 0
+    last_line: int = 0
+    errors: list[RowError] = field(default_factory=list)
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class ImportCheckpoint:
+    """
+    Last fully committed input line, persisted as JSON so an interrupted
+    import can be resumed.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+
+    def load(self) -> int:
+        if not self.path.exists():
+            return 0
+        return int(json.loads(self.path.read_text())["last_line"])
+
+    def save(self, last_line: int) -> None:
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(json.dumps({"last_line": last_line}))
+        tmp.replace(self.path)
+
+
+async def parse_user_rows(
+    lines: AsyncIterable[str], fmt: str
+) -> AsyncIterator[tuple[int, dict[str, Any] | None, str | None]]:
+    """
+    Yield ``(line_number, row, parse_error)`` for each data line.
+
+    Line numbers are 1-based positions in the input, header included, so
+    they can be used directly as resume checkpoints. A CSV record whose
+    quoted fields span several lines is numbered by its last line, like
+    ``csv.reader``'s ``line_num``.
+    """
+    if fmt not in SUPPORTED_FORMATS:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+    header: list[str] | None = None
+    line_number = 0
+    # Lines of a CSV record so far, and their quote count: an odd count
+    # means a quoted field is still open ("" escapes count twice)
+    pending: list[str] = []
+    quotes = 0
+    async for line in lines:
+        line_number += 1
+        if not pending and not line.strip():
+            continue
+        if fmt == "ndjson":
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_number, None, f"Invalid JSON: {e.msg}"
+                continue
+            if not isinstance(row, dict):
+                yield line_number, None, "Expected a JSON object"
+                continue
+            yield line_number, row, None
+        else:
+            pending.append(line)
+            quotes += line.count('"')
+            if quotes % 2:
+                continue
+            values = next(csv.reader(["\n".join(pending)]))
+            pending, quotes = [], 0
+            if header is None:
+                header = [value.strip() for value in values]
+                continue
+            if len(values) != len(header):
+                yield line_number, None, "Wrong number of columns"
+                continue
+            row = {k: v for k, v in zip(header, values, strict=True) if v != ""}
+            yield line_number, row, None
+    if pending:
+        yield line_number, None, "Unterminated quoted field"
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    """Split a stream of byte chunks into decoded lines."""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *complete, buffer = buffer.split(b"\n")
+        for line in complete:
+            yield line.decode("utf-8-sig").rstrip("\r")
+    if buffer:
+        yield buffer.decode("utf-8-sig").rstrip("\r")
+
+
+async def iter_file_lines(lines: Iterable[str]) -> AsyncIterator[str]:
+    for line in lines:
+        yield line.rstrip("\n")
+
+
+class BulkImportUsersUseCase:
+    """
+    Validate, hash and insert users in batches.
+
+    Password hashing is spread over ``executor`` (normally a process pool
+    sized to the available cores); rows that collide with an existing
+    username, email or CPF are skipped rather than failing the batch.
+    """
+
+    def __init__(
+        self,
+        user_repository: UserRepository,
+        executor: Executor | None = None,
+        batch_size: int = 1000,
+        workers: int = 1,
+    ):
+        self.user_repository = user_repository
+        self.executor = executor
+        self.batch_size = batch_size
+        self.workers = max(workers, 1)
+
+    async def _hash_all(self, passwords: list[str]) -> list[str]:
+        loop = asyncio.get_running_loop()
+        chunk_size = max(1, -(-len(passwords) // self.workers))
+        chunks = [
+            passwords[i : i + chunk_size] for i in range(0, len(passwords), chunk_size)
+        ]
+        results = await asyncio.gather(
+            *(loop.run_in_executor(self.executor, hash_passwords, c) for c in chunks)
+        )
+        return [hashed for chunk in results for hashed in chunk]
+
+    async def _flush(
+        self,
+        batch: list[tuple[int, UserImport]],
+        report: ImportReport,
+        checkpoint: ImportCheckpoint | None,
+        last_line: int,
+    ) -> None:
+        if batch:
+            hashes = await self._hash_all([user.password for _, user in batch])
+            rows = [
+                {
+                    "username": user.username,
+                    "email": user.email,
+                    "full_name": user.full_name,
+                    "cpf": user.cpf,
+                    "password_hash": password_hash,
+                    "role": user.role or UserRole.USER,
+                }
+                for (_, user), password_hash in zip(batch, hashes, strict=True)
+            ]
+            inserted = set(await self.user_repository.bulk_insert_users(rows))
+            for line, user in batch:
+                # Matched on all unique columns: a row may have lost on any one
+                key = (user.username, user.email, user.cpf)
+                if key in inserted:
+                    inserted.discard(key)
+                    report.inserted += 1
+                else:
+                    report.skipped += 1
+                    report.errors.append(
+                        RowError(line, "Username, email or CPF already registered")
+                    )
+        report.last_line = last_line
+        if checkpoint is not None:
+            checkpoint.save(last_line)
+
+    async def execute(
+        self,
+        rows: AsyncIterable[tuple[int, dict[str, Any] | None, str | None]],
+        resume_after_line: int = 0,
+        checkpoint: ImportCheckpoint | None = None,
+    ) -> ImportReport:
+        report = ImportReport(last_line=resume_after_line)
+        batch: list[tuple[int, UserImport]] = []
+        last_line = resume_after_line
+
+        async for line, row, parse_error in rows:
+            if line <= resume_after_line:
+                continue
+            last_line = line
+            report.processed += 1
+            if parse_error is not None:
+                report.errors.append(RowError(line, parse_error))
+                continue
+            try:
+                batch.append((line, UserImport.model_validate(row)))
+            except ValidationError as e:
+                message = "; ".join(
+                    f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}"
+                    for err in e.errors()
+                )
+                report.errors.append(RowError(line, message))
+                continue
+            if len(batch) >= self.batch_size:
+                await self._flush(batch, report, checkpoint, last_line)
+                batch = []
+
+        await self._flush(batch, report, checkpoint, last_line)
+        return report
@@ -0,0 +1,108 @@
+import csv
+import io
+import json
+import zlib
+from collections.abc import AsyncIterable, AsyncIterator
+from datetime import datetime
+from enum import Enum
+from typing import Any
+
+from src.domain.interfaces.user_repository import UserRepository
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    # One JSON document per chunk with column-major arrays, similar to
+    # Parquet row groups; the first line carries the column names.
+    "columnar": ("application/x-ndjson", "columnar.ndjson"),
+}
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _encode_csv(chunk: list[dict[str, Any]], header: bool) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(chunk[0].keys())
+    writer.writerows([_plain(v) for v in row.values()] for row in chunk)
+    return buffer.getvalue().encode()
+
+
+def _encode_ndjson(chunk: list[dict[str, Any]]) -> bytes:
+    return "".join(
+        json.dumps({k: _plain(v) for k, v in row.items()}) + "\n" for row in chunk
+    ).encode()
+
+
+def _encode_columnar(chunk: list[dict[str, Any]], header: bool) -> bytes:
+    columns = list(chunk[0].keys())
+    lines = []
+    if header:
+        lines.append(json.dumps({"columns": columns}))
+    lines.append(
+        json.dumps(
+            {
+                "rows": len(chunk),
+                "data": [[_plain(row[c]) for row in chunk] for c in columns],
+            }
+        )
+    )
+    return ("\n".join(lines) + "\n").encode()
+
+
+async def encode_export(
+    chunks: AsyncIterable[list[dict[str, Any]]], export_format: str
+) -> AsyncIterator[bytes]:
+    """Encode row chunks as they arrive; memory is bounded by one chunk."""
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported format: {export_format}")
+
+    first = True
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        if export_format == "csv":
+            yield _encode_csv(chunk, header=first)
+        elif export_format == "ndjson":
+            yield _encode_ndjson(chunk)
+        else:
+            yield _encode_columnar(chunk, header=first)
+        first = False
+
+
+async def gzip_stream(
+    data: AsyncIterable[bytes], level: int = 6
+) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: gzip container
+    async for block in data:
+        compressed = compressor.compress(block)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+class ExportUsersUseCase:
+    def __init__(self, user_repository: UserRepository, chunk_size: int = 1000):
+        self.user_repository = user_repository
+        self.chunk_size = chunk_size
+
+    def execute(
+        self,
+        export_format: str = "csv",
+        include_sessions: bool = False,
+        compress: bool = False,
+    ) -> AsyncIterator[bytes]:
+        stream = encode_export(
+            self.user_repository.stream_users(
+                batch_size=self.chunk_size, include_sessions=include_sessions
+            ),
+            export_format,
+        )
+        return gzip_stream(stream) if compress else stream
@@ -0,0 +1,165 @@
+"""
+Write-behind audit trail for logins, token refreshes and logouts.
+
+Request handlers only append an event to a bounded in-process queue; a
+background task drains it in multi-row INSERTs every
+AUDIT_FLUSH_INTERVAL_MS, or sooner once AUDIT_BATCH_SIZE events are
+waiting. When the queue is full new events are dropped and counted rather
+than slowing down authentication. Whatever is still queued on shutdown is
+flushed from the lifespan hook.
+"""
+
+import asyncio
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.config import settings
+from src.infrastructure.database.repositories.audit_event_repository import (
+    AuditEventRepository,
+)
+from src.infrastructure.monitoring.metrics import (
+    record_audit_events,
+    record_audit_queue_depth,
+)
+from src.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class AuditEvent:
+    event: str
+    outcome: str
+    user_id: int | None = None
+    username: str | None = None
+    ip_address: str | None = None
+    user_agent: str | None = None
+    detail: str | None = None
+    occurred_at: datetime = field(default_factory=lambda: datetime.now(UTC))
+
+    def __post_init__(self):
+        # Client-controlled values; keep them within the column sizes so one
+        # oversized header cannot fail a whole batch.
+        if self.username is not None:
+            self.username = self.username[:50]
+        if self.ip_address is not None:
+            self.ip_address = self.ip_address[:45]
+        if self.user_agent is not None:
+            self.user_agent = self.user_agent[:255]
+        if self.detail is not None:
+            self.detail = self.detail[:255]
+
+
+class AuditWriter:
+    def __init__(
+        self, max_events: int = 10_000, batch_size: int = 500, interval_ms: int = 200
+    ):
+        self.max_events = max_events
+        self.batch_size = batch_size
+        self.interval_ms = interval_ms
+        self.dropped = 0
+        self._queue: deque[AuditEvent] = deque()
+        self._session_factory: async_sessionmaker[AsyncSession] | None = None
+        self._task: asyncio.Task | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._stopping = False
+
+    @property
+    def pending(self) -> int:
+        return len(self._queue)
+
+    def record(self, event: AuditEvent) -> bool:
+        """Queue ``event``; returns False if it was dropped."""
+        if len(self._queue) >= self.max_events:
+            self.dropped += 1
+            record_audit_events("dropped")
+            return False
+        self._queue.append(event)
+        if self._wakeup is not None and len(self._queue) >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    async def flush(
+        self, session_factory: async_sessionmaker[AsyncSession] | None = None
+    ) -> int:
+        """Write every queued event in batches; returns how many were written."""
+        session_factory = session_factory or self._session_factory
+        if session_factory is None:
+            return 0
+        written = 0
+        while self._queue:
+            batch = [
+                self._queue.popleft()
+                for _ in range(min(self.batch_size, len(self._queue)))
+            ]
+            try:
+                async with session_factory() as session:
+                    await AuditEventRepository(session).add_events(
+                        [asdict(event) for event in batch]
+                    )
+            except Exception:
+                # Not re-queued: a persistent database error would otherwise
+                # grow the queue until everything is dropped anyway.
+                logger.exception("Failed to write %d audit events", len(batch))
+                record_audit_events("failed", len(batch))
+                break
+            written += len(batch)
+            record_audit_events("written", len(batch))
+        record_audit_queue_depth(len(self._queue))
+        return written
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout=self.interval_ms / 1000
+                )
+            except TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        self._session_factory = session_factory
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background writer and flush what is still queued."""
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self._wakeup = None
+        written = await self.flush()
+        if written:
+            logger.info("Flushed %d audit events on shutdown", written)
+
+    def reset(self) -> None:
+        self._queue.clear()
+        self.dropped = 0
+
+
+_audit_writer: AuditWriter | None = None
+
+
+def get_audit_writer() -> AuditWriter:
+    global _audit_writer
+    if _audit_writer is None:
+        _audit_writer = AuditWriter(
+            max_events=settings.AUDIT_QUEUE_MAX_EVENTS,
+            batch_size=settings.AUDIT_BATCH_SIZE,
+            interval_ms=settings.AUDIT_FLUSH_INTERVAL_MS,
+        )
+    return _audit_writer
+
+
+def record_auth_event(event: str, outcome: str, **fields) -> None:
+    """Queue an audit event if auditing is enabled."""
+    if settings.AUDIT_ENABLED:
+        get_audit_writer().record(AuditEvent(event=event, outcome=outcome, **fields))
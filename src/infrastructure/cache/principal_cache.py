@@ -0,0 +1,124 @@
+"""
+Per-process cache of authenticated principals.
+
+Holds a snapshot of the user behind an access token, keyed by username (the
+token's ``sub``), for PRINCIPAL_CACHE_TTL_SECONDS. It lets ``/me`` answer a
+conditional request with 304 without touching the database.
+
+Writes made through UserRepository on this replica invalidate the entry
+immediately. Writes on other replicas become visible once the entry
+expires, so the TTL bounds how stale a profile can be.
+
+Expired entries are kept for another DEGRADED_STALE_SECONDS. They are never
+returned by ``get``; ``get_stale`` hands them out only while the database
+is unavailable, so a valid access token keeps working during an outage.
+"""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+
+from src.config import settings
+from src.infrastructure.database.models.roles import UserRole
+from src.infrastructure.database.models.user import User
+
+
+@dataclass(frozen=True)
+class Principal:
+    id: int
+    username: str
+    email: str
+    full_name: str | None
+    cpf: str | None
+    role: UserRole
+    is_active: bool
+    created_at: datetime
+    version: int
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            full_name=user.full_name,
+            cpf=user.cpf,
+            role=user.role,
+            is_active=user.is_active,
+            created_at=user.created_at,
+            version=user.version,
+        )
+
+
+class PrincipalCache:
+    def __init__(
+        self,
+        ttl_seconds: float = 30.0,
+        max_entries: int = 10_000,
+        stale_seconds: float = 0.0,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.stale_seconds = stale_seconds
+        self._entries: OrderedDict[str, tuple[Principal, float]] = OrderedDict()
+
+    def get(self, username: str) -> Principal | None:
+        entry = self._entries.get(username)
+        if entry is None:
+            return None
+        principal, expires_at = entry
+        now = time.monotonic()
+        if now >= expires_at:
+            if now >= expires_at + self.stale_seconds:
+                del self._entries[username]
+            return None
+        self._entries.move_to_end(username)
+        return principal
+
+    def get_stale(self, username: str) -> Principal | None:
+        """The entry even past its TTL, within the stale window."""
+        entry = self._entries.get(username)
+        if entry is None:
+            return None
+        principal, expires_at = entry
+        if time.monotonic() >= expires_at + self.stale_seconds:
+            del self._entries[username]
+            return None
+        return principal
+
+    def put(self, principal: Principal) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        self._entries[principal.username] = (
+            principal,
+            time.monotonic() + self.ttl_seconds,
+        )
+        self._entries.move_to_end(principal.username)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, username: str) -> None:
+        self._entries.pop(username, None)
+
+    def invalidate_user_id(self, user_id: int) -> None:
+        for username, (principal, _) in list(self._entries.items()):
+            if principal.id == user_id:
+                del self._entries[username]
+
+    def reset(self) -> None:
+        self._entries.clear()
+
+
+_principal_cache: PrincipalCache | None = None
+
+
+def get_principal_cache() -> PrincipalCache:
+    global _principal_cache
+    if _principal_cache is None:
+        _principal_cache = PrincipalCache(
+            ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+            max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+            stale_seconds=settings.DEGRADED_STALE_SECONDS,
+        )
+    return _principal_cache
@@ -0,0 +1,153 @@
+"""
+Per-process cache of refresh-token states, for refreshing during outages.
+
+Refreshing needs the refresh_tokens row (is it still active, does the hash
+match) and the user's claims. Both are known when this replica issues the
+token at login, so they are remembered here, and revocations made through
+RefreshTokenRepository on this replica mark the entry inactive.
+
+Only while the database is unavailable, AuthService answers a refresh from
+an entry confirmed within DEGRADED_STALE_SECONDS, and a logout or session
+revocation consumes the token here so that it cannot be refreshed from the
+cache either. A revocation made on
+another replica in that window is not seen, which is the price of staying
+up. The token is consumed locally and the deactivation is written once the
+database is back.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.config import settings
+from src.infrastructure.database.circuit_breaker import DatabaseUnavailableError
+from src.infrastructure.database.models.refresh_token import RefreshToken
+from src.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class RefreshTokenState:
+    jti: str
+    session_id: int | None
+    token_hash: str
+    expires_at: datetime
+    active: bool
+    # Claims of the access tokens it refreshes into
+    user_id: int
+    username: str
+    email: str
+    role: str
+
+
+class RevocationCache:
+    def __init__(self, stale_seconds: float = 900.0, max_entries: int = 10_000):
+        self.stale_seconds = stale_seconds
+        self.max_entries = max_entries
+        # jti -> (state, monotonic time it was confirmed)
+        self._entries: OrderedDict[str, tuple[RefreshTokenState, float]] = OrderedDict()
+        self._pending: set[str] = set()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def remember(self, state: RefreshTokenState) -> None:
+        if self.stale_seconds <= 0:
+            return
+        self._entries[state.jti] = (state, time.monotonic())
+        self._entries.move_to_end(state.jti)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get_stale(self, jti: str) -> RefreshTokenState | None:
+        entry = self._entries.get(jti)
+        if entry is None:
+            return None
+        state, confirmed_at = entry
+        if time.monotonic() - confirmed_at >= self.stale_seconds:
+            del self._entries[jti]
+            return None
+        return state
+
+    def revoke(self, jti: str) -> None:
+        entry = self._entries.get(jti)
+        if entry is not None:
+            state, confirmed_at = entry
+            self._entries[jti] = (replace(state, active=False), confirmed_at)
+
+    def revoke_session(self, session_id: int) -> None:
+        for jti, (state, _) in list(self._entries.items()):
+            if state.session_id == session_id:
+                self.revoke(jti)
+
+    def consume(self, jti: str) -> None:
+        """Revoke locally now and in the database on the next flush."""
+        self.revoke(jti)
+        self._pending.add(jti)
+
+    def consume_session(self, user_id: int, session_id: int) -> int:
+        """Consume the cached tokens of one of ``user_id``'s sessions."""
+        jtis = [
+            jti
+            for jti, (state, _) in self._entries.items()
+            if state.session_id == session_id and state.user_id == user_id
+        ]
+        for jti in jtis:
+            self.consume(jti)
+        return len(jtis)
+
+    async def flush(self, session_factory: async_sessionmaker[AsyncSession]) -> int:
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, set()
+        try:
+            async with session_factory() as session:
+                await session.execute(
+                    update(RefreshToken)
+                    .where(RefreshToken.jti.in_([UUID(jti) for jti in pending]))
+                    .values(is_active=False)
+                )
+                await session.commit()
+        except DatabaseUnavailableError:
+            # Still down; retried on the next flush
+            self._pending |= pending
+            return 0
+        except Exception:
+            self._pending |= pending
+            logger.exception("Failed to write consumed refresh tokens")
+            return 0
+        return len(pending)
+
+    def reset(self) -> None:
+        self._entries.clear()
+        self._pending.clear()
+
+
+_revocation_cache: RevocationCache | None = None
+
+
+def get_revocation_cache() -> RevocationCache:
+    global _revocation_cache
+    if _revocation_cache is None:
+        _revocation_cache = RevocationCache(
+            stale_seconds=settings.DEGRADED_STALE_SECONDS,
+            max_entries=settings.REVOCATION_CACHE_MAX_ENTRIES,
+        )
+    return _revocation_cache
+
+
+async def run_revocation_flusher(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    """Write tokens consumed during an outage once the database is back."""
+    while True:
+        await asyncio.sleep(settings.DB_CIRCUIT_RESET_SECONDS)
+        await get_revocation_cache().flush(session_factory)
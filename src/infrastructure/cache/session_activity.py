@@ -0,0 +1,83 @@
+"""
+Coalesced ``last_used_at`` tracking for refresh-token sessions.
+
+Access tokens carry the id (``sid`` claim) of the refresh-token session
+they were issued with. Writing ``last_used_at`` on each of them would turn reads into
+writes, so touches are kept in memory (latest timestamp per session) and
+written in one batch every SESSION_LAST_USED_FLUSH_SECONDS. A session used
+a thousand times between flushes costs a single UPDATE.
+"""
+
+import asyncio
+from datetime import UTC, datetime
+
+from sqlalchemy import bindparam, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.config import settings
+from src.infrastructure.database.models.refresh_token import RefreshToken
+from src.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class SessionActivityTracker:
+    def __init__(self):
+        self._pending: dict[int, datetime] = {}
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def touch(self, sid: int, when: datetime | None = None) -> None:
+        self._pending[sid] = when or datetime.now(UTC)
+
+    def last_used(self, sid: int) -> datetime | None:
+        """Touch not yet written to the database, if any."""
+        return self._pending.get(sid)
+
+    async def flush(self, session_factory: async_sessionmaker[AsyncSession]) -> int:
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+        try:
+            async with session_factory() as session:
+                # Core executemany: one prepared UPDATE for the whole batch
+                table = RefreshToken.__table__
+                connection = await session.connection()
+                await connection.execute(
+                    update(table)
+                    .where(table.c.id == bindparam("b_id"))
+                    .values(last_used_at=bindparam("b_last_used_at")),
+                    [
+                        {"b_id": sid, "b_last_used_at": last_used}
+                        for sid, last_used in pending.items()
+                    ],
+                )
+                await session.commit()
+        except Exception:
+            # Put the touches back unless newer ones arrived meanwhile
+            for sid, last_used in pending.items():
+                self._pending.setdefault(sid, last_used)
+            logger.exception("Failed to write session activity")
+            return 0
+        return len(pending)
+
+    def reset(self) -> None:
+        self._pending.clear()
+
+
+_tracker = SessionActivityTracker()
+
+
+def get_session_activity_tracker() -> SessionActivityTracker:
+    return _tracker
+
+
+async def run_session_activity_flusher(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    """Write coalesced touches periodically; the final flush happens on shutdown."""
+    while True:
+        await asyncio.sleep(settings.SESSION_LAST_USED_FLUSH_SECONDS)
+        await get_session_activity_tracker().flush(session_factory)
@@ -0,0 +1,167 @@
+"""
+Negative-lookup filter for usernames and emails.
+
+A Bloom filter of every registered username and email lets the repository
+answer "definitely not registered" without a database round trip, which is
+what enumeration and credential-stuffing traffic mostly asks for. A positive
+answer only means "maybe", and falls through to the database.
+
+The filter is per process and only learns about registrations made through
+this process until its next periodic rebuild. A definite miss is therefore
+only trustworthy when a single replica serves the database, which is why
+USER_LOOKUP_FILTER_ENABLED is off by default.
+
+Deleted users are not removed: a key cannot be taken out of a Bloom filter
+without risking the keys it shares positions with, which would turn into
+false negatives. They stay "maybe" (one database lookup) until the rebuild.
+"""
+
+import asyncio
+import hashlib
+import math
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.config import settings
+from src.infrastructure.database.models.user import User
+from src.infrastructure.database.timeouts import BULK
+from src.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(capacity, 1)
+        self.size = max(
+            8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        )
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str) -> list[int]:
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(key)
+        )
+
+
+class UserLookupFilter:
+    """
+    Username/email membership filter with a "not built yet" pass-through.
+
+    Until the first build completes every lookup reports "maybe", so callers
+    always fall back to the database.
+    """
+
+    def __init__(self):
+        self._filter: BloomFilter | None = None
+        self._building: BloomFilter | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self._filter is not None
+
+    @staticmethod
+    def _username_key(username: str) -> str:
+        return f"u:{username}"
+
+    @staticmethod
+    def _email_key(email: str) -> str:
+        return f"e:{email}"
+
+    def _targets(self) -> list[BloomFilter]:
+        return [f for f in (self._filter, self._building) if f is not None]
+
+    def add_user(self, username: str, email: str) -> None:
+        for target in self._targets():
+            target.add(self._username_key(username))
+            target.add(self._email_key(email))
+
+    def might_contain_username(self, username: str) -> bool:
+        if not settings.USER_LOOKUP_FILTER_ENABLED or self._filter is None:
+            return True
+        return self._username_key(username) in self._filter
+
+    def might_contain_email(self, email: str) -> bool:
+        if not settings.USER_LOOKUP_FILTER_ENABLED or self._filter is None:
+            return True
+        return self._email_key(email) in self._filter
+
+    async def build(self, session: AsyncSession, batch_size: int = 1000) -> int:
+        """
+        Rebuild the filter from a streamed scan of ``users``.
+
+        Users registered while the scan is running are added to both the
+        current and the new filter, so nothing is lost when they are swapped.
+        """
+        user_count = (
+            await session.execute(
+                select(func.count(User.id)).execution_options(query_class=BULK)
+            )
+        ).scalar()
+        capacity = max(settings.USER_LOOKUP_FILTER_CAPACITY, (user_count or 0) * 5 // 4)
+        # Two keys (username and email) per user
+        self._building = BloomFilter(
+            capacity * 2, settings.USER_LOOKUP_FILTER_ERROR_RATE
+        )
+        try:
+            rows = await session.stream(
+                select(User.username, User.email).execution_options(
+                    yield_per=batch_size, query_class=BULK
+                )
+            )
+            loaded = 0
+            async for username, email in rows:
+                self._building.add(self._username_key(username))
+                self._building.add(self._email_key(email))
+                loaded += 1
+            self._filter = self._building
+        finally:
+            self._building = None
+        return loaded
+
+    def reset(self) -> None:
+        self._filter = None
+        self._building = None
+
+
+_user_lookup_filter = UserLookupFilter()
+
+
+def get_user_lookup_filter() -> UserLookupFilter:
+    return _user_lookup_filter
+
+
+async def build_user_lookup_filter(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    try:
+        async with session_factory() as session:
+            loaded = await get_user_lookup_filter().build(session)
+        logger.info("User lookup filter built with %d users", loaded)
+    except Exception:
+        # Leave the previous filter (or pass-through mode) in place
+        logger.exception("Failed to build user lookup filter")
+
+
+async def run_user_lookup_filter_refresher(
+    session_factory: async_sessionmaker[AsyncSession], build_first: bool = True
+) -> None:
+    """Build the filter now (unless already built) and rebuild it periodically."""
+    if not build_first:
+        await asyncio.sleep(settings.USER_LOOKUP_FILTER_REBUILD_SECONDS)
+    while True:
+        await build_user_lookup_filter(session_factory)
+        await asyncio.sleep(settings.USER_LOOKUP_FILTER_REBUILD_SECONDS)
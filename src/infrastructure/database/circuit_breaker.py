@@ -0,0 +1,185 @@
+"""
+Circuit breaker in front of the database.
+
+When PostgreSQL goes away, every request would otherwise wait for a pool
+connection or a connect timeout before failing, and the waits pile up until
+the pool and the event loop are saturated. The breaker counts consecutive
+connection failures (failed connects, dropped connections, pool checkout
+timeouts) reported by the engine hooks and, after
+DB_CIRCUIT_FAILURE_THRESHOLD of them, opens: database calls then fail at once
+with DatabaseUnavailableError instead of waiting.
+
+Every DB_CIRCUIT_RESET_SECONDS one call is let through as a trial (usually
+the health monitor's ``SELECT 1``); the first statement that succeeds closes
+the breaker again. The trial is a token: when the pool checkout takes it,
+the connection carries it so that its statements are not refused as a
+second call in the same interval.
+
+Callers that can answer from stale data (the principal and revocation
+caches) catch DatabaseUnavailableError; everything else gets a 503.
+"""
+
+import time
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.config import settings
+from src.infrastructure.monitoring.metrics import record_circuit_state
+from src.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+
+# Connection info key of the half-open trial token the connection holds
+TRIAL_INFO_KEY = "circuit_trial"
+
+
+class DatabaseUnavailableError(RuntimeError):
+    pass
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_seconds: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._last_error: str | None = None
+        self._trial = 0
+
+    @property
+    def is_closed(self) -> bool:
+        return self.state == CLOSED
+
+    def check(self) -> int | None:
+        """
+        Raise DatabaseUnavailableError unless a database call may proceed.
+
+        Returns the trial token when the call is the half-open trial.
+        """
+        if self.state == CLOSED:
+            return None
+        now = self._clock()
+        if now - self._opened_at < self.reset_seconds:
+            raise DatabaseUnavailableError(
+                f"Database unavailable (circuit {self.state}): {self._last_error}"
+            )
+        # One trial per reset interval; its outcome closes or re-opens us
+        self._opened_at = now
+        self._trial += 1
+        self._set_state(HALF_OPEN)
+        return self._trial
+
+    def holds_trial(self, token: int | None) -> bool:
+        """Whether ``token`` is the trial of the current half-open interval."""
+        return self.state == HALF_OPEN and token == self._trial
+
+    def record_success(self) -> None:
+        self.failures = 0
+        if self.state != CLOSED:
+            logger.warning("Database reachable again; closing the circuit")
+            self._set_state(CLOSED)
+
+    def record_failure(self, error: str) -> None:
+        self.failures += 1
+        self._last_error = error
+        if self.state == HALF_OPEN or (
+            self.state == CLOSED and self.failures >= self.failure_threshold
+        ):
+            if self.state == CLOSED:
+                logger.error(
+                    "Opening the database circuit after %d failures: %s",
+                    self.failures,
+                    error,
+                )
+            self._opened_at = self._clock()
+            self._set_state(OPEN)
+
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        record_circuit_state(state)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "last_error": self._last_error,
+        }
+
+    def reset(self) -> None:
+        self.failures = 0
+        self._opened_at = 0.0
+        self._last_error = None
+        self._set_state(CLOSED)
+
+
+_circuit_breaker: CircuitBreaker | None = None
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    global _circuit_breaker
+    if _circuit_breaker is None:
+        _circuit_breaker = CircuitBreaker(
+            failure_threshold=settings.DB_CIRCUIT_FAILURE_THRESHOLD,
+            reset_seconds=settings.DB_CIRCUIT_RESET_SECONDS,
+        )
+    return _circuit_breaker
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    breaker = get_circuit_breaker()
+    if breaker.holds_trial(conn.info.get(TRIAL_INFO_KEY)):
+        return
+    # Connections checked out before the circuit opened fail fast too
+    token = breaker.check()
+    if token is not None:
+        conn.info[TRIAL_INFO_KEY] = token
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    breaker = get_circuit_breaker()
+    if not breaker.is_closed or breaker.failures:
+        breaker.record_success()
+        conn.info.pop(TRIAL_INFO_KEY, None)
+
+
+def _handle_error(context) -> BaseException | None:
+    error = context.original_exception
+    # A cancelled task is not the database's fault, although SQLAlchemy
+    # handles it like a disconnect
+    if isinstance(error, DatabaseUnavailableError) or not isinstance(error, Exception):
+        return None
+    # No connection means the connect itself failed
+    if not (
+        context.is_disconnect
+        or context.connection is None
+        or isinstance(error, OSError | TimeoutError)
+    ):
+        return None
+    get_circuit_breaker().record_failure(f"{type(error).__name__}: {error}")
+    unavailable = DatabaseUnavailableError(f"Database unavailable: {error}")
+    unavailable.__cause__ = context.sqlalchemy_exception or error
+    return unavailable
+
+
+def install_circuit_breaker_hooks(engine: AsyncEngine) -> None:
+    """Attach the breaker to ``engine`` (idempotent)."""
+    sync_engine = engine.sync_engine
+    if event.contains(sync_engine, "handle_error", _handle_error):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
@@ -0,0 +1,36 @@
+from datetime import UTC, datetime
+
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, String
+
+from src.infrastructure.database.session import Base
+
+
+class AuthAuditEvent(Base):
+    # On PostgreSQL this table is range-partitioned by day of occurred_at
+    # (see migration b71e0f5c9a24); there the primary key is (id, occurred_at).
+    # No foreign key to users: audit rows outlive the accounts they describe.
+    __tablename__ = "auth_audit_events"
+
+    id = Column(
+        BigInteger().with_variant(Integer, "sqlite"),
+        primary_key=True,
+        autoincrement=True,
+    )
+    occurred_at = Column(
+        DateTime(timezone=True), default=lambda: datetime.now(UTC), nullable=False
+    )
+    event = Column(String(20), nullable=False)  # login, refresh, logout
+    outcome = Column(String(20), nullable=False)  # success, failure
+    user_id = Column(Integer, nullable=True)
+    username = Column(String(50), nullable=True)
+    ip_address = Column(String(45), nullable=True)
+    user_agent = Column(String(255), nullable=True)
+    detail = Column(String(255), nullable=True)
+
+    __table_args__ = (
+        Index("ix_auth_audit_events_occurred_at", "occurred_at"),
+        Index("ix_auth_audit_events_user_id", "user_id", "occurred_at"),
+    )
+
+    def __repr__(self):
+        return f"<AuthAuditEvent(id={self.id}, event='{self.event}', outcome='{self.outcome}', user_id={self.user_id})>"
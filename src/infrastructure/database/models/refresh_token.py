@@ -1,23 +1,59 @@
 from datetime import UTC, datetime
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, text
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    FetchedValue,
+    ForeignKey,
+    Index,
+    Integer,
+    PrimaryKeyConstraint,
+    Sequence,
+    String,
+    UniqueConstraint,
+    Uuid,
+    text,
+)
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import relationship
+from sqlalchemy.types import TypeDecorator
 
 from src.infrastructure.database.session import Base
 
 
+class _SQLiteRowId(TypeDecorator):
+    """Integer primary key aliasing the rowid, so SQLite assigns ids."""
+
+    impl = Integer
+    cache_ok = True
+
+
+@compiles(_SQLiteRowId, "sqlite")
+def _compile_sqlite_row_id(type_, compiler, **kw):
+    return "INTEGER PRIMARY KEY"
+
+
 class RefreshToken(Base):
+    # On PostgreSQL this table is range-partitioned by day of expires_at (see
+    # migration 3c1f0a9d2b7e): the primary key is (id, expires_at), ids come
+    # from refresh_tokens_id_seq and jti is unique per expires_at. SQLite
+    # (tests) cannot autoincrement a composite key, so there id alone is the
+    # primary key.
     __tablename__ = "refresh_tokens"
 
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    jti = Column(
-        String(255), unique=True, index=True, nullable=False
-    )  # JWT ID for rotation
+    id = Column(
+        Integer().with_variant(_SQLiteRowId(), "sqlite"),
+        Sequence("refresh_tokens_id_seq"),
+        server_default=FetchedValue(),
+        primary_key=True,
+    )
+    jti = Column(Uuid, nullable=False)  # JWT ID for rotation (time-ordered UUIDv7)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     token_hash = Column(
         String(255), nullable=False
     )  # Hashed refresh token for security
-    expires_at = Column(DateTime(timezone=True), nullable=False)
+    expires_at = Column(DateTime(timezone=True), primary_key=True)
     created_at = Column(
         DateTime(timezone=True),
         server_default=text("CURRENT_TIMESTAMP"),
@@ -26,9 +62,36 @@ class RefreshToken(Base):
     )
     is_active = Column(Boolean, default=True, nullable=False)
     revoked_at = Column(DateTime(timezone=True), nullable=True)
+    # Session metadata shown in "my sessions"
+    device = Column(String(255), nullable=True)  # User-Agent at login
+    ip_address = Column(String(45), nullable=True)
+    last_used_at = Column(DateTime(timezone=True), nullable=True)  # coalesced
 
     # Relationship to User
     user = relationship("User", back_populates="refresh_tokens")
 
+    __table_args__ = (
+        PrimaryKeyConstraint("id", "expires_at", name="refresh_tokens_pkey").ddl_if(
+            dialect="postgresql"
+        ),
+        UniqueConstraint("jti", "expires_at", name="uq_refresh_tokens_jti_expires_at"),
+        # Sessions per user. On PostgreSQL the INCLUDE columns make the
+        # session listing an index-only scan; the index also serves active
+        # session counts and the users.id foreign key check.
+        Index(
+            "ix_refresh_tokens_user_sessions",
+            "user_id",
+            "is_active",
+            "expires_at",
+            postgresql_include=[
+                "id",
+                "created_at",
+                "last_used_at",
+                "device",
+                "ip_address",
+            ],
+        ),
+    )
+
     def __repr__(self):
         return f"<RefreshToken(id={self.id}, jti='{self.jti}', user_id={self.user_id}, is_active={self.is_active})>"
@@ -1,6 +1,17 @@
 from datetime import UTC, datetime
 
-from sqlalchemy import Boolean, Column, DateTime, Enum, Integer, String, text
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Enum,
+    Index,
+    Integer,
+    String,
+    func,
+    literal_column,
+    text,
+)
 from sqlalchemy.orm import relationship
 
 from src.infrastructure.database.models.roles import UserRole
@@ -10,7 +21,7 @@ from src.infrastructure.database.session import Base
 class User(Base):
     __tablename__ = "users"
 
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     username = Column(String(50), unique=True, index=True, nullable=False)
     email = Column(String(100), unique=True, index=True, nullable=False)
     full_name = Column(String(100), nullable=True)
@@ -24,9 +35,26 @@ class User(Base):
         nullable=False,
     )
     is_active = Column(Boolean, default=True, nullable=False)
+    # Bumped by every UPDATE, ORM or Core; the ETag of the user's profile
+    version = Column(
+        Integer,
+        default=1,
+        server_default=text("1"),
+        onupdate=literal_column("version + 1"),
+        nullable=False,
+    )
+    updated_at = Column(
+        DateTime(timezone=True), onupdate=lambda: datetime.now(UTC), nullable=True
+    )
 
     # Relationship to RefreshToken
     refresh_tokens = relationship("RefreshToken", back_populates="user")
 
+    __table_args__ = (
+        # Case-insensitive lookups by username and email
+        Index("ix_users_username_lower", func.lower(username)),
+        Index("ix_users_email_lower", func.lower(email)),
+    )
+
     def __repr__(self):
         return f"<User(id={self.id}, username='{self.username}', email='{self.email}')>"
@@ -0,0 +1,225 @@
+"""
+Maintenance for range-partitioned PostgreSQL tables.
+
+Partitioned tables are split into one partition per UTC day of their
+partition key. Future partitions are created ahead of time so inserts never
+land in the default partition, and partitions whose whole range is older
+than the retention period are detached and dropped, which removes expired
+rows without row-by-row deletes or vacuum churn.
+
+Rows that still reach the default partition (keys past the premade days)
+are moved into their day's partition when it is created, since PostgreSQL
+refuses to create a partition over rows in the default one, and deleted
+from it once expired.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from src.config import settings
+from src.infrastructure.database.timeouts import BULK
+from src.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class PartitionedTable:
+    name: str
+    column: str
+    retention_days: int
+    days_ahead: int
+
+
+def get_partitioned_tables() -> list[PartitionedTable]:
+    return [
+        PartitionedTable(
+            name="refresh_tokens",
+            column="expires_at",
+            retention_days=settings.REFRESH_TOKEN_RETENTION_DAYS,
+            # Tokens expire REFRESH_TOKEN_EXPIRE_DAYS after creation
+            days_ahead=settings.REFRESH_TOKEN_EXPIRE_DAYS
+            + settings.PARTITION_PREMAKE_DAYS,
+        ),
+        PartitionedTable(
+            name="auth_audit_events",
+            column="occurred_at",
+            retention_days=settings.AUDIT_RETENTION_DAYS,
+            days_ahead=settings.PARTITION_PREMAKE_DAYS,
+        ),
+    ]
+
+
+def partition_name(table: str, day: date) -> str:
+    return f"{table}_p{day:%Y%m%d}"
+
+
+def partition_day(table: str, name: str) -> date | None:
+    prefix = f"{table}_p"
+    if not name.startswith(prefix):
+        return None
+    try:
+        return datetime.strptime(name[len(prefix) :], "%Y%m%d").date()
+    except ValueError:
+        return None
+
+
+def partition_bounds(day: date) -> tuple[datetime, datetime]:
+    start = datetime.combine(day, datetime.min.time(), UTC)
+    return start, start + timedelta(days=1)
+
+
+def create_partition_sql(table: str, day: date) -> str:
+    start, end = partition_bounds(day)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table, day)} "
+        f"PARTITION OF {table} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+
+
+async def list_partitions(conn: AsyncConnection, table: str) -> list[str]:
+    result = await conn.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON pg_inherits.inhparent = parent.oid "
+            "JOIN pg_class child ON pg_inherits.inhrelid = child.oid "
+            "WHERE parent.relname = :table"
+        ),
+        {"table": table},
+    )
+    return [row[0] for row in result]
+
+
+async def default_partition(conn: AsyncConnection, table: str) -> str | None:
+    result = await conn.execute(
+        text(
+            "SELECT partdefid::regclass::text FROM pg_partitioned_table "
+            "WHERE partrelid = CAST(:table AS regclass) AND partdefid <> 0"
+        ),
+        {"table": table},
+    )
+    return result.scalar_one_or_none()
+
+
+async def create_partition(
+    conn: AsyncConnection, table: PartitionedTable, day: date, default: str | None
+) -> None:
+    """Create ``day``'s partition, moving its rows out of ``default`` first."""
+    sql = text(create_partition_sql(table.name, day))
+    start, end = partition_bounds(day)
+    in_range = f"WHERE {table.column} >= :start AND {table.column} < :end"
+    bounds = {"start": start, "end": end}
+    if default is not None:
+        result = await conn.execute(
+            text(f"SELECT EXISTS (SELECT 1 FROM {default} {in_range})"),  # noqa: S608
+            bounds,
+        )
+        if not result.scalar():
+            default = None
+    if default is None:
+        await conn.execute(sql)
+        return
+
+    await conn.execute(text(f"CREATE TEMP TABLE partition_move (LIKE {table.name})"))
+    await conn.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {default} {in_range} RETURNING *) "  # noqa: S608
+            "INSERT INTO partition_move SELECT * FROM moved"
+        ),
+        bounds,
+    )
+    await conn.execute(sql)
+    await conn.execute(
+        text(f"INSERT INTO {table.name} SELECT * FROM partition_move")  # noqa: S608
+    )
+    await conn.execute(text("DROP TABLE partition_move"))
+    logger.warning(
+        "Moved rows of %s out of %s", partition_name(table.name, day), default
+    )
+
+
+async def ensure_partitions(
+    conn: AsyncConnection, table: PartitionedTable, today: date | None = None
+) -> list[str]:
+    """Create any missing daily partitions from today to ``days_ahead``."""
+    today = today or datetime.now(UTC).date()
+    existing = set(await list_partitions(conn, table.name))
+    default = await default_partition(conn, table.name)
+    created = []
+    for offset in range(table.days_ahead + 1):
+        day = today + timedelta(days=offset)
+        name = partition_name(table.name, day)
+        if name in existing:
+            continue
+        await create_partition(conn, table, day, default)
+        created.append(name)
+    return created
+
+
+async def purge_default_partition(
+    conn: AsyncConnection, table: PartitionedTable, today: date | None = None
+) -> int:
+    """Delete rows of the default partition older than ``retention_days``."""
+    default = await default_partition(conn, table.name)
+    if default is None:
+        return 0
+    today = today or datetime.now(UTC).date()
+    cutoff, _ = partition_bounds(today - timedelta(days=table.retention_days))
+    result = await conn.execute(
+        text(f"DELETE FROM {default} WHERE {table.column} < :cutoff"),  # noqa: S608
+        {"cutoff": cutoff},
+    )
+    return result.rowcount
+
+
+async def drop_expired_partitions(
+    conn: AsyncConnection, table: PartitionedTable, today: date | None = None
+) -> list[str]:
+    """Drop partitions whose whole range ended more than ``retention_days`` ago."""
+    today = today or datetime.now(UTC).date()
+    cutoff = today - timedelta(days=table.retention_days)
+    dropped = []
+    for name in await list_partitions(conn, table.name):
+        day = partition_day(table.name, name)
+        # A partition covers [day, day + 1), so it is fully expired once
+        # day + 1 <= cutoff.
+        if day is None or day + timedelta(days=1) > cutoff:
+            continue
+        await conn.execute(text(f"ALTER TABLE {table.name} DETACH PARTITION {name}"))
+        await conn.execute(text(f"DROP TABLE {name}"))
+        dropped.append(name)
+    return dropped
+
+
+async def maintain_partitions(engine: AsyncEngine) -> None:
+    for table in get_partitioned_tables():
+        try:
+            async with engine.begin() as conn:
+                # DDL may wait on locks held by long queries on the table
+                await conn.execution_options(query_class=BULK)
+                created = await ensure_partitions(conn, table)
+                dropped = await drop_expired_partitions(conn, table)
+                purged = await purge_default_partition(conn, table)
+            if created or dropped or purged:
+                logger.info(
+                    "Partition maintenance for %s: created %s, dropped %s, "
+                    "purged %d rows from the default partition",
+                    table.name,
+                    created,
+                    dropped,
+                    purged,
+                )
+        except Exception:
+            logger.exception("Partition maintenance failed for %s", table.name)
+
+
+async def run_partition_maintenance(engine: AsyncEngine) -> None:
+    """Run partition maintenance now and then every configured interval."""
+    while True:
+        await maintain_partitions(engine)
+        await asyncio.sleep(settings.PARTITION_MAINTENANCE_INTERVAL_SECONDS)
@@ -0,0 +1,67 @@
+"""
+Connection pool that measures checkout time.
+
+Checkout covers waiting for a free connection, opening one when the pool
+grows and the pre-ping round trip. It is exported as a histogram and charged
+to the current request's ``pool_wait`` stage for the flight recorder.
+
+Checkouts are refused at once while the database circuit is open, and a
+checkout timeout counts as a circuit failure. Under a request deadline the
+wait is cut to what is left of it; running out of deadline is the request's
+problem, not the pool's, so it is not counted against the circuit.
+"""
+
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection
+
+from src.infrastructure.database.circuit_breaker import (
+    TRIAL_INFO_KEY,
+    DatabaseUnavailableError,
+    get_circuit_breaker,
+)
+from src.infrastructure.database.timeouts import (
+    DeadlineExceededError,
+    remaining_seconds,
+)
+from src.infrastructure.monitoring.flight_recorder import record_stage
+from src.infrastructure.monitoring.metrics import (
+    record_deadline_exceeded,
+    record_pool_checkout,
+)
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._default_timeout = self._timeout
+
+    def connect(self) -> PoolProxiedConnection:
+        trial = get_circuit_breaker().check()
+        remaining = remaining_seconds()
+        if remaining is not None and remaining <= 0:
+            record_deadline_exceeded("pool_checkout")
+            raise DeadlineExceededError("Request deadline exceeded")
+        shortened = remaining is not None and remaining < self._default_timeout
+        # The queue reads the timeout before it first waits, so concurrent
+        # checkouts never see each other's value
+        self._timeout = remaining if shortened else self._default_timeout
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError as error:
+            if shortened:
+                record_deadline_exceeded("pool_checkout")
+                raise DeadlineExceededError(str(error)) from error
+            get_circuit_breaker().record_failure(str(error))
+            raise DatabaseUnavailableError(str(error)) from error
+        finally:
+            self._timeout = self._default_timeout
+            elapsed = time.perf_counter() - started
+            record_pool_checkout(elapsed)
+            record_stage("pool_wait", elapsed)
+        if trial is not None:
+            # Its statements run the trial this checkout was let through for
+            connection.info[TRIAL_INFO_KEY] = trial
+        return connection
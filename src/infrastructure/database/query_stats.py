@@ -0,0 +1,139 @@
+"""
+Per-request SQL accounting.
+
+Engine event hooks add every statement's count, rows and time to the
+QueryStats objects active in the current context. The request middleware
+opens one per HTTP request, exports it per route, and warns when a route
+goes over its query budget or repeats the same statement, the usual sign
+of an N+1 loop. Tests open their own with ``track_queries`` to pin the
+number of queries an endpoint issues.
+
+Statements run in SQLAlchemy's greenlet for the calling task, which shares
+the task's context, so concurrent requests are counted separately.
+"""
+
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.config import settings
+from src.infrastructure.monitoring.metrics import (
+    record_query_budget_exceeded,
+    record_request_queries,
+)
+from src.infrastructure.monitoring.route_label import route_template
+from src.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+UNMATCHED = "unmatched"
+
+_current: ContextVar["QueryStats | None"] = ContextVar("query_stats", default=None)
+
+
+@dataclass
+class QueryStats:
+    queries: int = 0
+    rows: int = 0
+    seconds: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+    # Enclosing tracker (e.g. a test around a request), which sees the same queries
+    parent: "QueryStats | None" = field(default=None, repr=False)
+
+    def add(self, statement: str, rows: int, seconds: float) -> None:
+        stats: QueryStats | None = self
+        while stats is not None:
+            stats.queries += 1
+            stats.rows += rows
+            stats.seconds += seconds
+            stats.statements[statement] += 1
+            stats = stats.parent
+
+    def most_repeated(self) -> tuple[str, int]:
+        if not self.statements:
+            return "", 0
+        return self.statements.most_common(1)[0]
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Count the statements run in this context until the block exits."""
+    stats = QueryStats(parent=_current.get())
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None:
+        return
+    elapsed = time.perf_counter() - context._query_started
+    # asyncpg reports the row count of SELECTs too; drivers that do not give -1
+    stats.add(statement, max(cursor.rowcount, 0), elapsed)
+
+
+def install_query_hooks(engine: AsyncEngine) -> None:
+    """Attach the accounting hooks to ``engine`` (idempotent)."""
+    sync_engine = engine.sync_engine
+    if event.contains(sync_engine, "after_cursor_execute", _after_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _budget_for(route: str) -> int:
+    return settings.QUERY_BUDGETS.get(route, settings.QUERY_BUDGET_DEFAULT)
+
+
+def report(route: str, stats: QueryStats) -> None:
+    """Export one request's statistics and warn about excess or repetition."""
+    record_request_queries(route, stats.queries, stats.rows, stats.seconds)
+    budget = _budget_for(route)
+    if stats.queries > budget:
+        record_query_budget_exceeded(route)
+        logger.warning(
+            "Route %s ran %d queries (budget %d, %.1f ms in the database)",
+            route,
+            stats.queries,
+            budget,
+            stats.seconds * 1000,
+        )
+    statement, repeats = stats.most_repeated()
+    if repeats >= settings.QUERY_REPEAT_THRESHOLD:
+        logger.warning(
+            "Route %s ran the same statement %d times, possible N+1: %s",
+            route,
+            repeats,
+            " ".join(statement.split())[:200],
+        )
+
+
+class QueryAccountingMiddleware:
+    """Account the SQL statements issued while serving each HTTP request."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with track_queries() as stats:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                report(route_template(scope) or UNMATCHED, stats)
@@ -0,0 +1,55 @@
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from src.infrastructure.database.models.audit_event import AuthAuditEvent
+from src.infrastructure.database.timeouts import AGGREGATE
+from src.infrastructure.monitoring.tracing import traced
+
+
+class AuditEventRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    @traced()
+    async def add_events(self, rows: list[dict[str, Any]]) -> None:
+        if not rows:
+            return
+        # One multi-row INSERT per batch
+        await self.session.execute(insert(AuthAuditEvent).values(rows))
+        await self.session.commit()
+
+    @traced()
+    async def list_events(
+        self,
+        since: datetime,
+        until: datetime,
+        user_id: int | None = None,
+        username: str | None = None,
+        event: str | None = None,
+        outcome: str | None = None,
+        limit: int = 100,
+    ) -> list[AuthAuditEvent]:
+        # The occurred_at range prunes partitions on PostgreSQL
+        query = (
+            select(AuthAuditEvent)
+            .filter(AuthAuditEvent.occurred_at >= since)
+            .filter(AuthAuditEvent.occurred_at < until)
+            .order_by(AuthAuditEvent.occurred_at.desc(), AuthAuditEvent.id.desc())
+            .limit(limit)
+        )
+        if user_id is not None:
+            query = query.filter(AuthAuditEvent.user_id == user_id)
+        if username is not None:
+            query = query.filter(AuthAuditEvent.username == username)
+        if event is not None:
+            query = query.filter(AuthAuditEvent.event == event)
+        if outcome is not None:
+            query = query.filter(AuthAuditEvent.outcome == outcome)
+        result = await self.session.execute(
+            query, execution_options={"query_class": AGGREGATE}
+        )
+        return list(result.scalars())
@@ -1,35 +1,118 @@
-from sqlalchemy import delete
+from datetime import UTC, datetime, timedelta
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import Select, delete, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from src.domain.interfaces.refresh_token_repository import (
     RefreshTokenRepository as RefreshTokenRepo,
 )
+from src.infrastructure.cache.revocation_cache import get_revocation_cache
 from src.infrastructure.database.models.refresh_token import RefreshToken
+from src.infrastructure.monitoring.tracing import traced
+
+# The token's exp claim has second precision, so allow a little slack around
+# the stored expires_at when using it to prune partitions.
+EXPIRES_AT_SLACK = timedelta(minutes=5)
+
+
+def _parse_jti(jti: str | UUID) -> UUID | None:
+    # jti comes from a client-supplied token; anything that is not a UUID
+    # cannot match a stored token.
+    if isinstance(jti, UUID):
+        return jti
+    try:
+        return UUID(jti)
+    except (TypeError, ValueError):
+        return None
+
+
+def select_by_jti(jti: UUID, expires_at: datetime | None = None) -> Select:
+    """The refresh path's lookup; ``expires_at`` lets PostgreSQL prune partitions."""
+    query = select(RefreshToken).filter(RefreshToken.jti == jti)
+    if expires_at is not None:
+        query = query.filter(
+            RefreshToken.expires_at.between(
+                expires_at - EXPIRES_AT_SLACK, expires_at + EXPIRES_AT_SLACK
+            )
+        )
+    return query
 
 
 class RefreshTokenRepository(RefreshTokenRepo):
     def __init__(self, session: AsyncSession):
         self.session = session
 
+    @traced()
     async def add_refresh_token(self, refresh_token: RefreshToken) -> RefreshToken:
         self.session.add(refresh_token)
         await self.session.commit()
         await self.session.refresh(refresh_token)
         return refresh_token
 
-    async def get_refresh_token_by_jti(self, jti: str) -> RefreshToken | None:
-        result = await self.session.execute(
-            select(RefreshToken).filter(RefreshToken.jti == jti)
-        )
+    @traced()
+    async def get_refresh_token_by_jti(
+        self, jti: str, expires_at: datetime | None = None
+    ) -> RefreshToken | None:
+        jti_value = _parse_jti(jti)
+        if jti_value is None:
+            return None
+        result = await self.session.execute(select_by_jti(jti_value, expires_at))
         return result.scalar_one_or_none()
 
+    @traced()
     async def update_refresh_token(self, refresh_token: RefreshToken) -> RefreshToken:
         self.session.add(refresh_token)
         await self.session.commit()
+        if not refresh_token.is_active:
+            get_revocation_cache().revoke(str(refresh_token.jti))
         await self.session.refresh(refresh_token)
         return refresh_token
 
+    @traced()
     async def delete_refresh_token(self, jti: str) -> None:
-        await self.session.execute(delete(RefreshToken).filter(RefreshToken.jti == jti))
+        jti_value = _parse_jti(jti)
+        if jti_value is None:
+            return
+        await self.session.execute(
+            delete(RefreshToken).filter(RefreshToken.jti == jti_value)
+        )
+        await self.session.commit()
+        get_revocation_cache().revoke(str(jti_value))
+
+    @traced()
+    async def list_active_sessions(self, user_id: int) -> list[dict[str, Any]]:
+        # Only columns of ix_refresh_tokens_user_sessions, for an index-only scan
+        result = await self.session.execute(
+            select(
+                RefreshToken.id,
+                RefreshToken.device,
+                RefreshToken.ip_address,
+                RefreshToken.created_at,
+                RefreshToken.last_used_at,
+                RefreshToken.expires_at,
+            )
+            .filter(RefreshToken.user_id == user_id)
+            # Bare column (is_active = true) so it is an index condition
+            .filter(RefreshToken.is_active)
+            .filter(RefreshToken.expires_at > datetime.now(UTC))
+            .order_by(RefreshToken.expires_at.desc())
+        )
+        return [row._asdict() for row in result]
+
+    @traced()
+    async def revoke_session(self, user_id: int, session_id: int) -> bool:
+        result = await self.session.execute(
+            update(RefreshToken)
+            .filter(RefreshToken.id == session_id)
+            .filter(RefreshToken.user_id == user_id)
+            .filter(RefreshToken.is_active.is_(True))
+            .values(is_active=False, revoked_at=datetime.now(UTC))
+            .returning(RefreshToken.id)
+        )
+        revoked = result.first() is not None
         await self.session.commit()
+        get_revocation_cache().revoke_session(session_id)
+        return revoked
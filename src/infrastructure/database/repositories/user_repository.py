@@ -1,15 +1,48 @@
-from sqlalchemy import delete
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime
+from typing import Any
+
+from sqlalchemy import delete, func, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from src.domain.interfaces.user_repository import UserRepository as UserRepo
+from src.infrastructure.cache.principal_cache import get_principal_cache
+from src.infrastructure.cache.user_lookup_filter import get_user_lookup_filter
+from src.infrastructure.database.models.refresh_token import RefreshToken
 from src.infrastructure.database.models.user import User
+from src.infrastructure.database.timeouts import BULK
+from src.infrastructure.monitoring.tracing import traced
+
+EXPORT_COLUMNS = (
+    User.id,
+    User.username,
+    User.email,
+    User.full_name,
+    User.role,
+    User.is_active,
+    User.created_at,
+)
+
+
+def _conflict_message(error: IntegrityError) -> str:
+    """The message AuthService uses for the unique column ``error`` names."""
+    # First line only: PostgreSQL's DETAIL line quotes the conflicting value
+    detail = str(error.orig).splitlines()[0].lower()
+    if "email" in detail:
+        return "Email already registered"
+    if "username" in detail:
+        return "Username already taken"
+    return "User already registered"
 
 
 class UserRepository(UserRepo):
     def __init__(self, session: AsyncSession):
         self.session = session
 
+    @traced()
     async def register_user(
         self,
         username: str,
@@ -28,30 +61,134 @@ class UserRepository(UserRepo):
             role=role,
         )
         self.session.add(new_user)
-        await self.session.commit()
+        try:
+            await self.session.commit()
+        except IntegrityError as error:
+            # Registered concurrently, e.g. on another replica
+            await self.session.rollback()
+            raise ValueError(_conflict_message(error)) from error
         await self.session.refresh(new_user)
+        get_user_lookup_filter().add_user(username, email)
         return new_user
 
+    @traced()
+    async def bulk_insert_users(
+        self, rows: list[dict[str, Any]]
+    ) -> list[tuple[str, str, str]]:
+        if not rows:
+            return []
+        # Multi-row INSERT ... ON CONFLICT DO NOTHING, so duplicates of any
+        # unique column are skipped without aborting the batch.
+        dialect = self.session.bind.dialect.name
+        insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+        result = await self.session.execute(
+            insert(User)
+            .values(rows)
+            .on_conflict_do_nothing()
+            .returning(User.username, User.email, User.cpf)
+            .execution_options(query_class=BULK)
+        )
+        inserted = result.all()
+        await self.session.commit()
+        lookup_filter = get_user_lookup_filter()
+        for username, email, _ in inserted:
+            lookup_filter.add_user(username, email)
+        return [tuple(row) for row in inserted]
+
+    async def stream_users(
+        self, batch_size: int = 1000, include_sessions: bool = False
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        stmt = select(*EXPORT_COLUMNS).order_by(User.id)
+        if include_sessions:
+            sessions = (
+                select(
+                    RefreshToken.user_id,
+                    func.count().label("active_sessions"),
+                )
+                # Bare column so it is an index condition on ix_refresh_tokens_user_sessions
+                .filter(RefreshToken.is_active)
+                .filter(RefreshToken.expires_at > datetime.now(UTC))
+                .group_by(RefreshToken.user_id)
+                .subquery()
+            )
+            stmt = stmt.add_columns(
+                func.coalesce(sessions.c.active_sessions, 0).label("active_sessions")
+            ).outerjoin(sessions, sessions.c.user_id == User.id)
+
+        # Server-side cursor: rows are fetched batch_size at a time
+        result = await self.session.stream(
+            stmt.execution_options(yield_per=batch_size, query_class=BULK)
+        )
+        async for partition in result.partitions():
+            yield [row._asdict() for row in partition]
+
+    @traced()
     async def get_user(self, user_id: int) -> User | None:
         result = await self.session.execute(select(User).filter(User.id == user_id))
         return result.scalar_one_or_none()
 
-    async def get_user_by_username(self, username: str) -> User | None:
+    @traced()
+    async def get_user_by_username(
+        self, username: str, use_lookup_filter: bool = False
+    ) -> User | None:
+        if use_lookup_filter and not get_user_lookup_filter().might_contain_username(
+            username
+        ):
+            return None
         result = await self.session.execute(
             select(User).filter(User.username == username)
         )
         return result.scalar_one_or_none()
 
-    async def get_user_by_email(self, email: str) -> User | None:
+    @traced()
+    async def get_user_by_email(
+        self, email: str, use_lookup_filter: bool = False
+    ) -> User | None:
+        if use_lookup_filter and not get_user_lookup_filter().might_contain_email(
+            email
+        ):
+            return None
         result = await self.session.execute(select(User).filter(User.email == email))
         return result.scalar_one_or_none()
 
+    @traced()
+    async def find_users(
+        self, username: str | None = None, email: str | None = None
+    ) -> list[User]:
+        # Case-insensitive, unlike the exact lookups used for login/signup
+        query = select(User).order_by(User.id)
+        if username is not None:
+            query = query.filter(func.lower(User.username) == username.lower())
+        if email is not None:
+            query = query.filter(func.lower(User.email) == email.lower())
+        result = await self.session.execute(query)
+        return list(result.scalars())
+
+    @traced()
     async def update_user(self, user: User) -> User:
         self.session.add(user)
         await self.session.commit()
         await self.session.refresh(user)
+        # Old values stay in the filter; that only costs a database lookup
+        get_user_lookup_filter().add_user(user.username, user.email)
+        get_principal_cache().invalidate(user.username)
         return user
 
+    @traced()
+    async def update_password_hash(self, user_id: int, password_hash: str) -> None:
+        await self.session.execute(
+            update(User).filter(User.id == user_id).values(password_hash=password_hash)
+        )
+        await self.session.commit()
+        get_principal_cache().invalidate_user_id(user_id)
+
+    @traced()
     async def delete_user(self, user_id: int) -> None:
-        await self.session.execute(delete(User).filter(User.id == user_id))
+        result = await self.session.execute(
+            delete(User).filter(User.id == user_id).returning(User.username, User.email)
+        )
+        deleted = result.all()
         await self.session.commit()
+        # Deleted users stay in the lookup filter until its next rebuild
+        for username, _ in deleted:
+            get_principal_cache().invalidate(username)
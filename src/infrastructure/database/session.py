@@ -1,38 +1,91 @@
 from collections.abc import AsyncGenerator
+from typing import Any
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.pool import NullPool
 
 from src.config import settings
-
-# Create async engine with connection pooling
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    pool_size=20,
-    max_overflow=0,
-    pool_pre_ping=True,
-    pool_recycle=300,
-    poolclass=NullPool if settings.DATABASE_URL.startswith("sqlite") else None,
+from src.infrastructure.database.circuit_breaker import install_circuit_breaker_hooks
+from src.infrastructure.database.pool import TimedAsyncQueuePool
+from src.infrastructure.database.query_stats import install_query_hooks
+from src.infrastructure.database.slow_queries import get_slow_query_sampler
+from src.infrastructure.database.timeouts import (
+    connect_args,
+    install_statement_timeout_hooks,
 )
+from src.infrastructure.monitoring.flight_recorder import install_flight_recorder_hooks
 
-# Create async session factory
-AsyncSessionLocal = async_sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autocommit=False,
-    autoflush=False,
-)
+# Engine and session factory are created on first use (normally from the
+# application lifespan) so that importing this module has no side effects.
+_engine: AsyncEngine | None = None
+_session_factory: async_sessionmaker[AsyncSession] | None = None
 
 # Create declarative base
 Base = declarative_base()
 
 
+def get_engine() -> AsyncEngine:
+    """Return the process-wide async engine, creating it on first use."""
+    global _engine
+    if _engine is None:
+        _engine = create_async_engine(
+            settings.DATABASE_URL,
+            echo=settings.DEBUG,
+            pool_size=20,
+            max_overflow=0,
+            pool_pre_ping=True,
+            pool_recycle=300,
+            connect_args=connect_args(settings.DATABASE_URL),
+            poolclass=(
+                NullPool
+                if settings.DATABASE_URL.startswith("sqlite")
+                else TimedAsyncQueuePool
+            ),
+        )
+        install_circuit_breaker_hooks(_engine)
+        install_statement_timeout_hooks(_engine)
+        if settings.QUERY_ACCOUNTING_ENABLED:
+            install_query_hooks(_engine)
+        if settings.FLIGHT_RECORDER_ENABLED:
+            install_flight_recorder_hooks(_engine)
+        if settings.SLOW_QUERY_SAMPLER_ENABLED:
+            get_slow_query_sampler().install(_engine)
+    return _engine
+
+
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    """Return the async session factory bound to the process-wide engine."""
+    global _session_factory
+    if _session_factory is None:
+        _session_factory = async_sessionmaker(
+            get_engine(),
+            class_=AsyncSession,
+            expire_on_commit=False,
+            autocommit=False,
+            autoflush=False,
+        )
+    return _session_factory
+
+
+def __getattr__(name: str) -> Any:
+    # Keep ``engine`` and ``AsyncSessionLocal`` importable for existing callers
+    # without building them at import time.
+    if name == "engine":
+        return get_engine()
+    if name == "AsyncSessionLocal":
+        return get_session_factory()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 # Dependency to get async database session
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
-    async with AsyncSessionLocal() as session:
+    async with get_session_factory()() as session:
         try:
             yield session
             await session.commit()
@@ -49,12 +102,34 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
+async def get_snapshot_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Read-only session pinned to a single snapshot, for long-running exports.
+
+    On PostgreSQL the transaction runs at REPEATABLE READ so every chunk of a
+    streamed export sees the same data.
+    """
+    async with get_session_factory()() as session:
+        if session.bind.dialect.name == "postgresql":
+            await session.connection(
+                execution_options={
+                    "isolation_level": "REPEATABLE READ",
+                    "postgresql_readonly": True,
+                }
+            )
+        try:
+            yield session
+        finally:
+            await session.rollback()
+
+
 # Create tables function
 async def create_tables():
-    async with engine.begin() as conn:
+    async with get_engine().begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
 
 # Close engine function
 async def close_db():
-    await engine.dispose()
+    if _engine is not None:
+        await _engine.dispose()
@@ -0,0 +1,278 @@
+"""
+Slow-query sampler with automatic EXPLAIN capture.
+
+Engine event hooks time every statement. Statements slower than
+SLOW_QUERY_THRESHOLD_MS are recorded under their normalized text (literals
+and bind parameters replaced by ``?``) in a bounded buffer that evicts the
+least recently seen statement.
+
+For each slow statement the plan is captured with ``EXPLAIN (FORMAT JSON)``
+(``EXPLAIN QUERY PLAN`` on SQLite) on a separate pooled connection, in a
+background task so the request that ran the statement does not wait for
+it. At most SLOW_QUERY_EXPLAINS_PER_MINUTE plans are captured, one at a
+time, and a statement's plan is refreshed at most once per
+SLOW_QUERY_RECAPTURE_SECONDS. EXPLAIN without ANALYZE does not execute
+the statement, so this is safe for UPDATE and DELETE too.
+
+Plans that scan a table sequentially (e.g. ``refresh_tokens`` after an
+index was lost) are logged and flagged in the admin listing.
+"""
+
+import asyncio
+import contextvars
+import json
+import re
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.config import settings
+from src.infrastructure.monitoring.metrics import (
+    record_slow_query,
+    record_slow_query_explain,
+)
+from src.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+EXPLAINABLE = ("SELECT", "WITH", "UPDATE", "DELETE")
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+# ":name" but not the PostgreSQL "::type" cast
+_BIND_PARAMETER = re.compile(r"\$\d+|%\(\w+\)s|%s|(?<![:\w]):\w+")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAMETER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+
+def normalize_statement(statement: str) -> str:
+    """Statement text with literals and parameters replaced by ``?``."""
+    normalized = " ".join(statement.split())
+    normalized = _STRING_LITERAL.sub("?", normalized)
+    normalized = _BIND_PARAMETER.sub("?", normalized)
+    normalized = _NUMBER.sub("?", normalized)
+    # IN lists of different lengths are the same statement
+    return _PARAMETER_LIST.sub("(?, ...)", normalized)
+
+
+def _postgresql_seq_scans(plan: Any) -> list[str]:
+    relations: list[str] = []
+    stack = [entry["Plan"] for entry in plan] if isinstance(plan, list) else []
+    while stack:
+        node = stack.pop()
+        if node.get("Node Type") == "Seq Scan":
+            relations.append(node.get("Relation Name", "?"))
+        stack.extend(node.get("Plans", ()))
+    return relations
+
+
+def _sqlite_seq_scans(plan: list[dict[str, Any]]) -> list[str]:
+    relations = []
+    for step in plan:
+        # "SCAN refresh_tokens" (or "SCAN TABLE ..." on older SQLite)
+        words = step["detail"].split()
+        if len(words) >= 2 and words[0] == "SCAN":
+            relations.append(words[2] if words[1] == "TABLE" else words[1])
+    return relations
+
+
+@dataclass
+class SlowQuery:
+    statement: str
+    count: int = 0
+    max_ms: float = 0.0
+    last_ms: float = 0.0
+    last_seen: datetime | None = None
+    plan: Any = None
+    plan_captured_at: datetime | None = None
+    seq_scans: list[str] = field(default_factory=list)
+    # Monotonic time of the last EXPLAIN attempt, for the recapture interval
+    explained_at: float | None = field(default=None, repr=False)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "statement": self.statement,
+            "count": self.count,
+            "max_ms": round(self.max_ms, 3),
+            "last_ms": round(self.last_ms, 3),
+            "last_seen": self.last_seen,
+            "plan": self.plan,
+            "plan_captured_at": self.plan_captured_at,
+            "seq_scans": self.seq_scans,
+        }
+
+
+class SlowQuerySampler:
+    def __init__(
+        self,
+        threshold_ms: float = 200.0,
+        max_statements: int = 200,
+        explains_per_minute: int = 6,
+        recapture_seconds: float = 600.0,
+    ):
+        self.threshold_ms = threshold_ms
+        self.max_statements = max_statements
+        self.explains_per_minute = explains_per_minute
+        self.recapture_seconds = recapture_seconds
+        self._queries: OrderedDict[str, SlowQuery] = OrderedDict()
+        self._explain_times: deque[float] = deque()
+        self._explaining: asyncio.Task | None = None
+        self._engine: AsyncEngine | None = None
+
+    # Engine hooks (run in the executing task's greenlet, on the loop thread)
+
+    def _before_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        context._slow_query_started = time.perf_counter()
+
+    def _after_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        elapsed_ms = (time.perf_counter() - context._slow_query_started) * 1000
+        # The sampler's own EXPLAINs are not workload
+        if elapsed_ms >= self.threshold_ms and not statement.startswith("EXPLAIN"):
+            self.observe(statement, None if executemany else parameters, elapsed_ms)
+
+    def install(self, engine: AsyncEngine) -> None:
+        """Attach the timing hooks to ``engine`` (idempotent)."""
+        if self._engine is not None:
+            return
+        self._engine = engine
+        sync_engine = engine.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def uninstall(self) -> None:
+        if self._engine is None:
+            return
+        sync_engine = self._engine.sync_engine
+        event.remove(sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.remove(sync_engine, "after_cursor_execute", self._after_cursor_execute)
+        self._engine = None
+
+    # Recording
+
+    def observe(self, statement: str, parameters: Any, elapsed_ms: float) -> None:
+        record_slow_query()
+        key = normalize_statement(statement)
+        entry = self._queries.get(key)
+        if entry is None:
+            entry = self._queries[key] = SlowQuery(statement=key)
+            while len(self._queries) > self.max_statements:
+                self._queries.popitem(last=False)
+        else:
+            self._queries.move_to_end(key)
+        entry.count += 1
+        entry.last_ms = elapsed_ms
+        entry.max_ms = max(entry.max_ms, elapsed_ms)
+        entry.last_seen = datetime.now(UTC)
+        if self._should_explain(statement, parameters, entry):
+            self._start_explain(statement, parameters, entry)
+
+    def _should_explain(
+        self, statement: str, parameters: Any, entry: SlowQuery
+    ) -> bool:
+        if self._engine is None or parameters is None:
+            return False
+        if self._engine.dialect.name not in ("postgresql", "sqlite"):
+            return False
+        if not statement.lstrip().upper().startswith(EXPLAINABLE):
+            return False
+        if self._explaining is not None and not self._explaining.done():
+            return False
+        now = time.monotonic()
+        if (
+            entry.explained_at is not None
+            and now - entry.explained_at < self.recapture_seconds
+        ):
+            return False
+        while self._explain_times and now - self._explain_times[0] >= 60:
+            self._explain_times.popleft()
+        return len(self._explain_times) < self.explains_per_minute
+
+    def _start_explain(self, statement: str, parameters: Any, entry: SlowQuery) -> None:
+        now = time.monotonic()
+        entry.explained_at = now
+        self._explain_times.append(now)
+        # A fresh context, so the EXPLAIN is not accounted to the current request
+        self._explaining = asyncio.get_running_loop().create_task(
+            self._explain(statement, parameters, entry),
+            context=contextvars.Context(),
+        )
+
+    async def _explain(self, statement: str, parameters: Any, entry: SlowQuery) -> None:
+        try:
+            async with self._engine.connect() as conn:
+                if self._engine.dialect.name == "postgresql":
+                    result = await conn.exec_driver_sql(
+                        f"EXPLAIN (FORMAT JSON) {statement}", parameters
+                    )
+                    plan = result.scalar_one()
+                    if isinstance(plan, str):
+                        plan = json.loads(plan)
+                    seq_scans = _postgresql_seq_scans(plan)
+                else:
+                    result = await conn.exec_driver_sql(
+                        f"EXPLAIN QUERY PLAN {statement}", parameters
+                    )
+                    plan = [
+                        {"id": row[0], "parent": row[1], "detail": row[3]}
+                        for row in result
+                    ]
+                    seq_scans = _sqlite_seq_scans(plan)
+        except Exception:
+            logger.warning("Could not EXPLAIN slow query: %s", entry.statement)
+            record_slow_query_explain("failed")
+            return
+        record_slow_query_explain("captured")
+        entry.plan = plan
+        entry.plan_captured_at = datetime.now(UTC)
+        entry.seq_scans = seq_scans
+        if seq_scans:
+            logger.warning(
+                "Slow query (%.0f ms) scans %s sequentially: %s",
+                entry.max_ms,
+                ", ".join(seq_scans),
+                entry.statement,
+            )
+
+    async def wait_idle(self) -> None:
+        """Wait for the EXPLAIN in progress, if any."""
+        if self._explaining is not None:
+            await asyncio.gather(self._explaining, return_exceptions=True)
+
+    async def stop(self) -> None:
+        if self._explaining is not None:
+            self._explaining.cancel()
+            await self.wait_idle()
+            self._explaining = None
+
+    def queries(self, seq_scans_only: bool = False) -> list[SlowQuery]:
+        """Recorded statements, most recently seen first."""
+        entries = reversed(self._queries.values())
+        return [entry for entry in entries if entry.seq_scans or not seq_scans_only]
+
+    def reset(self) -> None:
+        self._queries.clear()
+        self._explain_times.clear()
+        self._explaining = None
+
+
+_slow_query_sampler: SlowQuerySampler | None = None
+
+
+def get_slow_query_sampler() -> SlowQuerySampler:
+    global _slow_query_sampler
+    if _slow_query_sampler is None:
+        _slow_query_sampler = SlowQuerySampler(
+            threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+            max_statements=settings.SLOW_QUERY_MAX_STATEMENTS,
+            explains_per_minute=settings.SLOW_QUERY_EXPLAINS_PER_MINUTE,
+            recapture_seconds=settings.SLOW_QUERY_RECAPTURE_SECONDS,
+        )
+    return _slow_query_sampler
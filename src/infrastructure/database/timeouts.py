@@ -0,0 +1,259 @@
+"""
+Statement timeouts per query class and request deadlines.
+
+Statements are sorted into three classes, each with its own PostgreSQL
+``statement_timeout``:
+
+- ``lookup``: everything by default (point reads and writes on the login,
+  refresh and /me paths). Set for the whole connection when it is opened.
+- ``aggregate``: admin counts and listings.
+- ``bulk``: import, export and maintenance scans.
+
+Callers pick a class with the ``query_class`` execution option, on the
+statement or the connection. When a statement's class needs a different
+timeout than the one in force, ``SET LOCAL statement_timeout`` is issued
+before it, so the value lasts until the end of the transaction and pooled
+connections go back with the lookup timeout.
+
+Each HTTP request also gets a deadline (REQUEST_DEADLINE_MS, per route in
+REQUEST_DEADLINES). Statement timeouts and pool checkout waits are cut to
+what is left of it, and once it has passed no further database call is
+started. A request that ran out of time fails with DeadlineExceededError.
+Like DatabaseTimeoutError, it is a DatabaseUnavailableError, so callers that
+can answer from stale data still do and everything else gets a 503.
+"""
+
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.config import settings
+from src.infrastructure.database.circuit_breaker import DatabaseUnavailableError
+from src.infrastructure.monitoring.metrics import (
+    record_db_cancellation,
+    record_deadline_exceeded,
+    record_statement_timeout,
+)
+from src.infrastructure.monitoring.route_label import route_template
+
+LOOKUP = "lookup"
+AGGREGATE = "aggregate"
+BULK = "bulk"
+
+# SQLSTATE query_canceled, raised when statement_timeout fires
+QUERY_CANCELED = "57014"
+
+# conn.info key: (timeout in ms, whether it came from the deadline), or None
+# when unknown (a savepoint that may have changed it was rolled back)
+_APPLIED = "statement_timeout"
+
+
+class DatabaseTimeoutError(DatabaseUnavailableError):
+    pass
+
+
+class DeadlineExceededError(DatabaseTimeoutError):
+    pass
+
+
+def statement_timeout_ms(query_class: str) -> int:
+    """Configured statement timeout of ``query_class``; 0 means none."""
+    if query_class == AGGREGATE:
+        return settings.STATEMENT_TIMEOUT_AGGREGATE_MS
+    if query_class == BULK:
+        return settings.STATEMENT_TIMEOUT_BULK_MS
+    return settings.STATEMENT_TIMEOUT_LOOKUP_MS
+
+
+def effective_timeout_ms(
+    query_class: str, remaining: float | None = None
+) -> tuple[int, bool]:
+    """
+    Timeout for a statement of ``query_class`` with ``remaining`` seconds of
+    deadline, and whether the deadline is what limits it.
+    """
+    timeout = statement_timeout_ms(query_class)
+    if remaining is None:
+        return timeout, False
+    remaining_ms = max(1, int(remaining * 1000))
+    if timeout <= 0 or remaining_ms < timeout:
+        return remaining_ms, True
+    return timeout, False
+
+
+class Deadline:
+    def __init__(
+        self,
+        budget_ms: float | None = None,
+        scope: Scope | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._clock = clock
+        self.started = clock()
+        self._budget_ms = budget_ms
+        self._scope = scope
+
+    @property
+    def budget_ms(self) -> float:
+        if self._budget_ms is None:
+            # The route is only known once the router has matched it
+            route = route_template(self._scope) if self._scope else None
+            if route is None:
+                return settings.REQUEST_DEADLINE_MS
+            self._budget_ms = settings.REQUEST_DEADLINES.get(
+                route, settings.REQUEST_DEADLINE_MS
+            )
+        return self._budget_ms
+
+    def remaining(self) -> float | None:
+        """Seconds left (negative once passed), or None without a budget."""
+        budget_ms = self.budget_ms
+        if budget_ms <= 0:
+            return None
+        return budget_ms / 1000 - (self._clock() - self.started)
+
+
+_deadline: ContextVar[Deadline | None] = ContextVar("request_deadline", default=None)
+
+
+def remaining_seconds() -> float | None:
+    """Seconds left of the current deadline, or None without one."""
+    current = _deadline.get()
+    return None if current is None else current.remaining()
+
+
+@contextmanager
+def deadline(budget_ms: float) -> Iterator[Deadline]:
+    """Run database calls in this block under a deadline of ``budget_ms``."""
+    current = Deadline(budget_ms)
+    token = _deadline.set(current)
+    try:
+        yield current
+    finally:
+        _deadline.reset(token)
+
+
+class DeadlineMiddleware:
+    """Start each HTTP request's deadline when it arrives."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _deadline.set(Deadline(scope=scope))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _deadline.reset(token)
+
+
+def connect_args(url: str) -> dict[str, Any]:
+    """Driver arguments that set the lookup timeout on new connections."""
+    if make_url(url).drivername != "postgresql+asyncpg":
+        return {}
+    return {
+        "server_settings": {
+            "statement_timeout": str(settings.STATEMENT_TIMEOUT_LOOKUP_MS)
+        }
+    }
+
+
+def _query_class(context) -> str:
+    if context is None:
+        return LOOKUP
+    return context.execution_options.get("query_class", LOOKUP)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    remaining = remaining_seconds()
+    if remaining is not None and remaining <= 0:
+        record_deadline_exceeded("statement")
+        raise DeadlineExceededError("Request deadline exceeded")
+    if conn.dialect.name != "postgresql":
+        return
+
+    timeout, from_deadline = effective_timeout_ms(_query_class(context), remaining)
+    applied = conn.info.get(_APPLIED, (settings.STATEMENT_TIMEOUT_LOOKUP_MS, False))
+    if applied is not None:
+        current = applied[0]
+        # The deadline only shrinks, so a timeout under it still fits
+        if current == timeout or (from_deadline and 0 < current <= timeout):
+            return
+    # A separate cursor: ``cursor`` may be a server-side one for streaming
+    raw = conn.connection.cursor()
+    try:
+        raw.execute(f"SET LOCAL statement_timeout = {int(timeout)}")
+    finally:
+        raw.close()
+    conn.info[_APPLIED] = (timeout, from_deadline)
+
+
+def _end_transaction(conn) -> None:
+    # SET LOCAL ends with the transaction
+    conn.info.pop(_APPLIED, None)
+
+
+def _rollback_savepoint(conn, name, context) -> None:
+    conn.info[_APPLIED] = None
+
+
+def _checkin(dbapi_connection, connection_record) -> None:
+    connection_record.info.pop(_APPLIED, None)
+
+
+def _sqlstate(error: BaseException) -> str | None:
+    # asyncpg errors carry ``sqlstate``; psycopg2 ones ``pgcode``
+    for candidate in (error, getattr(error, "orig", None), error.__cause__):
+        code = getattr(candidate, "sqlstate", None) or getattr(
+            candidate, "pgcode", None
+        )
+        if code:
+            return code
+    return None
+
+
+def _handle_error(context) -> BaseException | None:
+    error = context.original_exception
+    if isinstance(error, DatabaseUnavailableError):
+        return None
+    query_class = _query_class(context.execution_context)
+    if not isinstance(error, Exception):
+        # CancelledError: the caller stopped waiting; let it propagate
+        record_db_cancellation(query_class)
+        return None
+    if _sqlstate(error) != QUERY_CANCELED:
+        return None
+
+    connection = context.connection
+    applied = connection.info.get(_APPLIED) if connection is not None else None
+    if applied and applied[1]:
+        record_deadline_exceeded("statement")
+        timeout = DeadlineExceededError("Request deadline exceeded")
+    else:
+        record_statement_timeout(query_class)
+        timeout = DatabaseTimeoutError(f"Statement timeout ({query_class})")
+    timeout.__cause__ = context.sqlalchemy_exception or error
+    return timeout
+
+
+def install_statement_timeout_hooks(engine: AsyncEngine) -> None:
+    """Apply query class timeouts and deadlines on ``engine`` (idempotent)."""
+    sync_engine = engine.sync_engine
+    if event.contains(sync_engine, "handle_error", _handle_error):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "commit", _end_transaction)
+    event.listen(sync_engine, "rollback", _end_transaction)
+    event.listen(sync_engine, "rollback_savepoint", _rollback_savepoint)
+    event.listen(sync_engine, "checkin", _checkin)
+    event.listen(sync_engine, "handle_error", _handle_error)
@@ -0,0 +1,60 @@
+"""
+Connection pool warm-up.
+
+Opens WARMUP_POOL_CONNECTIONS connections at start-up and runs the hot
+statements on each of them, so the first requests after a deploy neither
+wait for connection establishment nor pay for compiling and preparing those
+statements (asyncpg keeps prepared statements per connection, SQLAlchemy
+caches the compiled SQL per process).
+"""
+
+import asyncio
+from contextlib import AsyncExitStack
+from datetime import UTC, datetime
+from uuid import UUID
+
+from sqlalchemy import Select, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from src.infrastructure.database.models.user import User
+from src.infrastructure.database.repositories.refresh_token_repository import (
+    select_by_jti,
+)
+
+
+def hot_statements() -> list[Select]:
+    """Queries on the login, refresh and authenticated request paths."""
+    return [
+        select(User).where(User.username == ""),
+        select(User).where(User.id == 0),
+        # Built like the repository's, partition-pruning hint included
+        select_by_jti(UUID(int=0), datetime.now(UTC)),
+    ]
+
+
+async def _prepare(conn: AsyncConnection) -> None:
+    await conn.execute(text("SELECT 1"))
+    for statement in hot_statements():
+        await conn.execute(statement)
+    await conn.rollback()
+
+
+async def warm_pool(engine: AsyncEngine, connections: int) -> int:
+    """Open up to ``connections`` pooled connections and prepare statements on each.
+
+    Returns the number of connections warmed. All of them are held at once so
+    the pool has to create distinct connections, then they are returned to
+    the pool.
+    """
+    pool = engine.sync_engine.pool
+    if hasattr(pool, "size"):
+        connections = min(connections, pool.size())
+    else:
+        # Unpooled (e.g. SQLite): nothing to keep, only compile the statements
+        connections = 1
+    async with AsyncExitStack() as stack:
+        opened = await asyncio.gather(
+            *(stack.enter_async_context(engine.connect()) for _ in range(connections))
+        )
+        await asyncio.gather(*(_prepare(conn) for conn in opened))
+    return len(opened)
@@ -0,0 +1,97 @@
+"""
+Cached Prometheus exposition for /metrics.
+
+Rendering walks every series in the registry, which costs more as the
+service grows routes and labels. The rendered text is kept for
+METRICS_CACHE_TTL_SECONDS and shared by all scrapes in that window (e.g. an
+HA pair of Prometheus servers), and concurrent scrapes of an expired cache
+wait for a single render instead of each rendering their own.
+
+Rendering and compression run in a worker thread so a scrape does not hold
+the event loop while requests are waiting. Scrapers that send
+``Accept-Encoding: gzip`` get the compressed body, compressed once per
+render.
+"""
+
+import asyncio
+import gzip
+import time
+from collections.abc import Callable
+
+from prometheus_client import REGISTRY, CollectorRegistry, generate_latest
+
+from src.config import settings
+from src.infrastructure.monitoring.metrics import record_metrics_render
+
+# Exposition text compresses well even at the fastest level
+GZIP_LEVEL = 1
+
+
+class MetricsExposition:
+    def __init__(
+        self,
+        registry: CollectorRegistry = REGISTRY,
+        ttl_seconds: float = 2.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.registry = registry
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = asyncio.Lock()
+        self._body: bytes | None = None
+        self._gzipped: bytes | None = None
+        self._rendered_at = float("-inf")
+
+    def _render(self) -> bytes:
+        started = time.perf_counter()
+        body = generate_latest(self.registry)
+        record_metrics_render(time.perf_counter() - started)
+        return body
+
+    async def render(self, gzipped: bool = False) -> bytes:
+        """The exposition text, re-rendered once the cached one is too old."""
+        async with self._lock:
+            if (
+                self._body is None
+                or self._clock() - self._rendered_at >= self.ttl_seconds
+            ):
+                self._body = await asyncio.to_thread(self._render)
+                self._rendered_at = self._clock()
+                self._gzipped = None
+            if not gzipped:
+                return self._body
+            if self._gzipped is None:
+                self._gzipped = await asyncio.to_thread(
+                    gzip.compress, self._body, GZIP_LEVEL
+                )
+            return self._gzipped
+
+    def reset(self) -> None:
+        self._body = None
+        self._gzipped = None
+        self._rendered_at = float("-inf")
+
+
+_metrics_exposition: MetricsExposition | None = None
+
+
+def get_metrics_exposition() -> MetricsExposition:
+    global _metrics_exposition
+    if _metrics_exposition is None:
+        _metrics_exposition = MetricsExposition(
+            ttl_seconds=settings.METRICS_CACHE_TTL_SECONDS
+        )
+    return _metrics_exposition
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """Whether an Accept-Encoding header allows gzip (and does not refuse it)."""
+    for coding in accept_encoding.split(","):
+        name, _, params = coding.partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            quality = params.strip().removeprefix("q=")
+            try:
+                return not params or float(quality) > 0
+            except ValueError:
+                return False
+    return False
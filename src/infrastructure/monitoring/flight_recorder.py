@@ -0,0 +1,276 @@
+"""
+Slow-request flight recorder.
+
+Every HTTP request gets a RequestRecord in a context variable. Code on the
+request path charges time to named stages (``jwt``, ``lookup``,
+``hash_verify``, ``pool_wait``...), the engine hooks append each statement
+with its duration, and when the request finishes over its route's budget
+(FLIGHT_RECORDER_BUDGETS, else FLIGHT_RECORDER_BUDGET_MS) the record is kept
+in a ring buffer of the last FLIGHT_RECORDER_SIZE slow requests.
+
+Records hold the route template and sanitized path and query parameters,
+never bodies, headers or bind parameters. They can be listed from the admin
+API or written to FLIGHT_RECORDER_DUMP_DIR by sending the process SIGUSR1.
+
+This module does not import the metrics or other monitoring modules, so
+anything (metrics, pools, services) can record stages without import cycles.
+"""
+
+import json
+import os
+import re
+import signal
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qsl
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.config import settings
+from src.infrastructure.monitoring.route_label import route_template
+from src.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+REDACTED = "[redacted]"
+UNMATCHED = "unmatched"
+MAX_PARAMS = 20
+MAX_VALUE_LENGTH = 64
+MAX_STATEMENT_LENGTH = 200
+
+_SENSITIVE = re.compile(r"pass|secret|token|auth|key|cpf|email|session", re.IGNORECASE)
+
+_current: ContextVar["RequestRecord | None"] = ContextVar("flight_record", default=None)
+
+
+def sanitize_params(params: Any) -> dict[str, str]:
+    """Parameters safe to keep: sensitive names redacted, values truncated."""
+    sanitized: dict[str, str] = {}
+    for name, value in list(params.items())[:MAX_PARAMS]:
+        if _SENSITIVE.search(name):
+            sanitized[name] = REDACTED
+        else:
+            sanitized[name] = str(value)[:MAX_VALUE_LENGTH]
+    return sanitized
+
+
+@dataclass
+class RequestRecord:
+    method: str
+    path_template: str = UNMATCHED
+    path_params: dict[str, str] = field(default_factory=dict)
+    query_params: dict[str, str] = field(default_factory=dict)
+    started_at: datetime = field(default_factory=lambda: datetime.now(UTC))
+    started: float = field(default_factory=time.perf_counter)
+    status_code: int | None = None
+    duration_ms: float = 0.0
+    first_byte_ms: float | None = None
+    budget_ms: float = 0.0
+    loop_lag_ms: float | None = None
+    stages_ms: dict[str, float] = field(default_factory=dict)
+    queries: list[tuple[str, float]] = field(default_factory=list)
+    query_count: int = 0
+    db_ms: float = 0.0
+
+    def add_stage(self, name: str, seconds: float) -> None:
+        self.stages_ms[name] = self.stages_ms.get(name, 0.0) + seconds * 1000
+
+    def add_query(self, statement: str, seconds: float) -> None:
+        self.query_count += 1
+        self.db_ms += seconds * 1000
+        if len(self.queries) < settings.FLIGHT_RECORDER_MAX_QUERIES:
+            text = " ".join(statement.split())[:MAX_STATEMENT_LENGTH]
+            self.queries.append((text, seconds * 1000))
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "method": self.method,
+            "route": self.path_template,
+            "path_params": self.path_params,
+            "query_params": self.query_params,
+            "started_at": self.started_at.isoformat(),
+            "status_code": self.status_code,
+            "duration_ms": round(self.duration_ms, 3),
+            "first_byte_ms": (
+                None if self.first_byte_ms is None else round(self.first_byte_ms, 3)
+            ),
+            "budget_ms": self.budget_ms,
+            "loop_lag_ms": (
+                None if self.loop_lag_ms is None else round(self.loop_lag_ms, 3)
+            ),
+            "stages_ms": {
+                name: round(ms, 3) for name, ms in sorted(self.stages_ms.items())
+            },
+            "db": {
+                "query_count": self.query_count,
+                "total_ms": round(self.db_ms, 3),
+                "queries": [
+                    {"statement": statement, "ms": round(ms, 3)}
+                    for statement, ms in self.queries
+                ],
+            },
+        }
+
+
+def record_stage(name: str, seconds: float) -> None:
+    """Charge ``seconds`` to a stage of the current request, if any."""
+    record = _current.get()
+    if record is not None:
+        record.add_stage(name, seconds)
+
+
+@contextmanager
+def timed_stage(name: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - started)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._flight_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    record = _current.get()
+    if record is not None:
+        record.add_query(statement, time.perf_counter() - context._flight_started)
+
+
+def install_flight_recorder_hooks(engine: AsyncEngine) -> None:
+    """Attach the per-statement hooks to ``engine`` (idempotent)."""
+    sync_engine = engine.sync_engine
+    if event.contains(sync_engine, "after_cursor_execute", _after_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class FlightRecorder:
+    def __init__(self, size: int = 100, budget_ms: float = 500.0, budgets=None):
+        self.budget_ms = budget_ms
+        self.budgets: dict[str, float] = dict(budgets or {})
+        self._records: deque[RequestRecord] = deque(maxlen=size)
+
+    def budget_for(self, route: str) -> float:
+        return self.budgets.get(route, self.budget_ms)
+
+    def finish(self, record: RequestRecord) -> bool:
+        """Keep ``record`` if it went over its route's budget."""
+        record.budget_ms = self.budget_for(record.path_template)
+        if record.duration_ms <= record.budget_ms:
+            return False
+        self._records.append(record)
+        return True
+
+    def records(self, route: str | None = None, limit: int | None = None) -> list:
+        """Kept records, newest first."""
+        records = [
+            record
+            for record in reversed(self._records)
+            if route is None or record.path_template == route
+        ]
+        return records[:limit]
+
+    def dump(self, directory: str) -> Path:
+        """Write all kept records to a JSON file in ``directory``."""
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now(UTC).strftime("%Y%m%dT%H%M%SZ")
+        filename = path / f"flight-{os.getpid()}-{stamp}.json"
+        records = [record.to_dict() for record in self.records()]
+        filename.write_text(json.dumps(records, indent=2))
+        return filename
+
+    def reset(self) -> None:
+        self._records.clear()
+
+
+_flight_recorder: FlightRecorder | None = None
+
+
+def get_flight_recorder() -> FlightRecorder:
+    global _flight_recorder
+    if _flight_recorder is None:
+        _flight_recorder = FlightRecorder(
+            size=settings.FLIGHT_RECORDER_SIZE,
+            budget_ms=settings.FLIGHT_RECORDER_BUDGET_MS,
+            budgets=settings.FLIGHT_RECORDER_BUDGETS,
+        )
+    return _flight_recorder
+
+
+def dump_on_signal(loop, directory: str) -> bool:
+    """Dump the recorder on SIGUSR1; returns False where signals are unsupported."""
+
+    def _dump() -> None:
+        try:
+            path = get_flight_recorder().dump(directory)
+        except OSError:
+            logger.exception("Could not dump the flight recorder")
+            return
+        logger.warning("Flight recorder dumped to %s", path)
+
+    try:
+        loop.add_signal_handler(signal.SIGUSR1, _dump)
+    except (AttributeError, NotImplementedError, RuntimeError):
+        return False
+    return True
+
+
+class FlightRecorderMiddleware:
+    """Record each HTTP request and keep the ones over their latency budget."""
+
+    def __init__(self, app: ASGIApp, loop_lag: Callable[[], float] | None = None):
+        self.app = app
+        # Injected so this module does not depend on the loop monitor
+        self.loop_lag = loop_lag
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        record = RequestRecord(method=scope["method"])
+        token = _current.set(record)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                record.status_code = message["status"]
+                record.first_byte_ms = (time.perf_counter() - record.started) * 1000
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            record.duration_ms = (time.perf_counter() - record.started) * 1000
+            record.path_template = route_template(scope) or UNMATCHED
+            if self._finish(scope, record):
+                logger.info(
+                    "Slow request %s %s took %.0f ms",
+                    record.method,
+                    record.path_template,
+                    record.duration_ms,
+                )
+
+    def _finish(self, scope: Scope, record: RequestRecord) -> bool:
+        recorder = get_flight_recorder()
+        if record.duration_ms <= recorder.budget_for(record.path_template):
+            return False
+        # Only slow requests pay for sanitizing their parameters
+        record.path_params = sanitize_params(scope.get("path_params", {}))
+        query = scope.get("query_string", b"").decode("latin-1")
+        record.query_params = sanitize_params(dict(parse_qsl(query)))
+        if self.loop_lag is not None:
+            record.loop_lag_ms = self.loop_lag() * 1000
+        return recorder.finish(record)
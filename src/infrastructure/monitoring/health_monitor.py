@@ -0,0 +1,272 @@
+"""
+Background health monitor behind the health and readiness probes.
+
+Probes used to open a session and run ``SELECT 1`` each time, taking pool
+connections from real requests and timing out exactly when the pool was
+exhausted. Instead, a background task runs every check once per
+HEALTH_CHECK_INTERVAL_SECONDS and the probes only read the cached result.
+
+Each check has a staleness limit, so a wedged monitor reports unhealthy
+rather than serving an old "healthy" forever. It also has hysteresis: its
+state changes only after several consecutive results agree, so one slow
+``SELECT 1`` on a busy pod does not take it out of rotation.
+
+A failing degradable check (the database, when stale answers are enabled)
+reports the service as degraded rather than unhealthy: it stays ready,
+since the principal and revocation caches keep tokens working meanwhile.
+"""
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from src.config import settings
+from src.infrastructure.monitoring.metrics import record_database_connections
+from src.infrastructure.security.hashing_pool import get_hashing_queue_depth
+from src.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Returns (healthy, details)
+Probe = Callable[[], Awaitable[tuple[bool, dict[str, Any]]]]
+
+
+@dataclass
+class HealthCheck:
+    name: str
+    probe: Probe
+    stale_after: float
+    # Non-critical checks are reported but do not affect readiness
+    critical: bool = True
+    # Failing degrades the service instead of taking it out of rotation
+    degradable: bool = False
+
+
+@dataclass
+class CheckState:
+    healthy: bool | None = None
+    details: dict[str, Any] | None = None
+    checked_at: float | None = None  # time.monotonic()
+    timestamp: str | None = None
+    failures: int = 0
+    successes: int = 0
+
+
+async def check_database_health(db: AsyncSession) -> dict[str, Any]:
+    """Check database connectivity and basic operations."""
+    try:
+        start_time = time.time()
+        # Simple query to test database connectivity
+        result = await db.execute(text("SELECT 1"))
+        result.fetchone()
+        response_time = time.time() - start_time
+
+        return {
+            "status": "healthy",
+            "response_time_ms": round(response_time * 1000, 2),
+            "timestamp": datetime.now(UTC).isoformat(),
+        }
+    except Exception as e:
+        return {
+            "status": "unhealthy",
+            "error": str(e),
+            "timestamp": datetime.now(UTC).isoformat(),
+        }
+
+
+def database_probe(session_factory: async_sessionmaker[AsyncSession]) -> Probe:
+    async def probe() -> tuple[bool, dict[str, Any]]:
+        async with session_factory() as session:
+            result = await check_database_health(session)
+        return result["status"] == "healthy", result
+
+    return probe
+
+
+def pool_probe(engine: AsyncEngine) -> Probe:
+    async def probe() -> tuple[bool, dict[str, Any]]:
+        pool = engine.sync_engine.pool
+        if not hasattr(pool, "checkedout"):
+            return True, {"pooled": False}
+        checked_out = pool.checkedout()
+        capacity = pool.size() + max(getattr(pool, "_max_overflow", 0), 0)
+        saturation = checked_out / capacity if capacity else 0.0
+        record_database_connections(checked_out)
+        return saturation < settings.HEALTH_POOL_SATURATION_LIMIT, {
+            "checked_out": checked_out,
+            "capacity": capacity,
+            "saturation": round(saturation, 3),
+        }
+
+    return probe
+
+
+async def event_loop_probe() -> tuple[bool, dict[str, Any]]:
+    # Time for the loop to get back to us, i.e. how long ready callbacks wait
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    await asyncio.sleep(0)
+    lag_ms = (loop.time() - started) * 1000
+    return lag_ms < settings.HEALTH_LOOP_LAG_LIMIT_MS, {"lag_ms": round(lag_ms, 2)}
+
+
+async def executor_probe() -> tuple[bool, dict[str, Any]]:
+    depth = get_hashing_queue_depth()
+    return depth < settings.HEALTH_EXECUTOR_QUEUE_LIMIT, {"queue_depth": depth}
+
+
+def build_default_checks(
+    session_factory: async_sessionmaker[AsyncSession], engine: AsyncEngine
+) -> list[HealthCheck]:
+    stale_after = settings.HEALTH_STALE_AFTER_SECONDS
+    return [
+        HealthCheck(
+            "database",
+            database_probe(session_factory),
+            stale_after,
+            degradable=settings.DEGRADED_STALE_SECONDS > 0,
+        ),
+        HealthCheck("pool", pool_probe(engine), stale_after),
+        HealthCheck("event_loop", event_loop_probe, stale_after),
+        # Bulk imports fill the hashing pool on purpose; report, don't unready
+        HealthCheck("executor", executor_probe, stale_after, critical=False),
+    ]
+
+
+class HealthMonitor:
+    def __init__(
+        self,
+        checks: list[HealthCheck] | None = None,
+        interval: float = 5.0,
+        timeout: float = 2.0,
+        failure_threshold: int = 3,
+        recovery_threshold: int = 2,
+    ):
+        self.checks = checks or []
+        self.interval = interval
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.recovery_threshold = recovery_threshold
+        self._states: dict[str, CheckState] = {}
+        self._task: asyncio.Task | None = None
+
+    def _update(self, name: str, ok: bool, details: dict[str, Any]) -> None:
+        state = self._states.setdefault(name, CheckState())
+        if ok:
+            state.successes += 1
+            state.failures = 0
+            if state.healthy is None or state.successes >= self.recovery_threshold:
+                state.healthy = True
+        else:
+            state.failures += 1
+            state.successes = 0
+            if state.healthy is None or state.failures >= self.failure_threshold:
+                state.healthy = False
+        state.details = details
+        state.checked_at = time.monotonic()
+        state.timestamp = datetime.now(UTC).isoformat()
+
+    async def _run_check(self, check: HealthCheck) -> None:
+        try:
+            ok, details = await asyncio.wait_for(check.probe(), timeout=self.timeout)
+        except TimeoutError:
+            ok, details = False, {"error": f"timed out after {self.timeout}s"}
+        except Exception as e:
+            ok, details = False, {"error": str(e)}
+        self._update(check.name, ok, details)
+
+    async def run_once(self) -> None:
+        await asyncio.gather(*(self._run_check(check) for check in self.checks))
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Health monitor iteration failed")
+            await asyncio.sleep(self.interval)
+
+    def start(self, checks: list[HealthCheck] | None = None) -> None:
+        if checks is not None:
+            self.checks = checks
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def _status(self, check: HealthCheck, now: float) -> str:
+        state = self._states.get(check.name)
+        if state is None or state.checked_at is None:
+            return "unknown"
+        if now - state.checked_at > check.stale_after:
+            return "stale"
+        return "healthy" if state.healthy else "unhealthy"
+
+    def status(self, now: float | None = None) -> str:
+        """Overall status: "healthy", "degraded" or "unhealthy"."""
+        now = time.monotonic() if now is None else now
+        if not self.checks:
+            return "unhealthy"
+        overall = "healthy"
+        for check in self.checks:
+            if not check.critical:
+                continue
+            status = self._status(check, now)
+            if status == "healthy":
+                continue
+            if status == "unhealthy" and check.degradable:
+                overall = "degraded"
+            else:
+                return "unhealthy"
+        return overall
+
+    def is_ready(self, now: float | None = None) -> bool:
+        return self.status(now) != "unhealthy"
+
+    def snapshot(self, now: float | None = None) -> dict[str, dict[str, Any]]:
+        """Cached state of every check, as served by the detailed probe."""
+        now = time.monotonic() if now is None else now
+        result = {}
+        for check in self.checks:
+            state = self._states.get(check.name, CheckState())
+            result[check.name] = {
+                **(state.details or {}),
+                "status": self._status(check, now),
+                "critical": check.critical,
+                "degradable": check.degradable,
+                "age_seconds": (
+                    None
+                    if state.checked_at is None
+                    else round(now - state.checked_at, 3)
+                ),
+                "timestamp": state.timestamp,
+            }
+        return result
+
+    def reset(self) -> None:
+        self.checks = []
+        self._states.clear()
+
+
+_health_monitor: HealthMonitor | None = None
+
+
+def get_health_monitor() -> HealthMonitor:
+    global _health_monitor
+    if _health_monitor is None:
+        _health_monitor = HealthMonitor(
+            interval=settings.HEALTH_CHECK_INTERVAL_SECONDS,
+            timeout=settings.HEALTH_CHECK_TIMEOUT_SECONDS,
+            failure_threshold=settings.HEALTH_FAILURE_THRESHOLD,
+            recovery_threshold=settings.HEALTH_RECOVERY_THRESHOLD,
+        )
+    return _health_monitor
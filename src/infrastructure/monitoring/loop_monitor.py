@@ -0,0 +1,193 @@
+"""
+Event-loop lag monitor and blocking-call watchdog.
+
+A heartbeat task sleeps for LOOP_MONITOR_INTERVAL_MS and records how late
+it wakes up; that delay is the time every other ready callback waited too,
+exported as the ``event_loop_lag_seconds`` histogram.
+
+A watchdog thread checks the heartbeat. When it has not run for
+LOOP_BLOCK_THRESHOLD_MS beyond its interval, some callback is blocking the
+loop (a bcrypt call, a large JSON encode, a synchronous log write...), so
+the watchdog captures the loop thread's stack while it is still blocked and
+logs it, at most once per LOOP_BLOCK_LOG_INTERVAL_SECONDS.
+
+With LOOP_BLOCK_ATTRIBUTE_ROUTES, a middleware remembers which route each
+request task serves, and the blocked time is charged to the route of the
+task that was running. It costs a dict update per request, so it is a
+debug setting.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+import traceback
+import weakref
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.config import settings
+from src.infrastructure.monitoring.metrics import (
+    record_event_loop_block,
+    record_event_loop_lag,
+)
+from src.infrastructure.monitoring.route_label import route_template
+from src.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+UNATTRIBUTED = "unattributed"
+
+
+class LoopMonitor:
+    def __init__(
+        self,
+        interval_ms: float = 100.0,
+        threshold_ms: float = 200.0,
+        log_interval_seconds: float = 60.0,
+        attribute_routes: bool = False,
+    ):
+        self.interval = interval_ms / 1000
+        self.threshold = threshold_ms / 1000
+        self.log_interval_seconds = log_interval_seconds
+        self.attribute_routes = attribute_routes
+        self.last_lag = 0.0
+        self.blocks = 0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        self._last_beat = time.monotonic()
+        self._heartbeat: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stop = threading.Event()
+        # Set by the watchdog while the loop is blocked, consumed by the heartbeat
+        self._blocked_route: str | None = None
+        self._last_log = float("-inf")
+        self._suppressed = 0
+        self._task_scopes: weakref.WeakKeyDictionary[
+            asyncio.Task, Scope
+        ] = weakref.WeakKeyDictionary()
+
+    # Route attribution
+
+    def track(self, task: asyncio.Task, scope: Scope) -> None:
+        self._task_scopes[task] = scope
+
+    def untrack(self, task: asyncio.Task) -> None:
+        self._task_scopes.pop(task, None)
+
+    def _current_route(self) -> str:
+        if not self.attribute_routes or self._loop is None:
+            return UNATTRIBUTED
+        # Reading the loop's current task from another thread is a dict lookup
+        task = asyncio.current_task(self._loop)
+        scope = self._task_scopes.get(task) if task is not None else None
+        return UNATTRIBUTED if scope is None else route_template(scope) or UNATTRIBUTED
+
+    # Heartbeat (event loop side)
+
+    def _beat(self, lag: float) -> None:
+        self.last_lag = lag
+        self._last_beat = time.monotonic()
+        record_event_loop_lag(lag)
+        route, self._blocked_route = self._blocked_route, None
+        if route is not None:
+            record_event_loop_block(route, lag)
+
+    async def _run_heartbeat(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self._beat(max(loop.time() - started - self.interval, 0.0))
+
+    # Watchdog (separate thread)
+
+    def _check(self, now: float) -> None:
+        overdue = now - self._last_beat - self.interval
+        if overdue < self.threshold or self._blocked_route is not None:
+            return
+        # First detection of this blocking episode
+        self.blocks += 1
+        self._blocked_route = route = self._current_route()
+        if now - self._last_log < self.log_interval_seconds:
+            self._suppressed += 1
+            return
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = "".join(traceback.format_stack(frame)) if frame else ""
+        logger.warning(
+            "Event loop blocked for %.0f ms (route: %s, %d similar warnings "
+            "suppressed)\n%s",
+            overdue * 1000,
+            route,
+            self._suppressed,
+            stack,
+        )
+        self._last_log = now
+        self._suppressed = 0
+
+    def _run_watchdog(self) -> None:
+        while not self._stop.wait(self.threshold / 2):
+            self._check(time.monotonic())
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._heartbeat = asyncio.create_task(self._run_heartbeat())
+        self._watchdog = threading.Thread(
+            target=self._run_watchdog, name="loop-watchdog", daemon=True
+        )
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            await asyncio.gather(self._heartbeat, return_exceptions=True)
+            self._heartbeat = None
+        if self._watchdog is not None:
+            self._watchdog.join()
+            self._watchdog = None
+
+    def reset(self) -> None:
+        self.last_lag = 0.0
+        self.blocks = 0
+        self._blocked_route = None
+        self._last_log = float("-inf")
+        self._suppressed = 0
+        self._task_scopes.clear()
+
+
+_loop_monitor: LoopMonitor | None = None
+
+
+def get_loop_monitor() -> LoopMonitor:
+    global _loop_monitor
+    if _loop_monitor is None:
+        _loop_monitor = LoopMonitor(
+            interval_ms=settings.LOOP_MONITOR_INTERVAL_MS,
+            threshold_ms=settings.LOOP_BLOCK_THRESHOLD_MS,
+            log_interval_seconds=settings.LOOP_BLOCK_LOG_INTERVAL_SECONDS,
+            attribute_routes=settings.LOOP_BLOCK_ATTRIBUTE_ROUTES,
+        )
+    return _loop_monitor
+
+
+class RouteAttributionMiddleware:
+    """Remember the request scope of each task, for blocking attribution."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        task = asyncio.current_task()
+        if scope["type"] != "http" or task is None:
+            await self.app(scope, receive, send)
+            return
+        monitor = get_loop_monitor()
+        monitor.track(task, scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            monitor.untrack(task)
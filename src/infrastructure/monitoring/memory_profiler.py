@@ -0,0 +1,307 @@
+"""
+tracemalloc snapshots for finding memory growth.
+
+Tracing is off by default (it slows allocations down and takes memory of
+its own); it is started on demand from the admin endpoints, or at start-up
+with MEMORY_TRACE_ON_START. Snapshots are kept in memory, at most
+MEMORY_MAX_SNAPSHOTS, and can be listed by top allocation sites or diffed.
+
+Sites are grouped by module: the full dotted name for this service's code
+under ``src/`` and the top-level package for everything else, so the
+SQLAlchemy identity map, pydantic, the instrumentator and logging show up
+as separate lines.
+
+The RSS watchdog dumps a snapshot to MEMORY_DUMP_DIR when the resident set
+size goes over MEMORY_RSS_DUMP_THRESHOLD_MB, for offline analysis with
+``tracemalloc.Snapshot.load``. If tracing was off it is started instead,
+the dump is written on a later check if the RSS is still over, and tracing
+is stopped again after it. Tracing that was already on (started at
+start-up or from the admin endpoints) is left running.
+"""
+
+import asyncio
+import os
+import sys
+import sysconfig
+import time
+import tracemalloc
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Literal
+
+from src.config import settings
+from src.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+GroupBy = Literal["module", "filename", "lineno"]
+
+_SRC_ROOT = str(Path(__file__).resolve().parents[2])
+_STDLIB = sysconfig.get_paths()["stdlib"]
+_IGNORED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+class TracingNotStartedError(RuntimeError):
+    pass
+
+
+class SnapshotNotFoundError(KeyError):
+    pass
+
+
+def rss_bytes() -> int:
+    """Current resident set size of this process."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # Not Linux: peak RSS is the best available without psutil
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+@lru_cache(maxsize=4096)
+def module_of(filename: str) -> str:
+    """Module label of a source file: dotted under src/, else top-level package."""
+    if filename.startswith(_SRC_ROOT + os.sep):
+        relative = os.path.relpath(filename, os.path.dirname(_SRC_ROOT))
+        return (
+            os.path.splitext(relative)[0].replace(os.sep, ".").removesuffix(".__init__")
+        )
+    if filename.startswith("<"):
+        return filename
+    for path in sorted(sys.path, key=len, reverse=True):
+        if path and filename.startswith(path + os.sep):
+            top = os.path.relpath(filename, path).split(os.sep)[0]
+            top = os.path.splitext(top)[0]
+            return f"stdlib:{top}" if path == _STDLIB else top
+    return os.path.basename(filename)
+
+
+def _line(key: str, size: int, count: int, **extra: Any) -> dict[str, Any]:
+    return {"site": key, "size_bytes": size, "count": count, **extra}
+
+
+def _grouped(statistics: list, group_by: GroupBy) -> dict[str, list[int]]:
+    # tracemalloc groups by file or line; modules are a coarser grouping on top
+    groups: dict[str, list[int]] = {}
+    for stat in statistics:
+        frame = stat.traceback[0]
+        if group_by == "module":
+            key = module_of(frame.filename)
+        elif group_by == "filename":
+            key = frame.filename
+        else:
+            key = f"{frame.filename}:{frame.lineno}"
+        totals = groups.setdefault(key, [0, 0])
+        totals[0] += stat.size
+        totals[1] += stat.count
+    return groups
+
+
+@dataclass
+class SnapshotInfo:
+    id: int
+    taken_at: datetime
+    traced_bytes: int
+    rss_bytes: int
+    snapshot: tracemalloc.Snapshot
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "taken_at": self.taken_at,
+            "traced_bytes": self.traced_bytes,
+            "rss_bytes": self.rss_bytes,
+        }
+
+
+class MemoryProfiler:
+    def __init__(self, max_snapshots: int = 5):
+        self.max_snapshots = max_snapshots
+        self._snapshots: OrderedDict[int, SnapshotInfo] = OrderedDict()
+        self._next_id = 1
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = 1) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    def stop(self, keep_snapshots: bool = False) -> None:
+        tracemalloc.stop()
+        if not keep_snapshots:
+            self._snapshots.clear()
+
+    def status(self) -> dict[str, Any]:
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "tracing": self.tracing,
+            "frames": tracemalloc.get_traceback_limit(),
+            "traced_bytes": current,
+            "traced_peak_bytes": peak,
+            "tracemalloc_overhead_bytes": tracemalloc.get_tracemalloc_memory(),
+            "rss_bytes": rss_bytes(),
+            "snapshots": [info.to_dict() for info in self._snapshots.values()],
+        }
+
+    def _take(self) -> tracemalloc.Snapshot:
+        if not tracemalloc.is_tracing():
+            raise TracingNotStartedError("tracemalloc is not tracing")
+        return tracemalloc.take_snapshot().filter_traces(_IGNORED)
+
+    def take_snapshot(self) -> SnapshotInfo:
+        """Take and keep a snapshot (CPU bound; run it off the event loop)."""
+        snapshot = self._take()
+        info = SnapshotInfo(
+            id=self._next_id,
+            taken_at=datetime.now(UTC),
+            traced_bytes=tracemalloc.get_traced_memory()[0],
+            rss_bytes=rss_bytes(),
+            snapshot=snapshot,
+        )
+        self._next_id += 1
+        self._snapshots[info.id] = info
+        while len(self._snapshots) > self.max_snapshots:
+            self._snapshots.popitem(last=False)
+        return info
+
+    def _get(self, snapshot_id: int) -> SnapshotInfo:
+        try:
+            return self._snapshots[snapshot_id]
+        except KeyError:
+            raise SnapshotNotFoundError(snapshot_id) from None
+
+    def top(
+        self, snapshot_id: int, group_by: GroupBy = "module", limit: int = 25
+    ) -> list[dict[str, Any]]:
+        """Largest allocation sites of a snapshot."""
+        info = self._get(snapshot_id)
+        key_type = "filename" if group_by == "module" else group_by
+        groups = _grouped(info.snapshot.statistics(key_type), group_by)
+        ranked = sorted(groups.items(), key=lambda item: item[1][0], reverse=True)
+        return [_line(key, size, count) for key, (size, count) in ranked[:limit]]
+
+    def diff(
+        self,
+        from_id: int,
+        to_id: int,
+        group_by: GroupBy = "module",
+        limit: int = 25,
+    ) -> list[dict[str, Any]]:
+        """Allocation sites that grew (or shrank) the most between two snapshots."""
+        key_type = "filename" if group_by == "module" else group_by
+        before = _grouped(self._get(from_id).snapshot.statistics(key_type), group_by)
+        after = _grouped(self._get(to_id).snapshot.statistics(key_type), group_by)
+        lines = []
+        for key in before.keys() | after.keys():
+            size, count = after.get(key, (0, 0))
+            old_size, old_count = before.get(key, (0, 0))
+            if size != old_size or count != old_count:
+                lines.append(
+                    _line(
+                        key,
+                        size,
+                        count,
+                        size_diff_bytes=size - old_size,
+                        count_diff=count - old_count,
+                    )
+                )
+        lines.sort(key=lambda line: abs(line["size_diff_bytes"]), reverse=True)
+        return lines[:limit]
+
+    def dump(self, directory: str) -> Path:
+        """Write a fresh snapshot to ``directory`` for offline analysis."""
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now(UTC).strftime("%Y%m%dT%H%M%SZ")
+        filename = path / f"memory-{os.getpid()}-{stamp}.tracemalloc"
+        self._take().dump(str(filename))
+        return filename
+
+    def reset(self) -> None:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._snapshots.clear()
+        self._next_id = 1
+
+
+_memory_profiler: MemoryProfiler | None = None
+
+
+def get_memory_profiler() -> MemoryProfiler:
+    global _memory_profiler
+    if _memory_profiler is None:
+        _memory_profiler = MemoryProfiler(max_snapshots=settings.MEMORY_MAX_SNAPSHOTS)
+    return _memory_profiler
+
+
+class RssWatchdog:
+    """Dump a snapshot when the RSS goes over the threshold, at most once per cooldown."""
+
+    def __init__(
+        self,
+        profiler: MemoryProfiler,
+        threshold_bytes: int,
+        dump_dir: str,
+        cooldown_seconds: float = 3600.0,
+        frames: int = 1,
+    ):
+        self.profiler = profiler
+        self.threshold_bytes = threshold_bytes
+        self.dump_dir = dump_dir
+        self.cooldown_seconds = cooldown_seconds
+        self.frames = frames
+        self._last_dump: float | None = None
+        # Whether tracing is on because of this watchdog
+        self._started_tracing = False
+
+    def check(self, rss: int, now: float | None = None) -> Path | None:
+        if rss < self.threshold_bytes:
+            return None
+        now = time.monotonic() if now is None else now
+        if (
+            self._last_dump is not None
+            and now - self._last_dump < self.cooldown_seconds
+        ):
+            return None
+        if not self.profiler.tracing:
+            # Nothing traced yet; what grows from here on will be in the next dump
+            logger.warning(
+                "RSS %d MB over the dump threshold; starting tracemalloc",
+                rss // 2**20,
+            )
+            self.profiler.start(self.frames)
+            self._started_tracing = True
+            return None
+        path = self.profiler.dump(self.dump_dir)
+        self._last_dump = now
+        if self._started_tracing:
+            # Snapshots taken from the admin endpoints meanwhile stay listed
+            self.profiler.stop(keep_snapshots=True)
+            self._started_tracing = False
+        logger.warning(
+            "RSS %d MB over the dump threshold; wrote %s", rss // 2**20, path
+        )
+        return path
+
+
+async def run_rss_watchdog(watchdog: RssWatchdog, interval_seconds: float) -> None:
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await asyncio.to_thread(watchdog.check, rss_bytes())
+        except Exception:
+            logger.exception("RSS watchdog check failed")
@@ -2,9 +2,14 @@
 Prometheus metrics configuration and custom metrics.
 """
 
+import time
+
 from prometheus_client import Counter, Gauge, Histogram, Info
 from prometheus_fastapi_instrumentator import Instrumentator, metrics
 
+from src.config import settings
+from src.infrastructure.monitoring.flight_recorder import record_stage
+
 # Custom metrics
 AUTH_REQUESTS_TOTAL = Counter(
     "auth_requests_total",
@@ -24,8 +29,160 @@ DATABASE_CONNECTIONS = Gauge(
     "database_connections_active", "Number of active database connections"
 )
 
+RATE_LIMITED_REQUESTS_TOTAL = Counter(
+    "auth_rate_limited_requests_total",
+    "Number of authentication requests rejected by the rate limiter",
+    ["action", "key_type"],
+)
+
+STARTUP_DURATION = Gauge(
+    "app_startup_duration_seconds",
+    "Time spent in the lifespan start-up hook before serving requests",
+)
+
+AUDIT_EVENTS_TOTAL = Counter(
+    "auth_audit_events_total",
+    "Audit events by what happened to them (written, dropped, failed)",
+    ["result"],
+)
+
+AUDIT_QUEUE_DEPTH = Gauge(
+    "auth_audit_queue_depth", "Audit events waiting to be written"
+)
+
+AUTH_STAGE_DURATION = Histogram(
+    "auth_stage_duration_seconds",
+    "Time spent in each stage of login, refresh and logout",
+    ["operation", "stage"],
+    # Hash verification sits around PASSWORD_HASH_TARGET_MS, lookups far below
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop heartbeat woke up",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+
+EVENT_LOOP_BLOCKS_TOTAL = Counter(
+    "event_loop_blocks_total",
+    "Callbacks that blocked the event loop beyond the threshold",
+    ["route"],
+)
+
+EVENT_LOOP_BLOCKED_SECONDS = Counter(
+    "event_loop_blocked_seconds_total",
+    "Time the event loop spent blocked by such callbacks",
+    ["route"],
+)
+
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request",
+    "SQL statements issued per HTTP request",
+    ["route"],
+    buckets=(0, 1, 2, 3, 4, 5, 6, 8, 10, 15, 20, 50),
+)
+
+DB_ROWS_PER_REQUEST = Histogram(
+    "db_rows_per_request",
+    "Rows returned or affected by SQL statements per HTTP request",
+    ["route"],
+    buckets=(0, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000),
+)
+
+DB_TIME_PER_REQUEST = Histogram(
+    "db_time_per_request_seconds",
+    "Time spent executing SQL statements per HTTP request",
+    ["route"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+QUERY_BUDGET_EXCEEDED_TOTAL = Counter(
+    "db_query_budget_exceeded_total",
+    "Requests that issued more SQL statements than their route's budget",
+    ["route"],
+)
+
+SLOW_QUERIES_TOTAL = Counter(
+    "db_slow_queries_total",
+    "SQL statements slower than SLOW_QUERY_THRESHOLD_MS",
+)
+
+SLOW_QUERY_EXPLAINS_TOTAL = Counter(
+    "db_slow_query_explains_total",
+    "EXPLAIN plans captured for slow statements",
+    ["result"],
+)
+
+DB_POOL_CHECKOUT = Histogram(
+    "db_pool_checkout_seconds",
+    "Time to check a connection out of the pool (wait, connect, pre-ping)",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+)
+
+METRICS_RENDER_DURATION = Histogram(
+    "metrics_render_duration_seconds",
+    "Time to render the /metrics exposition (cache misses only)",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+
+DB_CIRCUIT_STATE = Gauge(
+    "db_circuit_breaker_state",
+    "Database circuit breaker state (0 closed, 1 half-open, 2 open)",
+)
+
+DEGRADED_RESPONSES_TOTAL = Counter(
+    "degraded_responses_total",
+    "Requests answered from stale caches while the database was unavailable",
+    ["source"],
+)
+
+DB_STATEMENT_TIMEOUTS_TOTAL = Counter(
+    "db_statement_timeouts_total",
+    "Statements cancelled by their statement_timeout, by query class",
+    ["query_class"],
+)
+
+DB_DEADLINE_EXCEEDED_TOTAL = Counter(
+    "db_deadline_exceeded_total",
+    "Database calls refused or cut short by the request deadline",
+    ["stage"],
+)
+
+DB_CANCELLATIONS_TOTAL = Counter(
+    "db_cancellations_total",
+    "Statements interrupted by task cancellation (client gone, shutdown)",
+    ["query_class"],
+)
+
+TRACING_SPANS_TOTAL = Counter(
+    "tracing_spans_total",
+    "Finished spans by export result",
+    ["result"],
+)
+
 SERVICE_INFO = Info("service_info", "Information about the authentication service")
 
+# Label values are restricted to these so cardinality stays fixed
+AUTH_ENDPOINTS = {
+    "login": "/api/v1/auth/login",
+    "refresh": "/api/v1/auth/refresh",
+    "logout": "/api/v1/auth/logout",
+}
+AUTH_STAGES = frozenset(
+    {"token_verify", "lookup", "hash_verify", "token_sign", "token_persist"}
+)
+AUTH_OUTCOMES = frozenset(
+    {
+        "success",
+        "unknown_user",
+        "bad_password",
+        "disabled",
+        "invalid_token",
+        "expired",
+    }
+)
+
 
 def setup_metrics() -> Instrumentator:
     """
@@ -35,7 +192,9 @@ def setup_metrics() -> Instrumentator:
         Configured Instrumentator instance
     """
     instrumentator = Instrumentator(
-        should_group_status_codes=False,
+        # Status classes (2xx, 4xx...) and route templates only, so the number
+        # of series does not grow with response codes or raw paths
+        should_group_status_codes=True,
         should_ignore_untemplated=True,
         should_respect_env_var=True,
         should_instrument_requests_inprogress=True,
@@ -45,20 +204,20 @@ def setup_metrics() -> Instrumentator:
         inprogress_labels=True,
     )
 
-    # Add default metrics
+    # Sizes per route only; method and status add series, not insight
     instrumentator.add(
         metrics.request_size(
             should_include_handler=True,
-            should_include_method=True,
-            should_include_status=True,
+            should_include_method=False,
+            should_include_status=False,
         )
     )
 
     instrumentator.add(
         metrics.response_size(
             should_include_handler=True,
-            should_include_method=True,
-            should_include_status=True,
+            should_include_method=False,
+            should_include_status=False,
         )
     )
 
@@ -81,9 +240,9 @@ def setup_metrics() -> Instrumentator:
     # Set service information
     SERVICE_INFO.info(
         {
-            "version": "1.0.0",
+            "version": settings.VERSION,
             "service": "authentication-microservice",
-            "environment": "development",  # This should come from config
+            "environment": settings.ENVIRONMENT,
         }
     )
 
@@ -98,3 +257,179 @@ def record_active_users(count: int) -> None:
 def record_database_connections(count: int) -> None:
     """Record the number of active database connections."""
     DATABASE_CONNECTIONS.set(count)
+
+
+def record_startup_duration(seconds: float) -> None:
+    """Record how long the application took to become ready."""
+    STARTUP_DURATION.set(seconds)
+
+
+def record_rate_limited(action: str, key_type: str) -> None:
+    """Count a request rejected by the rate limiter."""
+    RATE_LIMITED_REQUESTS_TOTAL.labels(action=action, key_type=key_type).inc()
+
+
+def record_audit_events(result: str, count: int = 1) -> None:
+    """Count audit events that were written, dropped on overflow or failed."""
+    AUDIT_EVENTS_TOTAL.labels(result=result).inc(count)
+
+
+def record_audit_queue_depth(depth: int) -> None:
+    """Record the number of audit events waiting to be written."""
+    AUDIT_QUEUE_DEPTH.set(depth)
+
+
+def record_event_loop_lag(seconds: float) -> None:
+    """Record one event loop heartbeat delay."""
+    EVENT_LOOP_LAG.observe(seconds)
+
+
+def record_event_loop_block(route: str, seconds: float) -> None:
+    """Count a blocking callback and its duration, by route if known."""
+    EVENT_LOOP_BLOCKS_TOTAL.labels(route=route).inc()
+    EVENT_LOOP_BLOCKED_SECONDS.labels(route=route).inc(seconds)
+
+
+def record_request_queries(route: str, queries: int, rows: int, seconds: float) -> None:
+    """Record the SQL statements issued while serving one request."""
+    DB_QUERIES_PER_REQUEST.labels(route=route).observe(queries)
+    DB_ROWS_PER_REQUEST.labels(route=route).observe(rows)
+    DB_TIME_PER_REQUEST.labels(route=route).observe(seconds)
+
+
+def record_query_budget_exceeded(route: str) -> None:
+    """Count a request that went over its route's query budget."""
+    QUERY_BUDGET_EXCEEDED_TOTAL.labels(route=route).inc()
+
+
+def record_slow_query() -> None:
+    """Count a statement over the slow-query threshold."""
+    SLOW_QUERIES_TOTAL.inc()
+
+
+def record_slow_query_explain(result: str) -> None:
+    """Count an EXPLAIN of a slow statement ("captured" or "failed")."""
+    SLOW_QUERY_EXPLAINS_TOTAL.labels(result=result).inc()
+
+
+def record_pool_checkout(seconds: float) -> None:
+    """Record how long a connection checkout took."""
+    DB_POOL_CHECKOUT.observe(seconds)
+
+
+def record_metrics_render(seconds: float) -> None:
+    """Record how long rendering the /metrics exposition took."""
+    METRICS_RENDER_DURATION.observe(seconds)
+
+
+CIRCUIT_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+
+def record_circuit_state(state: str) -> None:
+    """Record the database circuit breaker state."""
+    DB_CIRCUIT_STATE.set(CIRCUIT_STATES[state])
+
+
+def record_degraded_response(source: str) -> None:
+    """Count a "principal", "refresh_token" or "logout" answered without the DB."""
+    DEGRADED_RESPONSES_TOTAL.labels(source=source).inc()
+
+
+def record_statement_timeout(query_class: str) -> None:
+    """Count a statement cancelled by its query class's statement_timeout."""
+    DB_STATEMENT_TIMEOUTS_TOTAL.labels(query_class=query_class).inc()
+
+
+def record_deadline_exceeded(stage: str) -> None:
+    """Count a "pool_checkout" or "statement" that ran out of request deadline."""
+    DB_DEADLINE_EXCEEDED_TOTAL.labels(stage=stage).inc()
+
+
+def record_db_cancellation(query_class: str) -> None:
+    """Count a statement interrupted because its task was cancelled."""
+    DB_CANCELLATIONS_TOTAL.labels(query_class=query_class).inc()
+
+
+def record_spans(result: str, count: int = 1) -> None:
+    """Count spans "exported", "failed" or "dropped" (queue full)."""
+    TRACING_SPANS_TOTAL.labels(result=result).inc(count)
+
+
+class AuthMetrics:
+    """Records per-stage timings and outcomes of authentication operations."""
+
+    def observe_stage(self, operation: str, stage: str, seconds: float) -> None:
+        AUTH_STAGE_DURATION.labels(operation=operation, stage=stage).observe(seconds)
+
+    def record_outcome(self, operation: str, outcome: str, seconds: float) -> None:
+        endpoint = AUTH_ENDPOINTS.get(operation, "other")
+        if outcome not in AUTH_OUTCOMES:
+            outcome = "other"
+        AUTH_REQUESTS_TOTAL.labels(
+            method="POST", endpoint=endpoint, status=outcome
+        ).inc()
+        AUTH_RESPONSE_TIME.labels(method="POST", endpoint=endpoint).observe(seconds)
+
+
+class NoopAuthMetrics(AuthMetrics):
+    """Drop-in replacement that records nothing, for benchmarks."""
+
+    def observe_stage(self, operation: str, stage: str, seconds: float) -> None:
+        pass
+
+    def record_outcome(self, operation: str, outcome: str, seconds: float) -> None:
+        pass
+
+
+_auth_metrics: AuthMetrics | None = None
+
+
+def get_auth_metrics() -> AuthMetrics:
+    global _auth_metrics
+    if _auth_metrics is None:
+        _auth_metrics = (
+            AuthMetrics() if settings.AUTH_METRICS_ENABLED else NoopAuthMetrics()
+        )
+    return _auth_metrics
+
+
+def set_auth_metrics(auth_metrics: AuthMetrics | None) -> None:
+    """Replace the recorder; None goes back to the configured default."""
+    global _auth_metrics
+    _auth_metrics = auth_metrics
+
+
+class AuthTimer:
+    """
+    Times one authentication operation.
+
+    ``stage()`` charges the time since the previous call to a stage; stages
+    hit more than once (e.g. two lookups) are summed and observed once, in
+    ``done()``, together with the outcome.
+    """
+
+    __slots__ = ("operation", "metrics", "started", "last", "stages")
+
+    def __init__(self, operation: str, auth_metrics: AuthMetrics | None = None):
+        self.operation = operation
+        self.metrics = auth_metrics or get_auth_metrics()
+        self.started = self.last = time.perf_counter()
+        self.stages: dict[str, float] = {}
+
+    def stage(self, name: str) -> None:
+        now = time.perf_counter()
+        if name in AUTH_STAGES:
+            self.stages[name] = self.stages.get(name, 0.0) + (now - self.last)
+            record_stage(name, now - self.last)
+        self.last = now
+
+    def skip(self) -> None:
+        """Don't charge the time since the last stage to the next one."""
+        self.last = time.perf_counter()
+
+    def done(self, outcome: str) -> None:
+        for name, seconds in self.stages.items():
+            self.metrics.observe_stage(self.operation, name, seconds)
+        self.metrics.record_outcome(
+            self.operation, outcome, time.perf_counter() - self.started
+        )
@@ -0,0 +1,146 @@
+"""
+In-process sampling CPU profiler.
+
+A daemon thread wakes up every ``interval_ms`` and records the current stack
+of the profiled threads from ``sys._current_frames()``. Nothing is traced
+or instrumented, so the cost is one stack walk per thread per sample and
+the profiled code runs at normal speed.
+
+Stacks are aggregated as they are sampled, so memory is bounded by
+``max_stacks`` distinct stacks, not by the duration. Results render as
+collapsed stacks (``flamegraph.pl``, speedscope import) or speedscope JSON.
+Only one profile runs at a time per process.
+"""
+
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from types import FrameType
+from typing import Any
+
+TRUNCATED = "[truncated]"
+
+_profile_lock = threading.Lock()
+
+
+class ProfilerBusyError(RuntimeError):
+    pass
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    # Last two path components: enough to tell modules apart, no local paths
+    filename = "/".join(code.co_filename.replace("\\", "/").rsplit("/", 2)[-2:])
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+def _stack(frame: FrameType | None, max_depth: int) -> tuple[str, ...]:
+    labels = []
+    while frame is not None and len(labels) < max_depth:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()  # root first
+    return tuple(labels)
+
+
+@dataclass
+class Profile:
+    interval_ms: float
+    duration_seconds: float = 0.0
+    samples: int = 0
+    stacks: Counter = field(default_factory=Counter)
+
+    def collapsed(self) -> str:
+        """One ``frame;frame;frame count`` line per distinct stack."""
+        return "".join(
+            f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.most_common()
+        )
+
+    def speedscope(self, name: str = "auth-microservice") -> dict[str, Any]:
+        frames: list[dict[str, Any]] = []
+        index: dict[str, int] = {}
+        samples, weights = [], []
+        for stack, count in self.stacks.most_common():
+            sample = []
+            for label in stack:
+                if label not in index:
+                    index[label] = len(frames)
+                    frames.append({"name": label})
+                sample.append(index[label])
+            samples.append(sample)
+            weights.append(round(count * self.interval_ms / 1000, 6))
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": name,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": round(self.duration_seconds, 6),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+            "name": name,
+            "exporter": "auth-microservice sampling profiler",
+        }
+
+
+class SamplingProfiler:
+    def __init__(
+        self,
+        interval_ms: float = 10.0,
+        thread_ids: set[int] | None = None,
+        max_depth: int = 128,
+        max_stacks: int = 10_000,
+    ):
+        # None profiles every thread except the sampler itself
+        self.thread_ids = thread_ids
+        self.max_depth = max_depth
+        self.max_stacks = max_stacks
+        self.profile = Profile(interval_ms=interval_ms)
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._started = 0.0
+
+    def _sample(self) -> None:
+        own = threading.get_ident()
+        stacks = self.profile.stacks
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own:
+                continue
+            if self.thread_ids is not None and thread_id not in self.thread_ids:
+                continue
+            stack = _stack(frame, self.max_depth)
+            if stack not in stacks and len(stacks) >= self.max_stacks:
+                stack = (TRUNCATED,)
+            stacks[stack] += 1
+        self.profile.samples += 1
+
+    def _run(self) -> None:
+        interval = self.profile.interval_ms / 1000
+        while not self._stop.wait(interval):
+            self._sample()
+
+    def start(self) -> None:
+        if not _profile_lock.acquire(blocking=False):
+            raise ProfilerBusyError("A profile is already running")
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> Profile:
+        """Stop sampling (blocks until the sampler thread exits)."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            self.profile.duration_seconds = time.perf_counter() - self._started
+            _profile_lock.release()
+        return self.profile
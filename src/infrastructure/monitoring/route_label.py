@@ -0,0 +1,30 @@
+"""
+Route templates for metric labels.
+
+Labels use the route as declared (``/api/v1/admin/users/{user_id}``), never
+the request path, so label cardinality is bounded by the number of routes.
+"""
+
+from typing import Any
+
+from starlette.types import Scope
+
+_route_paths: dict[Any, str] = {}
+
+
+def route_template(scope: Scope) -> str | None:
+    """Path template of the route that handled ``scope``, if one matched."""
+    # The router fills in the endpoint on the shared scope once matched
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return None
+    path = _route_paths.get(endpoint)
+    if path is None:
+        for route in getattr(scope.get("app"), "routes", ()):
+            if getattr(route, "endpoint", None) is endpoint:
+                path = route.path
+                break
+        else:
+            path = getattr(endpoint, "__name__", None) or "unknown"
+        _route_paths[endpoint] = path
+    return path
@@ -0,0 +1,105 @@
+"""
+Start-up time reporting.
+
+Provides an ``-X importtime`` style breakdown of the application import and
+the time spent in the lifespan start-up hook, so regressions in cold-start
+latency can be tracked from the command line.
+"""
+
+import asyncio
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+
+from fastapi import FastAPI
+
+
+@dataclass(frozen=True)
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+@dataclass(frozen=True)
+class StartupReport:
+    import_seconds: float
+    lifespan_seconds: float
+    imports: list[ImportTiming]
+
+    @property
+    def total_seconds(self) -> float:
+        return self.import_seconds + self.lifespan_seconds
+
+
+def parse_importtime(output: str) -> list[ImportTiming]:
+    """Parse the stderr produced by ``python -X importtime``."""
+    timings = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        try:
+            self_us, cumulative_us, module = line[len("import time:") :].split("|")
+            timings.append(
+                ImportTiming(
+                    module=module.strip(),
+                    self_us=int(self_us),
+                    cumulative_us=int(cumulative_us),
+                )
+            )
+        except ValueError:
+            # Header line ("self [us] | cumulative | imported package")
+            continue
+    return timings
+
+
+def collect_import_times(module: str = "src.api.main") -> list[ImportTiming]:
+    """Import ``module`` in a fresh interpreter and return per-module timings."""
+    command = [sys.executable, "-X", "importtime", "-c", f"import {module}"]
+    result = subprocess.run(
+        command,  # noqa: S603
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+async def measure_lifespan(app: FastAPI) -> float:
+    """Run the application lifespan start-up and return its duration in seconds."""
+    start = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        elapsed = time.perf_counter() - start
+    return elapsed
+
+
+def format_startup_report(report: StartupReport, top: int = 20) -> str:
+    """Render a start-up report as a plain-text table."""
+    lines = [
+        f"Import time:   {report.import_seconds * 1000:9.1f} ms",
+        f"Lifespan time: {report.lifespan_seconds * 1000:9.1f} ms",
+        f"Ready after:   {report.total_seconds * 1000:9.1f} ms",
+        "",
+        f"Top {top} imports by cumulative time:",
+        f"{'cumulative [ms]':>16} {'self [ms]':>10}  module",
+    ]
+    slowest = sorted(report.imports, key=lambda t: t.cumulative_us, reverse=True)
+    for timing in slowest[:top]:
+        lines.append(
+            f"{timing.cumulative_us / 1000:16.1f} {timing.self_us / 1000:10.1f}  "
+            f"{timing.module}"
+        )
+    return "\n".join(lines)
+
+
+def build_startup_report(app: FastAPI, module: str = "src.api.main") -> StartupReport:
+    """Measure import and lifespan start-up time for ``app``."""
+    imports = collect_import_times(module)
+    import_us = next((t.cumulative_us for t in imports if t.module == module), 0)
+    lifespan_seconds = asyncio.run(measure_lifespan(app))
+    return StartupReport(
+        import_seconds=import_us / 1_000_000,
+        lifespan_seconds=lifespan_seconds,
+        imports=imports,
+    )
@@ -0,0 +1,437 @@
+"""
+Lightweight distributed tracing in the OpenTelemetry data model.
+
+The middleware opens a server span per HTTP request, continuing the trace
+of an incoming W3C ``traceparent`` header. ``@traced`` functions (the
+AuthService use cases, repository calls, token and password functions) open
+child spans, so a slow login breaks down into bcrypt, database and token
+signing time.
+
+Sampling is decided once per trace, at its root (head-based): the parent's
+decision is kept for remote parents, otherwise TRACING_SAMPLE_RATIO of the
+trace ids are sampled. Functions called outside a sampled trace run without
+creating any span.
+
+Finished spans are queued and exported in batches by a background task,
+like the audit writer, and dropped (and counted) when the queue is full.
+Spans are written as JSON lines to stdout or TRACING_FILE_PATH, one object
+per span with OTLP field names, so nothing outside the process is needed.
+"""
+
+import asyncio
+import functools
+import inspect
+import json
+import random
+import re
+import sys
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Protocol
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.config import settings
+from src.infrastructure.monitoring.metrics import record_spans
+from src.infrastructure.monitoring.route_label import route_template
+from src.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+_TRACEPARENT = re.compile(
+    r"^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})(?:-.*)?$"
+)
+_INVALID_TRACE_ID = "0" * 32
+_INVALID_SPAN_ID = "0" * 16
+
+
+@dataclass(frozen=True, slots=True)
+class SpanContext:
+    trace_id: str
+    span_id: str
+    sampled: bool
+
+
+def parse_traceparent(header: str) -> SpanContext | None:
+    """Parent span context of a W3C ``traceparent`` header, if valid."""
+    match = _TRACEPARENT.match(header.strip().lower())
+    if match is None:
+        return None
+    version, trace_id, span_id, flags = match.groups()
+    if version == "ff" or trace_id == _INVALID_TRACE_ID:
+        return None
+    if span_id == _INVALID_SPAN_ID:
+        return None
+    # Version 00 has no trailing fields
+    if version == "00" and len(header.strip()) != 55:
+        return None
+    return SpanContext(trace_id, span_id, sampled=bool(int(flags, 16) & 1))
+
+
+def format_traceparent(context: SpanContext) -> str:
+    return (
+        f"00-{context.trace_id}-{context.span_id}-{'01' if context.sampled else '00'}"
+    )
+
+
+def _new_trace_id() -> str:
+    return f"{random.getrandbits(128) or 1:032x}"
+
+
+def _new_span_id() -> str:
+    return f"{random.getrandbits(64) or 1:016x}"
+
+
+class Span:
+    __slots__ = (
+        "name",
+        "context",
+        "parent_span_id",
+        "kind",
+        "attributes",
+        "start_ns",
+        "end_ns",
+        "status",
+        "status_message",
+    )
+
+    recording = True
+
+    def __init__(
+        self,
+        name: str,
+        context: SpanContext,
+        parent_span_id: str | None,
+        kind: str = "internal",
+        attributes: dict[str, Any] | None = None,
+    ):
+        self.name = name
+        self.context = context
+        self.parent_span_id = parent_span_id
+        self.kind = kind
+        self.attributes = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+        self.status = "UNSET"
+        self.status_message: str | None = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, message: str) -> None:
+        self.status = "ERROR"
+        self.status_message = message
+
+    def end(self) -> None:
+        self.end_ns = time.time_ns()
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.context.trace_id,
+            "span_id": self.context.span_id,
+            "parent_span_id": self.parent_span_id,
+            "kind": self.kind,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "attributes": self.attributes,
+            "status": {"code": self.status, "message": self.status_message},
+        }
+
+
+class NonRecordingSpan:
+    """Carries the context of an unsampled trace; records nothing."""
+
+    __slots__ = ("context",)
+
+    recording = False
+
+    def __init__(self, context: SpanContext):
+        self.context = context
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_error(self, message: str) -> None:
+        pass
+
+
+_current_span: ContextVar[Span | NonRecordingSpan | None] = ContextVar(
+    "current_span", default=None
+)
+
+
+def current_span() -> Span | NonRecordingSpan | None:
+    return _current_span.get()
+
+
+class SpanExporter(Protocol):
+    def export(self, spans: list[dict[str, Any]]) -> None:
+        ...
+
+
+class ConsoleSpanExporter:
+    def export(self, spans: list[dict[str, Any]]) -> None:
+        sys.stdout.write(
+            "".join(json.dumps(span, default=str) + "\n" for span in spans)
+        )
+        sys.stdout.flush()
+
+
+class FileSpanExporter:
+    def __init__(self, path: str):
+        self.path = path
+
+    def export(self, spans: list[dict[str, Any]]) -> None:
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.writelines(json.dumps(span, default=str) + "\n" for span in spans)
+
+
+def build_exporter(kind: str, path: str) -> SpanExporter:
+    if kind == "file":
+        return FileSpanExporter(path)
+    if kind == "console":
+        return ConsoleSpanExporter()
+    raise ValueError(f"Unknown span exporter: {kind}")
+
+
+class BatchSpanProcessor:
+    def __init__(
+        self,
+        exporter: SpanExporter,
+        resource: dict[str, Any] | None = None,
+        max_queue: int = 4096,
+        batch_size: int = 256,
+        interval_ms: int = 2000,
+    ):
+        self.exporter = exporter
+        self.resource = dict(resource or {})
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.interval_ms = interval_ms
+        self._queue: deque[Span] = deque()
+        self._task: asyncio.Task | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._stopping = False
+
+    def on_end(self, span: Span) -> None:
+        # May run in a worker thread (hashing); deque appends are thread-safe
+        if len(self._queue) >= self.max_queue:
+            record_spans("dropped")
+            return
+        self._queue.append(span)
+        if len(self._queue) == self.batch_size and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def flush(self) -> int:
+        exported = 0
+        while self._queue:
+            batch = [
+                self._queue.popleft()
+                for _ in range(min(self.batch_size, len(self._queue)))
+            ]
+            spans = [dict(span.to_dict(), resource=self.resource) for span in batch]
+            try:
+                await asyncio.to_thread(self.exporter.export, spans)
+            except Exception:
+                logger.exception("Failed to export %d spans", len(spans))
+                record_spans("failed", len(spans))
+                break
+            exported += len(spans)
+            record_spans("exported", len(spans))
+        return exported
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout=self.interval_ms / 1000
+                )
+            except TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background exporter and export what is still queued."""
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self._wakeup = None
+        await self.flush()
+
+
+class Tracer:
+    def __init__(
+        self,
+        processor: BatchSpanProcessor | None = None,
+        sample_ratio: float = 1.0,
+    ):
+        self.processor = processor
+        self.sample_ratio = sample_ratio
+        self.enabled = processor is not None
+
+    def should_sample(self, trace_id: str) -> bool:
+        # Same rule as OpenTelemetry's TraceIdRatioBased: lower 64 bits of the id
+        return int(trace_id[16:], 16) < self.sample_ratio * 2**64
+
+    @contextmanager
+    def start_span(
+        self,
+        name: str,
+        kind: str = "internal",
+        parent: SpanContext | None = None,
+        attributes: dict[str, Any] | None = None,
+    ) -> Iterator[Span | NonRecordingSpan]:
+        """Open a span as a child of ``parent``, else of the current span."""
+        if parent is None:
+            current = _current_span.get()
+            parent = current.context if current is not None else None
+        if parent is None:
+            trace_id = _new_trace_id()
+            sampled = self.should_sample(trace_id)
+        else:
+            trace_id, sampled = parent.trace_id, parent.sampled
+        context = SpanContext(trace_id, _new_span_id(), sampled)
+        if sampled and self.enabled:
+            span: Span | NonRecordingSpan = Span(
+                name,
+                context,
+                parent.span_id if parent is not None else None,
+                kind,
+                attributes,
+            )
+        else:
+            span = NonRecordingSpan(context)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.set_error(f"{type(exc).__name__}: {exc}")
+            raise
+        finally:
+            _current_span.reset(token)
+            if span.recording:
+                span.end()
+                self.processor.on_end(span)
+
+    def start(self) -> None:
+        if self.processor is not None:
+            self.processor.start()
+
+    async def stop(self) -> None:
+        if self.processor is not None:
+            await self.processor.stop()
+
+
+_tracer: Tracer | None = None
+
+
+def get_tracer() -> Tracer:
+    global _tracer
+    if _tracer is None:
+        processor = None
+        if settings.TRACING_ENABLED:
+            processor = BatchSpanProcessor(
+                build_exporter(settings.TRACING_EXPORTER, settings.TRACING_FILE_PATH),
+                resource={
+                    "service.name": settings.TRACING_SERVICE_NAME,
+                    "service.version": settings.VERSION,
+                    "deployment.environment": settings.ENVIRONMENT,
+                },
+                max_queue=settings.TRACING_MAX_QUEUE,
+                batch_size=settings.TRACING_BATCH_SIZE,
+                interval_ms=settings.TRACING_EXPORT_INTERVAL_MS,
+            )
+        _tracer = Tracer(processor, sample_ratio=settings.TRACING_SAMPLE_RATIO)
+    return _tracer
+
+
+def set_tracer(tracer: Tracer | None) -> None:
+    """Replace the process tracer (``None`` rebuilds it from settings)."""
+    global _tracer
+    _tracer = tracer
+
+
+def traced(name: str | None = None) -> Callable:
+    """Run the function in a child span of the current sampled trace."""
+
+    def decorate(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                current = _current_span.get()
+                if current is None or not current.recording:
+                    return await func(*args, **kwargs)
+                with get_tracer().start_span(span_name):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            current = _current_span.get()
+            if current is None or not current.recording:
+                return func(*args, **kwargs)
+            with get_tracer().start_span(span_name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+class TracingMiddleware:
+    """Open a server span per HTTP request, continuing an incoming trace."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        tracer = get_tracer()
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+        parent = None
+        for key, value in scope["headers"]:
+            if key == b"traceparent":
+                parent = parse_traceparent(value.decode("latin-1"))
+                break
+        method = scope["method"]
+        with tracer.start_span(
+            method,
+            kind="server",
+            parent=parent,
+            attributes={"http.request.method": method, "url.path": scope["path"]},
+        ) as span:
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.response.status_code", message["status"])
+                    if message["status"] >= 500:
+                        span.set_error(f"HTTP {message['status']}")
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = route_template(scope)
+                if route is not None and span.recording:
+                    span.name = f"{method} {route}"
+                    span.set_attribute("http.route", route)
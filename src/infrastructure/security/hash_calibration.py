@@ -0,0 +1,120 @@
+"""
+Password hash cost calibration.
+
+Measures hashing latency on the current host and picks the strongest cost
+parameters whose p99 stays within the configured latency budget.
+"""
+
+import statistics
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+CALIBRATION_SECRET = "calibration-password-0123456789"  # noqa: S105
+
+ENV_NAMES = {
+    "rounds": "BCRYPT_ROUNDS",
+    "time_cost": "ARGON2_TIME_COST",
+    "memory_cost": "ARGON2_MEMORY_COST",
+    "parallelism": "ARGON2_PARALLELISM",
+}
+
+
+@dataclass(frozen=True)
+class CalibrationResult:
+    scheme: str
+    params: dict[str, int]
+    p99_ms: float
+    target_ms: float
+    measurements: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def meets_target(self) -> bool:
+        return self.p99_ms <= self.target_ms
+
+    def as_env(self) -> list[str]:
+        """Settings lines to paste into the service environment."""
+        return [f'PASSWORD_HASH_SCHEMES=["{self.scheme}"]'] + [
+            f"{ENV_NAMES[name]}={value}" for name, value in self.params.items()
+        ]
+
+
+def measure_p99_ms(hash_fn: Callable[[str], Any], samples: int) -> float:
+    """Hash ``samples`` times and return the 99th percentile in milliseconds."""
+    durations = []
+    for _ in range(max(samples, 2)):
+        start = time.perf_counter()
+        hash_fn(CALIBRATION_SECRET)
+        durations.append((time.perf_counter() - start) * 1000)
+    return statistics.quantiles(durations, n=100, method="inclusive")[98]
+
+
+def _pick(
+    scheme: str,
+    candidates: list[dict[str, int]],
+    build_hash_fn: Callable[[dict[str, int]], Callable[[str], Any]],
+    target_ms: float,
+    samples: int,
+) -> CalibrationResult:
+    # Candidates are ordered from cheapest to most expensive; cost grows
+    # monotonically so the search stops at the first one over budget.
+    best: CalibrationResult | None = None
+    measurements: dict[str, float] = {}
+    for params in candidates:
+        p99 = measure_p99_ms(build_hash_fn(params), samples)
+        label = ",".join(f"{k}={v}" for k, v in params.items())
+        measurements[label] = round(p99, 2)
+        result = CalibrationResult(scheme, params, round(p99, 2), target_ms)
+        if best is None or result.meets_target:
+            best = result
+        if not result.meets_target:
+            break
+    assert best is not None
+    return CalibrationResult(
+        best.scheme, best.params, best.p99_ms, target_ms, measurements
+    )
+
+
+def calibrate_bcrypt(
+    target_ms: float, samples: int = 10, min_rounds: int = 10, max_rounds: int = 16
+) -> CalibrationResult:
+    from passlib.hash import bcrypt
+
+    return _pick(
+        "bcrypt",
+        [{"rounds": rounds} for rounds in range(min_rounds, max_rounds + 1)],
+        lambda params: bcrypt.using(**params).hash,
+        target_ms,
+        samples,
+    )
+
+
+def calibrate_argon2(
+    target_ms: float,
+    samples: int = 10,
+    memory_cost: int = 65536,
+    parallelism: int = 4,
+    max_time_cost: int = 10,
+) -> CalibrationResult:
+    """
+    Calibrate argon2id time cost for a fixed memory cost.
+
+    Requires the optional ``argon2-cffi`` backend.
+    """
+    from passlib.hash import argon2
+
+    return _pick(
+        "argon2",
+        [
+            {
+                "time_cost": time_cost,
+                "memory_cost": memory_cost,
+                "parallelism": parallelism,
+            }
+            for time_cost in range(1, max_time_cost + 1)
+        ],
+        lambda params: argon2.using(type="ID", **params).hash,
+        target_ms,
+        samples,
+    )
@@ -0,0 +1,46 @@
+"""
+Process pool for CPU-bound password hashing outside the event loop.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+from src.config import settings
+
+_executor: ProcessPoolExecutor | None = None
+
+
+def get_hashing_workers() -> int:
+    return settings.BULK_IMPORT_WORKERS or os.cpu_count() or 1
+
+
+def get_hashing_executor() -> Executor:
+    """
+    Return the shared hashing pool, starting it on first use.
+
+    Workers are spawned rather than forked so they do not inherit the event
+    loop, open sockets or pool connections of the parent process.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=get_hashing_workers(),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def shutdown_hashing_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def get_hashing_queue_depth() -> int:
+    """Hashing jobs submitted to the pool and not finished yet."""
+    if _executor is None:
+        return 0
+    # ProcessPoolExecutor keeps no public counter of outstanding work
+    return len(getattr(_executor, "_pending_work_items", ()))
@@ -1,17 +1,87 @@
-from passlib.context import CryptContext
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from src.config import settings
+from src.infrastructure.monitoring.tracing import traced
 
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
 
+
+def get_hash_scheme_options(schemes: list[str]) -> dict[str, Any]:
+    """
+    Cost parameters for the configured schemes, in CryptContext keyword form.
+    """
+    options: dict[str, Any] = {}
+    if "bcrypt" in schemes:
+        options["bcrypt__rounds"] = settings.BCRYPT_ROUNDS
+    if "argon2" in schemes:
+        options["argon2__type"] = "ID"
+        options["argon2__time_cost"] = settings.ARGON2_TIME_COST
+        options["argon2__memory_cost"] = settings.ARGON2_MEMORY_COST
+        options["argon2__parallelism"] = settings.ARGON2_PARALLELISM
+    return options
+
+
+@lru_cache
+def get_pwd_context() -> "CryptContext":
+    """
+    Build the password hashing context on first use.
+
+    The first scheme in ``PASSWORD_HASH_SCHEMES`` is used for new hashes; the
+    remaining ones are accepted for verification and marked deprecated, so
+    existing hashes are upgraded on the next successful login.
+
+    passlib and the hashing backends are imported here rather than at module
+    import time to keep application start-up cheap.
+    """
+    from passlib.context import CryptContext
+
+    schemes = settings.PASSWORD_HASH_SCHEMES
+    return CryptContext(
+        schemes=schemes, deprecated="auto", **get_hash_scheme_options(schemes)
+    )
+
+
+@traced()
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verify a plain text password against its hash.
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 
+@traced()
 def get_password_hash(password: str) -> str:
     """
     Hash a plain text password.
     """
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
+
+
+def hash_passwords(passwords: list[str]) -> list[str]:
+    """
+    Hash a batch of passwords; used as the unit of work for process pools.
+    """
+    context = get_pwd_context()
+    return [context.hash(password) for password in passwords]
+
+
+@lru_cache
+def get_dummy_password_hash() -> str:
+    """
+    A hash made with the current policy, used to spend the same time on
+    unknown usernames as on real ones.
+    """
+    return get_password_hash("dummy-password-for-timing")
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """
+    Check whether a hash uses a deprecated scheme or outdated cost parameters.
+    """
+    try:
+        return get_pwd_context().needs_update(hashed_password)
+    except ValueError:
+        # Unrecognised hash format; leave it alone
+        return False
@@ -0,0 +1,214 @@
+"""
+Sliding-window rate limiting for the authentication endpoints.
+
+Counters use the two-bucket sliding window approximation: each key keeps the
+count of the current fixed window and the previous one, and the effective
+count is the previous count weighted by how much of it still overlaps the
+sliding window plus the current count. That gives near-exact limits with a
+constant amount of state per key.
+"""
+
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+from src.config import settings
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    allowed: bool
+    count: float
+    retry_after: int = 0
+
+
+def _sliding_count(
+    previous: int, current: int, window_start: float, window: float, now: float
+) -> float:
+    overlap = 1.0 - (now - window_start) / window
+    return previous * max(overlap, 0.0) + current
+
+
+def _retry_after(
+    previous: int,
+    current: int,
+    window_start: float,
+    window: float,
+    limit: int,
+    now: float,
+) -> int:
+    # Seconds until the weighted previous window has decayed enough for one
+    # more request to fit under the limit.
+    if current >= limit or previous == 0:
+        return max(1, math.ceil(window_start + window - now))
+    decay_until = (1.0 - (limit - current) / previous) * window
+    return max(1, math.ceil(window_start + decay_until - now))
+
+
+class RateLimitBackend(ABC):
+    @abstractmethod
+    async def hit(self, key: str, limit: int, window: int) -> RateLimitResult:
+        """Record one request for ``key`` and report whether it is allowed."""
+
+    @abstractmethod
+    async def reset(self) -> None:
+        pass
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """
+    Per-process backend with bounded memory.
+
+    Keys are stored by their hash and evicted least-recently-used once
+    ``max_keys`` is reached; hash collisions only make counting slightly
+    more conservative.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        # hash(key) -> (window_start, previous_count, current_count)
+        self._counters: OrderedDict[int, tuple[int, int, int]] = OrderedDict()
+
+    async def hit(self, key: str, limit: int, window: int) -> RateLimitResult:
+        now = time.time()
+        window_start = int(now // window) * window
+        slot = hash(key)
+
+        entry = self._counters.get(slot)
+        if entry is None:
+            previous, current = 0, 0
+        else:
+            start, previous, current = entry
+            if start != window_start:
+                # Roll forward; anything older than one window is dropped
+                previous = current if window_start - start == window else 0
+                current = 0
+
+        count = _sliding_count(previous, current, window_start, window, now)
+        allowed = count < limit
+        if allowed:
+            current += 1
+            count += 1
+
+        self._counters[slot] = (window_start, previous, current)
+        self._counters.move_to_end(slot)
+        while len(self._counters) > self.max_keys:
+            self._counters.popitem(last=False)
+
+        if allowed:
+            return RateLimitResult(allowed=True, count=count)
+        return RateLimitResult(
+            allowed=False,
+            count=count,
+            retry_after=_retry_after(
+                previous, current, window_start, window, limit, now
+            ),
+        )
+
+    async def reset(self) -> None:
+        self._counters.clear()
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """
+    Shared backend for multi-replica deployments.
+
+    ``client`` is any asyncio Redis-compatible client exposing ``incr``,
+    ``decr``, ``expire`` and ``get`` (for example ``redis.asyncio.Redis``);
+    no Redis library is imported here.
+    """
+
+    def __init__(self, client: Any, prefix: str = "ratelimit"):
+        self.client = client
+        self.prefix = prefix
+
+    async def hit(self, key: str, limit: int, window: int) -> RateLimitResult:
+        now = time.time()
+        window_index = int(now // window)
+        window_start = window_index * window
+        current_key = f"{self.prefix}:{key}:{window_index}"
+        previous_key = f"{self.prefix}:{key}:{window_index - 1}"
+
+        # Reserve the slot atomically, then give it back if over the limit,
+        # so that rejected requests are not counted (as in memory)
+        current = int(await self.client.incr(current_key))
+        if current == 1:
+            await self.client.expire(current_key, window * 2)
+        previous = int(await self.client.get(previous_key) or 0)
+
+        count = _sliding_count(previous, current - 1, window_start, window, now)
+        if count < limit:
+            return RateLimitResult(allowed=True, count=count + 1)
+        current = int(await self.client.decr(current_key))
+        return RateLimitResult(
+            allowed=False,
+            count=count,
+            retry_after=_retry_after(
+                previous, current, window_start, window, limit, now
+            ),
+        )
+
+    async def reset(self) -> None:
+        # Keys expire on their own; nothing to clear eagerly.
+        return None
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    key_type: str
+    limit: int
+
+
+def get_rate_limit_rules() -> dict[str, list[RateLimitRule]]:
+    """Per-action limits, each applied to its own key type."""
+    return {
+        "login": [
+            RateLimitRule("username", settings.RATE_LIMIT_LOGIN_PER_USERNAME),
+            RateLimitRule("ip", settings.RATE_LIMIT_LOGIN_PER_IP),
+        ],
+        "signup": [RateLimitRule("ip", settings.RATE_LIMIT_SIGNUP_PER_IP)],
+        "refresh": [RateLimitRule("ip", settings.RATE_LIMIT_REFRESH_PER_IP)],
+        "availability": [RateLimitRule("ip", settings.RATE_LIMIT_AVAILABILITY_PER_IP)],
+    }
+
+
+_backend: RateLimitBackend | None = None
+
+
+def get_rate_limit_backend() -> RateLimitBackend:
+    global _backend
+    if _backend is None:
+        _backend = InMemoryRateLimitBackend(max_keys=settings.RATE_LIMIT_MAX_KEYS)
+    return _backend
+
+
+def set_rate_limit_backend(backend: RateLimitBackend) -> None:
+    """Replace the rate limit backend, e.g. with a shared Redis backend."""
+    global _backend
+    _backend = backend
+
+
+async def check_rate_limit(
+    action: str, identifiers: dict[str, str]
+) -> tuple[RateLimitResult, str | None]:
+    """
+    Apply every rule configured for ``action``.
+
+    Returns the first rejection together with the key type that triggered it,
+    or an allowed result and ``None``.
+    """
+    backend = get_rate_limit_backend()
+    window = settings.RATE_LIMIT_WINDOW_SECONDS
+    result = RateLimitResult(allowed=True, count=0)
+    for rule in get_rate_limit_rules().get(action, []):
+        identifier = identifiers.get(rule.key_type)
+        if identifier is None:
+            continue
+        key = f"{action}:{rule.key_type}:{identifier}"
+        result = await backend.hit(key, rule.limit, window)
+        if not result.allowed:
+            return result, rule.key_type
+    return result, None
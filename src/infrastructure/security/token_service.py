@@ -1,16 +1,35 @@
+import os
+import time
 import uuid
 from datetime import UTC, datetime, timedelta
+from functools import lru_cache
+from types import ModuleType
 from typing import Any
 
-from jose import ExpiredSignatureError, JWTError, jwt
+from jose import ExpiredSignatureError, JWTError
 
 from src.config import settings
+from src.infrastructure.monitoring.tracing import traced
 from src.infrastructure.security.password_service import (
     get_password_hash,
     verify_password,
 )
 
 
+@lru_cache
+def get_jwt() -> ModuleType:
+    """
+    Import ``jose.jwt`` on first use.
+
+    ``jose.jwt`` pulls in the cryptography backends, which dominate the import
+    cost of this module, so it is loaded lazily (and warmed from the lifespan).
+    """
+    from jose import jwt
+
+    return jwt
+
+
+@traced()
 def create_access_token(
     data: dict[str, Any], expires_delta: timedelta | None = None
 ) -> str:
@@ -23,17 +42,44 @@ def create_access_token(
         )
 
     to_encode.update({"exp": expire, "iat": datetime.now(UTC)})
-    encoded_jwt = jwt.encode(
+    encoded_jwt = get_jwt().encode(
         to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
     )
     return encoded_jwt
 
 
-def create_refresh_token(user_id: int, jti: str | None = None) -> tuple[str, str]:
+def uuid7() -> uuid.UUID:
+    """
+    Time-ordered UUID (RFC 9562 version 7).
+
+    A 48-bit Unix millisecond timestamp followed by random bits, so new
+    identifiers land at the right-hand edge of a B-tree index instead of on
+    random pages.
+    """
+    timestamp_ms = time.time_ns() // 1_000_000
+    value = (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80
+    value |= int.from_bytes(os.urandom(10), "big")
+    # Version (bits 76-79) = 7, variant (bits 62-63) = 0b10
+    value = (value & ~(0xF << 76)) | (0x7 << 76)
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)
+    return uuid.UUID(int=value)
+
+
+def get_refresh_token_expiry() -> datetime:
+    # Whole seconds, so the stored expires_at matches the token's exp claim
+    return (
+        datetime.now(UTC) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    ).replace(microsecond=0)
+
+
+@traced()
+def create_refresh_token(
+    user_id: int, jti: str | None = None, expires_at: datetime | None = None
+) -> tuple[str, str]:
     if jti is None:
-        jti = str(uuid.uuid4())
+        jti = str(uuid7())
 
-    expire = datetime.now(UTC) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    expire = expires_at or get_refresh_token_expiry()
 
     refresh_data = {
         "sub": str(user_id),
@@ -43,16 +89,17 @@ def create_refresh_token(user_id: int, jti: str | None = None) -> tuple[str, str
         "iat": datetime.now(UTC),
     }
 
-    refresh_token = jwt.encode(
+    refresh_token = get_jwt().encode(
         refresh_data, settings.SECRET_KEY, algorithm=settings.ALGORITHM
     )
 
     return refresh_token, jti
 
 
+@traced()
 def decode_token(token: str) -> dict[str, Any]:
     try:
-        payload = jwt.decode(
+        payload = get_jwt().decode(
             token,
             settings.SECRET_KEY,
             algorithms=[settings.ALGORITHM],
@@ -64,6 +111,7 @@ def decode_token(token: str) -> dict[str, Any]:
         raise e  # Re-raise for specific handling
 
 
+@traced()
 def decode_refresh_token(token: str) -> dict[str, Any]:
     payload = decode_token(token)
     if payload.get("type") != "refresh":
@@ -71,9 +119,11 @@ def decode_refresh_token(token: str) -> dict[str, Any]:
     return payload
 
 
+@traced()
 def generate_token_hash(token: str) -> str:
     return get_password_hash(token)
 
 
+@traced()
 def verify_refresh_token(token: str, stored_hash: str) -> bool:
     return verify_password(token, stored_hash)
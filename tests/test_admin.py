@@ -2,11 +2,27 @@
 Tests for admin-only endpoints.
 """
 
+import gzip
+import json
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime, timedelta
+
 import pytest
 from fastapi import status
 from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from src.api.main import app
+from src.api.routers import admin as admin_router
+from src.config import settings
+from src.infrastructure.audit.audit_writer import get_audit_writer
+from src.infrastructure.cache.principal_cache import get_principal_cache
+from src.infrastructure.database.models.refresh_token import RefreshToken
 from src.infrastructure.database.models.roles import UserRole
+from src.infrastructure.monitoring.flight_recorder import get_flight_recorder
+from src.infrastructure.monitoring.profiler import SamplingProfiler
+from src.infrastructure.security.hashing_pool import get_hashing_executor
 
 
 @pytest.fixture
@@ -45,6 +61,20 @@ async def admin_auth_token(client: AsyncClient, admin_user: dict, test_user_data
     return response.json()["access_token"]
 
 
+@pytest.fixture
+async def expired_session(db_session: AsyncSession, admin_user: dict):
+    """Fixture to add an expired but still active session for the admin user."""
+    db_session.add(
+        RefreshToken(
+            jti=uuid.uuid4(),
+            user_id=admin_user["id"],
+            token_hash="expired",
+            expires_at=datetime.now(UTC) - timedelta(minutes=1),
+        )
+    )
+    await db_session.commit()
+
+
 @pytest.fixture
 async def user_auth_token(client: AsyncClient, user_user: dict, test_user_data: dict):
     """Fixture to get auth token for regular user."""
@@ -70,6 +100,15 @@ class TestAdminDashboard:
         assert response.status_code == status.HTTP_200_OK
         assert "Welcome to the admin dashboard" in response.json()["message"]
 
+    @pytest.mark.asyncio
+    async def test_dashboard_skips_expired_sessions(
+        self, client: AsyncClient, admin_auth_token: str, expired_session: None
+    ):
+        """Test that expired tokens not yet cleaned up are not counted."""
+        headers = {"Authorization": f"Bearer {admin_auth_token}"}
+        response = await client.get("/api/v1/admin/dashboard", headers=headers)
+        assert response.json()["statistics"]["active_sessions"] == 1
+
     @pytest.mark.asyncio
     async def test_user_cannot_access_dashboard(
         self, client: AsyncClient, user_auth_token: str
@@ -99,6 +138,27 @@ class TestAdminUsers:
         assert response.status_code == status.HTTP_200_OK
         assert "users" in response.json()
 
+    @pytest.mark.asyncio
+    async def test_filter_users_ignores_case(
+        self, client: AsyncClient, admin_auth_token: str
+    ):
+        """Test that username and email filters match regardless of case."""
+        headers = {"Authorization": f"Bearer {admin_auth_token}"}
+        response = await client.get(
+            "/api/v1/admin/users",
+            params={"username": "ADMIN_User", "email": "Admin@Example.com"},
+            headers=headers,
+        )
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["total_count"] == 1
+        assert data["users"][0]["username"] == "admin_user"
+
+        response = await client.get(
+            "/api/v1/admin/users", params={"username": "nobody"}, headers=headers
+        )
+        assert response.json()["total_count"] == 0
+
     @pytest.mark.asyncio
     async def test_user_cannot_list_users(
         self, client: AsyncClient, user_auth_token: str
@@ -113,3 +173,379 @@ class TestAdminUsers:
         """Test unauthenticated user cannot list users."""
         response = await client.get("/api/v1/admin/users")
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+class TestAdminUserImport:
+    """Test cases for the /admin/users/import endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_admin_can_import_users(
+        self, client: AsyncClient, admin_auth_token: str
+    ):
+        """Test admin can bulk import users from CSV."""
+        executor = ThreadPoolExecutor(max_workers=1)
+        app.dependency_overrides[get_hashing_executor] = lambda: executor
+        csv_data = (
+            "username,email,cpf,password\n"
+            "imported,imported@example.com,99999999999,importedpass\n"
+            "broken,broken,88888888888,pw\n"
+        )
+        headers = {"Authorization": f"Bearer {admin_auth_token}"}
+
+        response = await client.post(
+            "/api/v1/admin/users/import",
+            headers=headers,
+            files={"file": ("users.csv", csv_data, "text/csv")},
+        )
+        executor.shutdown()
+
+        assert response.status_code == status.HTTP_200_OK
+        report = response.json()
+        assert report["inserted"] == 1
+        assert report["errors"][0]["line"] == 3
+
+        login = await client.post(
+            "/api/v1/auth/login",
+            json={"username": "imported", "password": "importedpass"},
+        )
+        assert login.status_code == status.HTTP_200_OK
+
+    @pytest.mark.asyncio
+    async def test_user_cannot_import_users(
+        self, client: AsyncClient, user_auth_token: str
+    ):
+        """Test regular user cannot bulk import users."""
+        headers = {"Authorization": f"Bearer {user_auth_token}"}
+        response = await client.post(
+            "/api/v1/admin/users/import",
+            headers=headers,
+            files={"file": ("users.csv", "username\n", "text/csv")},
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+class TestAdminUserExport:
+    """Test cases for the /admin/users/export endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_admin_can_export_csv(
+        self, client: AsyncClient, admin_auth_token: str
+    ):
+        """Test admin can export users as CSV."""
+        headers = {"Authorization": f"Bearer {admin_auth_token}"}
+        response = await client.get("/api/v1/admin/users/export", headers=headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/csv")
+        lines = response.text.strip().splitlines()
+        assert lines[0].startswith("id,username,email")
+        assert "admin_user" in lines[1]
+
+    @pytest.mark.asyncio
+    async def test_export_ndjson_with_sessions_gzip(
+        self, client: AsyncClient, admin_auth_token: str
+    ):
+        """Test gzip-compressed NDJSON export with session counts."""
+        headers = {"Authorization": f"Bearer {admin_auth_token}"}
+        response = await client.get(
+            "/api/v1/admin/users/export",
+            headers=headers,
+            params={"format": "ndjson", "include_sessions": True, "gzip": True},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"] == "application/gzip"
+        rows = [
+            json.loads(line) for line in gzip.decompress(response.content).splitlines()
+        ]
+        assert rows[0]["username"] == "admin_user"
+        assert rows[0]["active_sessions"] == 1
+
+    @pytest.mark.asyncio
+    async def test_export_skips_expired_sessions(
+        self, client: AsyncClient, admin_auth_token: str, expired_session: None
+    ):
+        """Test that expired tokens not yet cleaned up are not counted."""
+        headers = {"Authorization": f"Bearer {admin_auth_token}"}
+        response = await client.get(
+            "/api/v1/admin/users/export",
+            headers=headers,
+            params={"format": "ndjson", "include_sessions": True},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert rows[0]["active_sessions"] == 1
+
+    @pytest.mark.asyncio
+    async def test_export_columnar(self, client: AsyncClient, admin_auth_token: str):
+        """Test columnar export groups values per column."""
+        headers = {"Authorization": f"Bearer {admin_auth_token}"}
+        response = await client.get(
+            "/api/v1/admin/users/export",
+            headers=headers,
+            params={"format": "columnar", "chunk_size": 1},
+        )
+
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        columns = lines[0]["columns"]
+        assert lines[1]["rows"] == 1
+        assert lines[1]["data"][columns.index("username")] == ["admin_user"]
+
+    @pytest.mark.asyncio
+    async def test_user_cannot_export(self, client: AsyncClient, user_auth_token: str):
+        """Test regular user cannot export users."""
+        headers = {"Authorization": f"Bearer {user_auth_token}"}
+        response = await client.get("/api/v1/admin/users/export", headers=headers)
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+class TestAdminAudit:
+    """Test cases for the /admin/audit endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_admin_can_query_login_events(
+        self, client: AsyncClient, admin_auth_token: str, db_session
+    ):
+        """Test that recorded logins can be queried once flushed."""
+        await client.post(
+            "/api/v1/auth/login",
+            json={"username": "admin_user", "password": "wrong-password"},
+            headers={"User-Agent": "audit-test"},
+        )
+        await get_audit_writer().flush(
+            async_sessionmaker(db_session.bind, expire_on_commit=False)
+        )
+
+        headers = {"Authorization": f"Bearer {admin_auth_token}"}
+        response = await client.get(
+            "/api/v1/admin/audit",
+            params={"username": "admin_user", "event": "login"},
+            headers=headers,
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        events = response.json()["events"]
+        assert [e["outcome"] for e in events] == ["failure", "success"]
+        assert events[0]["detail"] == "wrong password"
+        assert events[0]["user_agent"] == "audit-test"
+
+        response = await client.get(
+            "/api/v1/admin/audit", params={"outcome": "success"}, headers=headers
+        )
+        assert response.json()["count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_oversized_forwarded_ip_is_truncated(
+        self, client: AsyncClient, admin_auth_token: str, db_session, monkeypatch
+    ):
+        """Test that a forged X-Forwarded-For cannot fail the audit batch."""
+        monkeypatch.setattr(settings, "RATE_LIMIT_TRUST_FORWARDED_FOR", True)
+        forwarded_ip = "1" * 200
+        await client.post(
+            "/api/v1/auth/login",
+            json={"username": "admin_user", "password": "wrong-password"},
+            headers={"X-Forwarded-For": forwarded_ip},
+        )
+        await get_audit_writer().flush(
+            async_sessionmaker(db_session.bind, expire_on_commit=False)
+        )
+
+        headers = {"Authorization": f"Bearer {admin_auth_token}"}
+        response = await client.get(
+            "/api/v1/admin/audit", params={"outcome": "failure"}, headers=headers
+        )
+
+        [event] = response.json()["events"]
+        assert event["ip_address"] == forwarded_ip[:45]
+
+    @pytest.mark.asyncio
+    async def test_user_cannot_query_audit(
+        self, client: AsyncClient, user_auth_token: str
+    ):
+        """Test regular user cannot read the audit trail."""
+        headers = {"Authorization": f"Bearer {user_auth_token}"}
+        response = await client.get("/api/v1/admin/audit", headers=headers)
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+class TestAdminProfile:
+    """Test cases for the /admin/profile endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_admin_can_profile_collapsed(
+        self, client: AsyncClient, admin_auth_token: str
+    ):
+        """Test admin gets collapsed stacks of the event loop thread."""
+        headers = {"Authorization": f"Bearer {admin_auth_token}"}
+        response = await client.get(
+            "/api/v1/admin/profile",
+            params={"seconds": 0.1, "interval_ms": 5},
+            headers=headers,
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/plain")
+        assert int(response.headers["x-profile-samples"]) > 0
+        # The handler itself is suspended; the loop is seen running callbacks
+        assert "_run_once" in response.text
+
+    @pytest.mark.asyncio
+    async def test_admin_can_profile_speedscope(
+        self, client: AsyncClient, admin_auth_token: str
+    ):
+        """Test admin gets a speedscope file."""
+        headers = {"Authorization": f"Bearer {admin_auth_token}"}
+        response = await client.get(
+            "/api/v1/admin/profile",
+            params={"seconds": 0.05, "format": "speedscope", "threads": "all"},
+            headers=headers,
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["profiles"][0]["type"] == "sampled"
+        assert data["shared"]["frames"]
+
+    @pytest.mark.asyncio
+    async def test_profile_duration_is_limited(
+        self, client: AsyncClient, admin_auth_token: str
+    ):
+        """Test that overly long or dense profiles are rejected."""
+        headers = {"Authorization": f"Bearer {admin_auth_token}"}
+        too_long = await client.get(
+            "/api/v1/admin/profile", params={"seconds": 3600}, headers=headers
+        )
+        too_dense = await client.get(
+            "/api/v1/admin/profile", params={"interval_ms": 0.01}, headers=headers
+        )
+
+        assert too_long.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert too_dense.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    @pytest.mark.asyncio
+    async def test_profile_releases_the_session_before_sampling(
+        self,
+        client: AsyncClient,
+        admin_auth_token: str,
+        db_session: AsyncSession,
+        monkeypatch,
+    ):
+        """Test that no transaction is held open while the profiler samples."""
+        in_transaction = []
+
+        class RecordingProfiler(SamplingProfiler):
+            def start(self):
+                in_transaction.append(db_session.in_transaction())
+                super().start()
+
+        monkeypatch.setattr(admin_router, "SamplingProfiler", RecordingProfiler)
+        # Force the principal to be read from the database
+        get_principal_cache().reset()
+        headers = {"Authorization": f"Bearer {admin_auth_token}"}
+        response = await client.get(
+            "/api/v1/admin/profile", params={"seconds": 0.01}, headers=headers
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert in_transaction == [False]
+
+    @pytest.mark.asyncio
+    async def test_user_cannot_profile(self, client: AsyncClient, user_auth_token: str):
+        """Test regular user cannot run the profiler."""
+        headers = {"Authorization": f"Bearer {user_auth_token}"}
+        response = await client.get("/api/v1/admin/profile", headers=headers)
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+class TestAdminMemory:
+    """Test cases for the /admin/memory endpoints."""
+
+    @pytest.mark.asyncio
+    async def test_snapshot_and_diff(self, client: AsyncClient, admin_auth_token: str):
+        """Test admin can trace, take two snapshots and diff them."""
+        headers = {"Authorization": f"Bearer {admin_auth_token}"}
+        started = await client.post("/api/v1/admin/memory/tracing", headers=headers)
+        first = await client.post("/api/v1/admin/memory/snapshots", headers=headers)
+        await client.get("/api/v1/admin/dashboard", headers=headers)
+        second = await client.post("/api/v1/admin/memory/snapshots", headers=headers)
+
+        assert started.status_code == status.HTTP_200_OK
+        assert started.json()["tracing"] is True
+        assert first.status_code == status.HTTP_201_CREATED
+        top = await client.get(
+            f"/api/v1/admin/memory/snapshots/{first.json()['id']}", headers=headers
+        )
+        diff = await client.get(
+            "/api/v1/admin/memory/diff",
+            params={"from": first.json()["id"], "to": second.json()["id"]},
+            headers=headers,
+        )
+        stopped = await client.delete("/api/v1/admin/memory/tracing", headers=headers)
+
+        assert top.status_code == status.HTTP_200_OK
+        assert top.json()["sites"]
+        assert diff.status_code == status.HTTP_200_OK
+        assert all("size_diff_bytes" in site for site in diff.json()["sites"])
+        assert stopped.status_code == status.HTTP_204_NO_CONTENT
+
+    @pytest.mark.asyncio
+    async def test_snapshot_without_tracing(
+        self, client: AsyncClient, admin_auth_token: str
+    ):
+        """Test that a snapshot before tracing starts is a conflict."""
+        headers = {"Authorization": f"Bearer {admin_auth_token}"}
+        response = await client.post("/api/v1/admin/memory/snapshots", headers=headers)
+        assert response.status_code == status.HTTP_409_CONFLICT
+
+    @pytest.mark.asyncio
+    async def test_unknown_snapshot(self, client: AsyncClient, admin_auth_token: str):
+        """Test that an unknown snapshot id is not found."""
+        headers = {"Authorization": f"Bearer {admin_auth_token}"}
+        response = await client.get(
+            "/api/v1/admin/memory/snapshots/999", headers=headers
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    @pytest.mark.asyncio
+    async def test_user_cannot_trace_memory(
+        self, client: AsyncClient, user_auth_token: str
+    ):
+        """Test regular user cannot start tracing."""
+        headers = {"Authorization": f"Bearer {user_auth_token}"}
+        response = await client.post("/api/v1/admin/memory/tracing", headers=headers)
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+class TestAdminSlowRequests:
+    """Test cases for the /admin/slow-requests endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_lists_slow_requests(
+        self, client: AsyncClient, admin_auth_token: str, monkeypatch
+    ):
+        """Test admin sees requests over the budget, newest first."""
+        monkeypatch.setattr(get_flight_recorder(), "budget_ms", 0)
+        headers = {"Authorization": f"Bearer {admin_auth_token}"}
+        await client.get("/api/v1/admin/dashboard", headers=headers)
+
+        response = await client.get(
+            "/api/v1/admin/slow-requests",
+            params={"route": "/api/v1/admin/dashboard"},
+            headers=headers,
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        body = response.json()
+        assert body["count"] == 1
+        assert body["requests"][0]["route"] == "/api/v1/admin/dashboard"
+        assert body["requests"][0]["db"]["query_count"] == 5
+
+    @pytest.mark.asyncio
+    async def test_user_cannot_list_slow_requests(
+        self, client: AsyncClient, user_auth_token: str
+    ):
+        """Test regular user cannot read the flight recorder."""
+        headers = {"Authorization": f"Bearer {user_auth_token}"}
+        response = await client.get("/api/v1/admin/slow-requests", headers=headers)
+        assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,107 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.domain.use_cases.auth_service import AuthService
+from src.infrastructure.audit.audit_writer import AuditEvent, AuditWriter
+from src.infrastructure.database.models.audit_event import AuthAuditEvent
+
+
+def _session_factory(db_session: AsyncSession) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(db_session.bind, expire_on_commit=False)
+
+
+async def _count_events(db_session: AsyncSession) -> int:
+    return (await db_session.execute(select(func.count(AuthAuditEvent.id)))).scalar()
+
+
+@pytest.mark.asyncio
+class TestAuditWriter:
+    """Test cases for the write-behind audit queue."""
+
+    async def test_flush_writes_in_batches(self, db_session: AsyncSession):
+        """Test that every queued event is written, batch by batch."""
+        writer = AuditWriter(batch_size=2)
+        for i in range(5):
+            writer.record(AuditEvent("login", "success", user_id=i))
+
+        with patch(
+            "src.infrastructure.audit.audit_writer.AuditEventRepository.add_events",
+            autospec=True,
+        ) as add_events:
+            written = await writer.flush(_session_factory(db_session))
+
+        assert written == 5
+        assert [len(call.args[1]) for call in add_events.call_args_list] == [2, 2, 1]
+        assert writer.pending == 0
+
+    async def test_overflow_drops_and_counts(self):
+        """Test that a full queue drops new events instead of blocking."""
+        writer = AuditWriter(max_events=2)
+
+        assert writer.record(AuditEvent("login", "success"))
+        assert writer.record(AuditEvent("login", "success"))
+        assert not writer.record(AuditEvent("login", "failure"))
+        assert writer.pending == 2
+        assert writer.dropped == 1
+
+    async def test_stop_flushes_remaining_events(self, db_session: AsyncSession):
+        """Test that events queued before shutdown reach the database."""
+        writer = AuditWriter(interval_ms=60_000)
+        writer.start(_session_factory(db_session))
+        writer.record(AuditEvent("logout", "success", user_id=1))
+        writer.record(AuditEvent("login", "failure", username="x" * 80))
+
+        await writer.stop()
+
+        assert writer.pending == 0
+        assert await _count_events(db_session) == 2
+
+    async def test_failed_batch_is_counted_not_retried(self):
+        """Test that a database error does not leave the writer stuck."""
+        session = MagicMock()
+        session.__aenter__ = AsyncMock(side_effect=RuntimeError("db down"))
+        session.__aexit__ = AsyncMock(return_value=False)
+        writer = AuditWriter(batch_size=10)
+        writer.record(AuditEvent("login", "success"))
+
+        written = await writer.flush(lambda: session)
+
+        assert written == 0
+        assert writer.pending == 0
+
+
+@pytest.mark.asyncio
+class TestAuthServiceAudit:
+    """Test cases for the audit events emitted by AuthService."""
+
+    async def test_login_outcomes_are_recorded(self):
+        """Test that failed logins are recorded with their reason."""
+        recorder = MagicMock()
+        user_repo = AsyncMock()
+        user_repo.get_user_by_username.return_value = None
+        service = AuthService(user_repo, AsyncMock(), audit_recorder=recorder)
+
+        with pytest.raises(ValueError):
+            await service.authenticate_user("ghost", "password")
+
+        recorder.assert_called_once_with(
+            "login", "failure", username="ghost", detail="unknown user"
+        )
+
+    async def test_logout_is_recorded(self):
+        """Test that a logout records the token owner."""
+        recorder = MagicMock()
+        refresh_repo = AsyncMock()
+        refresh_repo.get_refresh_token_by_jti.return_value = MagicMock(user_id=7)
+        service = AuthService(AsyncMock(), refresh_repo, audit_recorder=recorder)
+
+        with patch(
+            "src.domain.use_cases.auth_service.decode_refresh_token",
+            return_value={"jti": "test"},
+        ):
+            await service.logout_user("token")
+
+        recorder.assert_called_once_with("logout", "success", user_id=7)
@@ -7,7 +7,10 @@ from datetime import timedelta
 import pytest
 from fastapi import status
 from httpx import AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.infrastructure.database.repositories.user_repository import UserRepository
 from src.infrastructure.security.token_service import create_access_token
 
 
@@ -170,6 +173,69 @@ class TestAuthMe:
         response = await client.get("/api/v1/auth/me", headers=headers)
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
 
+    @pytest.mark.asyncio
+    async def test_get_me_sets_cache_headers(
+        self, client: AsyncClient, auth_token: str
+    ):
+        """Test that /me is privately cacheable with an ETag."""
+        headers = {"Authorization": f"Bearer {auth_token}"}
+
+        response = await client.get("/api/v1/auth/me", headers=headers)
+
+        assert response.headers["etag"]
+        assert response.headers["cache-control"] == "private, no-cache"
+        assert response.headers["vary"] == "Authorization"
+
+    @pytest.mark.asyncio
+    async def test_get_me_not_modified_without_database(
+        self, client: AsyncClient, db_session: AsyncSession, auth_token: str
+    ):
+        """Test that a matching If-None-Match is answered 304 from the cache."""
+        headers = {"Authorization": f"Bearer {auth_token}"}
+        etag = (await client.get("/api/v1/auth/me", headers=headers)).headers["etag"]
+        statements = []
+
+        def capture(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        engine = db_session.bind.sync_engine
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            response = await client.get(
+                "/api/v1/auth/me", headers={**headers, "If-None-Match": etag}
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.headers["etag"] == etag
+        assert response.content == b""
+        assert statements == []
+
+    @pytest.mark.asyncio
+    async def test_get_me_etag_changes_on_update(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        created_user: dict,
+        auth_token: str,
+    ):
+        """Test that updating the user invalidates the previous ETag."""
+        headers = {"Authorization": f"Bearer {auth_token}"}
+        etag = (await client.get("/api/v1/auth/me", headers=headers)).headers["etag"]
+        repository = UserRepository(db_session)
+        user = await repository.get_user(created_user["id"])
+        user.full_name = "Renamed User"
+        await repository.update_user(user)
+
+        response = await client.get(
+            "/api/v1/auth/me", headers={**headers, "If-None-Match": etag}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["full_name"] == "Renamed User"
+        assert response.headers["etag"] != etag
+
 
 class TestRefreshTokens:
     """Test refresh token creation, validation, and management."""
@@ -228,3 +294,90 @@ class TestRefreshTokens:
             "/api/v1/auth/refresh", json={"refresh_token": refresh_token}
         )
         assert refresh_response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+class TestSessions:
+    """Test cases for listing and revoking the current user's sessions."""
+
+    async def _login(self, client: AsyncClient, test_user_data: dict, device: str):
+        response = await client.post(
+            "/api/v1/auth/login",
+            json={
+                "username": test_user_data["username"],
+                "password": test_user_data["password"],
+            },
+            headers={"User-Agent": device},
+        )
+        assert response.status_code == 200
+        return response.json()
+
+    @pytest.mark.asyncio
+    async def test_list_sessions(
+        self, client: AsyncClient, test_user_data: dict, created_user: dict
+    ):
+        """Test that each login shows up as a session with its device."""
+        await self._login(client, test_user_data, "phone")
+        tokens = await self._login(client, test_user_data, "laptop")
+
+        response = await client.get(
+            "/api/v1/auth/sessions",
+            headers={"Authorization": f"Bearer {tokens['access_token']}"},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        sessions = response.json()
+        assert {s["device"] for s in sessions} == {"phone", "laptop"}
+        # The listing request itself used the laptop session
+        laptop = next(s for s in sessions if s["device"] == "laptop")
+        assert laptop["last_used_at"] is not None
+
+    @pytest.mark.asyncio
+    async def test_revoke_session(
+        self, client: AsyncClient, test_user_data: dict, created_user: dict
+    ):
+        """Test that a revoked session can no longer refresh."""
+        phone = await self._login(client, test_user_data, "phone")
+        laptop = await self._login(client, test_user_data, "laptop")
+        headers = {"Authorization": f"Bearer {laptop['access_token']}"}
+        sessions = (await client.get("/api/v1/auth/sessions", headers=headers)).json()
+        phone_id = next(s["id"] for s in sessions if s["device"] == "phone")
+
+        response = await client.delete(
+            f"/api/v1/auth/sessions/{phone_id}", headers=headers
+        )
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+
+        refresh_response = await client.post(
+            "/api/v1/auth/refresh", json={"refresh_token": phone["refresh_token"]}
+        )
+        assert refresh_response.status_code == status.HTTP_401_UNAUTHORIZED
+        again = await client.delete(
+            f"/api/v1/auth/sessions/{phone_id}", headers=headers
+        )
+        assert again.status_code == status.HTTP_404_NOT_FOUND
+
+    @pytest.mark.asyncio
+    async def test_cannot_revoke_other_users_session(
+        self, client: AsyncClient, test_user_data: dict, created_user: dict
+    ):
+        """Test that sessions of another user are not found."""
+        victim = await self._login(client, test_user_data, "phone")
+        victim_headers = {"Authorization": f"Bearer {victim['access_token']}"}
+        sessions = (
+            await client.get("/api/v1/auth/sessions", headers=victim_headers)
+        ).json()
+        other = {
+            **test_user_data,
+            "username": "other",
+            "email": "o@example.com",
+            "cpf": "10987654321",
+        }
+        await client.post("/api/v1/auth/signup", json=other)
+        attacker = await self._login(client, other, "laptop")
+
+        response = await client.delete(
+            f"/api/v1/auth/sessions/{sessions[0]['id']}",
+            headers={"Authorization": f"Bearer {attacker['access_token']}"},
+        )
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
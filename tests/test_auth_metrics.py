@@ -0,0 +1,98 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from prometheus_client import REGISTRY
+
+from src.domain.use_cases.auth_service import AuthService
+from src.infrastructure.monitoring.metrics import (
+    AuthMetrics,
+    AuthTimer,
+    NoopAuthMetrics,
+    set_auth_metrics,
+)
+
+
+class RecordingMetrics(AuthMetrics):
+    def __init__(self):
+        self.stages: list[tuple[str, str]] = []
+        self.outcomes: list[tuple[str, str]] = []
+
+    def observe_stage(self, operation: str, stage: str, seconds: float) -> None:
+        self.stages.append((operation, stage))
+
+    def record_outcome(self, operation: str, outcome: str, seconds: float) -> None:
+        self.outcomes.append((operation, outcome))
+
+
+def _requests(status: str) -> float:
+    return (
+        REGISTRY.get_sample_value(
+            "auth_requests_total",
+            {"method": "POST", "endpoint": "/api/v1/auth/login", "status": status},
+        )
+        or 0.0
+    )
+
+
+class TestAuthTimer:
+    """Test cases for per-stage authentication timing."""
+
+    def test_repeated_stage_is_observed_once(self):
+        """Test that a stage hit twice is summed into one observation."""
+        recorder = RecordingMetrics()
+        timer = AuthTimer("refresh", recorder)
+
+        timer.stage("lookup")
+        timer.stage("hash_verify")
+        timer.stage("lookup")
+        timer.done("success")
+
+        assert sorted(recorder.stages) == [
+            ("refresh", "hash_verify"),
+            ("refresh", "lookup"),
+        ]
+        assert recorder.outcomes == [("refresh", "success")]
+
+    def test_unknown_labels_are_bounded(self):
+        """Test that unexpected stages and outcomes cannot add label values."""
+        before = _requests("other")
+        timer = AuthTimer("login", AuthMetrics())
+
+        timer.stage("something new")
+        timer.done("something new")
+
+        assert timer.stages == {}
+        assert _requests("other") == before + 1
+
+    def test_noop_metrics_record_nothing(self):
+        """Test that the no-op recorder leaves the registry untouched."""
+        before = _requests("success")
+
+        AuthTimer("login", NoopAuthMetrics()).done("success")
+
+        assert _requests("success") == before
+
+
+@pytest.mark.asyncio
+class TestAuthServiceMetrics:
+    """Test cases for the metrics recorded by AuthService."""
+
+    async def test_bad_password(self):
+        """Test that a failed login records its stages and outcome."""
+        recorder = RecordingMetrics()
+        set_auth_metrics(recorder)
+        user_repo = AsyncMock()
+        user_repo.get_user_by_username.return_value = MagicMock(is_active=True)
+        service = AuthService(user_repo, AsyncMock())
+
+        with patch(
+            "src.domain.use_cases.auth_service.verify_password", return_value=False
+        ):
+            with pytest.raises(ValueError):
+                await service.authenticate_user("alice", "wrong")
+
+        assert sorted(recorder.stages) == [
+            ("login", "hash_verify"),
+            ("login", "lookup"),
+        ]
+        assert recorder.outcomes == [("login", "bad_password")]
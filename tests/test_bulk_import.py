@@ -0,0 +1,160 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.domain.use_cases.bulk_import_users import (
+    BulkImportUsersUseCase,
+    ImportCheckpoint,
+    iter_file_lines,
+    iter_lines,
+    parse_user_rows,
+)
+from src.infrastructure.database.models.user import User
+from src.infrastructure.database.repositories.user_repository import UserRepository
+
+CSV_INPUT = [
+    "username,email,full_name,cpf,password",
+    "alice,alice@example.com,Alice,11111111111,secret1",
+    "bob,not-an-email,Bob,22222222222,secret2",
+    "carol,carol@example.com,Carol,33333333333,secret3",
+    "alice,alice2@example.com,Alice Again,44444444444,secret4",
+]
+
+
+def fake_hash_passwords(passwords: list[str]) -> list[str]:
+    return [f"hashed-{password}" for password in passwords]
+
+
+@pytest.fixture
+def use_case(db_session: AsyncSession):
+    with ThreadPoolExecutor(max_workers=2) as executor, patch(
+        "src.domain.use_cases.bulk_import_users.hash_passwords",
+        fake_hash_passwords,
+    ):
+        yield BulkImportUsersUseCase(
+            UserRepository(db_session), executor=executor, batch_size=2, workers=2
+        )
+
+
+async def count_users(db_session: AsyncSession) -> int:
+    return (await db_session.execute(select(func.count(User.id)))).scalar()
+
+
+class TestBulkImportUsers:
+    """Test cases for the bulk user import use case."""
+
+    @pytest.mark.asyncio
+    async def test_csv_import_reports_row_errors(
+        self, use_case: BulkImportUsersUseCase, db_session: AsyncSession
+    ):
+        """Test that valid rows are inserted and bad rows are reported."""
+        report = await use_case.execute(
+            parse_user_rows(iter_file_lines(CSV_INPUT), "csv")
+        )
+
+        assert report.processed == 4
+        assert report.inserted == 2
+        assert report.skipped == 1
+        assert report.last_line == 5
+        assert {error.line for error in report.errors} == {3, 5}
+        assert await count_users(db_session) == 2
+
+        user = await UserRepository(db_session).get_user_by_username("alice")
+        assert user.password_hash == "hashed-secret1"
+
+    @pytest.mark.asyncio
+    async def test_overlong_fields_are_row_errors(
+        self, use_case: BulkImportUsersUseCase, db_session: AsyncSession
+    ):
+        """Test that values longer than their columns never reach the batch."""
+        lines = [
+            "username,email,full_name,cpf,password",
+            f"{'u' * 51},long@example.com,Long Name,55555555555,secret",
+            "dave,dave@example.com,Dave,666666666660,secret",
+            "erin,erin@example.com,Erin,77777777777,secret",
+        ]
+
+        report = await use_case.execute(parse_user_rows(iter_file_lines(lines), "csv"))
+
+        assert report.inserted == 1
+        assert [error.line for error in report.errors] == [2, 3]
+        assert report.errors[0].error.startswith("username: ")
+        assert report.errors[1].error.startswith("cpf: ")
+        assert await count_users(db_session) == 1
+
+    @pytest.mark.asyncio
+    async def test_csv_quoted_line_breaks(
+        self, use_case: BulkImportUsersUseCase, db_session: AsyncSession
+    ):
+        """Test that a quoted field spanning lines stays one record."""
+        lines = [
+            "username,email,full_name,cpf,password",
+            'erin,erin@example.com,"Erin',
+            'Second Line",66666666666,secret',
+            "frank,frank@example.com,Frank,77777777777,secret",
+        ]
+
+        report = await use_case.execute(parse_user_rows(iter_file_lines(lines), "csv"))
+
+        assert report.processed == 2
+        assert report.inserted == 2
+        assert report.last_line == 4
+        user = await UserRepository(db_session).get_user_by_username("erin")
+        assert user.full_name == "Erin\nSecond Line"
+
+    @pytest.mark.asyncio
+    async def test_conflict_on_email_is_attributed_to_its_row(
+        self, use_case: BulkImportUsersUseCase, db_session: AsyncSession
+    ):
+        """Test that a row losing on email is the one reported, not its namesake."""
+        lines = [
+            "username,email,full_name,cpf,password",
+            "heidi,shared@example.com,Heidi,10101010101,secret",
+            "ivan,ivan@example.com,Ivan,12121212121,secret",
+            # Next batch: same username, first one clashes on email only
+            "grace,shared@example.com,Grace,88888888888,secret",
+            "grace,grace@example.com,Grace Two,99999999999,secret",
+        ]
+
+        report = await use_case.execute(parse_user_rows(iter_file_lines(lines), "csv"))
+
+        assert report.inserted == 3
+        assert [error.line for error in report.errors] == [4]
+        user = await UserRepository(db_session).get_user_by_username("grace")
+        assert user.email == "grace@example.com"
+
+    @pytest.mark.asyncio
+    async def test_ndjson_import(self, use_case: BulkImportUsersUseCase):
+        """Test NDJSON input including an unparsable line."""
+
+        async def chunks():
+            yield b'{"username": "dave", "email": "dave@example.com", '
+            yield b'"cpf": "55555555555", "password": "pw"}\n{not json}\n'
+
+        report = await use_case.execute(parse_user_rows(iter_lines(chunks()), "ndjson"))
+
+        assert report.inserted == 1
+        assert report.errors[0].line == 2
+        assert report.errors[0].error.startswith("Invalid JSON")
+
+    @pytest.mark.asyncio
+    async def test_resume_from_checkpoint(
+        self, use_case: BulkImportUsersUseCase, db_session: AsyncSession, tmp_path
+    ):
+        """Test that lines up to the checkpoint are not imported again."""
+        checkpoint = ImportCheckpoint(tmp_path / "import.checkpoint")
+        checkpoint.save(2)
+
+        report = await use_case.execute(
+            parse_user_rows(iter_file_lines(CSV_INPUT), "csv"),
+            resume_after_line=checkpoint.load(),
+            checkpoint=checkpoint,
+        )
+
+        assert report.processed == 3
+        user = await UserRepository(db_session).get_user_by_username("alice")
+        assert user.email == "alice2@example.com"
+        assert checkpoint.load() == 5
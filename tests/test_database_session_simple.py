@@ -35,7 +35,7 @@ class TestDatabaseSessionSimple:
         """Test close_db function."""
         mock_engine = AsyncMock()
 
-        with patch("src.infrastructure.database.session.engine", mock_engine):
+        with patch("src.infrastructure.database.session._engine", mock_engine):
             await close_db()
 
             mock_engine.dispose.assert_called_once()
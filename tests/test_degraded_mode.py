@@ -0,0 +1,315 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from conftest import TestSessionLocal
+from src.infrastructure.cache import principal_cache
+from src.infrastructure.cache.revocation_cache import get_revocation_cache
+from src.infrastructure.database.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    DatabaseUnavailableError,
+    get_circuit_breaker,
+    install_circuit_breaker_hooks,
+)
+from src.infrastructure.database.models.refresh_token import RefreshToken
+from src.infrastructure.database.pool import TimedAsyncQueuePool
+from src.infrastructure.monitoring.health_monitor import HealthCheck, get_health_monitor
+from src.infrastructure.monitoring.metrics import DEGRADED_RESPONSES_TOTAL
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def trip_circuit() -> None:
+    breaker = get_circuit_breaker()
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure("connection refused")
+
+
+@pytest.fixture
+def open_circuit(db_session: AsyncSession):
+    """Trips the circuit on demand; closed again before the tables are dropped."""
+    yield trip_circuit
+    get_circuit_breaker().reset()
+
+
+def degraded_count(source: str) -> float:
+    return DEGRADED_RESPONSES_TOTAL.labels(source=source)._value.get()
+
+
+async def login(client: AsyncClient, test_user_data: dict) -> dict:
+    response = await client.post(
+        "/api/v1/auth/login",
+        json={
+            "username": test_user_data["username"],
+            "password": test_user_data["password"],
+        },
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+class TestCircuitBreaker:
+    """Test cases for the database circuit breaker."""
+
+    def test_opens_after_consecutive_failures(self):
+        """Test that the breaker opens at the threshold and then fails fast."""
+        breaker = CircuitBreaker(failure_threshold=3, reset_seconds=10)
+
+        breaker.record_failure("boom")
+        breaker.record_success()
+        breaker.record_failure("boom")
+        breaker.record_failure("boom")
+        breaker.check()
+        breaker.record_failure("boom")
+
+        assert breaker.state == OPEN
+        with pytest.raises(DatabaseUnavailableError):
+            breaker.check()
+
+    def test_lets_one_trial_through_per_interval(self):
+        """Test the half-open trial and its outcomes."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=10, clock=clock)
+        breaker.record_failure("boom")
+
+        clock.now = 10
+        breaker.check()
+        assert breaker.state == HALF_OPEN
+        with pytest.raises(DatabaseUnavailableError):
+            breaker.check()
+
+        breaker.record_failure("still down")
+        assert breaker.state == OPEN
+
+        clock.now = 20
+        breaker.check()
+        breaker.record_success()
+        assert breaker.state == CLOSED
+        breaker.check()
+
+    @pytest.mark.asyncio
+    async def test_connect_failures_trip_the_breaker(self, tmp_path):
+        """Test that failed connects are reported as unavailability."""
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path}/missing/dir/db.sqlite"
+        )
+        install_circuit_breaker_hooks(engine)
+        try:
+            for _ in range(get_circuit_breaker().failure_threshold):
+                with pytest.raises(DatabaseUnavailableError):
+                    async with engine.connect() as conn:
+                        await conn.execute(text("SELECT 1"))
+        finally:
+            await engine.dispose()
+
+        assert get_circuit_breaker().state == OPEN
+
+    @pytest.mark.asyncio
+    async def test_pooled_trial_closes_the_circuit(self, tmp_path, monkeypatch):
+        """Test that the checkout taking the trial may run its statements."""
+        clock = FakeClock()
+        breaker = get_circuit_breaker()
+        monkeypatch.setattr(breaker, "_clock", clock)
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path}/db.sqlite",
+            poolclass=TimedAsyncQueuePool,
+        )
+        install_circuit_breaker_hooks(engine)
+        trip_circuit()
+        clock.now = breaker.reset_seconds
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        finally:
+            await engine.dispose()
+
+        assert breaker.state == CLOSED
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_fails_statements_fast(
+        self, db_session: AsyncSession, open_circuit
+    ):
+        """Test that statements are refused while the circuit is open."""
+        open_circuit()
+
+        with pytest.raises(DatabaseUnavailableError):
+            await db_session.execute(text("SELECT 1"))
+
+
+class TestDegradedPrincipal:
+    """Test cases for /me while the database is unavailable."""
+
+    @pytest.mark.asyncio
+    async def test_serves_stale_principal(
+        self,
+        client: AsyncClient,
+        auth_token: str,
+        monkeypatch,
+        open_circuit,
+    ):
+        """Test that a valid token keeps working from the expired cache entry."""
+        headers = {"Authorization": f"Bearer {auth_token}"}
+        assert (await client.get("/api/v1/auth/me", headers=headers)).status_code == 200
+        later = principal_cache.time.monotonic() + 60
+        monkeypatch.setattr(principal_cache.time, "monotonic", lambda: later)
+        open_circuit()
+        before = degraded_count("principal")
+
+        response = await client.get("/api/v1/auth/me", headers=headers)
+
+        assert response.status_code == 200
+        assert response.json()["username"] == "testuser"
+        assert degraded_count("principal") == before + 1
+
+    @pytest.mark.asyncio
+    async def test_unknown_principal_gets_503(
+        self, client: AsyncClient, auth_token: str, open_circuit
+    ):
+        """Test that without a cached principal the outage is reported as 503."""
+        open_circuit()
+
+        response = await client.get(
+            "/api/v1/auth/me", headers={"Authorization": f"Bearer {auth_token}"}
+        )
+
+        assert response.status_code == 503
+        assert "Retry-After" in response.headers
+
+
+class TestDegradedRefresh:
+    """Test cases for /refresh while the database is unavailable."""
+
+    @pytest.mark.asyncio
+    async def test_refreshes_once_and_writes_revocation_later(
+        self,
+        client: AsyncClient,
+        test_user_data: dict,
+        created_user: dict,
+        db_session: AsyncSession,
+        open_circuit,
+    ):
+        """Test that a token issued here refreshes once and is consumed on recovery."""
+        tokens = await login(client, test_user_data)
+        open_circuit()
+        body = {"refresh_token": tokens["refresh_token"]}
+
+        first = await client.post("/api/v1/auth/refresh", json=body)
+        replay = await client.post("/api/v1/auth/refresh", json=body)
+
+        assert first.status_code == 200
+        assert first.json()["access_token"]
+        assert replay.status_code == 401
+        assert get_revocation_cache().pending == 1
+
+        get_circuit_breaker().reset()
+        assert await get_revocation_cache().flush(TestSessionLocal) == 1
+        stored = await db_session.scalar(select(RefreshToken))
+        await db_session.refresh(stored)
+        assert not stored.is_active
+
+    @pytest.mark.asyncio
+    async def test_logged_out_token_is_not_served(
+        self,
+        client: AsyncClient,
+        test_user_data: dict,
+        created_user: dict,
+        open_circuit,
+    ):
+        """Test that revocations made on this replica are honoured."""
+        tokens = await login(client, test_user_data)
+        await client.post(
+            "/api/v1/auth/logout",
+            json={"refresh_token": tokens["refresh_token"]},
+            headers={"Authorization": f"Bearer {tokens['access_token']}"},
+        )
+        open_circuit()
+
+        response = await client.post(
+            "/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]}
+        )
+
+        assert response.status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_logout_during_outage_stops_cached_refresh(
+        self,
+        client: AsyncClient,
+        test_user_data: dict,
+        created_user: dict,
+        open_circuit,
+    ):
+        """Test that a token logged out during the outage cannot be refreshed."""
+        tokens = await login(client, test_user_data)
+        headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+        assert (await client.get("/api/v1/auth/me", headers=headers)).status_code == 200
+        open_circuit()
+        body = {"refresh_token": tokens["refresh_token"]}
+
+        logout = await client.post("/api/v1/auth/logout", json=body, headers=headers)
+        refresh = await client.post("/api/v1/auth/refresh", json=body)
+
+        assert logout.status_code == 200
+        assert refresh.status_code == 401
+        assert get_revocation_cache().pending == 1
+
+    @pytest.mark.asyncio
+    async def test_revoke_session_during_outage(
+        self,
+        client: AsyncClient,
+        test_user_data: dict,
+        created_user: dict,
+        open_circuit,
+    ):
+        """Test that revoking a session consumes its cached refresh token."""
+        tokens = await login(client, test_user_data)
+        headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+        sessions = (await client.get("/api/v1/auth/sessions", headers=headers)).json()
+        open_circuit()
+
+        revoke = await client.delete(
+            f"/api/v1/auth/sessions/{sessions[0]['id']}", headers=headers
+        )
+        refresh = await client.post(
+            "/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]}
+        )
+
+        assert revoke.status_code == 204
+        assert refresh.status_code == 401
+        assert get_revocation_cache().pending == 1
+
+
+class TestDegradedHealth:
+    """Test cases for health reporting of degraded mode."""
+
+    @pytest.mark.asyncio
+    async def test_detailed_health_reports_degraded(
+        self, client: AsyncClient, open_circuit
+    ):
+        """Test that a database outage is reported as degraded, not down."""
+
+        async def failing_probe():
+            return False, {"error": "connection refused"}
+
+        get_health_monitor().checks = [
+            HealthCheck("database", failing_probe, 30, degradable=True)
+        ]
+        await get_health_monitor().run_once()
+        open_circuit()
+
+        response = await client.get("/health/detailed")
+        ready = await client.get("/health/ready")
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "degraded"
+        assert response.json()["database_circuit"]["state"] == OPEN
+        assert ready.status_code == 200
@@ -0,0 +1,192 @@
+import asyncio
+import json
+import os
+import signal
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.config import Settings, settings
+from src.infrastructure.database.pool import TimedAsyncQueuePool
+from src.infrastructure.monitoring.flight_recorder import (
+    REDACTED,
+    FlightRecorder,
+    RequestRecord,
+    _current,
+    dump_on_signal,
+    get_flight_recorder,
+    sanitize_params,
+)
+from src.infrastructure.monitoring.metrics import DB_POOL_CHECKOUT
+
+
+@pytest.fixture
+def record_everything(monkeypatch):
+    monkeypatch.setattr(get_flight_recorder(), "budget_ms", 0)
+    return get_flight_recorder()
+
+
+class TestSanitizeParams:
+    """Test cases for parameter sanitization."""
+
+    def test_redacts_sensitive_names(self):
+        """Test that credentials and personal data are never kept."""
+        params = {
+            "refresh_token": "abc",
+            "password": "x",
+            "email": "a@b.c",
+            "user_id": "42",
+        }
+
+        assert sanitize_params(params) == {
+            "refresh_token": REDACTED,
+            "password": REDACTED,
+            "email": REDACTED,
+            "user_id": "42",
+        }
+
+    def test_truncates_values(self):
+        """Test that long values are cut."""
+        assert len(sanitize_params({"q": "x" * 1000})["q"]) == 64
+
+
+class TestFlightRecorder:
+    """Test cases for the slow-request ring buffer."""
+
+    def test_keeps_only_requests_over_budget(self):
+        """Test that fast requests are dropped and per-route budgets apply."""
+        recorder = FlightRecorder(budget_ms=100, budgets={"/export": 1000})
+        fast = RequestRecord(method="GET", path_template="/me", duration_ms=50)
+        slow = RequestRecord(method="GET", path_template="/me", duration_ms=150)
+        export = RequestRecord(method="GET", path_template="/export", duration_ms=900)
+
+        assert not recorder.finish(fast)
+        assert recorder.finish(slow)
+        assert not recorder.finish(export)
+        assert recorder.records() == [slow]
+
+    def test_long_admin_routes_have_default_budgets(self):
+        """Test that profiles and exports are not recorded as slow by default."""
+        recorder = FlightRecorder(budgets=Settings().FLIGHT_RECORDER_BUDGETS)
+
+        assert recorder.budget_for("/api/v1/admin/profile") > (
+            settings.PROFILER_MAX_SECONDS * 1000
+        )
+        assert recorder.budget_for("/api/v1/admin/users/export") > 500
+        assert recorder.budget_for("/api/v1/admin/users/import") > 500
+
+    def test_ring_buffer_is_bounded(self):
+        """Test that only the last slow requests are kept, newest first."""
+        recorder = FlightRecorder(size=2, budget_ms=0)
+        for path in ("/a", "/b", "/c"):
+            recorder.finish(
+                RequestRecord(method="GET", path_template=path, duration_ms=1)
+            )
+
+        assert [r.path_template for r in recorder.records()] == ["/c", "/b"]
+        assert [r.path_template for r in recorder.records(route="/b")] == ["/b"]
+
+    def test_dump_writes_json(self, tmp_path):
+        """Test that a dump can be read back."""
+        recorder = FlightRecorder(budget_ms=0)
+        recorder.finish(RequestRecord(method="GET", path_template="/a", duration_ms=1))
+
+        path = recorder.dump(str(tmp_path))
+
+        assert json.loads(path.read_text())[0]["route"] == "/a"
+
+    @pytest.mark.asyncio
+    async def test_dump_on_sigusr1(self, tmp_path, record_everything):
+        """Test that SIGUSR1 writes the recorder to the dump directory."""
+        record_everything.finish(
+            RequestRecord(method="GET", path_template="/a", duration_ms=1)
+        )
+        loop = asyncio.get_running_loop()
+        assert dump_on_signal(loop, str(tmp_path))
+        try:
+            os.kill(os.getpid(), signal.SIGUSR1)
+            for _ in range(50):
+                if list(tmp_path.iterdir()):
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            loop.remove_signal_handler(signal.SIGUSR1)
+
+        [dump] = list(tmp_path.iterdir())
+        assert json.loads(dump.read_text())[0]["route"] == "/a"
+
+
+class TestFlightRecorderMiddleware:
+    """Test cases for per-request recording."""
+
+    @pytest.mark.asyncio
+    async def test_login_breakdown(
+        self, client: AsyncClient, test_user_data, created_user, record_everything
+    ):
+        """Test that a login is kept with its stages and queries."""
+        response = await client.post(
+            "/api/v1/auth/login",
+            params={"password": "leaked", "trace": "1"},
+            json={
+                "username": test_user_data["username"],
+                "password": test_user_data["password"],
+            },
+        )
+        assert response.status_code == 200
+
+        [record] = record_everything.records(route="/api/v1/auth/login")
+        entry = record.to_dict()
+        assert entry["status_code"] == 200
+        assert entry["query_params"] == {"password": REDACTED, "trace": "1"}
+        assert {"lookup", "hash_verify", "token_persist"} <= entry["stages_ms"].keys()
+        assert entry["db"]["query_count"] == len(entry["db"]["queries"]) > 0
+        assert entry["db"]["queries"][0]["statement"].startswith("SELECT")
+        assert entry["first_byte_ms"] <= entry["duration_ms"]
+
+    @pytest.mark.asyncio
+    async def test_authenticated_request_records_jwt_stage(
+        self, client: AsyncClient, auth_token, record_everything
+    ):
+        """Test that token decoding is charged to the jwt stage."""
+        await client.get(
+            "/api/v1/auth/me", headers={"Authorization": f"Bearer {auth_token}"}
+        )
+
+        [record] = record_everything.records(route="/api/v1/auth/me")
+        assert "jwt" in record.stages_ms
+
+    @pytest.mark.asyncio
+    async def test_fast_requests_are_not_kept(self, client: AsyncClient):
+        """Test that requests within the default budget are dropped."""
+        await client.get("/health/live")
+
+        assert get_flight_recorder().records() == []
+
+
+class TestTimedPool:
+    """Test cases for the checkout-timing pool."""
+
+    @pytest.mark.asyncio
+    async def test_checkout_is_timed(self, tmp_path):
+        """Test that checkouts are observed and charged to the request."""
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+            poolclass=TimedAsyncQueuePool,
+            pool_size=1,
+        )
+        before = DB_POOL_CHECKOUT.collect()[0].samples
+        count = next(s.value for s in before if s.name.endswith("_count"))
+        record = RequestRecord(method="GET")
+        token = _current.set(record)
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        finally:
+            _current.reset(token)
+            await engine.dispose()
+
+        after = DB_POOL_CHECKOUT.collect()[0].samples
+        assert next(s.value for s in after if s.name.endswith("_count")) == count + 1
+        assert record.stages_ms["pool_wait"] > 0
@@ -1,17 +1,33 @@
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from fastapi import HTTPException
 from httpx import AsyncClient
 
+from src.api.lifecycle import get_lifecycle_state
 from src.api.routers.health import (
-    check_database_health,
     detailed_health_check,
     health_check,
     liveness_check,
     readiness_check,
     startup_check,
 )
+from src.infrastructure.monitoring.health_monitor import (
+    HealthCheck,
+    check_database_health,
+    get_health_monitor,
+)
+
+
+async def _database_probe(db) -> tuple[bool, dict]:
+    result = await check_database_health(db)
+    return result["status"] == "healthy", result
+
+
+async def _run_monitor(db) -> None:
+    monitor = get_health_monitor()
+    monitor.checks = [HealthCheck("database", lambda: _database_probe(db), 60)]
+    await monitor.run_once()
 
 
 class TestHealthEndpoints:
@@ -63,7 +79,8 @@ class TestHealthEndpoints:
         mock_db.execute.return_value = mock_result
 
         with patch("time.time", side_effect=[0.0, 0.05]):
-            result = await detailed_health_check(mock_db)
+            await _run_monitor(mock_db)
+        result = await detailed_health_check()
 
         assert result["status"] == "healthy"
         assert result["service"] == "authentication-microservice"
@@ -76,8 +93,9 @@ class TestHealthEndpoints:
         mock_db = AsyncMock()
         mock_db.execute.side_effect = Exception("Connection timeout")
 
+        await _run_monitor(mock_db)
         with pytest.raises(HTTPException) as exc_info:
-            await detailed_health_check(mock_db)
+            await detailed_health_check()
 
         assert exc_info.value.status_code == 503
         assert exc_info.value.detail["status"] == "unhealthy"
@@ -87,9 +105,10 @@ class TestHealthEndpoints:
     async def test_readiness_check_ready(self):
         """Test readiness check when database is ready."""
         mock_db = AsyncMock()
-        mock_db.execute.return_value = None  # Successful execution
+        mock_db.execute.return_value = MagicMock()  # Successful execution
 
-        result = await readiness_check(mock_db)
+        await _run_monitor(mock_db)
+        result = await readiness_check()
 
         assert result["status"] == "ready"
 
@@ -99,8 +118,9 @@ class TestHealthEndpoints:
         mock_db = AsyncMock()
         mock_db.execute.side_effect = Exception("Database unavailable")
 
+        await _run_monitor(mock_db)
         with pytest.raises(HTTPException) as exc_info:
-            await readiness_check(mock_db)
+            await readiness_check()
 
         assert exc_info.value.status_code == 503
         assert exc_info.value.detail["status"] == "not ready"
@@ -115,10 +135,20 @@ class TestHealthEndpoints:
     @pytest.mark.asyncio
     async def test_startup_check(self):
         """Test startup check endpoint."""
+        get_lifecycle_state().startup_complete = True
         result = await startup_check()
 
         assert result["status"] == "startup complete"
 
+    @pytest.mark.asyncio
+    async def test_startup_check_during_warm_up(self):
+        """Test that the startup probe fails until warm-up has finished."""
+        with pytest.raises(HTTPException) as exc_info:
+            await startup_check()
+
+        assert exc_info.value.status_code == 503
+        assert exc_info.value.detail["status"] == "starting"
+
     # Skip integration test since routes might not be properly configured
     # @pytest.mark.asyncio
     # async def test_health_endpoints_integration(self, client: AsyncClient):
@@ -140,6 +170,7 @@ class TestHealthEndpoints:
         result = await liveness_check()
         assert result["status"] == "alive"
 
+        get_lifecycle_state().startup_complete = True
         result = await startup_check()
         assert result["status"] == "startup complete"
 
@@ -0,0 +1,139 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.infrastructure.monitoring.health_monitor import (
+    HealthCheck,
+    HealthMonitor,
+    build_default_checks,
+    get_health_monitor,
+)
+
+
+class FakeProbe:
+    def __init__(self, results: list[bool]):
+        self.results = results
+        self.calls = 0
+
+    async def __call__(self) -> tuple[bool, dict]:
+        ok = self.results[min(self.calls, len(self.results) - 1)]
+        self.calls += 1
+        return ok, {}
+
+
+@pytest.mark.asyncio
+class TestHealthMonitor:
+    """Test cases for the cached background health monitor."""
+
+    async def test_not_ready_before_first_check(self):
+        """Test that readiness is withheld until every check has run."""
+        monitor = HealthMonitor([HealthCheck("db", FakeProbe([True]), 30)])
+
+        assert not monitor.is_ready()
+        assert monitor.snapshot()["db"]["status"] == "unknown"
+
+        await monitor.run_once()
+        assert monitor.is_ready()
+
+    async def test_failures_need_threshold_to_flip(self):
+        """Test that a single failed check does not unready the service."""
+        monitor = HealthMonitor(
+            [HealthCheck("db", FakeProbe([True, False, False, False]), 30)],
+            failure_threshold=3,
+        )
+
+        await monitor.run_once()
+        await monitor.run_once()
+        await monitor.run_once()
+        assert monitor.is_ready()
+
+        await monitor.run_once()
+        assert not monitor.is_ready()
+
+    async def test_recovery_needs_threshold(self):
+        """Test that an unhealthy check recovers only after repeated successes."""
+        monitor = HealthMonitor(
+            [HealthCheck("db", FakeProbe([False, True, True]), 30)],
+            recovery_threshold=2,
+        )
+
+        await monitor.run_once()
+        await monitor.run_once()
+        assert not monitor.is_ready()
+
+        await monitor.run_once()
+        assert monitor.is_ready()
+
+    async def test_stale_result_is_not_ready(self):
+        """Test that a result older than its staleness limit fails readiness."""
+        monitor = HealthMonitor([HealthCheck("db", FakeProbe([True]), 10)])
+        await monitor.run_once()
+        checked_at = monitor._states["db"].checked_at
+
+        assert monitor.is_ready(now=checked_at + 5)
+        assert not monitor.is_ready(now=checked_at + 11)
+        assert monitor.snapshot(now=checked_at + 11)["db"]["status"] == "stale"
+
+    async def test_slow_probe_times_out(self):
+        """Test that a hanging probe is reported as a failure."""
+
+        async def hang() -> tuple[bool, dict]:
+            await asyncio.sleep(10)
+            return True, {}
+
+        monitor = HealthMonitor([HealthCheck("db", hang, 30)], timeout=0.01)
+        await monitor.run_once()
+
+        assert not monitor.is_ready()
+        assert "timed out" in monitor.snapshot()["db"]["error"]
+
+    async def test_non_critical_check_does_not_affect_readiness(self):
+        """Test that only critical checks gate readiness."""
+        monitor = HealthMonitor(
+            [
+                HealthCheck("db", FakeProbe([True]), 30),
+                HealthCheck("executor", FakeProbe([False]), 30, critical=False),
+            ]
+        )
+        await monitor.run_once()
+
+        assert monitor.is_ready()
+        assert monitor.snapshot()["executor"]["status"] == "unhealthy"
+
+    async def test_degradable_check_keeps_service_ready(self):
+        """Test that a failing degradable check degrades instead of unreadying."""
+        monitor = HealthMonitor(
+            [
+                HealthCheck("db", FakeProbe([False]), 30, degradable=True),
+                HealthCheck("pool", FakeProbe([True]), 30),
+            ]
+        )
+        await monitor.run_once()
+
+        assert monitor.status() == "degraded"
+        assert monitor.is_ready()
+
+    async def test_default_checks(self, db_session: AsyncSession):
+        """Test that the default checks pass against the test database."""
+        monitor = HealthMonitor(
+            build_default_checks(async_sessionmaker(db_session.bind), db_session.bind)
+        )
+        await monitor.run_once()
+
+        snapshot = monitor.snapshot()
+        assert set(snapshot) == {"database", "pool", "event_loop", "executor"}
+        assert monitor.is_ready(), snapshot
+
+    async def test_probes_do_not_query_database(self, client: AsyncClient):
+        """Test that the readiness probe only reads the cached result."""
+        probe = FakeProbe([True])
+        get_health_monitor().checks = [HealthCheck("db", probe, 30)]
+        await get_health_monitor().run_once()
+
+        for _ in range(3):
+            response = await client.get("/health/ready")
+            assert response.status_code == 200
+
+        assert probe.calls == 1
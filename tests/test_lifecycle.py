@@ -0,0 +1,94 @@
+import asyncio
+import signal
+from datetime import UTC, datetime
+from uuid import UUID
+
+import pytest
+import uvicorn
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.api.lifecycle import get_lifecycle_state, warm_up
+from src.api.main import app
+from src.api.server import GracefulServer
+from src.config import settings
+from src.infrastructure.database.repositories.refresh_token_repository import (
+    select_by_jti,
+)
+from src.infrastructure.database.warmup import hot_statements, warm_pool
+from src.infrastructure.monitoring.health_monitor import HealthCheck, get_health_monitor
+
+
+async def _healthy() -> tuple[bool, dict]:
+    return True, {}
+
+
+@pytest.mark.asyncio
+class TestLifecycle:
+    """Test cases for start-up warm-up and graceful shutdown."""
+
+    async def test_warm_pool_runs_hot_statements(self, db_session: AsyncSession):
+        """Test that warm-up connects and runs the hot statements."""
+        assert await warm_pool(db_session.bind, 5) >= 1
+
+    async def test_warms_the_refresh_lookup_as_issued(self):
+        """Test that the warmed jti lookup is the one with the expires_at hint."""
+        warmed = str(hot_statements()[-1])
+
+        assert warmed == str(select_by_jti(UUID(int=0), datetime.now(UTC)))
+        assert "expires_at BETWEEN" in warmed
+
+    async def test_warm_up_completes_startup(self, db_session: AsyncSession):
+        """Test that warm-up builds the OpenAPI schema and marks start-up done."""
+        app.openapi_schema = None
+        get_health_monitor().checks = [HealthCheck("db", _healthy, 30)]
+
+        await warm_up(app, db_session.bind, async_sessionmaker(db_session.bind))
+
+        assert get_lifecycle_state().startup_complete
+        assert app.openapi_schema is not None
+        assert get_health_monitor().is_ready()
+
+    async def test_warm_up_failure_still_completes_startup(self):
+        """Test that a failed warm-up does not leave the pod starting forever."""
+
+        class BrokenEngine:
+            @property
+            def sync_engine(self):
+                raise RuntimeError("db down")
+
+        await warm_up(app, BrokenEngine(), None)
+
+        assert get_lifecycle_state().startup_complete
+
+    async def test_sigterm_reports_not_ready_before_stopping(self, monkeypatch):
+        """Test that the server keeps serving while readiness fails."""
+        monkeypatch.setattr(settings, "SHUTDOWN_READINESS_DELAY_SECONDS", 0.01)
+        server = GracefulServer(uvicorn.Config(app))
+
+        server.handle_exit(signal.SIGTERM, None)
+
+        assert get_lifecycle_state().shutting_down
+        assert not server.should_exit
+        await asyncio.sleep(0.05)
+        assert server.should_exit
+
+    async def test_second_signal_stops_at_once(self, monkeypatch):
+        """Test that repeating the signal skips the readiness delay."""
+        monkeypatch.setattr(settings, "SHUTDOWN_READINESS_DELAY_SECONDS", 60)
+        server = GracefulServer(uvicorn.Config(app))
+
+        server.handle_exit(signal.SIGTERM, None)
+        server.handle_exit(signal.SIGTERM, None)
+
+        assert server.should_exit
+
+    async def test_not_ready_while_shutting_down(self, client: AsyncClient):
+        """Test that readiness fails as soon as shutdown begins."""
+        get_health_monitor().checks = [HealthCheck("db", _healthy, 30)]
+        await get_health_monitor().run_once()
+        assert (await client.get("/health/ready")).status_code == 200
+
+        get_lifecycle_state().shutting_down = True
+
+        assert (await client.get("/health/ready")).status_code == 503
@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from conftest import metric_sample
+from src.infrastructure.monitoring.loop_monitor import (
+    UNATTRIBUTED,
+    LoopMonitor,
+    RouteAttributionMiddleware,
+    get_loop_monitor,
+)
+from src.infrastructure.monitoring.metrics import (
+    EVENT_LOOP_BLOCKS_TOTAL,
+    EVENT_LOOP_LAG,
+)
+from src.infrastructure.monitoring.route_label import route_template
+
+
+class TestLoopMonitor:
+    """Test cases for the event loop lag monitor and watchdog."""
+
+    def test_beat_records_lag(self):
+        """Test that every heartbeat is observed in the lag histogram."""
+        monitor = LoopMonitor()
+        before = metric_sample(EVENT_LOOP_LAG, "event_loop_lag_seconds_count")
+
+        monitor._beat(0.003)
+
+        assert monitor.last_lag == 0.003
+        assert (
+            metric_sample(EVENT_LOOP_LAG, "event_loop_lag_seconds_count") == before + 1
+        )
+
+    def test_check_ignores_short_delays(self):
+        """Test that a heartbeat within the threshold is not a block."""
+        monitor = LoopMonitor(interval_ms=100, threshold_ms=200)
+        monitor._last_beat = 10.0
+
+        monitor._check(10.25)
+
+        assert monitor.blocks == 0
+
+    def test_block_is_counted_once_per_episode(self, caplog):
+        """Test that a block is detected once and charged on the next beat."""
+        monitor = LoopMonitor(interval_ms=100, threshold_ms=200)
+        monitor._last_beat = 10.0
+        before = metric_sample(
+            EVENT_LOOP_BLOCKS_TOTAL, "event_loop_blocks_total", route=UNATTRIBUTED
+        )
+
+        with caplog.at_level(logging.WARNING):
+            monitor._check(10.5)
+            monitor._check(10.6)
+        monitor._beat(0.5)
+
+        assert monitor.blocks == 1
+        assert len([r for r in caplog.records if "blocked" in r.message]) == 1
+        assert (
+            metric_sample(
+                EVENT_LOOP_BLOCKS_TOTAL, "event_loop_blocks_total", route=UNATTRIBUTED
+            )
+            == before + 1
+        )
+
+    def test_warnings_are_rate_limited(self, caplog):
+        """Test that blocks within the log interval are only counted."""
+        monitor = LoopMonitor(
+            interval_ms=100, threshold_ms=200, log_interval_seconds=60
+        )
+
+        with caplog.at_level(logging.WARNING):
+            for now in (100.0, 110.0, 120.0):
+                monitor._last_beat = now - 1
+                monitor._check(now)
+                monitor._beat(1.0)
+            monitor._last_beat = 169.0
+            monitor._check(170.0)
+
+        warnings = [r.message for r in caplog.records if "blocked" in r.message]
+        assert monitor.blocks == 4
+        assert len(warnings) == 2
+        assert "2 similar warnings suppressed" in warnings[1]
+
+    def test_block_attributed_to_route(self):
+        """Test that the blocked time is charged to the running task's route."""
+
+        async def endpoint():
+            pass
+
+        app = SimpleNamespace(routes=[SimpleNamespace(endpoint=endpoint, path="/x")])
+        monitor = LoopMonitor(attribute_routes=True)
+
+        async def blocking_request():
+            monitor._loop = asyncio.get_running_loop()
+            monitor.track(asyncio.current_task(), {"endpoint": endpoint, "app": app})
+            return monitor._current_route()
+
+        assert asyncio.run(blocking_request()) == "/x"
+
+    def test_untracked_task_is_unattributed(self):
+        """Test that work outside a request is reported as unattributed."""
+        monitor = LoopMonitor(attribute_routes=True)
+
+        async def background():
+            monitor._loop = asyncio.get_running_loop()
+            return monitor._current_route()
+
+        assert asyncio.run(background()) == UNATTRIBUTED
+
+    @pytest.mark.asyncio
+    async def test_detects_real_blocking_call(self, caplog):
+        """Test that a synchronous sleep on the loop is caught with its stack."""
+        monitor = LoopMonitor(interval_ms=10, threshold_ms=50)
+        monitor.start()
+        try:
+            await asyncio.sleep(0.03)
+            with caplog.at_level(logging.WARNING):
+                time.sleep(0.2)
+                await asyncio.sleep(0.03)
+        finally:
+            await monitor.stop()
+
+        assert monitor.blocks == 1
+        assert "test_detects_real_blocking_call" in caplog.text
+
+
+class TestRouteAttributionMiddleware:
+    """Test cases for the request task tracking middleware."""
+
+    @pytest.mark.asyncio
+    async def test_tracks_request_task(self):
+        """Test that the request's task maps to its route while it runs."""
+        app = FastAPI()
+        app.add_middleware(RouteAttributionMiddleware)
+        monitor = get_loop_monitor()
+        seen = {}
+
+        @app.get("/blocking/{item}")
+        async def blocking(item: str):
+            scope = monitor._task_scopes.get(asyncio.current_task())
+            seen["route"] = route_template(scope)
+            return {}
+
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.get("/blocking/1")
+
+        assert response.status_code == 200
+        assert seen["route"] == "/blocking/{item}"
+        assert len(monitor._task_scopes) == 0
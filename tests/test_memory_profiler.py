@@ -0,0 +1,137 @@
+import tracemalloc
+
+import pytest
+
+from src.infrastructure.monitoring.memory_profiler import (
+    MemoryProfiler,
+    RssWatchdog,
+    SnapshotNotFoundError,
+    TracingNotStartedError,
+    module_of,
+    rss_bytes,
+)
+
+_retained: list = []
+
+
+def _allocate() -> None:
+    _retained.append([bytearray(1024) for _ in range(500)])
+
+
+@pytest.fixture
+def profiler():
+    profiler = MemoryProfiler(max_snapshots=2)
+    yield profiler
+    profiler.reset()
+    _retained.clear()
+
+
+class TestModuleOf:
+    """Test cases for allocation site grouping."""
+
+    def test_service_code_by_dotted_module(self):
+        """Test that files under src/ are labelled with their module."""
+        from src.api import lifecycle
+
+        assert module_of(lifecycle.__file__) == "src.api.lifecycle"
+
+    def test_packages_by_top_level_name(self):
+        """Test that third-party and stdlib files are labelled by package."""
+        import logging
+
+        import sqlalchemy.orm.identity
+
+        assert module_of(sqlalchemy.orm.identity.__file__) == "sqlalchemy"
+        assert module_of(logging.__file__) == "stdlib:logging"
+
+
+class TestMemoryProfiler:
+    """Test cases for tracemalloc snapshots."""
+
+    def test_snapshot_requires_tracing(self, profiler):
+        """Test that a snapshot without tracing is refused."""
+        with pytest.raises(TracingNotStartedError):
+            profiler.take_snapshot()
+
+    def test_diff_shows_growth(self, profiler):
+        """Test that allocations between snapshots top the diff."""
+        profiler.start()
+        before = profiler.take_snapshot()
+        _allocate()
+        after = profiler.take_snapshot()
+
+        [top] = profiler.diff(before.id, after.id, group_by="filename", limit=1)
+
+        assert top["site"] == __file__
+        assert top["size_diff_bytes"] >= 500 * 1024
+
+    def test_top_by_line(self, profiler):
+        """Test that the allocating line is among the largest sites."""
+        profiler.start()
+        _allocate()
+        info = profiler.take_snapshot()
+
+        sites = [site["site"] for site in profiler.top(info.id, group_by="lineno")]
+
+        assert any(site.startswith(f"{__file__}:") for site in sites[:3])
+
+    def test_old_snapshots_are_dropped(self, profiler):
+        """Test that only the last snapshots are kept."""
+        profiler.start()
+        first = profiler.take_snapshot()
+        profiler.take_snapshot()
+        profiler.take_snapshot()
+
+        with pytest.raises(SnapshotNotFoundError):
+            profiler.top(first.id)
+        assert len(profiler.status()["snapshots"]) == 2
+
+    def test_stop_ends_tracing(self, profiler):
+        """Test that stopping tracing drops the snapshots."""
+        profiler.start()
+        profiler.take_snapshot()
+        profiler.stop()
+
+        assert not tracemalloc.is_tracing()
+        assert profiler.status()["snapshots"] == []
+
+
+class TestRssWatchdog:
+    """Test cases for the RSS-triggered snapshot dump."""
+
+    def test_below_threshold_does_nothing(self, profiler, tmp_path):
+        """Test that a normal RSS neither starts tracing nor dumps."""
+        watchdog = RssWatchdog(
+            profiler, threshold_bytes=2**40, dump_dir=str(tmp_path)
+        )
+
+        assert watchdog.check(rss_bytes()) is None
+        assert not profiler.tracing
+
+    def test_starts_tracing_then_dumps(self, profiler, tmp_path):
+        """Test that crossing the threshold arms tracing, then writes a dump."""
+        watchdog = RssWatchdog(
+            profiler, threshold_bytes=1, dump_dir=str(tmp_path), cooldown_seconds=60
+        )
+
+        assert watchdog.check(10, now=0) is None
+        assert profiler.tracing
+        _allocate()
+        path = watchdog.check(10, now=1)
+
+        assert path is not None and path.parent == tmp_path
+        loaded = tracemalloc.Snapshot.load(str(path))
+        assert loaded.statistics("filename")
+        assert not profiler.tracing
+        # Within the cooldown nothing more is written
+        assert watchdog.check(10, now=30) is None
+        assert watchdog.check(10, now=62) is None
+        assert watchdog.check(10, now=63) is not None
+
+    def test_leaves_tracing_started_elsewhere(self, profiler, tmp_path):
+        """Test that tracing on before the threshold was crossed keeps running."""
+        profiler.start()
+        watchdog = RssWatchdog(profiler, threshold_bytes=1, dump_dir=str(tmp_path))
+
+        assert watchdog.check(10, now=0) is not None
+        assert profiler.tracing
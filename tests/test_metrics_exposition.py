@@ -0,0 +1,131 @@
+import asyncio
+import gzip
+
+import pytest
+from httpx import AsyncClient
+from prometheus_client import CollectorRegistry, Counter
+
+from src.api.main import instrumentator
+from src.infrastructure.monitoring.exposition import MetricsExposition, accepts_gzip
+from src.infrastructure.monitoring.metrics import METRICS_RENDER_DURATION
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def registry():
+    registry = CollectorRegistry()
+    Counter("scrapes", "Test counter", registry=registry).inc()
+    return registry
+
+
+def _render_count() -> float:
+    samples = METRICS_RENDER_DURATION.collect()[0].samples
+    return next(sample.value for sample in samples if sample.name.endswith("_count"))
+
+
+class TestMetricsExposition:
+    """Test cases for the cached exposition."""
+
+    @pytest.mark.asyncio
+    async def test_reuses_render_within_ttl(self, registry):
+        """Test that scrapes inside the TTL share one render."""
+        clock = FakeClock()
+        exposition = MetricsExposition(registry, ttl_seconds=2, clock=clock)
+        counter = registry._names_to_collectors["scrapes"]
+
+        first = await exposition.render()
+        counter.inc()
+        clock.now = 1.9
+        cached = await exposition.render()
+        clock.now = 2.0
+        fresh = await exposition.render()
+
+        assert b"scrapes_total 1.0" in first
+        assert cached == first
+        assert b"scrapes_total 2.0" in fresh
+
+    @pytest.mark.asyncio
+    async def test_zero_ttl_renders_every_time(self, registry):
+        """Test that the cache can be turned off."""
+        exposition = MetricsExposition(registry, ttl_seconds=0)
+        before = _render_count()
+
+        await exposition.render()
+        await exposition.render()
+
+        assert _render_count() == before + 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_scrapes_render_once(self, registry):
+        """Test that scrapes of an expired cache wait for a single render."""
+        exposition = MetricsExposition(registry, ttl_seconds=60)
+        before = _render_count()
+
+        bodies = await asyncio.gather(*(exposition.render() for _ in range(5)))
+
+        assert len(set(bodies)) == 1
+        assert _render_count() == before + 1
+
+    @pytest.mark.asyncio
+    async def test_gzip_matches_plain_body(self, registry):
+        """Test that the compressed body is the same exposition."""
+        exposition = MetricsExposition(registry, ttl_seconds=60)
+
+        plain = await exposition.render()
+        compressed = await exposition.render(gzipped=True)
+
+        assert gzip.decompress(compressed) == plain
+
+
+class TestAcceptsGzip:
+    """Test cases for Accept-Encoding negotiation."""
+
+    @pytest.mark.parametrize(
+        ("header", "expected"),
+        [
+            ("gzip", True),
+            ("deflate, gzip;q=0.5", True),
+            ("*", True),
+            ("", False),
+            ("identity", False),
+            ("gzip;q=0", False),
+            ("gzip; q=0.0", False),
+        ],
+    )
+    def test_negotiation(self, header, expected):
+        """Test that gzip is used only when the scraper accepts it."""
+        assert accepts_gzip(header) is expected
+
+
+class TestMetricsEndpoint:
+    """Test cases for GET /metrics."""
+
+    @pytest.mark.asyncio
+    async def test_gzip_response(self, client: AsyncClient):
+        """Test that scrapers accepting gzip get a compressed body."""
+        response = await client.get("/metrics", headers={"Accept-Encoding": "gzip"})
+
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert "metrics_render_duration_seconds" in response.text
+
+    @pytest.mark.asyncio
+    async def test_plain_response(self, client: AsyncClient):
+        """Test that other scrapers get plain text."""
+        response = await client.get("/metrics", headers={"Accept-Encoding": "identity"})
+
+        assert response.status_code == 200
+        assert "content-encoding" not in response.headers
+        assert response.headers["content-type"].startswith("text/plain")
+
+    def test_request_labels_are_bounded(self):
+        """Test that request series use status classes and route templates."""
+        assert instrumentator.should_group_status_codes
+        assert instrumentator.should_ignore_untemplated
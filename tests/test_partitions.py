@@ -0,0 +1,202 @@
+from datetime import UTC, date, datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.infrastructure.database import partitions
+from src.infrastructure.database.models.refresh_token import RefreshToken
+from src.infrastructure.database.partitions import (
+    PartitionedTable,
+    create_partition_sql,
+    drop_expired_partitions,
+    ensure_partitions,
+    partition_day,
+    partition_name,
+    purge_default_partition,
+)
+from src.infrastructure.database.repositories.refresh_token_repository import (
+    RefreshTokenRepository,
+)
+from src.infrastructure.database.repositories.user_repository import UserRepository
+from src.infrastructure.security.token_service import uuid7
+
+TABLE = PartitionedTable(
+    name="refresh_tokens", column="expires_at", retention_days=1, days_ahead=2
+)
+
+
+def _executed_sql(conn: AsyncMock) -> list[str]:
+    return [str(call.args[0]) for call in conn.execute.await_args_list]
+
+
+class TestPartitionNaming:
+    """Test cases for daily partition names and bounds."""
+
+    def test_round_trip(self):
+        """Test that partition names encode and decode their day."""
+        name = partition_name("refresh_tokens", date(2026, 3, 9))
+
+        assert name == "refresh_tokens_p20260309"
+        assert partition_day("refresh_tokens", name) == date(2026, 3, 9)
+
+    def test_foreign_names_are_ignored(self):
+        """Test that the default partition and other tables are not parsed."""
+        assert partition_day("refresh_tokens", "refresh_tokens_default") is None
+        assert partition_day("refresh_tokens", "audit_log_p20260309") is None
+
+    def test_create_partition_sql_covers_one_day(self):
+        """Test that a partition spans exactly one UTC day."""
+        sql = create_partition_sql("refresh_tokens", date(2026, 3, 9))
+
+        assert "PARTITION OF refresh_tokens" in sql
+        assert "FROM ('2026-03-09T00:00:00+00:00')" in sql
+        assert "TO ('2026-03-10T00:00:00+00:00')" in sql
+
+
+@pytest.mark.asyncio
+class TestPartitionMaintenance:
+    """Test cases for creating and dropping partitions."""
+
+    async def test_ensure_creates_missing_partitions(self):
+        """Test that only missing future partitions are created."""
+        conn = AsyncMock()
+        existing = ["refresh_tokens_p20260309", "refresh_tokens_default"]
+        with patch.object(
+            partitions, "list_partitions", AsyncMock(return_value=existing)
+        ), patch.object(partitions, "default_partition", AsyncMock(return_value=None)):
+            created = await ensure_partitions(conn, TABLE, today=date(2026, 3, 9))
+
+        assert created == ["refresh_tokens_p20260310", "refresh_tokens_p20260311"]
+        assert len(_executed_sql(conn)) == 2
+
+    async def test_rows_in_default_are_moved_into_new_partition(self):
+        """Test that default partition rows in a new range do not block it."""
+        conn = AsyncMock()
+        conn.execute.return_value = MagicMock(scalar=MagicMock(return_value=True))
+        existing = ["refresh_tokens_p20260309", "refresh_tokens_p20260310"]
+        with patch.object(
+            partitions, "list_partitions", AsyncMock(return_value=existing)
+        ), patch.object(
+            partitions,
+            "default_partition",
+            AsyncMock(return_value="refresh_tokens_default"),
+        ):
+            created = await ensure_partitions(conn, TABLE, today=date(2026, 3, 9))
+
+        assert created == ["refresh_tokens_p20260311"]
+        sql = _executed_sql(conn)
+        assert sql[0].startswith("SELECT EXISTS (SELECT 1 FROM refresh_tokens_default")
+        assert sql[2].startswith("WITH moved AS (DELETE FROM refresh_tokens_default")
+        assert sql[3] == create_partition_sql("refresh_tokens", date(2026, 3, 11))
+        assert sql[4] == "INSERT INTO refresh_tokens SELECT * FROM partition_move"
+        assert sql[5] == "DROP TABLE partition_move"
+        bounds = conn.execute.await_args_list[2].args[1]
+        assert bounds == {
+            "start": datetime(2026, 3, 11, tzinfo=UTC),
+            "end": datetime(2026, 3, 12, tzinfo=UTC),
+        }
+
+    async def test_empty_range_is_created_directly(self):
+        """Test that nothing is moved when the default partition has no rows."""
+        conn = AsyncMock()
+        conn.execute.return_value = MagicMock(scalar=MagicMock(return_value=False))
+        existing = ["refresh_tokens_p20260309", "refresh_tokens_p20260310"]
+        with patch.object(
+            partitions, "list_partitions", AsyncMock(return_value=existing)
+        ), patch.object(
+            partitions,
+            "default_partition",
+            AsyncMock(return_value="refresh_tokens_default"),
+        ):
+            await ensure_partitions(conn, TABLE, today=date(2026, 3, 9))
+
+        sql = _executed_sql(conn)
+        assert len(sql) == 2
+        assert sql[1] == create_partition_sql("refresh_tokens", date(2026, 3, 11))
+
+    async def test_purge_expired_rows_of_default_partition(self):
+        """Test that the default partition keeps only rows within retention."""
+        conn = AsyncMock()
+        conn.execute.return_value = MagicMock(rowcount=3)
+        with patch.object(
+            partitions,
+            "default_partition",
+            AsyncMock(return_value="refresh_tokens_default"),
+        ):
+            purged = await purge_default_partition(conn, TABLE, today=date(2026, 3, 9))
+
+        assert purged == 3
+        assert _executed_sql(conn) == [
+            "DELETE FROM refresh_tokens_default WHERE expires_at < :cutoff"
+        ]
+        assert conn.execute.await_args.args[1] == {
+            "cutoff": datetime(2026, 3, 8, tzinfo=UTC)
+        }
+
+    async def test_purge_without_default_partition(self):
+        """Test that tables without a default partition are left alone."""
+        conn = AsyncMock()
+        with patch.object(
+            partitions, "default_partition", AsyncMock(return_value=None)
+        ):
+            assert await purge_default_partition(conn, TABLE) == 0
+
+        conn.execute.assert_not_awaited()
+
+    async def test_drop_only_fully_expired_partitions(self):
+        """Test that partitions inside the retention period are kept."""
+        conn = AsyncMock()
+        existing = [
+            "refresh_tokens_p20260306",
+            "refresh_tokens_p20260307",
+            "refresh_tokens_p20260308",
+            "refresh_tokens_p20260309",
+            "refresh_tokens_default",
+        ]
+        with patch.object(
+            partitions, "list_partitions", AsyncMock(return_value=existing)
+        ):
+            dropped = await drop_expired_partitions(conn, TABLE, today=date(2026, 3, 9))
+
+        assert dropped == ["refresh_tokens_p20260306", "refresh_tokens_p20260307"]
+        sql = _executed_sql(conn)
+        assert sql[0] == (
+            "ALTER TABLE refresh_tokens DETACH PARTITION refresh_tokens_p20260306"
+        )
+        assert sql[1] == "DROP TABLE refresh_tokens_p20260306"
+
+
+@pytest.mark.asyncio
+class TestRefreshTokenLookupHint:
+    """Test cases for the partition-pruning expires_at hint."""
+
+    async def test_lookup_with_expiry_hint(self, db_session: AsyncSession):
+        """Test that the hint matches within slack and excludes other days."""
+        user = await UserRepository(db_session).register_user(
+            username="hintuser",
+            full_name="Hint User",
+            cpf="12345678901",
+            email="hint@example.com",
+            password="hashed",
+        )
+        repo = RefreshTokenRepository(db_session)
+        jti = uuid7()
+        expires_at = (datetime.now(UTC) + timedelta(days=7)).replace(microsecond=0)
+        await repo.add_refresh_token(
+            RefreshToken(
+                jti=jti,
+                user_id=user.id,
+                token_hash="hash",
+                expires_at=expires_at,
+            )
+        )
+
+        assert await repo.get_refresh_token_by_jti(str(jti), expires_at)
+        assert await repo.get_refresh_token_by_jti(str(jti))
+        assert (
+            await repo.get_refresh_token_by_jti(
+                str(jti), expires_at - timedelta(days=1)
+            )
+            is None
+        )
@@ -0,0 +1,111 @@
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from passlib.hash import bcrypt
+
+from src.domain.use_cases.auth_service import AuthService
+from src.infrastructure.database.models.roles import UserRole
+from src.infrastructure.security.hash_calibration import calibrate_bcrypt
+from src.infrastructure.security.password_service import (
+    get_hash_scheme_options,
+    password_needs_rehash,
+    verify_password,
+)
+
+
+class TestPasswordPolicy:
+    """Test cases for the configurable hashing policy."""
+
+    def test_low_cost_hash_needs_rehash(self):
+        """Test that hashes below the configured cost are flagged."""
+        weak_hash = bcrypt.using(rounds=4).hash("secret")
+
+        assert verify_password("secret", weak_hash) is True
+        assert password_needs_rehash(weak_hash) is True
+
+    def test_unknown_hash_is_left_alone(self):
+        """Test that unrecognised hashes are not flagged for rehash."""
+        assert password_needs_rehash("not-a-hash") is False
+
+    def test_scheme_options_only_for_configured_schemes(self):
+        """Test that cost options are emitted per configured scheme."""
+        assert set(get_hash_scheme_options(["bcrypt"])) == {"bcrypt__rounds"}
+        argon2_options = get_hash_scheme_options(["argon2", "bcrypt"])
+        assert argon2_options["argon2__type"] == "ID"
+        assert "argon2__memory_cost" in argon2_options
+
+
+class TestRehashOnLogin:
+    """Test cases for transparent rehash in AuthService.authenticate_user."""
+
+    @pytest.fixture
+    def user(self):
+        user = Mock()
+        user.id = 7
+        user.username = "testuser"
+        user.email = "test@example.com"
+        user.password_hash = "old_hash"
+        user.is_active = True
+        user.role = UserRole.USER
+        return user
+
+    @pytest.mark.asyncio
+    async def test_rehash_is_scheduled(self, user):
+        """Test that outdated hashes are rewritten via the task scheduler."""
+        user_repository = AsyncMock()
+        user_repository.get_user_by_username.return_value = user
+        scheduler = Mock()
+        service = AuthService(user_repository, AsyncMock(), task_scheduler=scheduler)
+
+        with patch(
+            "src.domain.use_cases.auth_service.verify_password", return_value=True
+        ), patch(
+            "src.domain.use_cases.auth_service.password_needs_rehash",
+            return_value=True,
+        ):
+            await service.authenticate_user("testuser", "secret")
+
+        scheduler.assert_called_once_with(service._rehash_password, 7, "secret")
+        user_repository.update_password_hash.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_rehash_inline_without_scheduler(self, user):
+        """Test that the rehash is awaited when no scheduler is configured."""
+        user_repository = AsyncMock()
+        user_repository.get_user_by_username.return_value = user
+        service = AuthService(user_repository, AsyncMock())
+
+        with patch(
+            "src.domain.use_cases.auth_service.verify_password", return_value=True
+        ), patch(
+            "src.domain.use_cases.auth_service.password_needs_rehash",
+            return_value=True,
+        ), patch(
+            "src.domain.use_cases.auth_service.get_password_hash",
+            return_value="new_hash",
+        ):
+            await service.authenticate_user("testuser", "secret")
+
+        user_repository.update_password_hash.assert_awaited_once_with(7, "new_hash")
+
+
+class TestHashCalibration:
+    """Test cases for hash cost calibration."""
+
+    def test_calibrate_bcrypt_picks_highest_cost_within_target(self):
+        """Test that the strongest candidate under the budget is selected."""
+        result = calibrate_bcrypt(
+            target_ms=60_000, samples=2, min_rounds=4, max_rounds=5
+        )
+
+        assert result.params == {"rounds": 5}
+        assert result.meets_target is True
+        assert set(result.measurements) == {"rounds=4", "rounds=5"}
+        assert "BCRYPT_ROUNDS=5" in result.as_env()
+
+    def test_calibrate_bcrypt_falls_back_to_cheapest(self):
+        """Test that the cheapest candidate is returned when none fit."""
+        result = calibrate_bcrypt(target_ms=0, samples=2, min_rounds=4, max_rounds=6)
+
+        assert result.params == {"rounds": 4}
+        assert result.meets_target is False
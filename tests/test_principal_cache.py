@@ -0,0 +1,62 @@
+from datetime import UTC, datetime
+from unittest.mock import patch
+
+from src.api.http_cache import etag_matches
+from src.infrastructure.cache.principal_cache import Principal, PrincipalCache
+from src.infrastructure.database.models.roles import UserRole
+
+
+def _principal(user_id: int = 1, username: str = "alice") -> Principal:
+    return Principal(
+        id=user_id,
+        username=username,
+        email=f"{username}@example.com",
+        full_name=None,
+        cpf=None,
+        role=UserRole.USER,
+        is_active=True,
+        created_at=datetime.now(UTC),
+        version=1,
+    )
+
+
+class TestPrincipalCache:
+    """Test cases for the per-process principal cache."""
+
+    def test_entries_expire(self):
+        """Test that an entry is not served after its TTL."""
+        cache = PrincipalCache(ttl_seconds=30)
+        with patch("time.monotonic", return_value=100.0):
+            cache.put(_principal())
+        with patch("time.monotonic", return_value=129.0):
+            assert cache.get("alice") is not None
+        with patch("time.monotonic", return_value=130.0):
+            assert cache.get("alice") is None
+
+    def test_least_recently_used_is_evicted(self):
+        """Test that the cache stays within max_entries."""
+        cache = PrincipalCache(max_entries=2)
+        cache.put(_principal(1, "alice"))
+        cache.put(_principal(2, "bob"))
+        cache.get("alice")
+        cache.put(_principal(3, "carol"))
+
+        assert cache.get("bob") is None
+        assert cache.get("alice") is not None
+
+    def test_invalidate_user_id(self):
+        """Test that entries can be dropped by user id."""
+        cache = PrincipalCache()
+        cache.put(_principal(1, "alice"))
+
+        cache.invalidate_user_id(1)
+
+        assert cache.get("alice") is None
+
+    def test_etag_matching(self):
+        """Test If-None-Match lists, weak validators and the wildcard."""
+        assert etag_matches('"1.2"', '"1.2"')
+        assert etag_matches('"0.1", W/"1.2"', '"1.2"')
+        assert etag_matches("*", '"1.2"')
+        assert not etag_matches('"1.1"', '"1.2"')
+        assert not etag_matches(None, '"1.2"')
@@ -0,0 +1,81 @@
+import threading
+import time
+
+import pytest
+
+from src.infrastructure.monitoring.profiler import (
+    TRUNCATED,
+    Profile,
+    ProfilerBusyError,
+    SamplingProfiler,
+)
+
+
+def _busy_worker(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+class TestSamplingProfiler:
+    """Test cases for the in-process sampling profiler."""
+
+    def test_samples_busy_thread(self):
+        """Test that a thread burning CPU shows up in the stacks."""
+        stop = threading.Event()
+        worker = threading.Thread(target=_busy_worker, args=(stop,))
+        worker.start()
+        profiler = SamplingProfiler(interval_ms=1, thread_ids={worker.ident})
+        try:
+            profiler.start()
+            time.sleep(0.05)
+            profile = profiler.stop()
+        finally:
+            stop.set()
+            worker.join()
+
+        assert profile.samples > 0
+        assert "_busy_worker" in profile.collapsed()
+
+    def test_only_one_profile_at_a_time(self):
+        """Test that concurrent profiles are refused."""
+        first = SamplingProfiler()
+        first.start()
+        try:
+            with pytest.raises(ProfilerBusyError):
+                SamplingProfiler().start()
+        finally:
+            first.stop()
+
+        # The lock is released once the first profile stops
+        second = SamplingProfiler()
+        second.start()
+        second.stop()
+
+    def test_distinct_stacks_are_capped(self):
+        """Test that stacks beyond max_stacks are folded into one bucket."""
+        stop = threading.Event()
+        worker = threading.Thread(target=stop.wait)
+        worker.start()
+        profiler = SamplingProfiler(thread_ids={worker.ident}, max_stacks=1)
+        profiler.profile.stacks[("already", "seen")] = 1
+
+        profiler._sample()
+        stop.set()
+        worker.join()
+
+        assert profiler.profile.stacks[(TRUNCATED,)] == 1
+        assert len(profiler.profile.stacks) == 2
+
+    def test_speedscope_shares_frames(self):
+        """Test that speedscope output indexes each frame once."""
+        profile = Profile(interval_ms=10, duration_seconds=1.0)
+        profile.stacks[("main", "handler", "hash")] = 3
+        profile.stacks[("main", "handler")] = 1
+
+        data = profile.speedscope()
+
+        frames = [frame["name"] for frame in data["shared"]["frames"]]
+        assert frames == ["main", "handler", "hash"]
+        assert data["profiles"][0]["samples"] == [[0, 1, 2], [0, 1]]
+        assert data["profiles"][0]["weights"] == [0.03, 0.01]
+        assert profile.collapsed() == "main;handler;hash 3\nmain;handler 1\n"
@@ -0,0 +1,196 @@
+"""
+Per-request SQL accounting and query counts per endpoint.
+
+The counts pin how many statements each endpoint issues; a change that adds
+a query (or an N+1 loop) to a hot path has to update them deliberately.
+"""
+
+import logging
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+
+from conftest import metric_sample
+from src.infrastructure.database.models.roles import UserRole
+from src.infrastructure.database.query_stats import QueryStats, report, track_queries
+from src.infrastructure.monitoring.metrics import (
+    DB_QUERIES_PER_REQUEST,
+    QUERY_BUDGET_EXCEEDED_TOTAL,
+)
+
+
+@pytest.fixture
+async def admin_tokens(client: AsyncClient, test_user_data: dict) -> dict:
+    admin_data = dict(test_user_data, role=UserRole.ADMIN)
+    response = await client.post("/api/v1/auth/signup", json=admin_data)
+    assert response.status_code == 201
+    response = await client.post(
+        "/api/v1/auth/login",
+        json={
+            "username": test_user_data["username"],
+            "password": test_user_data["password"],
+        },
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.fixture
+def admin_headers(admin_tokens: dict) -> dict:
+    return {"Authorization": f"Bearer {admin_tokens['access_token']}"}
+
+
+class TestEndpointQueryCounts:
+    """Exact number of SQL statements per endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_signup(
+        self, client: AsyncClient, test_user_data, assert_query_count
+    ):
+        """Test signup: username and email checks, insert and re-read."""
+        with assert_query_count(4):
+            response = await client.post("/api/v1/auth/signup", json=test_user_data)
+        assert response.status_code == 201
+
+    @pytest.mark.asyncio
+    async def test_signup_availability(self, client: AsyncClient, assert_query_count):
+        """Test availability: one lookup."""
+        with assert_query_count(1):
+            response = await client.get(
+                "/api/v1/auth/signup/availability", params={"username": "someone"}
+            )
+        assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_login(
+        self, client: AsyncClient, test_user_data, created_user, assert_query_count
+    ):
+        """Test login: user lookup, refresh token insert and re-read."""
+        with assert_query_count(3):
+            response = await client.post(
+                "/api/v1/auth/login",
+                json={
+                    "username": test_user_data["username"],
+                    "password": test_user_data["password"],
+                },
+            )
+        assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_me_cold_and_cached(
+        self, client: AsyncClient, admin_headers, assert_query_count
+    ):
+        """Test /me: one lookup, then none while the principal is cached."""
+        with assert_query_count(1):
+            response = await client.get("/api/v1/auth/me", headers=admin_headers)
+        assert response.status_code == 200
+        with assert_query_count(0):
+            response = await client.get("/api/v1/auth/me", headers=admin_headers)
+        assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_refresh(self, client: AsyncClient, admin_tokens, assert_query_count):
+        """Test refresh: token and user lookups, rotation and re-read."""
+        with assert_query_count(4):
+            response = await client.post(
+                "/api/v1/auth/refresh",
+                json={"refresh_token": admin_tokens["refresh_token"]},
+            )
+        assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_sessions(
+        self, client: AsyncClient, admin_headers, assert_query_count
+    ):
+        """Test session listing: user lookup and one index scan."""
+        with assert_query_count(2):
+            response = await client.get("/api/v1/auth/sessions", headers=admin_headers)
+        assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_admin_dashboard(
+        self, client: AsyncClient, admin_headers, assert_query_count
+    ):
+        """Test dashboard: user lookup and four counts."""
+        with assert_query_count(5):
+            response = await client.get(
+                "/api/v1/admin/dashboard", headers=admin_headers
+            )
+        assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_admin_users(
+        self, client: AsyncClient, admin_headers, assert_query_count
+    ):
+        """Test user listing: user lookup and one page, independent of its size."""
+        with assert_query_count(2):
+            response = await client.get("/api/v1/admin/users", headers=admin_headers)
+        assert response.status_code == 200
+        assert len(response.json()) >= 1
+
+
+class TestQueryAccounting:
+    """Test cases for the accounting hooks and the per-request report."""
+
+    @pytest.mark.asyncio
+    async def test_nested_trackers_both_count(self, db_session):
+        """Test that an enclosing tracker sees the statements of an inner one."""
+        with track_queries() as outer:
+            await db_session.execute(text("SELECT 1"))
+            with track_queries() as inner:
+                await db_session.execute(text("SELECT 2"))
+
+        assert inner.queries == 1
+        assert outer.queries == 2
+        assert outer.seconds >= inner.seconds > 0
+
+    @pytest.mark.asyncio
+    async def test_request_exported_per_route(self, client: AsyncClient, admin_headers):
+        """Test that requests are recorded under their route template."""
+        route = "/api/v1/admin/dashboard"
+        name = "db_queries_per_request_count"
+        before = metric_sample(DB_QUERIES_PER_REQUEST, name, route=route)
+
+        await client.get(route, headers=admin_headers)
+
+        assert metric_sample(DB_QUERIES_PER_REQUEST, name, route=route) == before + 1
+
+    def test_budget_exceeded_is_logged(self, caplog, monkeypatch):
+        """Test that a request over its route budget is counted and logged."""
+        from src.config import settings
+
+        monkeypatch.setattr(settings, "QUERY_BUDGETS", {"/budgeted": 2})
+        stats = QueryStats()
+        for i in range(3):
+            stats.add(f"SELECT {i}", 1, 0.001)
+        before = metric_sample(
+            QUERY_BUDGET_EXCEEDED_TOTAL,
+            "db_query_budget_exceeded_total",
+            route="/budgeted",
+        )
+
+        with caplog.at_level(logging.WARNING):
+            report("/budgeted", stats)
+
+        assert "ran 3 queries (budget 2" in caplog.text
+        assert (
+            metric_sample(
+                QUERY_BUDGET_EXCEEDED_TOTAL,
+                "db_query_budget_exceeded_total",
+                route="/budgeted",
+            )
+            == before + 1
+        )
+
+    def test_repeated_statement_is_logged(self, caplog):
+        """Test that one statement run in a loop is reported as a possible N+1."""
+        stats = QueryStats()
+        for _ in range(5):
+            stats.add("SELECT * FROM users WHERE id = ?", 1, 0.001)
+
+        with caplog.at_level(logging.WARNING):
+            report("/loop", stats)
+
+        assert "possible N+1" in caplog.text
+        assert "ran 5 queries" not in caplog.text
@@ -0,0 +1,161 @@
+"""
+Query plans of the repository queries.
+
+Each repository call is executed against the test schema and the SQL it
+sends is run through SQLite's EXPLAIN QUERY PLAN, asserting that the
+intended index is used. The PostgreSQL plans before and after the index
+audit migration are described in docs/QUERY_PLANS.md.
+"""
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.infrastructure.database.models.refresh_token import RefreshToken
+from src.infrastructure.database.repositories.refresh_token_repository import (
+    RefreshTokenRepository,
+)
+from src.infrastructure.database.repositories.user_repository import UserRepository
+from src.infrastructure.security.token_service import uuid7
+
+JTI = uuid7()
+
+
+async def _get_user(session: AsyncSession, user_id: int) -> None:
+    await UserRepository(session).get_user(user_id)
+
+
+async def _get_user_by_username(session: AsyncSession, user_id: int) -> None:
+    await UserRepository(session).get_user_by_username("planuser")
+
+
+async def _get_user_by_email(session: AsyncSession, user_id: int) -> None:
+    await UserRepository(session).get_user_by_email("plan@example.com")
+
+
+async def _find_users_by_username(session: AsyncSession, user_id: int) -> None:
+    await UserRepository(session).find_users(username="PlanUser")
+
+
+async def _find_users_by_email(session: AsyncSession, user_id: int) -> None:
+    await UserRepository(session).find_users(email="Plan@Example.com")
+
+
+async def _update_password_hash(session: AsyncSession, user_id: int) -> None:
+    await UserRepository(session).update_password_hash(user_id, "new-hash")
+
+
+async def _stream_users_with_sessions(session: AsyncSession, user_id: int) -> None:
+    async for _ in UserRepository(session).stream_users(include_sessions=True):
+        pass
+
+
+async def _list_active_sessions(session: AsyncSession, user_id: int) -> None:
+    await RefreshTokenRepository(session).list_active_sessions(user_id)
+
+
+async def _get_refresh_token_by_jti(session: AsyncSession, user_id: int) -> None:
+    await RefreshTokenRepository(session).get_refresh_token_by_jti(str(JTI))
+
+
+async def _delete_refresh_token(session: AsyncSession, user_id: int) -> None:
+    await RefreshTokenRepository(session).delete_refresh_token(str(JTI))
+
+
+@pytest_asyncio.fixture
+async def seeded_user_id(db_session: AsyncSession) -> int:
+    user = await UserRepository(db_session).register_user(
+        username="planuser",
+        full_name="Plan User",
+        cpf="12345678901",
+        email="plan@example.com",
+        password="hashed",
+    )
+    await RefreshTokenRepository(db_session).add_refresh_token(
+        RefreshToken(
+            jti=JTI,
+            user_id=user.id,
+            token_hash="hash",
+            expires_at=datetime.now(UTC) + timedelta(days=7),
+        )
+    )
+    return user.id
+
+
+@pytest.fixture
+def captured_statements(db_session: AsyncSession):
+    statements: list[tuple[str, tuple]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            statements.append((statement, parameters))
+
+    engine = db_session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", capture)
+    yield statements
+    event.remove(engine, "before_cursor_execute", capture)
+
+
+@pytest.mark.asyncio
+class TestRepositoryQueryPlans:
+    """Test that repository queries are served by the intended index."""
+
+    @pytest.mark.parametrize(
+        ("query", "table", "expected"),
+        [
+            (_get_user, "users", "USING INTEGER PRIMARY KEY"),
+            (_get_user_by_username, "users", "USING INDEX ix_users_username ("),
+            (_get_user_by_email, "users", "USING INDEX ix_users_email ("),
+            (_find_users_by_username, "users", "USING INDEX ix_users_username_lower"),
+            (_find_users_by_email, "users", "USING INDEX ix_users_email_lower"),
+            (_update_password_hash, "users", "USING INTEGER PRIMARY KEY"),
+            # The export scans users by design; only the join side is checked
+            (
+                _stream_users_with_sessions,
+                "refresh_tokens",
+                "INDEX ix_refresh_tokens_user_sessions",
+            ),
+            (
+                _list_active_sessions,
+                "refresh_tokens",
+                "INDEX ix_refresh_tokens_user_sessions",
+            ),
+            # SQLite's name for the (jti, expires_at) unique constraint
+            (
+                _get_refresh_token_by_jti,
+                "refresh_tokens",
+                "USING INDEX sqlite_autoindex_refresh_tokens_1 (jti=?)",
+            ),
+            (
+                _delete_refresh_token,
+                "refresh_tokens",
+                "USING INDEX sqlite_autoindex_refresh_tokens_1 (jti=?)",
+            ),
+        ],
+        ids=lambda value: value.__name__.lstrip("_") if callable(value) else None,
+    )
+    async def test_query_uses_index(
+        self,
+        db_session: AsyncSession,
+        seeded_user_id: int,
+        captured_statements: list,
+        query,
+        table: str,
+        expected: str,
+    ):
+        """Test that the query's plan uses the expected index, not a table scan."""
+        await query(db_session, seeded_user_id)
+        assert captured_statements, "query did not reach the database"
+
+        statement, parameters = captured_statements[-1]
+        conn = await db_session.connection()
+        plan = (
+            await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        ).all()
+        details = "\n".join(row[-1] for row in plan)
+
+        assert expected in details, details
+        assert f"SCAN {table}\n" not in f"{details}\n", details
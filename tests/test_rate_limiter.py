@@ -0,0 +1,143 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+
+from src.config import settings
+from src.infrastructure.security.rate_limiter import (
+    InMemoryRateLimitBackend,
+    RedisRateLimitBackend,
+)
+
+
+class FakeRedis:
+    """Minimal asyncio Redis stand-in for the shared backend."""
+
+    def __init__(self):
+        self.data: dict[str, int] = {}
+
+    async def incr(self, key):
+        self.data[key] = self.data.get(key, 0) + 1
+        return self.data[key]
+
+    async def decr(self, key):
+        self.data[key] = self.data.get(key, 0) - 1
+        return self.data[key]
+
+    async def expire(self, key, seconds):
+        return True
+
+    async def get(self, key):
+        return self.data.get(key)
+
+
+class TestInMemoryRateLimitBackend:
+    """Test cases for the in-process sliding window backend."""
+
+    @pytest.mark.asyncio
+    async def test_allows_up_to_limit(self):
+        """Test that requests beyond the limit are rejected with Retry-After."""
+        backend = InMemoryRateLimitBackend()
+
+        results = [await backend.hit("login:ip:1.2.3.4", 3, 60) for _ in range(4)]
+
+        assert [r.allowed for r in results] == [True, True, True, False]
+        assert 1 <= results[-1].retry_after <= 60
+
+    @pytest.mark.asyncio
+    async def test_keys_are_independent(self):
+        """Test that limits are tracked per key."""
+        backend = InMemoryRateLimitBackend()
+
+        await backend.hit("a", 1, 60)
+        result = await backend.hit("b", 1, 60)
+
+        assert result.allowed is True
+
+    @pytest.mark.asyncio
+    async def test_memory_is_bounded(self):
+        """Test that least recently used keys are evicted."""
+        backend = InMemoryRateLimitBackend(max_keys=2)
+
+        for key in ("a", "b", "c"):
+            await backend.hit(key, 1, 60)
+
+        assert len(backend._counters) == 2
+        assert (await backend.hit("a", 1, 60)).allowed is True
+
+    @pytest.mark.asyncio
+    async def test_reset(self):
+        """Test that reset clears all counters."""
+        backend = InMemoryRateLimitBackend()
+        await backend.hit("a", 1, 60)
+
+        await backend.reset()
+
+        assert (await backend.hit("a", 1, 60)).allowed is True
+
+
+class TestRedisRateLimitBackend:
+    """Test cases for the shared backend."""
+
+    @pytest.mark.asyncio
+    async def test_allows_up_to_limit(self):
+        """Test that the shared backend enforces the same limits."""
+        backend = RedisRateLimitBackend(FakeRedis())
+
+        results = [await backend.hit("signup:ip:1.2.3.4", 2, 60) for _ in range(3)]
+
+        assert [r.allowed for r in results] == [True, True, False]
+        assert results[-1].retry_after >= 1
+
+    @pytest.mark.asyncio
+    async def test_matches_in_memory_backend(self, monkeypatch):
+        """Test that both backends allow the same requests and skip rejections."""
+        now = [1_000_050.0]
+        monkeypatch.setattr(
+            "src.infrastructure.security.rate_limiter.time.time", lambda: now[0]
+        )
+        redis = FakeRedis()
+        backends = [InMemoryRateLimitBackend(), RedisRateLimitBackend(redis)]
+        outcomes = []
+
+        for backend in backends:
+            now[0] = 1_000_050.0
+            allowed = [(await backend.hit("k", 3, 60)).allowed for _ in range(5)]
+            # Half of the previous window still counts: 1.5 + 0 < 3 < 1.5 + 2
+            now[0] += 60
+            allowed += [(await backend.hit("k", 3, 60)).allowed for _ in range(3)]
+            outcomes.append(allowed)
+
+        assert outcomes[0] == outcomes[1]
+        assert outcomes[0] == [True] * 3 + [False] * 2 + [True, True, False]
+        assert sorted(redis.data.values()) == [2, 3]
+
+
+class TestRateLimitedEndpoints:
+    """Test cases for rate limiting on the authentication endpoints."""
+
+    @pytest.mark.asyncio
+    async def test_login_throttled_per_username(self, client: AsyncClient, monkeypatch):
+        """Test that repeated logins for one username receive 429."""
+        monkeypatch.setattr(settings, "RATE_LIMIT_LOGIN_PER_USERNAME", 2)
+        credentials = {"username": "nobody", "password": "wrong"}
+
+        statuses = [
+            (await client.post("/api/v1/auth/login", json=credentials)).status_code
+            for _ in range(2)
+        ]
+        response = await client.post("/api/v1/auth/login", json=credentials)
+
+        assert statuses == [status.HTTP_401_UNAUTHORIZED] * 2
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert int(response.headers["Retry-After"]) >= 1
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_can_be_disabled(self, client: AsyncClient, monkeypatch):
+        """Test that no requests are throttled when disabled."""
+        monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+        monkeypatch.setattr(settings, "RATE_LIMIT_LOGIN_PER_USERNAME", 1)
+        credentials = {"username": "nobody", "password": "wrong"}
+
+        for _ in range(3):
+            response = await client.post("/api/v1/auth/login", json=credentials)
+            assert response.status_code == status.HTTP_401_UNAUTHORIZED
@@ -1,3 +1,5 @@
+import time
+import uuid
 from datetime import UTC, datetime, timedelta
 
 import pytest
@@ -11,6 +13,7 @@ from src.infrastructure.security.token_service import (
     create_refresh_token,
     decode_refresh_token,
     generate_token_hash,
+    uuid7,
     verify_refresh_token,
 )
 
@@ -85,6 +88,34 @@ class TestJWTTokens:
         assert len(token) > 0
 
 
+class TestUUID7:
+    """Test time-ordered token identifiers."""
+
+    def test_version_and_variant(self):
+        """Test that identifiers are RFC 9562 version 7 UUIDs."""
+        value = uuid7()
+
+        assert value.version == 7
+        assert value.variant == uuid.RFC_4122
+
+    def test_embeds_current_time(self):
+        """Test that the leading 48 bits are the Unix time in milliseconds."""
+        before = time.time_ns() // 1_000_000
+        value = uuid7()
+        after = time.time_ns() // 1_000_000
+
+        assert before <= value.int >> 80 <= after
+
+    def test_ordered_across_milliseconds(self):
+        """Test that later identifiers sort after earlier ones."""
+        first = uuid7()
+        time.sleep(0.002)
+        second = uuid7()
+
+        assert first < second
+        assert str(first) < str(second)
+
+
 class TestRefreshTokenUtils:
     """Test refresh token utility functions."""
 
@@ -99,7 +130,7 @@ class TestRefreshTokenUtils:
         assert isinstance(token, str)
         assert isinstance(jti, str)
         assert len(token) > 0
-        assert len(jti) > 0
+        assert uuid.UUID(jti).version == 7
 
         # Should be decodeable
         payload = decode_refresh_token(token)
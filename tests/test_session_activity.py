@@ -0,0 +1,78 @@
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.infrastructure.cache.session_activity import SessionActivityTracker
+from src.infrastructure.database.models.refresh_token import RefreshToken
+from src.infrastructure.database.repositories.user_repository import UserRepository
+from src.infrastructure.security.token_service import uuid7
+
+
+async def _add_session(db_session: AsyncSession) -> RefreshToken:
+    user = await UserRepository(db_session).register_user(
+        username="sessionuser",
+        full_name="Session User",
+        cpf="12345678901",
+        email="session@example.com",
+        password="hashed",
+    )
+    token = RefreshToken(
+        jti=uuid7(),
+        user_id=user.id,
+        token_hash="hash",
+        expires_at=datetime.now(UTC) + timedelta(days=7),
+    )
+    db_session.add(token)
+    await db_session.commit()
+    return token
+
+
+@pytest.mark.asyncio
+class TestSessionActivityTracker:
+    """Test cases for coalesced session last-used writes."""
+
+    async def test_touches_are_coalesced(self):
+        """Test that only the latest touch per session is kept."""
+        tracker = SessionActivityTracker()
+        first = datetime(2026, 1, 1, tzinfo=UTC)
+        latest = first + timedelta(minutes=1)
+
+        tracker.touch(1, first)
+        tracker.touch(1, latest)
+        tracker.touch(2, first)
+
+        assert tracker.pending == 2
+        assert tracker.last_used(1) == latest
+
+    async def test_flush_writes_last_used(self, db_session: AsyncSession):
+        """Test that a flush writes the pending touches and clears them."""
+        token = await _add_session(db_session)
+        tracker = SessionActivityTracker()
+        when = datetime(2026, 1, 1, 12, tzinfo=UTC)
+        tracker.touch(token.id, when)
+
+        written = await tracker.flush(
+            async_sessionmaker(db_session.bind, expire_on_commit=False)
+        )
+
+        assert written == 1
+        assert tracker.pending == 0
+        last_used = (
+            await db_session.execute(
+                select(RefreshToken.last_used_at).filter(RefreshToken.id == token.id)
+            )
+        ).scalar_one()
+        assert last_used.replace(tzinfo=UTC) == when
+
+    async def test_failed_flush_keeps_touches(self):
+        """Test that touches survive a database error for the next flush."""
+        tracker = SessionActivityTracker()
+        tracker.touch(1)
+
+        def broken_factory():
+            raise RuntimeError("db down")
+
+        assert await tracker.flush(broken_factory) == 0
+        assert tracker.pending == 1
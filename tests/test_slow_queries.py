@@ -0,0 +1,185 @@
+import logging
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from src.infrastructure.database.models.roles import UserRole
+from src.infrastructure.database.slow_queries import (
+    SlowQuerySampler,
+    get_slow_query_sampler,
+    normalize_statement,
+)
+
+
+@pytest_asyncio.fixture
+async def engine():
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    async with engine.begin() as conn:
+        await conn.execute(
+            text("CREATE TABLE refresh_tokens (id INTEGER PRIMARY KEY, jti TEXT)")
+        )
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def sampler(engine):
+    # Every statement counts as slow
+    sampler = SlowQuerySampler(threshold_ms=0, explains_per_minute=2)
+    sampler.install(engine)
+    yield sampler
+    sampler.uninstall()
+
+
+async def _run(engine, sql: str, **params) -> None:
+    async with engine.connect() as conn:
+        await conn.execute(text(sql), params)
+
+
+class TestNormalizeStatement:
+    """Test cases for statement normalization."""
+
+    def test_replaces_literals_and_parameters(self):
+        """Test that statements differing only in values share a key."""
+        assert normalize_statement(
+            "SELECT * FROM users\n WHERE id = $1 AND name = 'bob' LIMIT 10"
+        ) == normalize_statement(
+            "SELECT * FROM users WHERE id = $2 AND name = 'al' LIMIT 5"
+        )
+
+    def test_collapses_in_lists(self):
+        """Test that IN lists of different lengths share a key."""
+        assert normalize_statement(
+            "SELECT 1 WHERE id IN (?, ?)"
+        ) == normalize_statement("SELECT 1 WHERE id IN (?, ?, ?, ?)")
+
+    def test_keeps_casts(self):
+        """Test that PostgreSQL casts are not taken for parameters."""
+        assert "::jsonb" in normalize_statement("SELECT $1::jsonb")
+
+
+class TestSlowQuerySampler:
+    """Test cases for the slow-query sampler."""
+
+    @pytest.mark.asyncio
+    async def test_captures_plan_with_seq_scan(self, engine, sampler, caplog):
+        """Test that a full table scan is captured and flagged."""
+        with caplog.at_level(logging.WARNING):
+            await _run(engine, "SELECT * FROM refresh_tokens WHERE jti = :jti", jti="x")
+            await sampler.wait_idle()
+
+        [query] = sampler.queries()
+        assert query.statement == "SELECT * FROM refresh_tokens WHERE jti = ?"
+        assert query.count == 1
+        assert query.plan
+        assert query.seq_scans == ["refresh_tokens"]
+        assert "scans refresh_tokens sequentially" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_index_lookup_is_not_flagged(self, engine, sampler):
+        """Test that a primary key lookup has a plan but no seq scan."""
+        await _run(engine, "SELECT * FROM refresh_tokens WHERE id = :id", id=1)
+        await sampler.wait_idle()
+
+        [query] = sampler.queries()
+        assert query.plan
+        assert query.seq_scans == []
+        assert sampler.queries(seq_scans_only=True) == []
+
+    @pytest.mark.asyncio
+    async def test_same_statement_explained_once(self, engine, sampler):
+        """Test that repeats are counted without explaining them again."""
+        for jti in ("a", "b", "c"):
+            await _run(engine, "SELECT * FROM refresh_tokens WHERE jti = :jti", jti=jti)
+            await sampler.wait_idle()
+
+        [query] = sampler.queries()
+        assert query.count == 3
+        assert len(sampler._explain_times) == 1
+
+    @pytest.mark.asyncio
+    async def test_explains_are_rate_limited(self, engine, sampler):
+        """Test that no more than the configured plans are captured per minute."""
+        for sql in (
+            "SELECT id FROM refresh_tokens",
+            "SELECT jti FROM refresh_tokens",
+            "SELECT id, jti FROM refresh_tokens",
+        ):
+            await _run(engine, sql)
+            await sampler.wait_idle()
+
+        plans = [query.plan for query in sampler.queries()]
+        assert len(plans) == 3
+        assert sum(plan is not None for plan in plans) == 2
+
+    @pytest.mark.asyncio
+    async def test_fast_statements_are_ignored(self, engine):
+        """Test that statements under the threshold are not recorded."""
+        sampler = SlowQuerySampler(threshold_ms=10_000)
+        sampler.install(engine)
+        try:
+            await _run(engine, "SELECT * FROM refresh_tokens")
+        finally:
+            sampler.uninstall()
+
+        assert sampler.queries() == []
+
+    def test_buffer_is_bounded(self):
+        """Test that the least recently seen statements are evicted."""
+        sampler = SlowQuerySampler(max_statements=2)
+        for sql in (
+            "SELECT * FROM a",
+            "SELECT * FROM b",
+            "SELECT * FROM a",
+            "SELECT * FROM c",
+        ):
+            sampler.observe(sql, None, 500)
+
+        assert [q.statement for q in sampler.queries()] == [
+            "SELECT * FROM c",
+            "SELECT * FROM a",
+        ]
+
+
+class TestAdminSlowQueries:
+    """Test cases for the /admin/slow-queries endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_lists_slow_queries(self, client: AsyncClient, test_user_data):
+        """Test that admins see the sampled statements."""
+        admin_data = dict(test_user_data, role=UserRole.ADMIN)
+        await client.post("/api/v1/auth/signup", json=admin_data)
+        response = await client.post(
+            "/api/v1/auth/login",
+            json={
+                "username": test_user_data["username"],
+                "password": test_user_data["password"],
+            },
+        )
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        get_slow_query_sampler().observe("SELECT * FROM users WHERE id = 7", None, 900)
+
+        response = await client.get("/api/v1/admin/slow-queries", headers=headers)
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["count"] == 1
+        assert body["queries"][0]["statement"] == "SELECT * FROM users WHERE id = ?"
+        assert body["queries"][0]["max_ms"] == 900
+
+    @pytest.mark.asyncio
+    async def test_requires_admin(self, client: AsyncClient, auth_token):
+        """Test that regular users are refused."""
+        response = await client.get(
+            "/api/v1/admin/slow-queries",
+            headers={"Authorization": f"Bearer {auth_token}"},
+        )
+        assert response.status_code == 403
@@ -0,0 +1,54 @@
+import pytest
+
+from src.infrastructure.monitoring.startup import (
+    ImportTiming,
+    StartupReport,
+    format_startup_report,
+    measure_lifespan,
+    parse_importtime,
+)
+
+
+class TestStartupReport:
+    """Test cases for the start-up time report."""
+
+    def test_parse_importtime_skips_header(self):
+        """Test that importtime output is parsed into timings."""
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   jose.exceptions\n"
+            "import time:       300 |        420 | jose\n"
+        )
+
+        timings = parse_importtime(output)
+
+        assert timings == [
+            ImportTiming(module="jose.exceptions", self_us=120, cumulative_us=120),
+            ImportTiming(module="jose", self_us=300, cumulative_us=420),
+        ]
+
+    def test_format_startup_report_orders_by_cumulative_time(self):
+        """Test that the slowest imports are listed first."""
+        report = StartupReport(
+            import_seconds=0.5,
+            lifespan_seconds=0.1,
+            imports=[
+                ImportTiming(module="fast", self_us=10, cumulative_us=10),
+                ImportTiming(module="slow", self_us=900, cumulative_us=9000),
+            ],
+        )
+
+        text = format_startup_report(report, top=1)
+
+        assert "Ready after:" in text
+        assert "slow" in text
+        assert "fast" not in text
+
+    @pytest.mark.asyncio
+    async def test_measure_lifespan(self):
+        """Test that the lifespan start-up hook runs and is timed."""
+        from src.api.main import app
+
+        elapsed = await measure_lifespan(app)
+
+        assert elapsed >= 0
@@ -0,0 +1,269 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from src.config import settings
+from src.infrastructure.database import circuit_breaker, timeouts
+from src.infrastructure.database.circuit_breaker import get_circuit_breaker
+from src.infrastructure.database.pool import TimedAsyncQueuePool
+from src.infrastructure.database.timeouts import (
+    AGGREGATE,
+    BULK,
+    LOOKUP,
+    DatabaseTimeoutError,
+    DeadlineExceededError,
+    DeadlineMiddleware,
+    connect_args,
+    deadline,
+    effective_timeout_ms,
+    remaining_seconds,
+)
+from src.infrastructure.monitoring.metrics import (
+    DB_CANCELLATIONS_TOTAL,
+    DB_DEADLINE_EXCEEDED_TOTAL,
+    DB_STATEMENT_TIMEOUTS_TOTAL,
+)
+
+
+class RecordingCursor:
+    def __init__(self, executed: list[str]):
+        self.executed = executed
+
+    def execute(self, statement: str) -> None:
+        self.executed.append(statement)
+
+    def close(self) -> None:
+        pass
+
+
+class FakePostgresConnection:
+    """Just enough of a Connection for the timeout hooks."""
+
+    def __init__(self):
+        self.dialect = SimpleNamespace(name="postgresql")
+        self.info: dict = {}
+        self.executed: list[str] = []
+        self.connection = SimpleNamespace(cursor=lambda: RecordingCursor(self.executed))
+
+    def run(self, query_class: str = LOOKUP) -> None:
+        context = SimpleNamespace(execution_options={"query_class": query_class})
+        timeouts._before_cursor_execute(self, None, "SELECT 1", (), context, False)
+
+
+class QueryCanceledError(Exception):
+    sqlstate = "57014"
+
+
+def error_context(error: BaseException, connection=None, query_class=LOOKUP):
+    return SimpleNamespace(
+        original_exception=error,
+        sqlalchemy_exception=None,
+        connection=connection,
+        execution_context=SimpleNamespace(
+            execution_options={"query_class": query_class}
+        ),
+        is_disconnect=not isinstance(error, Exception),
+    )
+
+
+def counter(metric, **labels) -> float:
+    return metric.labels(**labels)._value.get()
+
+
+@pytest.fixture
+def timeout_settings(monkeypatch):
+    monkeypatch.setattr(settings, "STATEMENT_TIMEOUT_LOOKUP_MS", 2000)
+    monkeypatch.setattr(settings, "STATEMENT_TIMEOUT_AGGREGATE_MS", 15_000)
+    monkeypatch.setattr(settings, "STATEMENT_TIMEOUT_BULK_MS", 0)
+
+
+class TestEffectiveTimeout:
+    """Test cases for combining query class timeouts with the deadline."""
+
+    def test_class_timeouts(self, timeout_settings):
+        """Test that each class gets its configured timeout."""
+        assert effective_timeout_ms(LOOKUP) == (2000, False)
+        assert effective_timeout_ms(AGGREGATE) == (15_000, False)
+        assert effective_timeout_ms(BULK) == (0, False)
+        assert effective_timeout_ms("unknown") == (2000, False)
+
+    def test_deadline_cuts_timeouts(self, timeout_settings):
+        """Test that the deadline limits classes with a longer or no timeout."""
+        assert effective_timeout_ms(LOOKUP, remaining=5.0) == (2000, False)
+        assert effective_timeout_ms(AGGREGATE, remaining=5.0) == (5000, True)
+        assert effective_timeout_ms(BULK, remaining=5.0) == (5000, True)
+        assert effective_timeout_ms(LOOKUP, remaining=0.0001) == (1, True)
+
+    def test_connect_args_only_for_asyncpg(self, timeout_settings):
+        """Test that the lookup timeout is the connection default on PostgreSQL."""
+        assert connect_args("postgresql+asyncpg://u:p@db/auth") == {
+            "server_settings": {"statement_timeout": "2000"}
+        }
+        assert connect_args("sqlite+aiosqlite:///:memory:") == {}
+
+
+class TestSetLocal:
+    """Test cases for SET LOCAL statement_timeout on PostgreSQL."""
+
+    def test_lookups_use_the_connection_default(self, timeout_settings):
+        """Test that lookups need no extra round trip."""
+        conn = FakePostgresConnection()
+
+        conn.run()
+        conn.run()
+
+        assert conn.executed == []
+
+    def test_set_once_per_change(self, timeout_settings):
+        """Test that the timeout is only set when the class needs another one."""
+        conn = FakePostgresConnection()
+
+        conn.run(AGGREGATE)
+        conn.run(AGGREGATE)
+        conn.run(BULK)
+        conn.run(LOOKUP)
+
+        assert conn.executed == [
+            "SET LOCAL statement_timeout = 15000",
+            "SET LOCAL statement_timeout = 0",
+            "SET LOCAL statement_timeout = 2000",
+        ]
+
+    def test_reset_with_the_transaction(self, timeout_settings):
+        """Test that a new transaction starts from the connection default."""
+        conn = FakePostgresConnection()
+        conn.run(AGGREGATE)
+
+        timeouts._end_transaction(conn)
+        conn.run(LOOKUP)
+        timeouts._rollback_savepoint(conn, "sp_1", None)
+        conn.run(LOOKUP)
+
+        assert conn.executed == [
+            "SET LOCAL statement_timeout = 15000",
+            "SET LOCAL statement_timeout = 2000",
+        ]
+
+    def test_deadline_tightens_the_timeout(self, timeout_settings):
+        """Test that a deadline shorter than the class timeout is applied once."""
+        conn = FakePostgresConnection()
+
+        with deadline(1000):
+            conn.run(LOOKUP)
+            conn.run(LOOKUP)
+
+        assert len(conn.executed) == 1
+        applied = int(conn.executed[0].rsplit("=", 1)[1])
+        assert 0 < applied <= 1000
+        assert conn.info["statement_timeout"] == (applied, True)
+
+
+class TestTimeoutErrors:
+    """Test cases for translating timeouts and cancellations."""
+
+    def test_statement_timeout(self):
+        """Test that query_canceled is reported per query class."""
+        before = counter(DB_STATEMENT_TIMEOUTS_TOTAL, query_class=AGGREGATE)
+
+        error = timeouts._handle_error(
+            error_context(QueryCanceledError(), FakePostgresConnection(), AGGREGATE)
+        )
+
+        assert isinstance(error, DatabaseTimeoutError)
+        assert not isinstance(error, DeadlineExceededError)
+        assert counter(DB_STATEMENT_TIMEOUTS_TOTAL, query_class=AGGREGATE) == before + 1
+
+    def test_deadline_timeout(self):
+        """Test that a timeout set from the deadline is reported as such."""
+        conn = FakePostgresConnection()
+        conn.info["statement_timeout"] = (800, True)
+        before = counter(DB_DEADLINE_EXCEEDED_TOTAL, stage="statement")
+
+        error = timeouts._handle_error(error_context(QueryCanceledError(), conn))
+
+        assert isinstance(error, DeadlineExceededError)
+        assert counter(DB_DEADLINE_EXCEEDED_TOTAL, stage="statement") == before + 1
+
+    def test_other_errors_pass_through(self):
+        """Test that unrelated database errors are left alone."""
+        assert timeouts._handle_error(error_context(ValueError("boom"))) is None
+
+    def test_cancellation_is_counted_not_a_failure(self):
+        """Test that a cancelled task neither trips the circuit nor is replaced."""
+        context = error_context(asyncio.CancelledError(), FakePostgresConnection())
+        before = counter(DB_CANCELLATIONS_TOTAL, query_class=LOOKUP)
+
+        assert circuit_breaker._handle_error(context) is None
+        assert timeouts._handle_error(context) is None
+        assert get_circuit_breaker().failures == 0
+        assert counter(DB_CANCELLATIONS_TOTAL, query_class=LOOKUP) == before + 1
+
+
+class TestDeadlines:
+    """Test cases for request deadlines."""
+
+    @pytest.mark.asyncio
+    async def test_expired_deadline_refuses_statements(self, db_session: AsyncSession):
+        """Test that no statement starts once the deadline has passed."""
+        before = counter(DB_DEADLINE_EXCEEDED_TOTAL, stage="statement")
+
+        with deadline(1):
+            await asyncio.sleep(0.01)
+            with pytest.raises(DeadlineExceededError):
+                await db_session.execute(text("SELECT 1"))
+
+        assert counter(DB_DEADLINE_EXCEEDED_TOTAL, stage="statement") == before + 1
+        assert remaining_seconds() is None
+
+    @pytest.mark.asyncio
+    async def test_deadline_cuts_pool_checkout(self, tmp_path):
+        """Test that waiting for a connection stops at the deadline."""
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path}/db.sqlite",
+            poolclass=TimedAsyncQueuePool,
+            pool_size=1,
+            max_overflow=0,
+            pool_timeout=30,
+        )
+        before = counter(DB_DEADLINE_EXCEEDED_TOTAL, stage="pool_checkout")
+        try:
+            async with engine.connect():
+                started = time.perf_counter()
+                with deadline(100), pytest.raises(DeadlineExceededError):
+                    async with engine.connect():
+                        pass
+                assert time.perf_counter() - started < 5
+        finally:
+            await engine.dispose()
+
+        assert engine.pool._timeout == 30
+        assert get_circuit_breaker().failures == 0
+        assert counter(DB_DEADLINE_EXCEEDED_TOTAL, stage="pool_checkout") == before + 1
+
+    @pytest.mark.asyncio
+    async def test_middleware_sets_route_deadline(self, monkeypatch):
+        """Test that requests get the deadline of their route, or none."""
+        monkeypatch.setattr(settings, "REQUEST_DEADLINE_MS", 10_000)
+        monkeypatch.setattr(settings, "REQUEST_DEADLINES", {"/export": 0})
+        seen = []
+
+        async def export():
+            pass
+
+        async def app(scope, receive, send):
+            seen.append(remaining_seconds())
+            scope["endpoint"] = export
+            seen.append(remaining_seconds())
+
+        routes = [SimpleNamespace(endpoint=export, path="/export")]
+        await DeadlineMiddleware(app)(
+            {"type": "http", "app": SimpleNamespace(routes=routes)}, None, None
+        )
+
+        assert 0 < seen[0] <= 10
+        assert seen[1] is None
+        assert remaining_seconds() is None
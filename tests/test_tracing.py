@@ -0,0 +1,261 @@
+import json
+
+import pytest
+from httpx import AsyncClient
+
+from src.infrastructure.monitoring.tracing import (
+    BatchSpanProcessor,
+    FileSpanExporter,
+    SpanContext,
+    Tracer,
+    current_span,
+    format_traceparent,
+    get_tracer,
+    parse_traceparent,
+    set_tracer,
+    traced,
+)
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+class ListExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, spans):
+        self.spans.extend(spans)
+
+
+@pytest.fixture
+def exporter():
+    exporter = ListExporter()
+    processor = BatchSpanProcessor(exporter, resource={"service.name": "test"})
+    set_tracer(Tracer(processor, sample_ratio=1.0))
+    return exporter
+
+
+class TestTraceparent:
+    """Test cases for W3C traceparent parsing."""
+
+    def test_parses_valid_header(self):
+        """Test that trace id, parent id and the sampled flag are read."""
+        context = parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-01")
+
+        assert context == SpanContext(TRACE_ID, PARENT_ID, sampled=True)
+        assert format_traceparent(context) == f"00-{TRACE_ID}-{PARENT_ID}-01"
+
+    def test_reads_unsampled_flag(self):
+        """Test that flags without the sampled bit are kept unsampled."""
+        assert not parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-00").sampled
+
+    @pytest.mark.parametrize(
+        "header",
+        [
+            "",
+            "garbage",
+            f"00-{'0' * 32}-{PARENT_ID}-01",
+            f"00-{TRACE_ID}-{'0' * 16}-01",
+            f"ff-{TRACE_ID}-{PARENT_ID}-01",
+            f"00-{TRACE_ID}-{PARENT_ID}-01-extra",
+            f"00-{TRACE_ID[:-1]}-{PARENT_ID}-01",
+        ],
+    )
+    def test_rejects_invalid_headers(self, header):
+        """Test that malformed or invalid headers start a new trace."""
+        assert parse_traceparent(header) is None
+
+    def test_accepts_future_versions_with_extra_fields(self):
+        """Test that later versions may carry trailing fields."""
+        assert parse_traceparent(f"01-{TRACE_ID}-{PARENT_ID}-01-extra") is not None
+
+
+class TestSampling:
+    """Test cases for head-based sampling."""
+
+    def test_ratio_zero_records_nothing(self):
+        """Test that unsampled root spans are not recorded or exported."""
+        exporter = ListExporter()
+        processor = BatchSpanProcessor(exporter)
+        tracer = Tracer(processor, sample_ratio=0.0)
+
+        with tracer.start_span("root") as span:
+            assert not span.recording
+
+        assert len(processor._queue) == 0
+
+    def test_ratio_one_records_root_and_children(self):
+        """Test that children share the root's trace and point at it."""
+        processor = BatchSpanProcessor(ListExporter())
+        tracer = Tracer(processor, sample_ratio=1.0)
+
+        with tracer.start_span("root") as root:
+            with tracer.start_span("child") as child:
+                pass
+
+        assert child.context.trace_id == root.context.trace_id
+        assert child.parent_span_id == root.context.span_id
+        assert root.parent_span_id is None
+        assert [span.name for span in processor._queue] == ["child", "root"]
+
+    def test_remote_decision_wins_over_ratio(self):
+        """Test that the sampled flag of a remote parent is honoured."""
+        tracer = Tracer(BatchSpanProcessor(ListExporter()), sample_ratio=0.0)
+
+        sampled = SpanContext(TRACE_ID, PARENT_ID, sampled=True)
+        with tracer.start_span("server", parent=sampled) as span:
+            assert span.recording
+
+        tracer = Tracer(BatchSpanProcessor(ListExporter()), sample_ratio=1.0)
+        unsampled = SpanContext(TRACE_ID, PARENT_ID, sampled=False)
+        with tracer.start_span("server", parent=unsampled) as span:
+            assert not span.recording
+
+    def test_decision_is_stable_per_trace_id(self):
+        """Test that the ratio rule depends only on the trace id."""
+        tracer = Tracer(BatchSpanProcessor(ListExporter()), sample_ratio=0.5)
+
+        assert tracer.should_sample("0" * 16 + "0" * 15 + "1")
+        assert not tracer.should_sample("0" * 16 + "f" * 16)
+
+
+class TestTraced:
+    """Test cases for the traced decorator."""
+
+    @pytest.mark.asyncio
+    async def test_no_span_outside_a_trace(self, exporter):
+        """Test that decorated functions do nothing extra without a trace."""
+
+        @traced()
+        async def work():
+            return current_span()
+
+        assert await work() is None
+
+    @pytest.mark.asyncio
+    async def test_records_errors(self, exporter):
+        """Test that an exception marks the span as failed and propagates."""
+
+        @traced("failing")
+        def fail():
+            raise ValueError("boom")
+
+        with get_tracer().start_span("root"):
+            with pytest.raises(ValueError):
+                fail()
+        await get_tracer().processor.flush()
+
+        failing = next(span for span in exporter.spans if span["name"] == "failing")
+        assert failing["status"] == {"code": "ERROR", "message": "ValueError: boom"}
+
+
+class TestBatchSpanProcessor:
+    """Test cases for the batching exporter."""
+
+    @pytest.mark.asyncio
+    async def test_drops_spans_when_queue_is_full(self):
+        """Test that the queue is bounded."""
+        exporter = ListExporter()
+        tracer = Tracer(BatchSpanProcessor(exporter, max_queue=2), sample_ratio=1.0)
+
+        for _ in range(5):
+            with tracer.start_span("span"):
+                pass
+        exported = await tracer.processor.flush()
+
+        assert exported == 2
+
+    @pytest.mark.asyncio
+    async def test_background_export_on_stop(self):
+        """Test that stopping exports what is still queued."""
+        exporter = ListExporter()
+        tracer = Tracer(
+            BatchSpanProcessor(exporter, interval_ms=60_000), sample_ratio=1.0
+        )
+        tracer.start()
+
+        with tracer.start_span("span"):
+            pass
+        await tracer.stop()
+
+        assert [span["name"] for span in exporter.spans] == ["span"]
+
+    @pytest.mark.asyncio
+    async def test_file_exporter_writes_json_lines(self, tmp_path):
+        """Test that each span is one JSON object with the resource attached."""
+        path = tmp_path / "traces.jsonl"
+        processor = BatchSpanProcessor(
+            FileSpanExporter(str(path)), resource={"service.name": "auth"}
+        )
+        tracer = Tracer(processor, sample_ratio=1.0)
+
+        with tracer.start_span("one"):
+            pass
+        with tracer.start_span("two"):
+            pass
+        await processor.flush()
+
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [line["name"] for line in lines] == ["one", "two"]
+        assert lines[0]["resource"] == {"service.name": "auth"}
+
+
+class TestRequestTracing:
+    """Test cases for spans of HTTP requests."""
+
+    @pytest.mark.asyncio
+    async def test_login_continues_incoming_trace(
+        self, client: AsyncClient, test_user_data: dict, created_user: dict, exporter
+    ):
+        """Test that a login is broken down into service, database and hashing spans."""
+        response = await client.post(
+            "/api/v1/auth/login",
+            json={
+                "username": test_user_data["username"],
+                "password": test_user_data["password"],
+            },
+            headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"},
+        )
+        assert response.status_code == 200
+        await get_tracer().processor.flush()
+
+        spans = {span["name"]: span for span in exporter.spans}
+        server = spans["POST /api/v1/auth/login"]
+        assert server["kind"] == "server"
+        assert server["parent_span_id"] == PARENT_ID
+        assert server["attributes"]["http.route"] == "/api/v1/auth/login"
+        assert server["attributes"]["http.response.status_code"] == 200
+        assert server["resource"] == {"service.name": "test"}
+
+        login = spans["AuthService.authenticate_user"]
+        assert login["parent_span_id"] == server["span_id"]
+        for name in (
+            "UserRepository.get_user_by_username",
+            "verify_password",
+            "create_access_token",
+            "RefreshTokenRepository.add_refresh_token",
+        ):
+            assert spans[name]["parent_span_id"] == login["span_id"]
+        assert {span["trace_id"] for span in exporter.spans} == {TRACE_ID}
+
+    @pytest.mark.asyncio
+    async def test_unmatched_route_keeps_method_name(
+        self, client: AsyncClient, exporter
+    ):
+        """Test that unmatched routes keep the method as span name."""
+        response = await client.get("/does-not-exist")
+        assert response.status_code == 404
+        await get_tracer().processor.flush()
+
+        (server,) = exporter.spans
+        assert server["name"] == "GET"
+        assert server["status"]["code"] == "UNSET"
+
+    @pytest.mark.asyncio
+    async def test_disabled_by_default(self, client: AsyncClient):
+        """Test that no spans are created when tracing is off."""
+        response = await client.get("/health")
+
+        assert response.status_code == 200
+        assert current_span() is None
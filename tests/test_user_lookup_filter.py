@@ -0,0 +1,195 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import settings
+from src.domain.use_cases.auth_service import AuthService
+from src.infrastructure.cache.user_lookup_filter import (
+    BloomFilter,
+    get_user_lookup_filter,
+)
+from src.infrastructure.database.models.user import User
+from src.infrastructure.database.repositories.user_repository import UserRepository
+
+
+@pytest.fixture
+def lookup_filter_enabled(monkeypatch):
+    monkeypatch.setattr(settings, "USER_LOOKUP_FILTER_ENABLED", True)
+
+
+class TestBloomFilter:
+    """Test cases for the Bloom filter."""
+
+    def test_no_false_negatives(self):
+        """Test that every added key is reported as present."""
+        bloom = BloomFilter(capacity=1000)
+        keys = [f"user{i}" for i in range(1000)]
+        for key in keys:
+            bloom.add(key)
+
+        assert all(key in bloom for key in keys)
+
+    def test_false_positive_rate_is_bounded(self):
+        """Test that unknown keys are mostly reported as absent."""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"user{i}")
+
+        false_positives = sum(f"other{i}" in bloom for i in range(10_000))
+
+        assert false_positives < 500
+
+
+class TestUserLookupFilter:
+    """Test cases for the username/email lookup filter."""
+
+    def test_pass_through_until_built(self):
+        """Test that an unbuilt filter never reports a definite miss."""
+        lookup_filter = get_user_lookup_filter()
+
+        assert lookup_filter.ready is False
+        assert lookup_filter.might_contain_username("anyone") is True
+
+    @pytest.mark.asyncio
+    async def test_build_and_short_circuit(
+        self, db_session: AsyncSession, created_user: dict, lookup_filter_enabled
+    ):
+        """Test that definite misses skip the database."""
+        lookup_filter = get_user_lookup_filter()
+        loaded = await lookup_filter.build(db_session)
+
+        assert loaded == 1
+        assert lookup_filter.might_contain_username(created_user["username"])
+        assert lookup_filter.might_contain_email(created_user["email"])
+
+        session = AsyncMock()
+        repository = UserRepository(session)
+        assert (
+            await repository.get_user_by_username(
+                "unknown-user", use_lookup_filter=True
+            )
+            is None
+        )
+        session.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_users_from_other_replicas_are_found(self, db_session: AsyncSession):
+        """Test that signup checks do not trust a filter that missed a user."""
+        await get_user_lookup_filter().build(db_session)
+        # Inserted behind the filter's back, as another replica would
+        db_session.add(
+            User(
+                username="elsewhere",
+                full_name="Other Replica",
+                cpf="11122233344",
+                email="elsewhere@example.com",
+                password_hash="hash",
+            )
+        )
+        await db_session.commit()
+        repository = UserRepository(db_session)
+        service = AuthService(repository, AsyncMock())
+
+        assert await repository.get_user_by_username("elsewhere") is not None
+        assert await service.check_availability(username="elsewhere") == {
+            "username": False
+        }
+
+    @pytest.mark.asyncio
+    async def test_concurrent_registration_is_a_conflict(
+        self, db_session: AsyncSession, created_user: dict
+    ):
+        """Test that a unique violation is reported like the duplicate checks."""
+        repository = UserRepository(db_session)
+
+        with pytest.raises(ValueError, match="Username already taken"):
+            await repository.register_user(
+                username=created_user["username"],
+                full_name="Duplicate",
+                cpf="55566677788",
+                email="duplicate@example.com",
+                password="hash",
+            )
+
+    @pytest.mark.asyncio
+    async def test_register_updates_filter_and_delete_keeps_it(
+        self, db_session: AsyncSession, lookup_filter_enabled
+    ):
+        """Test that registrations are added and deletions never cause misses."""
+        lookup_filter = get_user_lookup_filter()
+        await lookup_filter.build(db_session)
+        repository = UserRepository(db_session)
+
+        user = await repository.register_user(
+            username="newbie",
+            full_name="New User",
+            cpf="98765432100",
+            email="newbie@example.com",
+            password="hash",
+        )
+        assert lookup_filter.might_contain_username("newbie") is True
+
+        await repository.delete_user(user.id)
+        # Removing it could clear positions shared with other users
+        assert lookup_filter.might_contain_username("newbie") is True
+
+    @pytest.mark.asyncio
+    async def test_disabled_by_default(
+        self, db_session: AsyncSession, created_user: dict
+    ):
+        """Test that logins query the database unless the filter is enabled."""
+        await get_user_lookup_filter().build(db_session)
+        session = AsyncMock()
+        session.execute.return_value = MagicMock()
+        repository = UserRepository(session)
+
+        await repository.get_user_by_username("unknown-user", use_lookup_filter=True)
+
+        session.execute.assert_called_once()
+
+
+class TestUnknownUserLogin:
+    """Test cases for uniform timing on unknown usernames."""
+
+    @pytest.mark.asyncio
+    async def test_unknown_user_verifies_dummy_hash(self):
+        """Test that a hash is still verified when the user does not exist."""
+        user_repository = AsyncMock()
+        user_repository.get_user_by_username.return_value = None
+        service = AuthService(user_repository, AsyncMock())
+
+        with patch(
+            "src.domain.use_cases.auth_service.verify_password", return_value=False
+        ) as mock_verify, patch(
+            "src.domain.use_cases.auth_service.get_dummy_password_hash",
+            return_value="dummy",
+        ):
+            with pytest.raises(ValueError, match="Invalid username or password"):
+                await service.authenticate_user("ghost", "password")
+
+        mock_verify.assert_called_once_with("password", "dummy")
+
+
+class TestSignupAvailability:
+    """Test cases for the /signup/availability endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_taken_and_free_values(self, client: AsyncClient, created_user: dict):
+        """Test availability for registered and unregistered values."""
+        response = await client.get(
+            "/api/v1/auth/signup/availability",
+            params={"username": created_user["username"], "email": "free@example.com"},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {"username": False, "email": True}
+
+    @pytest.mark.asyncio
+    async def test_requires_a_parameter(self, client: AsyncClient):
+        """Test that at least one value must be given."""
+        response = await client.get("/api/v1/auth/signup/availability")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST